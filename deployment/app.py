@@ -7,25 +7,34 @@ import os
 import numpy as np
 import json
 
+from compiled_forest import CompiledForest
+
 # Inicializar la aplicación FastAPI
 app = FastAPI(title="API de Predicción de Retención Estudiantil")
 
 # --- Carga de Artefactos ---
 MODEL_PATH = 'models/random_forest_model.pkl'
+# Random forest compilado (arrays planos): más pequeño y se abre con memory-mapping
+COMPILED_MODEL_DIR = 'models/random_forest_compiled'
 FEATURES_PATH = 'feature_info.json'
 
 pipeline = None
 model_loaded = False
 numerical_features = []
+feature_dtypes = {}
 
 try:
-    # Cargar el pipeline completo
-    pipeline = joblib.load(MODEL_PATH)
+    # Cargar el modelo compilado si existe; si no, el pipeline completo
+    if os.path.isdir(COMPILED_MODEL_DIR):
+        pipeline = CompiledForest.load(COMPILED_MODEL_DIR)
+    else:
+        pipeline = joblib.load(MODEL_PATH)
     
     # Cargar la lista de características numéricas
     with open(FEATURES_PATH, 'r') as f:
         feature_info = json.load(f)
         numerical_features = feature_info.get('numerical_columns', [])
+        feature_dtypes = feature_info.get('feature_dtypes', {})
     
     if pipeline and numerical_features:
         model_loaded = True
@@ -63,6 +72,16 @@ def predict(student: StudentFeatures):
     # Crear DataFrame solo con las características numéricas y sus nombres correctos
     features_df = pd.DataFrame([student.features], columns=numerical_features)
     
+    # Usar los mismos tipos que en entrenamiento cuando el valor es representable
+    for col, dtype in feature_dtypes.items():
+        if col in features_df.columns:
+            try:
+                converted = features_df[col].astype(dtype)
+            except (TypeError, ValueError):
+                continue
+            if np.allclose(converted.to_numpy(dtype=float), features_df[col].to_numpy(dtype=float), rtol=1e-6, equal_nan=True):
+                features_df[col] = converted
+    
     # Predecir
     try:
         prediction = pipeline.predict(features_df)[0]
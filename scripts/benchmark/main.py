@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Script de benchmark del procesamiento de datos.
+
+Este script carga el dataset OULAD completo y compara el tiempo de
+process_all_data con los backends pandas y polars, verificando además que
+ambos producen las mismas tablas derivadas.
+"""
+
+import sys
+import json
+import time
+from pathlib import Path
+
+# Agregar el directorio src al path para importar el módulo
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from nombre_paquete.database import load_all_data
+from nombre_paquete.database.data_processor import PROCESSING_ENGINES, process_all_data
+
+import logging
+import pandas as pd
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DERIVED_TABLES = ['student_consolidated', 'interaction_features', 'assessment_features']
+
+def benchmark_processing_engines(data_dict, repeats: int = 3):
+    """
+    Mide el tiempo de process_all_data con cada backend.
+    
+    Args:
+        data_dict: Diccionario con todos los DataFrames originales
+        repeats: Número de repeticiones por backend (se reporta la mejor)
+        
+    Returns:
+        Diccionario con tiempos por backend, speedup y resultado de paridad
+    """
+    timings = {}
+    outputs = {}
+    
+    for engine in PROCESSING_ENGINES:
+        runs = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            outputs[engine] = process_all_data(data_dict, engine=engine)
+            runs.append(time.perf_counter() - start)
+        timings[engine] = min(runs)
+        logger.info(f"⏱️ {engine}: {timings[engine]:.2f} s (mejor de {repeats})")
+    
+    parity = True
+    for name in DERIVED_TABLES:
+        try:
+            pd.testing.assert_frame_equal(outputs['polars'][name], outputs['pandas'][name], check_exact=False, rtol=1e-12)
+        except AssertionError as e:
+            logger.error(f"❌ {name} difiere entre backends: {e}")
+            parity = False
+    
+    return {
+        'timings_seconds': timings,
+        'speedup_polars': timings['pandas'] / timings['polars'],
+        'parity': parity
+    }
+
+def main():
+    """
+    Función principal que ejecuta el benchmark y guarda los resultados.
+    """
+    logger.info("🚀 Iniciando benchmark de procesamiento...")
+    
+    data_dict = load_all_data()
+    results = benchmark_processing_engines(data_dict)
+    
+    results_dir = Path("docs/benchmark")
+    results_dir.mkdir(parents=True, exist_ok=True)
+    results_file = results_dir / "processing_engines.json"
+    with open(results_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    
+    logger.info(f"⚡ Speedup polars vs pandas: {results['speedup_polars']:.2f}x")
+    logger.info(f"✅ Resultados guardados en: {results_file}")
+
+if __name__ == "__main__":
+    main()
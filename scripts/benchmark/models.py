@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Script de benchmark de los modelos baseline.
+
+Este script entrena cada tipo de modelo sobre la matriz de modelado y mide
+el tiempo de entrenamiento, la latencia de predicción de una sola fila y el
+tamaño del modelo serializado. Para 'hist_gb' se mide además el segundo
+entrenamiento, que reutiliza la matriz discretizada cacheada en disco.
+"""
+
+import sys
+import json
+import time
+import tempfile
+from pathlib import Path
+
+# Agregar el directorio src al path para importar el módulo
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from nombre_paquete.models.baseline_model import BaselineModel
+from nombre_paquete.preprocessing.modeling_matrix import load_modeling_matrix, modeling_matrix_problems
+
+import logging
+import numpy as np
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PROCESSED_DIR = Path("data/processed")
+MODEL_TYPES = ['logistic', 'random_forest', 'hist_gb']
+
+def measure_latency(model, row, repeats: int = 200):
+    """
+    Mide la latencia de predict_proba sobre una sola fila.
+
+    Args:
+        model: BaselineModel entrenado
+        row: DataFrame de una fila
+        repeats: Número de predicciones
+
+    Returns:
+        Mediana de la latencia en milisegundos
+    """
+    model.predict_proba(row)
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(row)
+        latencies.append(time.perf_counter() - start)
+    return float(np.median(latencies) * 1000)
+
+def benchmark_model_types(features_df, target):
+    """
+    Entrena cada tipo de modelo y mide tiempo, latencia y tamaño.
+
+    Args:
+        features_df: DataFrame con características
+        target: Series con variable objetivo
+
+    Returns:
+        Diccionario con los resultados por tipo de modelo
+    """
+    results = {}
+    row = features_df.iloc[[0]]
+
+    for model_type in MODEL_TYPES:
+        model = BaselineModel(model_type=model_type)
+        start = time.perf_counter()
+        metrics = model.train(features_df, target)
+        train_seconds = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = Path(tmp_dir) / f"{model_type}.pkl"
+            model.save_model(str(model_path))
+            size_mb = model_path.stat().st_size / 1024 ** 2
+
+        results[model_type] = {
+            'train_seconds': train_seconds,
+            'latency_ms': measure_latency(model, row),
+            'model_size_mb': size_mb,
+            'roc_auc': metrics['roc_auc'],
+            'f1_score': metrics['f1_score']
+        }
+
+        if model_type == 'hist_gb':
+            # Segundo entrenamiento: la matriz discretizada sale de la caché en disco
+            start = time.perf_counter()
+            BaselineModel(model_type=model_type).train(features_df, target)
+            results[model_type]['train_seconds_cached_bins'] = time.perf_counter() - start
+
+        logger.info(
+            f"⏱️ {model_type}: entrenamiento {train_seconds:.2f} s, latencia {results[model_type]['latency_ms']:.2f} ms, "
+            f"tamaño {size_mb:.2f} MB, ROC-AUC {metrics['roc_auc']:.3f}"
+        )
+
+    return results
+
+def main():
+    """
+    Función principal que ejecuta el benchmark y guarda los resultados.
+    """
+    logger.info("🚀 Iniciando benchmark de modelos...")
+
+    problems = modeling_matrix_problems(PROCESSED_DIR)
+    if problems:
+        logger.error(f"❌ Matriz de modelado no utilizable ({'; '.join(problems)}). Ejecuta primero el preprocesamiento.")
+        sys.exit(1)
+
+    features_df, target = load_modeling_matrix(PROCESSED_DIR)
+    results = benchmark_model_types(features_df, target)
+
+    results_dir = Path("docs/benchmark")
+    results_dir.mkdir(parents=True, exist_ok=True)
+    results_file = results_dir / "model_types.json"
+    with open(results_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    logger.info(f"✅ Resultados guardados en: {results_file}")
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ procesa los datos y los guarda en formato limpio para el análisis posterior.
 
 import sys
 import os
+import time
+import argparse
 from pathlib import Path
 
 # Agregar el directorio src al path para importar el módulo
@@ -22,7 +24,30 @@ from nombre_paquete.database import (
     create_processed_data_folder,
     save_processed_data
 )
-from nombre_paquete.database.data_processor import process_all_data
+from nombre_paquete.database.data_processor import (
+    process_all_data,
+    find_processed_table,
+    merge_student_data,
+    create_interaction_features,
+    create_assessment_features
+)
+from nombre_paquete.database.assessment_engine import create_enrollment_assessment_features
+from nombre_paquete.database.resource_monitor import record_peak_rss, track_stage_peak
+from nombre_paquete.database.data_loader import (
+    DATA_PATH,
+    load_student_info,
+    load_courses,
+    load_assessments,
+    load_student_assessments,
+    load_student_registration,
+    load_vle
+)
+from nombre_paquete.database.data_validator import HASH_BYTES, summarize_table_in_chunks
+from nombre_paquete.database.out_of_core import DEFAULT_ROW_BYTES, estimate_row_bytes, estimate_source_bytes
+from nombre_paquete.database.memory_budget import BudgetedTableCache
+from nombre_paquete.database.incremental_ingest import STUDENT_VLE_DTYPES, InteractionStore
+from nombre_paquete.database.interaction_aggregates import InteractionAggregateState
+from nombre_paquete.resource_planner import get_resource_plan
 
 import logging
 import pandas as pd
@@ -34,10 +59,303 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Tablas que caben en memoria, en el orden de load_all_data (studentVle se procesa por bloques)
+TABLE_LOADERS = {
+    'student_info': load_student_info,
+    'courses': load_courses,
+    'assessments': load_assessments,
+    'student_assessments': load_student_assessments,
+    'student_registration': load_student_registration,
+    'vle': load_vle
+}
+
+# Etapas que consumen cada tabla en el modo con presupuesto de memoria
+TABLE_CONSUMERS = {
+    'student_info': ['integrity', 'student_consolidated'],
+    'courses': ['integrity', 'student_consolidated'],
+    'student_registration': ['integrity', 'student_consolidated', 'assessment_features'],
+    'assessments': ['integrity', 'assessment_features'],
+    'student_assessments': ['integrity', 'assessment_features'],
+    'vle': ['interaction_features']
+}
+
+# Carpeta de datos procesados
+PROCESSED_PATH = Path("data") / "processed"
+
+def parse_args():
+    """
+    Lee los argumentos de línea de comandos.
+    
+    Returns:
+        argparse.Namespace con los argumentos
+    """
+    parser = argparse.ArgumentParser(description="Adquisición de datos OULAD")
+    parser.add_argument(
+        '--delta', type=Path, default=None,
+        help="CSV con interacciones nuevas (studentVle) a añadir al almacén incremental"
+    )
+    parser.add_argument(
+        '--verify', action='store_true',
+        help="Fuerza la verificación del estado agregado contra un recálculo completo"
+    )
+    parser.add_argument(
+        '--max-memory', type=float, default=None, metavar='MB',
+        help="Ejecuta con un presupuesto de memoria (MB): libera cada tabla tras su último "
+             "consumidor, vuelca a parquet si no cabe y procesa studentVle por bloques"
+    )
+    return parser.parse_args()
+
+def ingest_delta_file(delta_path: Path, verify: bool = False):
+    """
+    Valida un lote de interacciones nuevas, lo añade al almacén particionado
+    y lo pliega en el estado agregado de interacciones.
+    
+    Solo se leen el lote y las tablas de dimensiones pequeñas; el histórico
+    de studentVle se relee únicamente en las verificaciones periódicas y, tras
+    cada adquisición completa, en la primera ingesta (que siembra el almacén).
+    
+    Args:
+        delta_path: Ruta del CSV con las filas nuevas
+        verify: Si True, verifica el estado aunque no toque por calendario
+    """
+    logger.info(f"📥 Ingesta incremental de {delta_path}...")
+    vle = load_vle()
+    with InteractionAggregateState() as state:
+        seeded = InteractionStore().has_history() and state.is_seeded()
+    if not seeded:
+        # Sin histórico, interaction_features se reescribiría solo con los lotes
+        clean_path = find_processed_table(PROCESSED_PATH, 'student_vle_clean')
+        if clean_path is None or clean_path.suffix != '.parquet':
+            raise RuntimeError(
+                "El almacén y el estado de interacciones no tienen el histórico y no hay "
+                "student_vle_clean.parquet; ejecuta primero la adquisición completa (sin --delta)"
+            )
+        chunk_rows = get_resource_plan().chunk_rows
+        seed_interaction_store(lambda: iter_parquet_chunks(clean_path, chunk_rows), vle)
+    
+    delta_df = pd.read_csv(delta_path, dtype=STUDENT_VLE_DTYPES)
+    store = InteractionStore()
+    result = store.ingest(delta_df, vle, load_student_registration())
+    
+    logger.info(f"🧩 Particiones modificadas: {len(result['changed_partitions'])}")
+    for name in result['changed_partitions']:
+        logger.info(f"   - {name}")
+    
+    # Plegar el lote en el estado agregado y regenerar interaction_features
+    with InteractionAggregateState() as state:
+        state.fold(delta_df, vle, batch_id=result['batch_id'])
+        save_processed_data(
+            {'interaction_features': state.interaction_features()},
+            create_processed_data_folder(),
+            format='parquet'
+        )
+        
+        if verify or state.needs_verification():
+            # El almacén contiene el histórico sembrado más todos los lotes
+            verification = state.verify(store.read(), vle)
+            if verification['overall_status'] != 'PASS':
+                raise RuntimeError(f"El estado agregado no coincide con el recálculo completo: {verification['tables']}")
+    
+    store.mark_consumed('interaction_features')
+
+def iter_parquet_chunks(path: Path, chunk_rows: int):
+    """
+    Recorre un fichero parquet por bloques de filas.
+    
+    Args:
+        path: Ruta del fichero
+        chunk_rows: Filas por bloque
+        
+    Returns:
+        Generador de DataFrames
+    """
+    import pyarrow.parquet as pq
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+        yield batch.to_pandas()
+
+def seed_interaction_store(make_chunks, vle):
+    """
+    Reconstruye el almacén incremental y el estado agregado con el histórico
+    completo de studentVle.
+    
+    Las ingestas --delta posteriores se añaden sobre este histórico, de modo
+    que el almacén siempre contiene histórico + lotes y el estado sus agregados.
+    
+    Args:
+        make_chunks: Función sin argumentos que devuelve los bloques de studentVle
+            (se llama una vez para el almacén y otra para el estado)
+        vle: Tabla vle
+    """
+    logger.info("🌱 Sembrando el almacén incremental con el histórico de studentVle...")
+    start = time.perf_counter()
+    store = InteractionStore()
+    history = store.ingest_history(make_chunks())
+    with InteractionAggregateState() as state:
+        state.seed(make_chunks(), vle)
+    # interaction_features se calculó sobre este mismo histórico
+    store.mark_consumed('interaction_features')
+    logger.info(
+        f"✅ Histórico sembrado: {history['rows']} filas en {history['partitions']} particiones "
+        f"({time.perf_counter() - start:.1f} s)"
+    )
+
+def reset_interaction_store():
+    """
+    Invalida el almacén incremental y el estado agregado tras una adquisición completa.
+    
+    El histórico nuevo se siembra de forma perezosa en la primera ingesta
+    --delta, de modo que las adquisiciones que nunca usan --delta no pagan
+    la reconstrucción del almacén.
+    """
+    InteractionStore().reset()
+    with InteractionAggregateState() as state:
+        state.reset()
+
+def _merge_validation(results, name, table_results):
+    """Añade los resultados de validación de una tabla a los acumulados."""
+    results['missing'][name] = table_results['missing_values']
+    results['types'][name] = table_results['data_types']
+    results['summary']['file_summary'][name] = table_results['file_summary']
+    results['summary']['key_statistics'].update(table_results['key_statistics'])
+
+def run_with_memory_budget(max_memory_mb):
+    """
+    Ejecuta la adquisición con un presupuesto de memoria.
+    
+    Las tablas pequeñas se cargan una a una, se validan y se guardan como
+    *_clean.parquet; solo se retienen mientras les queden consumidores, y si
+    no caben en el presupuesto se recargan desde esa copia. studentVle nunca
+    se materializa: se valida por bloques y se agrega fuera de memoria. Cada
+    resultado se guarda en cuanto se calcula y se registra el pico de RSS de
+    cada etapa.
+    
+    Args:
+        max_memory_mb: Presupuesto de memoria en MB
+    """
+    logger.info(f"🚀 Iniciando adquisición con presupuesto de memoria de {max_memory_mb:.0f} MB...")
+    
+    processed_path = create_processed_data_folder()
+    stage_peaks = {}
+    validation = {'missing': {}, 'types': {}, 'summary': {'file_summary': {}, 'key_statistics': {}}}
+    
+    with BudgetedTableCache(max_memory_mb, TABLE_CONSUMERS) as tables:
+        # 1. Tablas pequeñas: carga, validación y copia limpia, de una en una
+        for name, loader in TABLE_LOADERS.items():
+            with track_stage_peak(f"load_{name}", stage_peaks):
+                df = loader()
+                table_results = {
+                    'missing_values': check_missing_values({name: df})[name],
+                    'data_types': validate_data_types({name: df})[name]
+                }
+                table_summary = generate_data_summary({name: df})
+                table_results['file_summary'] = table_summary['file_summary'][name]
+                table_results['key_statistics'] = table_summary['key_statistics']
+                _merge_validation(validation, name, table_results)
+                
+                save_processed_data({f"{name}_clean": df}, processed_path, format='parquet')
+                tables.put(name, df, disk_copy=processed_path / f"{name}_clean.parquet")
+                del df
+        
+        # 2. Integridad referencial
+        with track_stage_peak('integrity', stage_peaks):
+            integrity_results = validate_data_integrity({
+                name: tables.get(name)
+                for name in ['student_info', 'student_registration', 'courses', 'assessments', 'student_assessments']
+            })
+        tables.finish_stage('integrity')
+        
+        # 3. Consolidación del estudiante
+        with track_stage_peak('student_consolidated', stage_peaks):
+            student_consolidated = merge_student_data({
+                name: tables.get(name) for name in ['student_info', 'student_registration', 'courses']
+            })
+            save_processed_data({'student_consolidated': student_consolidated}, processed_path, format='parquet')
+            del student_consolidated
+        tables.finish_stage('student_consolidated')
+        
+        # 4. Características de evaluaciones
+        with track_stage_peak('assessment_features', stage_peaks):
+            assessment_tables = {
+                name: tables.get(name) for name in ['student_registration', 'assessments', 'student_assessments']
+            }
+            save_processed_data({
+                'assessment_features': create_assessment_features(assessment_tables),
+                'enrollment_assessment_features': create_enrollment_assessment_features(assessment_tables)
+            }, processed_path, format='parquet')
+            del assessment_tables
+        tables.finish_stage('assessment_features')
+        
+        # 5. studentVle: validación y copia limpia por bloques, sin materializar la tabla
+        # Los bloques y los hashes de deduplicación se cargan al presupuesto que dejan las tablas residentes
+        student_vle_path = DATA_PATH / "studentVle.csv"
+        validation_mb = max(max_memory_mb - tables.resident_mb, max_memory_mb / 4)
+        row_bytes = estimate_row_bytes(student_vle_path) or DEFAULT_ROW_BYTES
+        chunk_rows = max(int(validation_mb * 1024 ** 2 / (4 * (row_bytes + HASH_BYTES))), 1)
+        expected_rows = int((estimate_source_bytes(student_vle_path) or 0) / row_bytes)
+        with track_stage_peak('student_vle_validation', stage_peaks):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            
+            clean_path = processed_path / "student_vle_clean.parquet"
+            with pq.ParquetWriter(clean_path, pa.Schema.from_pandas(
+                pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in STUDENT_VLE_DTYPES.items()}),
+                preserve_index=False
+            ), compression='zstd') as writer:
+                def write_chunks():
+                    for chunk in pd.read_csv(student_vle_path, chunksize=chunk_rows):
+                        writer.write_table(pa.Table.from_pandas(
+                            chunk[list(STUDENT_VLE_DTYPES)].astype(STUDENT_VLE_DTYPES), preserve_index=False
+                        ))
+                        yield chunk
+                
+                _merge_validation(validation, 'student_vle', summarize_table_in_chunks(
+                    'student_vle', write_chunks(), memory_budget_mb=validation_mb, expected_rows=expected_rows
+                ))
+        
+        # 6. Características de interacciones fuera de memoria con el presupuesto restante
+        with track_stage_peak('interaction_features', stage_peaks):
+            remaining_mb = max(max_memory_mb - tables.resident_mb, max_memory_mb / 4)
+            interaction_features = create_interaction_features(
+                {'student_vle': student_vle_path, 'vle': tables.get('vle')},
+                memory_budget_mb=remaining_mb
+            )
+            save_processed_data({'interaction_features': interaction_features}, processed_path, format='parquet')
+            del interaction_features
+        tables.finish_stage('interaction_features')
+        
+        n_spills = tables.n_spills
+    
+    # 7. El almacén incremental se sembrará desde la copia limpia en la primera ingesta --delta
+    reset_interaction_store()
+    
+    # 8. Reporte final y métricas de memoria por etapa
+    with track_stage_peak('report', stage_peaks):
+        generate_final_report(
+            {}, integrity_results, validation['missing'], validation['types'], validation['summary']
+        )
+    
+    logger.info("📈 Pico de memoria por etapa (MB):")
+    for stage, peak in stage_peaks.items():
+        logger.info(f"   {stage}: {peak:.0f}")
+    record_peak_rss(
+        'data_acquisition_budgeted',
+        extra={'max_memory_mb': max_memory_mb, 'stage_peak_rss_mb': stage_peaks, 'n_spills': n_spills},
+        peak_rss_mb=max(stage_peaks.values())
+    )
+    logger.info("✅ Pipeline de adquisición con presupuesto de memoria completado exitosamente!")
+
 def main():
     """
     Función principal que ejecuta todo el pipeline de adquisición de datos.
     """
+    args = parse_args()
+    if args.delta is not None:
+        ingest_delta_file(args.delta, verify=args.verify)
+        return
+    if args.max_memory is not None:
+        run_with_memory_budget(args.max_memory)
+        return
+    
     logger.info("🚀 Iniciando pipeline de adquisición de datos OULAD...")
     
     try:
@@ -67,16 +385,23 @@ def main():
         
         # 7. Procesar datos
         logger.info("🔄 Paso 7: Procesando datos...")
-        processed_data = process_all_data(data_dict)
+        # Una partición por presentación, repartidas entre todos los núcleos
+        processed_data = process_all_data(data_dict, n_jobs=-1)
         
         # 8. Guardar datos procesados
         logger.info("💾 Paso 8: Guardando datos procesados...")
-        save_processed_data(processed_data, processed_path)
+        save_processed_data(processed_data, processed_path, format='parquet', n_jobs=-1)
+        
+        # El almacén incremental se sembrará con este histórico en la primera ingesta --delta
+        reset_interaction_store()
         
         # 9. Generar reporte final
         logger.info("📋 Paso 9: Generando reporte final...")
         generate_final_report(data_dict, integrity_results, missing_results, type_results, data_summary)
         
+        # 10. Registrar el pico de memoria como métrica de regresión
+        record_peak_rss('data_acquisition', extra={'student_vle_rows': len(data_dict['student_vle'])})
+        
         logger.info("✅ Pipeline de adquisición de datos completado exitosamente!")
         
     except Exception as e:
@@ -1,25 +1,30 @@
 import os
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 
+# Add src to the path to reuse the processed-data readers
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../src'))
+from nombre_paquete.database.data_processor import find_processed_table, read_processed_table
+
 # Set style
 sns.set(style="whitegrid")
 
 # Paths
 processed_dir = os.path.join(os.path.dirname(__file__), '../../data/processed')
-main_files = [
-    'student_consolidated.csv',
-    'student_info_clean.csv'
+main_tables = [
+    'student_consolidated',
+    'student_info_clean'
 ]
 
-# Try to load the most consolidated file
-for fname in main_files:
-    fpath = os.path.join(processed_dir, fname)
-    if os.path.exists(fpath):
-        df = pd.read_csv(fpath)
-        print(f"Loaded {fname} with shape {df.shape}")
+# Try to load the most consolidated table (csv, parquet or feather)
+for table in main_tables:
+    fpath = find_processed_table(processed_dir, table)
+    if fpath is not None:
+        df = read_processed_table(processed_dir, table)
+        print(f"Loaded {fpath.name} with shape {df.shape}")
         break
 else:
     raise FileNotFoundError("No main processed student file found in data/processed/")
@@ -19,6 +19,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../../src'))
 from nombre_paquete.models.baseline_model import BaselineModel
 from nombre_paquete.models.neural_network import NeuralNetworkModel
 from nombre_paquete.evaluation.model_evaluator import ModelEvaluator
+from nombre_paquete.preprocessing.modeling_matrix import load_modeling_matrix, modeling_matrix_is_current
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -35,6 +36,12 @@ def load_evaluation_data():
     
     processed_dir = Path(__file__).parent.parent.parent / "data" / "processed"
     
+    # Preferir la matriz binaria (memory-mapped, sin parseo) si está al día con el CSV
+    if modeling_matrix_is_current(processed_dir):
+        features_df, target = load_modeling_matrix(processed_dir, mmap=True)
+        logger.info(f"✅ Cargados datos con {len(features_df)} registros")
+        return features_df, target
+    
     # Cargar características y target
     features_path = processed_dir / "modeling_features.csv"
     target_path = processed_dir / "modeling_target.csv"
@@ -42,7 +49,14 @@ def load_evaluation_data():
     if not features_path.exists() or not target_path.exists():
         raise FileNotFoundError("No se encontraron los archivos de datos para evaluación.")
     
-    features_df = pd.read_csv(features_path)
+    # Reutilizar los tipos reducidos registrados por el preprocesamiento
+    feature_dtypes = None
+    feature_info_path = processed_dir / "feature_info.json"
+    if feature_info_path.exists():
+        with open(feature_info_path, 'r', encoding='utf-8') as f:
+            feature_dtypes = json.load(f).get('feature_dtypes')
+    
+    features_df = pd.read_csv(features_path, dtype=feature_dtypes)
     target = pd.read_csv(target_path).squeeze()
     
     logger.info(f"✅ Cargados datos con {len(features_df)} registros")
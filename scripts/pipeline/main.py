@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Punto de entrada único del pipeline de extremo a extremo.
+
+Este script declara las etapas del proyecto (adquisición, preprocesamiento,
+entrenamiento y evaluación) con sus entradas, salidas, código y parámetros,
+y las ejecuta con el orquestador: las etapas sin cambios se saltan (o se
+recuperan de la caché de artefactos) y las independientes se ejecutan en
+paralelo. Cambiar un hiperparámetro en config/model_params.json solo vuelve
+a ejecutar el entrenamiento de ese modelo y las etapas que dependen de él.
+"""
+
+import sys
+import json
+import argparse
+import logging
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# Agregar el directorio src al path para importar el módulo
+sys.path.append(str(PROJECT_ROOT / "src"))
+
+from nombre_paquete.models.compiled_forest import ARRAY_NAMES, METADATA_FILE
+from nombre_paquete.pipeline.orchestrator import PipelineOrchestrator, Stage, python_dependencies
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MODEL_PARAMS_PATH = Path("config") / "model_params.json"
+
+PROCESSED = Path("data") / "processed"
+MODELS = Path("models")
+PACKAGE = Path("src") / "nombre_paquete"
+
+# Matriz de modelado que leen entrenamiento y evaluación
+MODELING_MATRIX = [
+    PROCESSED / "modeling_features.npy",
+    PROCESSED / "modeling_target.npy",
+    PROCESSED / "modeling_schema.json"
+]
+BASELINE_MODELS = [MODELS / "logistic_regression_model.pkl", MODELS / "random_forest_model.pkl"]
+COMPILED_FOREST = [MODELS / "random_forest_compiled" / f"{name}.npy" for name in ARRAY_NAMES] + [
+    MODELS / "random_forest_compiled" / METADATA_FILE
+]
+NN_MODEL = [MODELS / "neural_network_model.keras", MODELS / "neural_network_model_preprocessor.pkl"]
+
+# Módulos que el script de entrenamiento importa pero solo usa la otra sub-etapa
+BASELINE_ONLY_CODE = [PACKAGE / "models" / "baseline_model.py", PACKAGE / "models" / "compiled_forest.py"]
+NN_ONLY_CODE = [PACKAGE / "models" / "neural_network.py"]
+
+def stage_code(script, exclude=()):
+    """
+    Código del que depende una etapa: el script y los módulos que importa transitivamente.
+
+    Args:
+        script: Script de la etapa
+        exclude: Módulos importados que la etapa no usa
+
+    Returns:
+        Lista de ficheros de código
+    """
+    return python_dependencies(script, PACKAGE, root=PROJECT_ROOT, exclude=exclude)
+
+def parse_args():
+    """
+    Lee los argumentos de línea de comandos.
+
+    Returns:
+        argparse.Namespace con los argumentos
+    """
+    parser = argparse.ArgumentParser(description="Pipeline de extremo a extremo con caché de artefactos")
+    parser.add_argument(
+        'targets', nargs='*',
+        help="Etapas objetivo (se ejecutan también sus predecesoras); por defecto, todo el pipeline"
+    )
+    parser.add_argument('--force', action='store_true', help="Ignora la caché y ejecuta todas las etapas")
+    parser.add_argument('--dry-run', action='store_true', help="Muestra qué etapas se ejecutarían")
+    parser.add_argument('--max-workers', type=int, default=None, help="Etapas simultáneas como máximo")
+    return parser.parse_args()
+
+def load_model_params():
+    """
+    Carga los hiperparámetros de los modelos.
+
+    Returns:
+        Diccionario con las secciones 'baseline' y 'neural_network'
+    """
+    params_path = PROJECT_ROOT / MODEL_PARAMS_PATH
+    if not params_path.exists():
+        return {'baseline': {}, 'neural_network': {}}
+    with open(params_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def build_stages(model_params):
+    """
+    Declara el grafo de etapas del proyecto.
+
+    Args:
+        model_params: Hiperparámetros de los modelos
+
+    Returns:
+        Lista de etapas
+    """
+    python = sys.executable
+    training_script = Path("scripts") / "training" / "main.py"
+
+    return [
+        Stage(
+            name='data_acquisition',
+            command=[python, Path("scripts") / "data_acquisition" / "main.py"],
+            inputs=[Path("data") / "anonymisedData"],
+            outputs=[PROCESSED / "student_consolidated.parquet", PROCESSED / "interaction_features.parquet"],
+            code=stage_code(Path("scripts") / "data_acquisition" / "main.py")
+        ),
+        Stage(
+            name='preprocessing',
+            command=[python, Path("scripts") / "preprocessing" / "main.py"],
+            inputs=[PROCESSED / "student_consolidated.parquet", PROCESSED / "interaction_features.parquet"],
+            outputs=MODELING_MATRIX + [
+                PROCESSED / "modeling_features.csv",
+                PROCESSED / "modeling_target.csv",
+                PROCESSED / "feature_info.json",
+                PROCESSED / "feature_state.json"
+            ],
+            code=stage_code(Path("scripts") / "preprocessing" / "main.py"),
+            depends_on=['data_acquisition']
+        ),
+        # Los modelos baseline y la red neuronal son independientes: se entrenan en paralelo
+        Stage(
+            name='train_baseline',
+            command=[python, training_script, '--stage', 'baseline'],
+            inputs=MODELING_MATRIX,
+            outputs=BASELINE_MODELS + COMPILED_FOREST + [PROCESSED / "baseline_results.json"],
+            code=stage_code(training_script, exclude=NN_ONLY_CODE),
+            params=model_params.get('baseline', {}),
+            depends_on=['preprocessing']
+        ),
+        Stage(
+            name='train_neural_network',
+            command=[python, training_script, '--stage', 'neural_network'],
+            inputs=MODELING_MATRIX,
+            outputs=NN_MODEL + [PROCESSED / "neural_network_results.json"],
+            code=stage_code(training_script, exclude=BASELINE_ONLY_CODE),
+            params=model_params.get('neural_network', {}),
+            depends_on=['preprocessing']
+        ),
+        Stage(
+            name='compare_models',
+            command=[python, training_script, '--stage', 'compare'],
+            inputs=MODELING_MATRIX + BASELINE_MODELS + NN_MODEL + [
+                PROCESSED / "baseline_results.json",
+                PROCESSED / "neural_network_results.json"
+            ],
+            outputs=[PROCESSED / "model_comparison.csv", PROCESSED / "training_results.json"],
+            code=stage_code(training_script),
+            depends_on=['train_baseline', 'train_neural_network']
+        ),
+        Stage(
+            name='evaluation',
+            command=[python, Path("scripts") / "evaluation" / "main.py"],
+            inputs=MODELING_MATRIX + BASELINE_MODELS + NN_MODEL,
+            outputs=[
+                PROCESSED / "final_model_comparison.csv",
+                PROCESSED / "evaluation_summary.json",
+                PROCESSED / "evaluation_results.json"
+            ],
+            code=stage_code(Path("scripts") / "evaluation" / "main.py"),
+            depends_on=['train_baseline', 'train_neural_network']
+        )
+    ]
+
+def main():
+    """
+    Función principal del pipeline.
+    """
+    args = parse_args()
+    orchestrator = PipelineOrchestrator(
+        build_stages(load_model_params()),
+        root=PROJECT_ROOT,
+        max_workers=args.max_workers
+    )
+    targets = args.targets or None
+
+    if args.dry_run:
+        for name, action in orchestrator.plan(targets).items():
+            logger.info(f"   {name}: {action}")
+        return
+
+    statuses = orchestrator.run(targets, force=args.force)
+    if any(status in ('failed', 'skipped') for status in statuses.values()):
+        logger.error(f"❌ Pipeline con errores: {statuses}")
+        sys.exit(1)
+    logger.info("✅ Pipeline completado exitosamente")
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,9 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../../src'))
 
 from nombre_paquete.preprocessing.feature_engineering import FeatureEngineer
 from nombre_paquete.database.data_loader import load_all_data
+from nombre_paquete.database.data_processor import find_processed_table, read_processed_table
+from nombre_paquete.database.feature_store import FeatureStore, aggregate_enrollments
+from nombre_paquete.preprocessing.modeling_matrix import save_modeling_matrix
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -33,18 +36,17 @@ def load_processed_data():
     
     processed_dir = Path(__file__).parent.parent.parent / "data" / "processed"
     
-    # Cargar datos de estudiantes
-    student_files = [
-        'student_consolidated.csv',
-        'student_info_clean.csv'
+    # Cargar datos de estudiantes (el formato se detecta por la extensión)
+    student_tables = [
+        'student_consolidated',
+        'student_info_clean'
     ]
     
     student_df = None
-    for file in student_files:
-        file_path = processed_dir / file
-        if file_path.exists():
-            student_df = pd.read_csv(file_path)
-            logger.info(f"✅ Cargado {file} con {len(student_df)} registros")
+    for table in student_tables:
+        if find_processed_table(processed_dir, table) is not None:
+            student_df = read_processed_table(processed_dir, table)
+            logger.info(f"✅ Cargado {table} con {len(student_df)} registros")
             break
     
     if student_df is None:
@@ -52,10 +54,9 @@ def load_processed_data():
     
     # Cargar características de interacciones
     interaction_df = None
-    interaction_file = processed_dir / 'interaction_features.csv'
-    if interaction_file.exists():
-        interaction_df = pd.read_csv(interaction_file)
-        logger.info(f"✅ Cargado interaction_features.csv con {len(interaction_df)} registros")
+    if find_processed_table(processed_dir, 'interaction_features') is not None:
+        interaction_df = read_processed_table(processed_dir, 'interaction_features')
+        logger.info(f"✅ Cargado interaction_features con {len(interaction_df)} registros")
     
     return student_df, interaction_df
 
@@ -77,7 +78,8 @@ def prepare_modeling_data():
     # Preparar características
     features_df, target = feature_engineer.prepare_features(
         student_df=student_df,
-        interaction_features=interaction_df
+        interaction_features=interaction_df,
+        n_jobs=-1
     )
     
     # Guardar características preparadas
@@ -90,9 +92,24 @@ def prepare_modeling_data():
     features_df.to_csv(features_path, index=False)
     target.to_csv(target_path, index=False)
     
+    # Matriz binaria float32 para carga con memory-mapping en entrenamiento/evaluación
+    save_modeling_matrix(features_df, target, output_dir)
+    
+    # Guardar el bloque disperso de características hasheadas (si está activo)
+    if feature_engineer.hashed_features is not None:
+        from scipy import sparse
+        hashed_path = output_dir / "modeling_hashed_features.npz"
+        sparse.save_npz(hashed_path, feature_engineer.hashed_features)
+        logger.info(f"✅ Características hasheadas guardadas en {hashed_path}")
+    
     logger.info(f"✅ Características guardadas en {features_path}")
     logger.info(f"✅ Variable objetivo guardada en {target_path}")
     
+    # Publicar un vector por matrícula en el feature store (las filas son por fecha de interacción)
+    with FeatureStore(output_dir / "feature_store.sqlite") as store:
+        version = store.write(aggregate_enrollments(features_df), description="scripts/preprocessing/main.py")
+    logger.info(f"✅ Feature store actualizado (versión {version})")
+    
     # Mostrar resumen de características
     logger.info(f"📊 Resumen de características:")
     logger.info(f"   - Total de características: {len(feature_engineer.feature_columns)}")
@@ -153,8 +170,16 @@ def main():
             'feature_columns': feature_engineer.feature_columns,
             'numerical_columns': feature_engineer.numerical_columns,
             'categorical_columns': feature_engineer.categorical_columns,
-            'total_features': len(feature_engineer.feature_columns)
+            'total_features': len(feature_engineer.feature_columns),
+            'feature_dtypes': feature_engineer.feature_dtypes,
+            'activity_thresholds': feature_engineer.activity_thresholds
         }
+        if feature_engineer.use_feature_hashing:
+            feature_info['hashing'] = {
+                'n_buckets': feature_engineer.n_hash_buckets,
+                'crosses': [list(cross) for cross in feature_engineer.hash_crosses],
+                'collision_stats': feature_engineer.hash_collision_stats
+            }
         
         # Guardar como JSON
         import json
@@ -163,6 +188,12 @@ def main():
             json.dump(feature_info, f, indent=2, ensure_ascii=False)
         
         logger.info(f"✅ Información de características guardada en {feature_info_path}")
+        
+        # Guardar el estado ajustado (umbrales y sketches de cuantiles) para servicio
+        feature_state_path = output_dir / "feature_state.json"
+        with open(feature_state_path, 'w', encoding='utf-8') as f:
+            json.dump(feature_engineer.get_fitted_state(), f, ensure_ascii=False)
+        logger.info(f"✅ Estado ajustado de características guardado en {feature_state_path}")
         logger.info("✅ Preprocesamiento completado exitosamente")
         
         return features_df, target, feature_engineer
@@ -7,23 +7,100 @@ para predicción de abandono estudiantil.
 
 import os
 import sys
+import argparse
 import pandas as pd
 import numpy as np
 import logging
 import json
 from pathlib import Path
+from sklearn.model_selection import train_test_split
 
 # Añadir el directorio src al path para importar módulos
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../src'))
 
 from nombre_paquete.models.baseline_model import BaselineModel
+from nombre_paquete.models.compiled_forest import CompiledForest
 from nombre_paquete.models.neural_network import NeuralNetworkModel
 from nombre_paquete.evaluation.model_evaluator import ModelEvaluator
+from nombre_paquete.evaluation.permutation_importance import permutation_importance
+from nombre_paquete.preprocessing.modeling_matrix import load_modeling_matrix, modeling_matrix_is_current
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# Hiperparámetros de los modelos (la etapa de entrenamiento del pipeline se
+# invalida solo cuando cambia la sección del modelo correspondiente)
+MODEL_PARAMS_PATH = PROJECT_ROOT / "config" / "model_params.json"
+
+# Resultados intermedios de cada sub-etapa de entrenamiento
+BASELINE_RESULTS_PATH = PROJECT_ROOT / "data" / "processed" / "baseline_results.json"
+NN_RESULTS_PATH = PROJECT_ROOT / "data" / "processed" / "neural_network_results.json"
+
+TRAINING_STAGES = ['all', 'baseline', 'neural_network', 'compare']
+
+# Carpeta (dentro de models/) del random forest compilado para despliegue
+COMPILED_FOREST_DIR = "random_forest_compiled"
+
+# Carpeta de las importancias de características
+FEATURE_IMPORTANCE_DIR = PROJECT_ROOT / "docs" / "modeling" / "feature_importance"
+
+def parse_args():
+    """
+    Lee los argumentos de línea de comandos.
+    
+    Returns:
+        argparse.Namespace con los argumentos
+    """
+    parser = argparse.ArgumentParser(description="Entrenamiento de modelos de retención")
+    parser.add_argument(
+        '--stage', choices=TRAINING_STAGES, default='all',
+        help="Sub-etapa a ejecutar: modelos baseline, red neuronal, comparación o todo"
+    )
+    return parser.parse_args()
+
+def load_model_params():
+    """
+    Carga los hiperparámetros de los modelos.
+    
+    Returns:
+        Diccionario con las secciones 'baseline' y 'neural_network'
+    """
+    if not MODEL_PARAMS_PATH.exists():
+        return {'baseline': {}, 'neural_network': {}}
+    with open(MODEL_PARAMS_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_stage_results(results, path):
+    """
+    Guarda los resultados de una sub-etapa de entrenamiento.
+    
+    Args:
+        results: Diccionario de resultados
+        path: Ruta del JSON de salida
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False, default=str)
+    logger.info(f"✅ Resultados de la sub-etapa guardados en {path}")
+
+def load_stage_results(path):
+    """
+    Carga los resultados de una sub-etapa de entrenamiento.
+    
+    Args:
+        path: Ruta del JSON guardado por save_stage_results
+        
+    Returns:
+        Diccionario de resultados
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"No se encontró {path}. Ejecute primero la sub-etapa correspondiente.")
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
 def load_modeling_data():
     """
     Carga los datos preparados para modelado.
@@ -35,6 +112,12 @@ def load_modeling_data():
     
     processed_dir = Path(__file__).parent.parent.parent / "data" / "processed"
     
+    # Preferir la matriz binaria (memory-mapped, sin parseo) si está al día con el CSV
+    if modeling_matrix_is_current(processed_dir):
+        features_df, target = load_modeling_matrix(processed_dir, mmap=True)
+        logger.info(f"✅ Cargados datos con {len(features_df)} registros y {len(features_df.columns)} características")
+        return features_df, target
+    
     # Cargar características
     features_path = processed_dir / "modeling_features.csv"
     target_path = processed_dir / "modeling_target.csv"
@@ -42,7 +125,14 @@ def load_modeling_data():
     if not features_path.exists() or not target_path.exists():
         raise FileNotFoundError("No se encontraron los archivos de datos para modelado. Ejecute primero el script de preprocesamiento.")
     
-    features_df = pd.read_csv(features_path)
+    # Reutilizar los tipos reducidos registrados por el preprocesamiento
+    feature_dtypes = None
+    feature_info_path = processed_dir / "feature_info.json"
+    if feature_info_path.exists():
+        with open(feature_info_path, 'r', encoding='utf-8') as f:
+            feature_dtypes = json.load(f).get('feature_dtypes')
+    
+    features_df = pd.read_csv(features_path, dtype=feature_dtypes)
     target = pd.read_csv(target_path).squeeze()
     
     logger.info(f"✅ Cargados datos con {len(features_df)} registros y {len(features_df.columns)} características")
@@ -50,13 +140,39 @@ def load_modeling_data():
     
     return features_df, target
 
-def train_baseline_models(features_df, target):
+def save_permutation_importance(model, model_name, features_df, target, n_jobs=-1):
+    """
+    Calcula y guarda la importancia por permutación sobre la partición de prueba.
+    
+    Args:
+        model: Modelo entrenado (BaselineModel o NeuralNetworkModel)
+        model_name: Nombre del modelo (prefijo del CSV)
+        features_df: DataFrame con características
+        target: Series con variable objetivo
+        n_jobs: Procesos para repartir las características
+        
+    Returns:
+        Ruta del CSV guardado
+    """
+    # Misma partición de prueba que usan los modelos al entrenar
+    _, X_test, _, y_test = train_test_split(
+        features_df, target, test_size=0.2, random_state=42, stratify=target
+    )
+    importance_df = permutation_importance(model, X_test, y_test, n_jobs=n_jobs)
+    FEATURE_IMPORTANCE_DIR.mkdir(parents=True, exist_ok=True)
+    importance_path = FEATURE_IMPORTANCE_DIR / f"{model_name}_permutation_importance.csv"
+    importance_df.to_csv(importance_path, index=False)
+    logger.info(f"✅ Importancia por permutación guardada para {model_name}")
+    return str(importance_path)
+
+def train_baseline_models(features_df, target, params=None):
     """
     Entrena modelos baseline (Logistic Regression y Random Forest).
     
     Args:
         features_df: DataFrame con características
         target: Series con variable objetivo
+        params: Hiperparámetros por modelo (sección 'baseline' de model_params.json)
         
     Returns:
         Diccionario con resultados de los modelos baseline
@@ -75,7 +191,7 @@ def train_baseline_models(features_df, target):
         logger.info(f"🔧 Entrenando {model_name}...")
         
         # Crear y entrenar modelo
-        model = BaselineModel(model_type=model_type)
+        model = BaselineModel(model_type=model_type, params=(params or {}).get(model_name))
         
         # Entrenar modelo
         metrics = model.train(features_df, target)
@@ -87,11 +203,11 @@ def train_baseline_models(features_df, target):
         feature_importance = None # Inicializar
         if model.model_type in ['logistic', 'random_forest']:
             try:
-                feature_importance = model.get_feature_importance(features_df)
+                numeric_cols = features_df.select_dtypes(include=np.number).columns.tolist()
+                feature_importance = model.get_feature_importance(numeric_cols)
                 if not feature_importance.empty:
-                    importance_path = Path(__file__).parent.parent.parent / "docs" / "modeling" / "feature_importance"
-                    importance_path.mkdir(parents=True, exist_ok=True)
-                    feature_importance.to_csv(importance_path / f"{model_name}_feature_importance.csv", index=False)
+                    FEATURE_IMPORTANCE_DIR.mkdir(parents=True, exist_ok=True)
+                    feature_importance.to_csv(FEATURE_IMPORTANCE_DIR / f"{model_name}_feature_importance.csv", index=False)
                     logger.info(f"✅ Importancia de características guardada para {model_name}")
             except Exception as e:
                 logger.warning(f"❌ Error al guardar importancia de características para {model_name}: {e}")
@@ -102,12 +218,17 @@ def train_baseline_models(features_df, target):
         model_path = models_dir / f"{model_name}_model.pkl"
         model.save_model(str(model_path))
         
+        # Artefacto compilado del random forest para servir (arrays planos con memory-mapping)
+        if model_type == 'random_forest':
+            CompiledForest.from_pipeline(model.pipeline).save(models_dir / COMPILED_FOREST_DIR)
+        
         # Guardar resultados
         baseline_results[model_name] = {
             'model_type': model_type,
             'metrics': metrics,
             'cv_metrics': cv_metrics,
             'feature_importance': feature_importance, # Guardar la importancia si se generó
+            'permutation_importance_path': save_permutation_importance(model, model_name, features_df, target),
             'model_path': str(model_path)
         }
         
@@ -115,13 +236,14 @@ def train_baseline_models(features_df, target):
     
     return baseline_results
 
-def train_neural_network(features_df, target):
+def train_neural_network(features_df, target, params=None):
     """
     Entrena el modelo de red neuronal.
     
     Args:
         features_df: DataFrame con características
         target: Series con variable objetivo
+        params: Hiperparámetros (sección 'neural_network' de model_params.json)
         
     Returns:
         Diccionario con resultados del modelo de red neuronal
@@ -129,11 +251,17 @@ def train_neural_network(features_df, target):
     logger.info("🚀 Entrenando modelo de red neuronal...")
     
     # Crear modelo de red neuronal
+    params = params or {}
     input_dim = len(features_df.columns)
-    nn_model = NeuralNetworkModel(input_dim=input_dim, architecture=[128, 64, 32])
+    nn_model = NeuralNetworkModel(input_dim=input_dim, architecture=params.get('architecture', [128, 64, 32]))
     
     # Entrenar modelo
-    metrics = nn_model.train(features_df, target, epochs=10, batch_size=32, patience=10)
+    metrics = nn_model.train(
+        features_df, target,
+        epochs=params.get('epochs', 10),
+        batch_size=params.get('batch_size', 32),
+        patience=params.get('patience', 10)
+    )
     
     # Guardar modelo
     models_dir = Path(__file__).parent.parent.parent / "models"
@@ -153,7 +281,9 @@ def train_neural_network(features_df, target):
         'metrics': metrics,
         'architecture': nn_model.architecture,
         'model_path': str(model_path),
-        'training_plot': str(training_plot_path)
+        'training_plot': str(training_plot_path),
+        # Keras ya paraleliza cada predicción; se evalúa en el proceso actual
+        'permutation_importance_path': save_permutation_importance(nn_model, 'neural_network', features_df, target, n_jobs=1)
     }
     
     logger.info(f"✅ Red neuronal entrenada - F1: {metrics['f1_score']:.3f}, ROC-AUC: {metrics['roc_auc']:.3f}")
@@ -271,18 +401,48 @@ def save_training_results(baseline_results, nn_results, evaluation_results, comp
 def main():
     """
     Función principal del script de entrenamiento.
+    
+    Con --stage se ejecuta solo una sub-etapa, de modo que el orquestador
+    del pipeline pueda entrenar los modelos baseline y la red neuronal en
+    paralelo y comparar después.
     """
-    logger.info("🚀 Iniciando entrenamiento de modelos...")
+    args = parse_args()
+    logger.info(f"🚀 Iniciando entrenamiento de modelos (sub-etapa: {args.stage})...")
     
     try:
-        # Cargar datos
+        # Cargar datos e hiperparámetros
         features_df, target = load_modeling_data()
+        model_params = load_model_params()
+        
+        if args.stage == 'baseline':
+            baseline_results = train_baseline_models(features_df, target, model_params.get('baseline'))
+            # La importancia se guarda como registros para reconstruir el DataFrame al comparar
+            save_stage_results({
+                name: {**results, 'feature_importance': (
+                    results['feature_importance'].to_dict('records')
+                    if results['feature_importance'] is not None else None
+                )}
+                for name, results in baseline_results.items()
+            }, BASELINE_RESULTS_PATH)
+            return baseline_results
         
-        # Entrenar modelos baseline
-        baseline_results = train_baseline_models(features_df, target)
+        if args.stage == 'neural_network':
+            nn_results = train_neural_network(features_df, target, model_params.get('neural_network'))
+            save_stage_results(nn_results, NN_RESULTS_PATH)
+            return nn_results
         
-        # Entrenar modelo de red neuronal
-        nn_results = train_neural_network(features_df, target)
+        if args.stage == 'compare':
+            baseline_results = load_stage_results(BASELINE_RESULTS_PATH)
+            for results in baseline_results.values():
+                if results.get('feature_importance') is not None:
+                    results['feature_importance'] = pd.DataFrame(results['feature_importance'])
+            nn_results = load_stage_results(NN_RESULTS_PATH)
+        else:
+            # Entrenar modelos baseline
+            baseline_results = train_baseline_models(features_df, target, model_params.get('baseline'))
+            
+            # Entrenar modelo de red neuronal
+            nn_results = train_neural_network(features_df, target, model_params.get('neural_network'))
         
         # Evaluar todos los modelos
         evaluation_results, comparison_df = evaluate_models(baseline_results, nn_results, features_df, target)
@@ -19,7 +19,9 @@ from .data_validator import (
     validate_data_integrity,
     check_missing_values,
     validate_data_types,
-    generate_data_summary
+    generate_data_summary,
+    validate_student_vle_delta,
+    summarize_table_in_chunks
 )
 
 from .data_processor import (
@@ -28,6 +30,16 @@ from .data_processor import (
     merge_student_data
 )
 
+from .out_of_core import out_of_core_groupby
+
+from .assessment_engine import create_enrollment_assessment_features
+
+from .feature_store import FeatureStore, aggregate_enrollments
+
+from .incremental_ingest import InteractionStore
+
+from .memory_budget import BudgetedTableCache
+
 __all__ = [
     # Data loading functions
     'load_student_info',
@@ -44,9 +56,23 @@ __all__ = [
     'check_missing_values',
     'validate_data_types',
     'generate_data_summary',
+    'validate_student_vle_delta',
+    'summarize_table_in_chunks',
     
     # Data processing functions
     'create_processed_data_folder',
     'save_processed_data',
-    'merge_student_data'
+    'merge_student_data',
+    'out_of_core_groupby',
+    'create_enrollment_assessment_features',
+    
+    # Feature store
+    'FeatureStore',
+    'aggregate_enrollments',
+    
+    # Incremental interaction store
+    'InteractionStore',
+    
+    # Memory-budgeted table cache
+    'BudgetedTableCache'
 ]
@@ -0,0 +1,156 @@
+"""
+Módulo del motor vectorizado de características de evaluaciones.
+
+Este módulo calcula características de evaluaciones por matrícula
+(id_student, code_module, code_presentation) teniendo en cuenta el peso de
+cada evaluación, su fecha límite y el retraso de la entrega. La tabla de
+entregas (la grande) solo se relaciona con las demás mediante claves
+enteras: cada entrega se asocia a su evaluación y a su matrícula con una
+búsqueda en un índice hash, y todas las agregaciones son pasadas de
+``np.bincount`` sobre el código entero de la matrícula.
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+ENROLLMENT_KEYS = ['id_student', 'code_module', 'code_presentation']
+
+# Tipos de evaluación con estadísticas propias
+ASSESSMENT_TYPES = ['TMA', 'CMA', 'Exam']
+
+ASSESSMENT_TABLE_COLUMNS = ['code_module', 'code_presentation', 'id_assessment', 'assessment_type', 'date', 'weight']
+
+STUDENT_ASSESSMENT_COLUMNS = ['id_assessment', 'id_student', 'date_submitted', 'is_banked', 'score']
+
+
+def _group_mean(codes: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """Media por grupo ignorando NaN (NaN si el grupo no tiene valores)."""
+    observed = ~np.isnan(values)
+    total = np.bincount(codes[observed], weights=values[observed], minlength=n_groups)
+    count = np.bincount(codes[observed], minlength=n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def _group_max(codes: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """Máximo por grupo ignorando NaN (NaN si el grupo no tiene valores)."""
+    observed = ~np.isnan(values)
+    result = np.full(n_groups, -np.inf)
+    np.maximum.at(result, codes[observed], values[observed])
+    result[np.isneginf(result)] = np.nan
+    return result
+
+
+def create_enrollment_assessment_features(data_dict: Dict[str, Any], as_of: Optional[int] = None) -> pd.DataFrame:
+    """
+    Crea características de evaluaciones por matrícula.
+
+    Args:
+        data_dict: Diccionario con 'student_registration', 'assessments' y
+            'student_assessments' (DataFrame o ruta del CSV)
+        as_of: Día de la presentación hasta el que se observan los datos; solo
+            cuentan las entregas y fechas límite anteriores o iguales (None usa todo)
+
+    Returns:
+        pd.DataFrame con una fila por matrícula, en el orden de student_registration
+    """
+    logger.info("📊 Creando características de evaluaciones por matrícula...")
+
+    student_assessments = data_dict['student_assessments']
+    if not isinstance(student_assessments, pd.DataFrame):
+        student_assessments = pd.read_csv(Path(student_assessments), usecols=STUDENT_ASSESSMENT_COLUMNS)
+    assessments = data_dict['assessments'].drop_duplicates('id_assessment')
+    enrollments = data_dict['student_registration'][ENROLLMENT_KEYS].drop_duplicates(ignore_index=True)
+    n_enrollments = len(enrollments)
+
+    # Códigos enteros de presentación, compartidos por evaluaciones y matrículas (tablas pequeñas)
+    presentation_keys = pd.concat([
+        assessments[['code_module', 'code_presentation']],
+        enrollments[['code_module', 'code_presentation']]
+    ], ignore_index=True)
+    presentation_codes, presentations = pd.MultiIndex.from_frame(presentation_keys).factorize()
+    n_presentations = len(presentations)
+    assessment_presentation = presentation_codes[:len(assessments)]
+    enrollment_presentation = presentation_codes[len(assessments):]
+
+    deadline = assessments['date'].to_numpy(dtype=np.float64)
+    weight = assessments['weight'].to_numpy(dtype=np.float64)
+    type_code = pd.Categorical(assessments['assessment_type'], categories=ASSESSMENT_TYPES).codes
+    due = ~np.isnan(deadline) if as_of is None else deadline <= as_of
+
+    # Único join de la tabla grande: posición de la evaluación por id_assessment (entero)
+    position = pd.Index(assessments['id_assessment']).get_indexer(student_assessments['id_assessment'])
+    student_ids = student_assessments['id_student'].to_numpy(dtype=np.int64)
+    matched = position >= 0
+    enrollment_key = pd.Index(enrollments['id_student'].to_numpy(dtype=np.int64) * n_presentations + enrollment_presentation)
+    enrollment = np.full(len(student_assessments), -1, dtype=np.int64)
+    enrollment[matched] = enrollment_key.get_indexer(
+        student_ids[matched] * n_presentations + assessment_presentation[position[matched]]
+    )
+
+    date_submitted = student_assessments['date_submitted'].to_numpy(dtype=np.float64)
+    keep = enrollment >= 0
+    if as_of is not None:
+        keep &= date_submitted <= as_of
+    if (enrollment < 0).any():
+        logger.warning(f"⚠️ {int((enrollment < 0).sum())} entregas sin evaluación o matrícula conocida; se omiten")
+
+    codes = enrollment[keep]
+    position = position[keep]
+    score = student_assessments['score'].to_numpy(dtype=np.float64)[keep]
+    date_submitted = date_submitted[keep]
+    banked = (
+        student_assessments['is_banked'].to_numpy(dtype=np.float64)[keep] == 1
+        if 'is_banked' in student_assessments.columns else np.zeros(len(codes), dtype=bool)
+    )
+    sub_weight = weight[position]
+    sub_deadline = deadline[position]
+    sub_type = type_code[position]
+    has_score = ~np.isnan(score)
+
+    # Puntuación media y ponderada por el peso de cada evaluación
+    n_submitted = np.bincount(codes, minlength=n_enrollments)
+    weighted_total = np.bincount(codes[has_score], weights=score[has_score] * sub_weight[has_score], minlength=n_enrollments)
+    weight_total = np.bincount(codes[has_score], weights=sub_weight[has_score], minlength=n_enrollments)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weighted_score = np.where(weight_total > 0, weighted_total / weight_total, np.nan)
+
+    # Retraso respecto a la fecha límite (las evaluaciones convalidadas no cuentan)
+    lateness = np.where(banked, np.nan, date_submitted - sub_deadline)
+    late = lateness > 0
+
+    # Fechas límite vencidas sin entrega
+    expected_due = np.bincount(assessment_presentation[due], minlength=n_presentations)[enrollment_presentation]
+    submitted_due = np.bincount(codes[due[position]], minlength=n_enrollments)
+    missed_deadlines = np.maximum(expected_due - submitted_due, 0)
+
+    features = {
+        'n_assessments_submitted': n_submitted,
+        'avg_score': _group_mean(codes, score, n_enrollments),
+        'weighted_score': weighted_score,
+        'weight_submitted': np.bincount(codes, weights=sub_weight, minlength=n_enrollments),
+        'n_late_submissions': np.bincount(codes[late], minlength=n_enrollments),
+        'avg_lateness_days': _group_mean(codes, lateness, n_enrollments),
+        'max_lateness_days': _group_max(codes, lateness, n_enrollments),
+        'n_missed_deadlines': missed_deadlines,
+        'n_banked': np.bincount(codes[banked], minlength=n_enrollments),
+    }
+
+    # Estadísticas por tipo de evaluación (TMA, CMA, Exam)
+    for code, assessment_type in enumerate(ASSESSMENT_TYPES):
+        is_type = sub_type == code
+        suffix = assessment_type.lower()
+        features[f'n_{suffix}'] = np.bincount(codes[is_type], minlength=n_enrollments)
+        features[f'avg_score_{suffix}'] = _group_mean(codes[is_type], score[is_type], n_enrollments)
+
+    result = enrollments.copy()
+    for name, values in features.items():
+        result[name] = values.astype(np.int64) if values.dtype.kind in 'iu' else values
+
+    logger.info(f"✅ Características de evaluaciones por matrícula creadas: {len(result)} registros")
+    return result
@@ -11,6 +11,8 @@ from pathlib import Path
 from typing import Optional, Dict, Any
 import logging
 
+from ..resource_planner import get_resource_plan
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -123,8 +125,8 @@ def load_student_vle() -> pd.DataFrame:
     """
     try:
         file_path = DATA_PATH / "studentVle.csv"
-        # Cargar en chunks debido al tamaño del archivo
-        chunk_size = 100000
+        # Cargar en chunks debido al tamaño del archivo (tamaño según la memoria disponible)
+        chunk_size = get_resource_plan().chunk_rows
         chunks = []
         
         for chunk in pd.read_csv(file_path, chunksize=chunk_size):
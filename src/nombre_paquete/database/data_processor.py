@@ -6,13 +6,56 @@ procesar los datos y guardarlos en formato limpio para el análisis.
 """
 
 import pandas as pd
+import numpy as np
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 import logging
 
+from .out_of_core import out_of_core_groupby
+from ..resource_planner import get_resource_plan, limit_worker_threads
+from .assessment_engine import ASSESSMENT_TABLE_COLUMNS, create_enrollment_assessment_features
+
 logger = logging.getLogger(__name__)
 
+# Claves de partición: cada presentación de un módulo se procesa por separado
+PARTITION_KEYS = ['code_module', 'code_presentation']
+
+# Tablas de dimensiones compartidas (solo lectura) con los procesos worker
+DIMENSION_TABLES = ['courses', 'vle', 'assessments']
+_SHARED_TABLES: Dict[str, pd.DataFrame] = {}
+
+# Formatos de salida de los datos procesados
+PROCESSED_FORMATS = ('csv', 'parquet', 'feather')
+PROCESSED_EXTENSIONS = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather'}
+
+# Tablas con al menos estas filas se escriben con un row group por presentación
+ROW_GROUP_PARTITION_MIN_ROWS = 100_000
+MAX_ROW_GROUP_ROWS = 1_000_000
+
+# Motores disponibles para las tablas derivadas
+PROCESSING_ENGINES = ('pandas', 'polars')
+
+# Agregaciones de interacciones por estudiante y día
+INTERACTION_KEYS = ['id_student', 'code_module', 'code_presentation', 'date']
+INTERACTION_AGGREGATIONS = {
+    'sum_click': ['sum', 'count', 'mean'],
+    'activity_type': 'nunique'
+}
+
+# Columnas de studentAssessment que intervienen en las agregaciones
+ASSESSMENT_INPUT_COLUMNS = ['id_student', 'id_assessment', 'score', 'date_submitted']
+
+# Agregaciones de evaluaciones por estudiante
+ASSESSMENT_AGGREGATIONS = {
+    'score': ['mean', 'std', 'min', 'max', 'count'],
+    'date_submitted': ['mean', 'std'],
+    'assessment_type': 'nunique',
+    'weight': 'sum'
+}
+
 def create_processed_data_folder() -> Path:
     """
     Crea la carpeta para datos procesados si no existe.
@@ -25,23 +68,144 @@ def create_processed_data_folder() -> Path:
     logger.info(f"✅ Carpeta de datos procesados creada: {processed_path}")
     return processed_path
 
-def save_processed_data(data_dict: Dict[str, pd.DataFrame], output_path: Path) -> None:
+def _row_group_runs(df: pd.DataFrame, partition_columns: Optional[Sequence[str]]) -> List[Tuple[int, int]]:
     """
-    Guarda los DataFrames procesados en archivos CSV.
+    Calcula los row groups (inicio, longitud) con que se escribe una tabla.
+    
+    Si la tabla está agrupada por las columnas de partición (cada combinación
+    ocupa un único tramo contiguo, como (code_module, code_presentation) en los
+    CSV originales de OULAD, ordenados por módulo y después por presentación)
+    cada combinación es un row group; si no, se usan row groups de tamaño fijo
+    para no alterar el orden de las filas.
+    
+    Args:
+        df: DataFrame a escribir
+        partition_columns: Columnas de partición (None para no particionar)
+        
+    Returns:
+        Lista de tramos (inicio, longitud)
+    """
+    n_rows = len(df)
+    partition_columns = list(partition_columns or [])
+    if partition_columns and set(partition_columns) <= set(df.columns) and n_rows >= ROW_GROUP_PARTITION_MIN_ROWS:
+        codes = df.groupby(partition_columns, sort=False, dropna=False).ngroup().to_numpy()
+        starts = np.flatnonzero(np.diff(codes)) + 1
+        if len(starts) + 1 == codes.max() + 1:
+            bounds = np.concatenate([[0], starts, [n_rows]])
+            return [(int(start), int(end - start)) for start, end in zip(bounds[:-1], bounds[1:])]
+        logger.info(f"ℹ️ Tabla no agrupada por {partition_columns}: row groups de tamaño fijo")
+    return [(start, min(MAX_ROW_GROUP_ROWS, n_rows - start)) for start in range(0, n_rows, MAX_ROW_GROUP_ROWS)] or [(0, 0)]
+
+def _write_table(df: pd.DataFrame, file_path: Path, format: str, partition_columns: Optional[Sequence[str]]) -> None:
+    """
+    Escribe una tabla en el formato indicado.
+    
+    En parquet y feather, las tablas grandes agrupadas por las columnas de
+    partición se escriben con un row group (o record batch) por combinación.
+    
+    Args:
+        df: DataFrame a escribir
+        file_path: Ruta de salida
+        format: 'csv', 'parquet' o 'feather'
+        partition_columns: Columnas de partición de los row groups (None para no particionar)
+    """
+    if format == 'csv':
+        df.to_csv(file_path, index=False)
+        return
+    
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    runs = _row_group_runs(df, partition_columns)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    
+    if format == 'parquet':
+        with pq.ParquetWriter(file_path, table.schema, compression='zstd') as writer:
+            for start, length in runs:
+                writer.write_table(table.slice(start, length), row_group_size=max(length, 1))
+    else:
+        options = pa.ipc.IpcWriteOptions(compression='zstd')
+        with pa.ipc.new_file(str(file_path), table.schema, options=options) as writer:
+            for start, length in runs:
+                writer.write_table(table.slice(start, length), max_chunksize=max(length, 1))
+
+def save_processed_data(data_dict: Dict[str, pd.DataFrame],
+                        output_path: Path,
+                        format: str = 'csv',
+                        n_jobs: int = 1,
+                        partition_columns: Optional[Sequence[str]] = tuple(PARTITION_KEYS)) -> None:
+    """
+    Guarda los DataFrames procesados en archivos CSV, Parquet o Feather.
     
     Args:
         data_dict: Diccionario con DataFrames a guardar
         output_path: Ruta donde guardar los archivos
+        format: 'csv', 'parquet' (zstd) o 'feather' (Arrow IPC con zstd)
+        n_jobs: Tablas escritas en paralelo (-1 usa todos los núcleos)
+        partition_columns: Columnas cuyas combinaciones definen los row groups de las tablas grandes
     """
-    logger.info("💾 Guardando datos procesados...")
+    if format not in PROCESSED_FORMATS:
+        raise ValueError(f"format debe ser uno de {PROCESSED_FORMATS}")
     
-    for name, df in data_dict.items():
-        file_path = output_path / f"{name}.csv"
-        df.to_csv(file_path, index=False)
-        logger.info(f"✅ Guardado {name}.csv: {len(df)} registros")
+    logger.info(f"💾 Guardando datos procesados ({format})...")
+    
+    def _save(name, df):
+        file_name = f"{name}{PROCESSED_EXTENSIONS[format]}"
+        _write_table(df, output_path / file_name, format, partition_columns)
+        logger.info(f"✅ Guardado {file_name}: {len(df)} registros")
+    
+    # La escritura (compresión y E/S) libera el GIL: basta con hilos
+    n_workers = min(resolve_n_jobs(n_jobs), max(len(data_dict), 1))
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        futures = [executor.submit(_save, name, df) for name, df in data_dict.items()]
+        for future in futures:
+            future.result()
     
     logger.info("✅ Todos los datos procesados guardados exitosamente")
 
+def find_processed_table(input_path: Path, name: str) -> Optional[Path]:
+    """
+    Busca el fichero de una tabla procesada en cualquiera de los formatos.
+    
+    Si existe en varios formatos se usa el más reciente.
+    
+    Args:
+        input_path: Carpeta de datos procesados
+        name: Nombre de la tabla (sin extensión)
+        
+    Returns:
+        Ruta del fichero o None si no existe
+    """
+    candidates = [
+        Path(input_path) / f"{name}{PROCESSED_EXTENSIONS[format]}" for format in PROCESSED_FORMATS
+    ]
+    candidates = [path for path in candidates if path.exists()]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda path: path.stat().st_mtime)
+
+def read_processed_table(input_path: Path, name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Lee una tabla procesada detectando su formato por la extensión.
+    
+    Args:
+        input_path: Carpeta de datos procesados
+        name: Nombre de la tabla (sin extensión)
+        columns: Columnas a leer (None lee todas)
+        
+    Returns:
+        pd.DataFrame: Tabla leída
+    """
+    file_path = find_processed_table(input_path, name)
+    if file_path is None:
+        raise FileNotFoundError(f"No se encontró la tabla procesada {name} en {input_path}")
+    
+    if file_path.suffix == '.parquet':
+        return pd.read_parquet(file_path, columns=columns)
+    if file_path.suffix == '.feather':
+        return pd.read_feather(file_path, columns=columns)
+    return pd.read_csv(file_path, usecols=columns)
+
 def merge_student_data(data_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     """
     Crea un DataFrame consolidado con toda la información del estudiante.
@@ -54,8 +218,8 @@ def merge_student_data(data_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     """
     logger.info("🔗 Consolidando información del estudiante...")
     
-    # DataFrame base con información demográfica
-    student_base = data_dict['student_info'].copy()
+    # DataFrame base con información demográfica (el merge ya devuelve un objeto nuevo)
+    student_base = data_dict['student_info']
     
     # Agregar información de registro
     registration_info = data_dict['student_registration'][
@@ -83,29 +247,57 @@ def merge_student_data(data_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     logger.info(f"✅ Información consolidada: {len(student_consolidated)} registros")
     return student_consolidated
 
-def create_interaction_features(data_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+def _with_activity_type(student_vle: pd.DataFrame, vle_info: pd.DataFrame) -> pd.DataFrame:
+    """
+    Añade activity_type a las interacciones conservando solo las columnas agregadas.
+    
+    Con copy-on-write la selección de columnas no copia datos; si cada id_site
+    tiene un único tipo de actividad, un map evita materializar el merge.
+    
+    Args:
+        student_vle: DataFrame (o bloque) de studentVle
+        vle_info: Pares únicos (id_site, activity_type)
+        
+    Returns:
+        pd.DataFrame: Claves de interacción, sum_click y activity_type
+    """
+    columns = INTERACTION_KEYS + ['sum_click']
+    if vle_info['id_site'].is_unique:
+        activity_type = student_vle['id_site'].map(vle_info.set_index('id_site')['activity_type'])
+        return student_vle[columns].assign(activity_type=activity_type)
+    return student_vle[columns + ['id_site']].merge(vle_info, on='id_site', how='left')
+
+def create_interaction_features(data_dict: Dict[str, Any], memory_budget_mb: Optional[float] = None) -> pd.DataFrame:
     """
     Crea características agregadas de las interacciones estudiantiles.
     
     Args:
-        data_dict: Diccionario con todos los DataFrames
+        data_dict: Diccionario con todos los DataFrames; con memory_budget_mb,
+            'student_vle' puede ser también la ruta del CSV (se lee por bloques)
+        memory_budget_mb: Si se indica, agrega fuera de memoria con este presupuesto (MB)
         
     Returns:
         pd.DataFrame: DataFrame con características de interacciones
     """
     logger.info("📊 Creando características de interacciones...")
     
-    student_vle = data_dict['student_vle'].copy()
-    
     # Agregar información del VLE
     vle_info = data_dict['vle'][['id_site', 'activity_type']].drop_duplicates()
-    student_vle = student_vle.merge(vle_info, on='id_site', how='left')
     
-    # Características agregadas por estudiante y semana
-    interaction_features = student_vle.groupby(['id_student', 'code_module', 'code_presentation', 'date']).agg({
-        'sum_click': ['sum', 'count', 'mean'],
-        'activity_type': 'nunique'
-    }).reset_index()
+    if memory_budget_mb is None:
+        student_vle = _with_activity_type(data_dict['student_vle'], vle_info)
+        
+        # Características agregadas por estudiante y semana
+        interaction_features = student_vle.groupby(INTERACTION_KEYS).agg(INTERACTION_AGGREGATIONS).reset_index()
+    else:
+        # El merge con el VLE (tabla pequeña) se aplica a cada bloque antes del volcado
+        interaction_features = out_of_core_groupby(
+            data_dict['student_vle'],
+            INTERACTION_KEYS,
+            INTERACTION_AGGREGATIONS,
+            memory_budget_mb=memory_budget_mb,
+            transform=lambda chunk: _with_activity_type(chunk, vle_info)
+        ).reset_index()
     
     # Renombrar columnas
     interaction_features.columns = [
@@ -116,35 +308,41 @@ def create_interaction_features(data_dict: Dict[str, pd.DataFrame]) -> pd.DataFr
     logger.info(f"✅ Características de interacciones creadas: {len(interaction_features)} registros")
     return interaction_features
 
-def create_assessment_features(data_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+def create_assessment_features(data_dict: Dict[str, Any], memory_budget_mb: Optional[float] = None) -> pd.DataFrame:
     """
     Crea características agregadas de las evaluaciones estudiantiles.
     
     Args:
-        data_dict: Diccionario con todos los DataFrames
+        data_dict: Diccionario con todos los DataFrames; con memory_budget_mb,
+            'student_assessments' puede ser también la ruta del CSV
+        memory_budget_mb: Si se indica, agrega fuera de memoria con este presupuesto (MB)
         
     Returns:
         pd.DataFrame: DataFrame con características de evaluaciones
     """
     logger.info("📊 Creando características de evaluaciones...")
     
-    student_assessments = data_dict['student_assessments'].copy()
-    assessments = data_dict['assessments'].copy()
+    assessment_info = data_dict['assessments'][['id_assessment', 'assessment_type', 'weight']]
     
-    # Merge con información de evaluaciones
-    assessment_features = student_assessments.merge(
-        assessments[['id_assessment', 'assessment_type', 'weight']],
-        on='id_assessment',
-        how='left'
-    )
-    
-    # Características agregadas por estudiante
-    student_assessment_summary = assessment_features.groupby('id_student').agg({
-        'score': ['mean', 'std', 'min', 'max', 'count'],
-        'date_submitted': ['mean', 'std'],
-        'assessment_type': 'nunique',
-        'weight': 'sum'
-    }).reset_index()
+    if memory_budget_mb is None:
+        # Merge con información de evaluaciones, solo con las columnas agregadas
+        student_assessments = data_dict['student_assessments'][ASSESSMENT_INPUT_COLUMNS]
+        assessment_features = student_assessments.merge(
+            assessment_info,
+            on='id_assessment',
+            how='left'
+        )
+        
+        # Características agregadas por estudiante
+        student_assessment_summary = assessment_features.groupby('id_student').agg(ASSESSMENT_AGGREGATIONS).reset_index()
+    else:
+        student_assessment_summary = out_of_core_groupby(
+            data_dict['student_assessments'],
+            ['id_student'],
+            ASSESSMENT_AGGREGATIONS,
+            memory_budget_mb=memory_budget_mb,
+            transform=lambda chunk: chunk[ASSESSMENT_INPUT_COLUMNS].merge(assessment_info, on='id_assessment', how='left')
+        ).reset_index()
     
     # Renombrar columnas
     student_assessment_summary.columns = [
@@ -156,32 +354,276 @@ def create_assessment_features(data_dict: Dict[str, pd.DataFrame]) -> pd.DataFra
     logger.info(f"✅ Características de evaluaciones creadas: {len(student_assessment_summary)} registros")
     return student_assessment_summary
 
-def process_all_data(data_dict: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+def resolve_n_jobs(n_jobs: Optional[int]) -> int:
+    """
+    Traduce n_jobs al número de procesos a usar.
+    
+    -1 o None usan los workers del plan de recursos (núcleos del cgroup y
+    memoria disponible), no os.cpu_count.
+    
+    Args:
+        n_jobs: Número de procesos solicitado
+        
+    Returns:
+        Número de procesos (>= 1)
+    """
+    return get_resource_plan().resolve_n_jobs(n_jobs)
+
+def create_partition_executor(n_workers: int, shared_tables: Optional[Dict[str, pd.DataFrame]] = None) -> ProcessPoolExecutor:
+    """
+    Crea un pool de procesos para el modo particionado.
+    
+    Con el método 'fork' las tablas compartidas se heredan sin copiarse ni
+    serializarse (copy-on-write); en otras plataformas se envían una vez por worker.
+    
+    Args:
+        n_workers: Número de procesos
+        shared_tables: Tablas de dimensiones de solo lectura para los workers
+        
+    Returns:
+        ProcessPoolExecutor configurado
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    # Cada worker usa su parte de los núcleos para BLAS/OpenMP
+    n_threads = get_resource_plan().threads_per_process(n_workers)
+    return ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=context,
+        initializer=_init_partition_worker,
+        initargs=(shared_tables or {}, n_threads)
+    )
+
+def _init_partition_worker(shared_tables: Dict[str, pd.DataFrame], n_threads: int = 1) -> None:
+    """Inicializa un worker con las tablas de dimensiones compartidas y su límite de hilos."""
+    global _SHARED_TABLES
+    _SHARED_TABLES = shared_tables
+    limit_worker_threads(n_threads)
+
+def split_by_presentation(df: pd.DataFrame) -> Dict[Tuple[Any, Any], pd.DataFrame]:
+    """
+    Divide un DataFrame por (code_module, code_presentation).
+    
+    Args:
+        df: DataFrame con las columnas de partición
+        
+    Returns:
+        Diccionario clave de partición -> porción del DataFrame
+    """
+    return {key: part for key, part in df.groupby(PARTITION_KEYS, sort=False, dropna=False)}
+
+def _assessment_partials(data_dict: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """
+    Calcula agregados parciales (mergeables) de evaluaciones por estudiante.
+    
+    Args:
+        data_dict: Diccionario con 'student_assessments' y 'assessments'
+        
+    Returns:
+        Diccionario con sumas/conteos/extremos por estudiante y pares (estudiante, tipo)
+    """
+    assessment_features = data_dict['student_assessments'].merge(
+        data_dict['assessments'][['id_assessment', 'assessment_type', 'weight']],
+        on='id_assessment',
+        how='left'
+    )
+    assessment_features = assessment_features.assign(
+        score_sq=assessment_features['score'] ** 2,
+        date_submitted_sq=assessment_features['date_submitted'] ** 2
+    )
+    sums = assessment_features.groupby('id_student').agg(
+        score_sum=('score', 'sum'), score_sq_sum=('score_sq', 'sum'), score_count=('score', 'count'),
+        score_min=('score', 'min'), score_max=('score', 'max'),
+        date_sum=('date_submitted', 'sum'), date_sq_sum=('date_submitted_sq', 'sum'),
+        date_count=('date_submitted', 'count'), weight_sum=('weight', 'sum')
+    ).reset_index()
+    types = assessment_features[['id_student', 'assessment_type']].dropna().drop_duplicates()
+    return {'sums': sums, 'types': types}
+
+def _merge_assessment_partials(partials: List[Dict[str, pd.DataFrame]]) -> pd.DataFrame:
+    """
+    Combina los agregados parciales de evaluaciones en el resumen por estudiante.
+    
+    Args:
+        partials: Lista de resultados de _assessment_partials
+        
+    Returns:
+        pd.DataFrame: Mismo esquema que create_assessment_features
+    """
+    sums = pd.concat([partial['sums'] for partial in partials], ignore_index=True)
+    merged = sums.groupby('id_student').agg(
+        score_sum=('score_sum', 'sum'), score_sq_sum=('score_sq_sum', 'sum'), score_count=('score_count', 'sum'),
+        score_min=('score_min', 'min'), score_max=('score_max', 'max'),
+        date_sum=('date_sum', 'sum'), date_sq_sum=('date_sq_sum', 'sum'),
+        date_count=('date_count', 'sum'), weight_sum=('weight_sum', 'sum')
+    )
+    types = pd.concat([partial['types'] for partial in partials], ignore_index=True).drop_duplicates()
+    unique_types = types.groupby('id_student')['assessment_type'].nunique()
+    
+    def _mean_std(total, total_sq, count):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = total / count.where(count > 0)
+            variance = (total_sq - total ** 2 / count) / (count - 1).where(count > 1)
+        return mean, np.sqrt(variance.clip(lower=0))
+    
+    avg_score, std_score = _mean_std(merged['score_sum'], merged['score_sq_sum'], merged['score_count'])
+    avg_date, std_date = _mean_std(merged['date_sum'], merged['date_sq_sum'], merged['date_count'])
+    
+    return pd.DataFrame({
+        'id_student': merged.index,
+        'avg_score': avg_score.to_numpy(),
+        'std_score': std_score.to_numpy(),
+        'min_score': merged['score_min'].to_numpy(),
+        'max_score': merged['score_max'].to_numpy(),
+        'assessment_count': merged['score_count'].to_numpy(),
+        'avg_submission_date': avg_date.to_numpy(),
+        'std_submission_date': std_date.to_numpy(),
+        'unique_assessment_types': unique_types.reindex(merged.index, fill_value=0).to_numpy(),
+        'total_weight': merged['weight_sum'].to_numpy()
+    })
+
+def _process_partition(partition: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+    """
+    Procesa una partición (una presentación) dentro de un worker.
+    
+    Args:
+        partition: Porciones de las tablas de hechos de la partición
+        
+    Returns:
+        Diccionario con los resultados parciales de la partición
+    """
+    tables = dict(_SHARED_TABLES, **partition)
+    return {
+        'student_consolidated': merge_student_data(tables),
+        'interaction_features': create_interaction_features(tables),
+        'assessment_partials': _assessment_partials(tables)
+    }
+
+def process_partitioned(data_dict: Dict[str, pd.DataFrame], n_jobs: int = -1) -> Dict[str, pd.DataFrame]:
+    """
+    Calcula las tablas derivadas procesando cada presentación en un proceso worker.
+    
+    Las tablas de hechos se dividen por (code_module, code_presentation); las
+    de dimensiones se comparten en solo lectura. Los resultados se concatenan
+    en el mismo orden que el modo en memoria, y los agregados por estudiante
+    (que cruzan presentaciones) se combinan a partir de parciales.
+    
+    Args:
+        data_dict: Diccionario con todos los DataFrames originales
+        n_jobs: Número de procesos (-1 usa todos los núcleos)
+        
+    Returns:
+        Dict[str, pd.DataFrame]: student_consolidated, interaction_features y assessment_features
+    """
+    # Asignar a cada evaluación entregada la presentación de su evaluación
+    assessment_keys = data_dict['assessments'][['id_assessment'] + PARTITION_KEYS].drop_duplicates('id_assessment')
+    student_assessments = data_dict['student_assessments'].merge(assessment_keys, on='id_assessment', how='left')
+    
+    student_info = data_dict['student_info'].assign(_position=np.arange(len(data_dict['student_info'])))
+    fact_tables = {
+        'student_info': student_info,
+        'student_registration': data_dict['student_registration'],
+        'student_vle': data_dict['student_vle'],
+        'student_assessments': student_assessments
+    }
+    fact_parts = {name: split_by_presentation(df) for name, df in fact_tables.items()}
+    partition_keys = list(dict.fromkeys(key for parts in fact_parts.values() for key in parts))
+    partitions = [
+        {name: fact_parts[name].get(key, df.iloc[0:0]) for name, df in fact_tables.items()}
+        for key in partition_keys
+    ]
+    
+    n_workers = min(resolve_n_jobs(n_jobs), len(partitions)) or 1
+    logger.info(f"🧩 Procesando {len(partitions)} particiones con {n_workers} procesos...")
+    shared_tables = {name: data_dict[name] for name in DIMENSION_TABLES}
+    with create_partition_executor(n_workers, shared_tables) as executor:
+        results = list(executor.map(_process_partition, partitions))
+    
+    student_consolidated = pd.concat([r['student_consolidated'] for r in results], ignore_index=True)
+    student_consolidated = (
+        student_consolidated.sort_values('_position', kind='mergesort')
+        .drop(columns=['_position'])
+        .reset_index(drop=True)
+    )
+    interaction_features = (
+        pd.concat([r['interaction_features'] for r in results], ignore_index=True)
+        .sort_values(['id_student', 'code_module', 'code_presentation', 'date'], kind='mergesort')
+        .reset_index(drop=True)
+    )
+    assessment_features = _merge_assessment_partials([r['assessment_partials'] for r in results])
+    
+    return {
+        'student_consolidated': student_consolidated,
+        'interaction_features': interaction_features,
+        'assessment_features': assessment_features
+    }
+
+def process_all_data(data_dict: Dict[str, Any],
+                     n_jobs: int = 1,
+                     memory_budget_mb: Optional[float] = None,
+                     engine: str = 'pandas') -> Dict[str, pd.DataFrame]:
     """
     Procesa todos los datos y crea DataFrames consolidados para el análisis.
     
     Args:
         data_dict: Diccionario con todos los DataFrames originales
+        n_jobs: 1 procesa todo en memoria en el proceso actual; otro valor
+            (-1 = todos los núcleos) procesa cada presentación en paralelo
+            (no aplica con engine='polars' ni con memory_budget_mb, que lo avisan)
+        memory_budget_mb: Si se indica, las agregaciones de interacciones y
+            evaluaciones se calculan fuera de memoria con este presupuesto (MB);
+            'student_vle' y 'student_assessments' pueden ser rutas CSV
+        engine: 'pandas' o 'polars' (planes perezosos multihilo con el mismo resultado;
+            las tablas pueden ser rutas CSV/Parquet, que se escanean desde el fichero)
         
     Returns:
         Dict[str, pd.DataFrame]: Diccionario con DataFrames procesados
     """
     logger.info("🔄 Procesando todos los datos...")
     
+    if engine not in PROCESSING_ENGINES:
+        raise ValueError(f"engine debe ser uno de {PROCESSING_ENGINES}")
+    
     processed_data = {}
     
-    # 1. Información consolidada del estudiante
-    processed_data['student_consolidated'] = merge_student_data(data_dict)
+    # Polars ya paraleliza con hilos y el modo fuera de memoria procesa por bloques en serie
+    if resolve_n_jobs(n_jobs) > 1 and (engine == 'polars' or memory_budget_mb is not None):
+        mode = "engine='polars'" if engine == 'polars' else 'memory_budget_mb'
+        logger.warning(f"⚠️ n_jobs={n_jobs} se ignora con {mode}: no se reparte por procesos")
     
-    # 2. Características de interacciones
-    processed_data['interaction_features'] = create_interaction_features(data_dict)
+    if engine == 'polars':
+        # 1-3. Tablas derivadas con el backend Polars
+        from .polars_backend import process_with_polars
+        processed_data.update(process_with_polars(data_dict))
+    elif memory_budget_mb is not None:
+        # 1-3. Agregaciones fuera de memoria sobre las tablas de hechos grandes
+        processed_data['student_consolidated'] = merge_student_data(data_dict)
+        processed_data['interaction_features'] = create_interaction_features(data_dict, memory_budget_mb)
+        processed_data['assessment_features'] = create_assessment_features(data_dict, memory_budget_mb)
+    elif resolve_n_jobs(n_jobs) > 1:
+        # 1-3. Tablas derivadas por partición (code_module, code_presentation)
+        processed_data.update(process_partitioned(data_dict, n_jobs=n_jobs))
+    else:
+        # 1. Información consolidada del estudiante
+        processed_data['student_consolidated'] = merge_student_data(data_dict)
+        
+        # 2. Características de interacciones
+        processed_data['interaction_features'] = create_interaction_features(data_dict)
+        
+        # 3. Características de evaluaciones
+        processed_data['assessment_features'] = create_assessment_features(data_dict)
     
-    # 3. Características de evaluaciones
-    processed_data['assessment_features'] = create_assessment_features(data_dict)
+    # Características de evaluaciones por matrícula (peso, retraso y tipo)
+    assessments = data_dict.get('assessments')
+    if isinstance(assessments, pd.DataFrame) and set(ASSESSMENT_TABLE_COLUMNS) <= set(assessments.columns):
+        processed_data['enrollment_assessment_features'] = create_enrollment_assessment_features(data_dict)
     
-    # 4. Datos originales limpios
+    # 4. Datos originales limpios: referencias a los DataFrames de origen, que
+    # no se modifican (con copy-on-write cualquier escritura posterior copiaría)
     for name, df in data_dict.items():
-        processed_data[f"{name}_clean"] = df.copy()
+        # Las tablas pasadas como ruta CSV no se materializan en memoria
+        if isinstance(df, pd.DataFrame):
+            processed_data[f"{name}_clean"] = df
     
     logger.info("✅ Procesamiento de datos completado")
     return processed_data 
\ No newline at end of file
@@ -7,11 +7,79 @@ valores faltantes, tipos de datos y relaciones entre tablas.
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Any
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Any, Union
 import logging
 
+from .out_of_core import DEFAULT_MEMORY_BUDGET_MB, plan_partitions
+
 logger = logging.getLogger(__name__)
 
+# Tipos esperados según el data dictionary
+EXPECTED_TYPES = {
+    'student_info': {
+        'code_module': 'object',
+        'code_presentation': 'object',
+        'id_student': 'int64',
+        'gender': 'object',
+        'region': 'object',
+        'highest_education': 'object',
+        'imd_band': 'object',
+        'age_band': 'object',
+        'num_of_prev_attempts': 'int64',
+        'studied_credits': 'int64',
+        'disability': 'object',
+        'final_result': 'object'
+    },
+    'courses': {
+        'code_module': 'object',
+        'code_presentation': 'object',
+        'module_presentation_length': 'int64'
+    },
+    'assessments': {
+        'code_module': 'object',
+        'code_presentation': 'object',
+        'id_assessment': 'int64',
+        'assessment_type': 'object',
+        'date': 'object',  # Puede contener strings vacíos
+        'weight': 'int64'
+    },
+    'student_assessments': {
+        'id_assessment': 'int64',
+        'id_student': 'int64',
+        'date_submitted': 'int64',
+        'is_banked': 'int64',
+        'score': 'int64'
+    },
+    'student_registration': {
+        'code_module': 'object',
+        'code_presentation': 'object',
+        'id_student': 'int64',
+        'date_registration': 'int64',
+        'date_unregistration': 'object'  # Puede contener strings vacíos
+    },
+    'vle': {
+        'id_site': 'int64',
+        'code_module': 'object',
+        'code_presentation': 'object',
+        'activity_type': 'object',
+        'week_from': 'object',  # Puede contener strings vacíos
+        'week_to': 'object'     # Puede contener strings vacíos
+    },
+    'student_vle': {
+        'code_module': 'object',
+        'code_presentation': 'object',
+        'id_student': 'int64',
+        'id_site': 'int64',
+        'date': 'int64',
+        'sum_click': 'int64'
+    }
+}
+
+# Bytes por fila de los hashes que se vuelcan a disco para contar valores distintos
+HASH_BYTES = 8
+
 def validate_data_integrity(data_dict: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
     """
     Valida la integridad referencial entre las tablas del dataset.
@@ -112,6 +180,20 @@ def check_missing_values(data_dict: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
     
     return missing_summary
 
+def _type_mismatches(df: pd.DataFrame, expected: Dict[str, str]) -> Dict[str, Dict[str, str]]:
+    """Columnas cuyo tipo no coincide con el esperado."""
+    actual_types = df.dtypes.to_dict()
+    mismatches = {}
+    for col, expected_type in expected.items():
+        if col in actual_types:
+            actual_type = str(actual_types[col])
+            if actual_type != expected_type:
+                mismatches[col] = {
+                    'expected': expected_type,
+                    'actual': actual_type
+                }
+    return mismatches
+
 def validate_data_types(data_dict: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
     """
     Valida que los tipos de datos sean los esperados según el diccionario de datos.
@@ -124,83 +206,12 @@ def validate_data_types(data_dict: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
     """
     logger.info("🔍 Validando tipos de datos...")
     
-    # Definir tipos esperados según el data dictionary
-    expected_types = {
-        'student_info': {
-            'code_module': 'object',
-            'code_presentation': 'object',
-            'id_student': 'int64',
-            'gender': 'object',
-            'region': 'object',
-            'highest_education': 'object',
-            'imd_band': 'object',
-            'age_band': 'object',
-            'num_of_prev_attempts': 'int64',
-            'studied_credits': 'int64',
-            'disability': 'object',
-            'final_result': 'object'
-        },
-        'courses': {
-            'code_module': 'object',
-            'code_presentation': 'object',
-            'module_presentation_length': 'int64'
-        },
-        'assessments': {
-            'code_module': 'object',
-            'code_presentation': 'object',
-            'id_assessment': 'int64',
-            'assessment_type': 'object',
-            'date': 'object',  # Puede contener strings vacíos
-            'weight': 'int64'
-        },
-        'student_assessments': {
-            'id_assessment': 'int64',
-            'id_student': 'int64',
-            'date_submitted': 'int64',
-            'is_banked': 'int64',
-            'score': 'int64'
-        },
-        'student_registration': {
-            'code_module': 'object',
-            'code_presentation': 'object',
-            'id_student': 'int64',
-            'date_registration': 'int64',
-            'date_unregistration': 'object'  # Puede contener strings vacíos
-        },
-        'vle': {
-            'id_site': 'int64',
-            'code_module': 'object',
-            'code_presentation': 'object',
-            'activity_type': 'object',
-            'week_from': 'object',  # Puede contener strings vacíos
-            'week_to': 'object'     # Puede contener strings vacíos
-        },
-        'student_vle': {
-            'code_module': 'object',
-            'code_presentation': 'object',
-            'id_student': 'int64',
-            'id_site': 'int64',
-            'date': 'int64',
-            'sum_click': 'int64'
-        }
-    }
-    
     type_validation = {}
     
     for name, df in data_dict.items():
-        if name in expected_types:
-            actual_types = df.dtypes.to_dict()
-            expected = expected_types[name]
-            
-            mismatches = {}
-            for col, expected_type in expected.items():
-                if col in actual_types:
-                    actual_type = str(actual_types[col])
-                    if actual_type != expected_type:
-                        mismatches[col] = {
-                            'expected': expected_type,
-                            'actual': actual_type
-                        }
+        if name in EXPECTED_TYPES:
+            expected = EXPECTED_TYPES[name]
+            mismatches = _type_mismatches(df, expected)
             
             type_validation[name] = {
                 'status': 'PASS' if len(mismatches) == 0 else 'FAIL',
@@ -269,4 +280,190 @@ def generate_data_summary(data_dict: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
         }
     
     logger.info("✅ Resumen de datos generado exitosamente")
-    return summary 
\ No newline at end of file
+    return summary
+
+def _spill_hashes(hashes: np.ndarray, paths: List[Path]) -> None:
+    """Añade hashes de 64 bits al fichero de la partición que les toca por módulo."""
+    partition_ids = hashes % np.uint64(len(paths))
+    order = np.argsort(partition_ids, kind='stable')
+    boundaries = np.flatnonzero(np.diff(partition_ids[order])) + 1
+    for rows in np.split(order, boundaries):
+        if len(rows):
+            with open(paths[int(partition_ids[rows[0]])], 'ab') as f:
+                hashes[rows].tofile(f)
+
+def _count_distinct_hashes(paths: List[Path]) -> int:
+    """Cuenta los hashes distintos leyendo una sola partición cada vez."""
+    return sum(len(np.unique(np.fromfile(path, dtype=np.uint64))) for path in paths if path.exists())
+
+def summarize_table_in_chunks(name: str,
+                              chunks: Iterable[pd.DataFrame],
+                              memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+                              expected_rows: Optional[int] = None,
+                              spill_dir: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """
+    Calcula valores faltantes, tipos y resumen de una tabla leída por bloques.
+    
+    Produce las mismas entradas que check_missing_values, validate_data_types
+    y generate_data_summary para esa tabla sin materializarla completa. Las
+    filas duplicadas y los estudiantes únicos se cuentan con un hash de 64 bits
+    que se vuelca a disco repartido por particiones; al final se deduplica una
+    partición cada vez, de modo que solo una de ellas ocupa memoria.
+    
+    Args:
+        name: Nombre de la tabla (p. ej. 'student_vle')
+        chunks: Iterable de bloques de la tabla
+        memory_budget_mb: Presupuesto de memoria para deduplicar cada partición (MB)
+        expected_rows: Filas estimadas de la tabla (None si se desconocen)
+        spill_dir: Carpeta base de los ficheros de volcado (temporal del sistema por defecto)
+        
+    Returns:
+        Dict con 'missing_values', 'data_types', 'file_summary' y 'key_statistics'
+    """
+    n_partitions = plan_partitions(
+        HASH_BYTES * expected_rows if expected_rows else None, int(memory_budget_mb * 1024 ** 2)
+    )
+    logger.info(f"🔍 Validando {name} por bloques ({n_partitions} particiones de hashes)...")
+    
+    n_rows = 0
+    n_columns = 0
+    memory_bytes = 0
+    missing_counts = None
+    mismatches = {}
+    total_clicks = 0
+    
+    with tempfile.TemporaryDirectory(dir=spill_dir, prefix="tdsp-spill-") as tmp_dir:
+        row_paths = [Path(tmp_dir) / f"rows-{i:05d}.u64" for i in range(n_partitions)]
+        student_paths = [Path(tmp_dir) / f"students-{i:05d}.u64" for i in range(n_partitions)]
+        
+        for chunk in chunks:
+            n_rows += len(chunk)
+            n_columns = len(chunk.columns)
+            memory_bytes += chunk.memory_usage(deep=True).sum()
+            chunk_missing = chunk.isnull().sum()
+            missing_counts = chunk_missing if missing_counts is None else missing_counts + chunk_missing
+            if name in EXPECTED_TYPES:
+                mismatches.update(_type_mismatches(chunk, EXPECTED_TYPES[name]))
+            _spill_hashes(pd.util.hash_pandas_object(chunk, index=False).to_numpy(), row_paths)
+            if name == 'student_vle':
+                students = chunk['id_student'].drop_duplicates()
+                _spill_hashes(pd.util.hash_pandas_object(students, index=False).to_numpy(), student_paths)
+                total_clicks += int(chunk['sum_click'].sum())
+        
+        duplicate_rows = n_rows - _count_distinct_hashes(row_paths)
+        unique_students = _count_distinct_hashes(student_paths)
+    
+    if missing_counts is None:
+        raise ValueError(f"La tabla {name} no tiene bloques")
+    
+    total_missing = missing_counts.sum()
+    
+    result = {
+        'missing_values': {
+            'total_rows': n_rows,
+            'missing_values': missing_counts.to_dict(),
+            'missing_percentages': (missing_counts / n_rows * 100).to_dict(),
+            'total_missing': total_missing,
+            'total_missing_percentage': total_missing / n_rows * 100
+        },
+        'data_types': {
+            'status': 'PASS' if len(mismatches) == 0 else 'FAIL',
+            'mismatches': mismatches,
+            'total_columns': len(EXPECTED_TYPES.get(name, {})),
+            'mismatched_columns': len(mismatches)
+        },
+        'file_summary': {
+            'rows': n_rows,
+            'columns': n_columns,
+            'memory_mb': memory_bytes / 1024 / 1024,
+            'duplicate_rows': duplicate_rows,
+            'missing_values': total_missing
+        },
+        'key_statistics': {}
+    }
+    if name == 'student_vle':
+        result['key_statistics']['interactions'] = {
+            'total_interactions': n_rows,
+            'unique_students': unique_students,
+            'avg_clicks_per_interaction': total_clicks / n_rows,
+            'total_clicks': total_clicks
+        }
+    
+    logger.info(f"✅ {name}: {n_rows} registros validados por bloques")
+    return result
+
+def validate_student_vle_delta(delta_df: pd.DataFrame,
+                               vle: pd.DataFrame,
+                               student_registration: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Valida un lote nuevo de interacciones (studentVle) sin releer el histórico.
+    
+    Solo se recorren las filas del lote y las tablas de dimensiones pequeñas
+    (vle y studentRegistration), por lo que el coste es O(tamaño del lote).
+    
+    Args:
+        delta_df: Lote de filas nuevas de studentVle
+        vle: Tabla vle con los recursos válidos
+        student_registration: Tabla de matrículas válidas
+        
+    Returns:
+        Dict con resultados de validación
+    """
+    logger.info(f"🔍 Validando lote de interacciones: {len(delta_df)} registros...")
+    
+    key_columns = ['code_module', 'code_presentation', 'id_student', 'id_site', 'date']
+    expected_columns = key_columns + ['sum_click']
+    validation_results = {'checks': {}, 'overall_status': 'PASS'}
+    checks = validation_results['checks']
+    
+    missing_columns = [col for col in expected_columns if col not in delta_df.columns]
+    checks['columns'] = {
+        'status': 'PASS' if not missing_columns else 'FAIL',
+        'missing_columns': missing_columns
+    }
+    
+    if not missing_columns:
+        null_keys = int(delta_df[key_columns].isna().any(axis=1).sum())
+        checks['null_keys'] = {'status': 'PASS' if null_keys == 0 else 'FAIL', 'invalid_rows': null_keys}
+        
+        non_numeric = [
+            col for col in ['id_student', 'id_site', 'date', 'sum_click']
+            if not pd.api.types.is_numeric_dtype(delta_df[col])
+        ]
+        checks['numeric_columns'] = {'status': 'PASS' if not non_numeric else 'FAIL', 'columns': non_numeric}
+        
+        if not non_numeric:
+            invalid_clicks = int((delta_df['sum_click'] <= 0).sum())
+            checks['positive_clicks'] = {
+                'status': 'PASS' if invalid_clicks == 0 else 'FAIL',
+                'invalid_rows': invalid_clicks
+            }
+        
+        # Cada recurso debe pertenecer a la presentación de la interacción
+        site_keys = vle[['id_site', 'code_module', 'code_presentation']].drop_duplicates()
+        unknown_sites = delta_df[['id_site', 'code_module', 'code_presentation']].merge(
+            site_keys, how='left', indicator=True
+        )['_merge'].eq('left_only')
+        checks['sites_in_vle'] = {
+            'status': 'PASS' if not unknown_sites.any() else 'FAIL',
+            'invalid_rows': int(unknown_sites.sum())
+        }
+        
+        # Cada interacción debe corresponder a una matrícula existente
+        enrollment_keys = student_registration[['id_student', 'code_module', 'code_presentation']].drop_duplicates()
+        unknown_enrollments = delta_df[['id_student', 'code_module', 'code_presentation']].merge(
+            enrollment_keys, how='left', indicator=True
+        )['_merge'].eq('left_only')
+        checks['enrollments_in_registration'] = {
+            'status': 'PASS' if not unknown_enrollments.any() else 'FAIL',
+            'invalid_rows': int(unknown_enrollments.sum())
+        }
+    
+    if any(result['status'] == 'FAIL' for result in checks.values()):
+        validation_results['overall_status'] = 'FAIL'
+        failed = [name for name, result in checks.items() if result['status'] == 'FAIL']
+        logger.warning(f"⚠️ Lote de interacciones inválido: {failed}")
+    else:
+        logger.info("✅ Lote de interacciones validado correctamente")
+    
+    return validation_results
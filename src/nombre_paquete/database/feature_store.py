@@ -0,0 +1,357 @@
+"""
+Módulo de almacén local de características (feature store).
+
+Este módulo guarda los vectores de características por matrícula
+(id_student, code_module, code_presentation) en una base SQLite indexada y
+versionada, para consultar un estudiante o un lote de estudiantes sin
+releer el CSV completo de características.
+"""
+
+import pandas as pd
+import numpy as np
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Clave de cada vector de características
+KEY_COLUMNS = ['id_student', 'code_module', 'code_presentation']
+
+# Ruta por defecto del almacén
+FEATURE_STORE_PATH = Path("data/processed/feature_store.sqlite")
+
+# Versiones que se conservan tras cada escritura
+DEFAULT_MAX_VERSIONS = 5
+
+# Agregación por matrícula de las características diarias de interacciones; el
+# resto de columnas que varían entre fechas se promedian y las constantes se conservan
+ENROLLMENT_AGGREGATIONS = {
+    'date': 'max',
+    'total_clicks': 'sum',
+    'interaction_count': 'sum',
+    'unique_activity_types': 'max'
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    version TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    columns TEXT NOT NULL,
+    n_rows INTEGER NOT NULL,
+    description TEXT
+);
+CREATE TABLE IF NOT EXISTS features (
+    version TEXT NOT NULL,
+    id_student INTEGER NOT NULL,
+    code_module TEXT NOT NULL,
+    code_presentation TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (version, id_student, code_module, code_presentation)
+) WITHOUT ROWID;
+"""
+
+
+def aggregate_enrollments(features_df: pd.DataFrame,
+                          aggregations: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Reduce las características a una fila por matrícula.
+
+    Las características de interacciones tienen una fila por matrícula y
+    fecha. Las columnas constantes dentro de cada matrícula conservan su
+    valor; las de ``aggregations`` se agregan con su función y el resto de
+    columnas numéricas que varían se promedian. La media de clics por
+    interacción se recalcula con los totales agregados.
+
+    Args:
+        features_df: DataFrame con las columnas clave y las características
+        aggregations: Columna -> función de agregación (por defecto ENROLLMENT_AGGREGATIONS)
+
+    Returns:
+        DataFrame con una fila por matrícula, en orden de primera aparición y con las mismas columnas
+    """
+    aggregations = ENROLLMENT_AGGREGATIONS if aggregations is None else aggregations
+    if not features_df.duplicated(subset=KEY_COLUMNS).any():
+        return features_df
+
+    value_cols = [col for col in features_df.columns if col not in KEY_COLUMNS]
+    grouped = features_df.groupby(KEY_COLUMNS, sort=False)
+    varying = grouped[value_cols].nunique(dropna=False).gt(1).any()
+    numeric_cols = set(features_df.select_dtypes(include=[np.number, 'bool']).columns)
+
+    spec = {
+        col: aggregations[col] if col in aggregations
+        else 'mean' if varying[col] and col in numeric_cols
+        else 'first'
+        for col in value_cols
+    }
+    enrollments_df = grouped.agg(spec).reset_index()
+
+    if {'total_clicks', 'interaction_count', 'avg_clicks_per_interaction'} <= set(enrollments_df.columns):
+        counts = enrollments_df['interaction_count']
+        enrollments_df['avg_clicks_per_interaction'] = (enrollments_df['total_clicks'] / counts).where(counts > 0, 0)
+
+    logger.info(f"🔧 Características agregadas por matrícula: {len(features_df)} -> {len(enrollments_df)} filas")
+    return enrollments_df[features_df.columns]
+
+
+class FeatureStore:
+    """
+    Almacén de características por matrícula respaldado por SQLite.
+
+    Cada escritura crea una versión nueva e inmutable y elimina las más
+    antiguas por encima del límite; las lecturas usan la última versión
+    salvo que se indique otra. Los vectores se guardan como
+    float64 contiguo, de modo que una consulta puntual es una búsqueda por
+    clave primaria y un ``np.frombuffer``.
+    """
+
+    def __init__(self, db_path: Union[str, Path] = FEATURE_STORE_PATH):
+        """
+        Abre (o crea) el almacén de características.
+
+        Args:
+            db_path: Ruta del fichero SQLite
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.db_path))
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(_SCHEMA)
+        self._columns_cache: Dict[str, List[str]] = {}
+
+    def close(self) -> None:
+        """Cierra la conexión con la base de datos."""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self,
+              features_df: pd.DataFrame,
+              version: Optional[str] = None,
+              description: Optional[str] = None,
+              keep: Optional[str] = None,
+              max_versions: Optional[int] = DEFAULT_MAX_VERSIONS) -> str:
+        """
+        Escribe una nueva versión de los vectores de características.
+
+        Se guardan todas las columnas numéricas y booleanas distintas de la clave.
+
+        Args:
+            features_df: DataFrame con las columnas clave y las características
+            version: Nombre de la versión (por defecto 'v<n>' incremental)
+            description: Descripción opcional de la versión
+            keep: Qué fila conservar si una clave aparece repetida ('first' o 'last');
+                None lanza un error ante claves duplicadas (use aggregate_enrollments
+                para reducir las filas por fecha a una por matrícula)
+            max_versions: Versiones que se conservan tras escribir (None = todas)
+
+        Returns:
+            Nombre de la versión escrita
+        """
+        missing_keys = [col for col in KEY_COLUMNS if col not in features_df.columns]
+        if missing_keys:
+            raise ValueError(f"Faltan columnas clave en features_df: {missing_keys}")
+
+        duplicated = features_df.duplicated(subset=KEY_COLUMNS, keep=keep or False)
+        if duplicated.any():
+            if keep is None:
+                raise ValueError(
+                    f"{int(duplicated.sum())} filas con clave repetida; use keep='first' o keep='last'"
+                )
+            logger.warning(f"⚠️ Descartadas {int(duplicated.sum())} filas con clave repetida (keep='{keep}')")
+            features_df = features_df[~duplicated]
+
+        feature_cols = [
+            col for col in features_df.select_dtypes(include=[np.number, 'bool']).columns
+            if col not in KEY_COLUMNS
+        ]
+        version = version or self._next_version()
+
+        matrix = np.ascontiguousarray(features_df[feature_cols].to_numpy(dtype=np.float64, na_value=np.nan))
+        rows = zip(
+            [version] * len(features_df),
+            features_df['id_student'].astype(np.int64).tolist(),
+            features_df['code_module'].astype(str).tolist(),
+            features_df['code_presentation'].astype(str).tolist(),
+            (row.tobytes() for row in matrix)
+        )
+
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO versions (version, created_at, columns, n_rows, description) VALUES (?, ?, ?, ?, ?)",
+                (version, pd.Timestamp.now().isoformat(), json.dumps(feature_cols), len(features_df), description)
+            )
+            self.connection.executemany("INSERT INTO features VALUES (?, ?, ?, ?, ?)", rows)
+
+        self._columns_cache[version] = feature_cols
+        logger.info(f"✅ Feature store: versión {version} con {len(features_df)} vectores de {len(feature_cols)} características")
+        if max_versions is not None:
+            self.prune(max_versions)
+        return version
+
+    def _next_version(self) -> str:
+        """Siguiente nombre 'v<n>' (no reutiliza los de versiones eliminadas)."""
+        numbers = [
+            int(name[1:]) for (name,) in self.connection.execute("SELECT version FROM versions")
+            if name.startswith('v') and name[1:].isdigit()
+        ]
+        return f"v{max(numbers, default=0) + 1}"
+
+    def prune(self, max_versions: int) -> List[str]:
+        """
+        Elimina las versiones más antiguas y conserva las max_versions más recientes.
+
+        Args:
+            max_versions: Número de versiones que se conservan (>= 1)
+
+        Returns:
+            Lista de versiones eliminadas
+        """
+        if max_versions < 1:
+            raise ValueError("max_versions debe ser al menos 1")
+        removed = [
+            name for (name,) in self.connection.execute(
+                "SELECT version FROM versions ORDER BY created_at DESC, version DESC LIMIT -1 OFFSET ?",
+                (max_versions,)
+            )
+        ]
+        if removed:
+            with self.connection:
+                self.connection.executemany("DELETE FROM features WHERE version = ?", [(name,) for name in removed])
+                self.connection.executemany("DELETE FROM versions WHERE version = ?", [(name,) for name in removed])
+            for name in removed:
+                self._columns_cache.pop(name, None)
+            logger.info(f"🗑️ Feature store: eliminadas {len(removed)} versiones antiguas ({', '.join(removed)})")
+        return removed
+
+    def list_versions(self) -> pd.DataFrame:
+        """
+        Lista las versiones disponibles en el almacén.
+
+        Returns:
+            DataFrame con versión, fecha de creación, filas y descripción
+        """
+        return pd.read_sql_query(
+            "SELECT version, created_at, n_rows, description FROM versions ORDER BY created_at, version",
+            self.connection
+        )
+
+    def latest_version(self) -> str:
+        """
+        Obtiene la versión más reciente.
+
+        Returns:
+            Nombre de la última versión escrita
+        """
+        row = self.connection.execute(
+            "SELECT version FROM versions ORDER BY created_at DESC, version DESC LIMIT 1"
+        ).fetchone()
+        if row is None:
+            raise ValueError("El feature store está vacío")
+        return row[0]
+
+    def get_columns(self, version: Optional[str] = None) -> List[str]:
+        """
+        Obtiene los nombres de las características de una versión.
+
+        Args:
+            version: Versión a consultar (None usa la última)
+
+        Returns:
+            Lista de nombres de características
+        """
+        version = version or self.latest_version()
+        if version not in self._columns_cache:
+            row = self.connection.execute("SELECT columns FROM versions WHERE version = ?", (version,)).fetchone()
+            if row is None:
+                raise ValueError(f"No existe la versión {version}")
+            self._columns_cache[version] = json.loads(row[0])
+        return self._columns_cache[version]
+
+    def get(self,
+            id_student: int,
+            code_module: str,
+            code_presentation: str,
+            version: Optional[str] = None) -> Optional[pd.Series]:
+        """
+        Consulta el vector de características de una matrícula.
+
+        Args:
+            id_student: Identificador del estudiante
+            code_module: Código del módulo
+            code_presentation: Código de la presentación
+            version: Versión a consultar (None usa la última)
+
+        Returns:
+            Series con las características o None si la matrícula no existe
+        """
+        version = version or self.latest_version()
+        row = self.connection.execute(
+            "SELECT vector FROM features WHERE version = ? AND id_student = ? "
+            "AND code_module = ? AND code_presentation = ?",
+            (version, int(id_student), code_module, code_presentation)
+        ).fetchone()
+        if row is None:
+            return None
+        return pd.Series(np.frombuffer(row[0], dtype=np.float64), index=self.get_columns(version))
+
+    def get_many(self,
+                 keys: Union[pd.DataFrame, Iterable[Tuple[int, str, str]]],
+                 version: Optional[str] = None) -> pd.DataFrame:
+        """
+        Consulta en bloque los vectores de varias matrículas.
+
+        Las claves se cargan en una tabla temporal y se resuelven con un único
+        join indexado; las matrículas inexistentes devuelven NaN.
+
+        Args:
+            keys: DataFrame con las columnas clave o iterable de tuplas
+                (id_student, code_module, code_presentation)
+            version: Versión a consultar (None usa la última)
+
+        Returns:
+            DataFrame con las columnas clave y las características, en el orden de entrada
+        """
+        version = version or self.latest_version()
+        columns = self.get_columns(version)
+        keys_df = keys[KEY_COLUMNS] if isinstance(keys, pd.DataFrame) else pd.DataFrame(list(keys), columns=KEY_COLUMNS)
+
+        key_rows = list(zip(
+            range(len(keys_df)),
+            keys_df['id_student'].astype(np.int64).tolist(),
+            keys_df['code_module'].astype(str).tolist(),
+            keys_df['code_presentation'].astype(str).tolist()
+        ))
+
+        with self.connection:
+            self.connection.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS lookup_keys "
+                "(position INTEGER, id_student INTEGER, code_module TEXT, code_presentation TEXT)"
+            )
+            self.connection.execute("DELETE FROM lookup_keys")
+            self.connection.executemany("INSERT INTO lookup_keys VALUES (?, ?, ?, ?)", key_rows)
+            found = self.connection.execute(
+                "SELECT k.position, f.vector FROM lookup_keys k JOIN features f "
+                "ON f.version = ? AND f.id_student = k.id_student "
+                "AND f.code_module = k.code_module AND f.code_presentation = k.code_presentation",
+                (version,)
+            ).fetchall()
+
+        matrix = np.full((len(keys_df), len(columns)), np.nan)
+        if found:
+            positions = np.fromiter((position for position, _ in found), dtype=np.int64, count=len(found))
+            vectors = np.frombuffer(b''.join(vector for _, vector in found), dtype=np.float64)
+            matrix[positions] = vectors.reshape(len(found), len(columns))
+
+        result = pd.DataFrame(matrix, columns=columns)
+        result.insert(0, 'code_presentation', keys_df['code_presentation'].to_numpy())
+        result.insert(0, 'code_module', keys_df['code_module'].to_numpy())
+        result.insert(0, 'id_student', keys_df['id_student'].to_numpy())
+        return result
@@ -0,0 +1,287 @@
+"""
+Módulo de ingesta incremental de interacciones (studentVle).
+
+Este módulo mantiene un almacén columnar (parquet) particionado por
+code_module/code_presentation/date al que cada lote diario se añade sin
+reescribir el histórico. La adquisición completa siembra el almacén con el
+histórico de studentVle (lotes ``history-*``); cada ingesta incremental
+añade después un lote diario. Un manifiesto registra los lotes ingeridos y
+las particiones que tocó cada uno, para que las etapas posteriores
+recalculen solo las particiones que cambiaron desde su última ejecución.
+"""
+
+import pandas as pd
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import logging
+
+from .data_validator import validate_student_vle_delta
+
+logger = logging.getLogger(__name__)
+
+# Ruta por defecto del almacén de interacciones
+INTERACTION_STORE_PATH = Path("data/processed/student_vle_store")
+
+# Columnas de partición (en orden de anidamiento de carpetas)
+STORE_PARTITION_KEYS = ['code_module', 'code_presentation', 'date']
+
+# Esquema de studentVle: todos los ficheros del almacén comparten tipos
+STUDENT_VLE_DTYPES = {
+    'code_module': 'str',
+    'code_presentation': 'str',
+    'id_student': 'int64',
+    'id_site': 'int64',
+    'date': 'int64',
+    'sum_click': 'int64'
+}
+
+MANIFEST_FILE = "_manifest.json"
+
+# Prefijo de los lotes con los que se siembra el histórico
+HISTORY_BATCH_PREFIX = "history-"
+
+# Clave de partición: (code_module, code_presentation, date)
+PartitionKey = Tuple[str, str, int]
+
+
+def _partition_name(key: PartitionKey) -> str:
+    """Nombre relativo de la carpeta de una partición (estilo Hive)."""
+    return "/".join(f"{col}={value}" for col, value in zip(STORE_PARTITION_KEYS, key))
+
+
+def _parse_partition_name(name: str) -> PartitionKey:
+    """Convierte el nombre relativo de una partición en su clave."""
+    values = [part.split("=", 1)[1] for part in name.split("/")]
+    return values[0], values[1], int(values[2])
+
+
+class InteractionStore:
+    """
+    Almacén de interacciones particionado y de solo anexado.
+
+    Cada lote se escribe como un fichero ``part-<batch_id>.parquet`` en cada
+    partición que toca; el histórico nunca se reescribe, de modo que ingerir
+    un lote cuesta O(tamaño del lote). Los lotes se identifican por un hash de
+    su contenido, lo que hace la ingesta idempotente.
+    """
+
+    def __init__(self, root: Union[str, Path] = INTERACTION_STORE_PATH):
+        """
+        Abre (o crea) el almacén de interacciones.
+
+        Args:
+            root: Carpeta raíz del almacén
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """Lee el manifiesto o crea uno vacío."""
+        manifest_path = self.root / MANIFEST_FILE
+        if manifest_path.exists():
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {'batches': [], 'partitions': {}, 'consumers': {}}
+
+    def _save_manifest(self) -> None:
+        """Escribe el manifiesto de forma atómica (fichero temporal + rename)."""
+        tmp_path = self.root / f"{MANIFEST_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.root / MANIFEST_FILE)
+
+    @staticmethod
+    def batch_id_for(delta_df: pd.DataFrame) -> str:
+        """
+        Calcula el identificador de contenido de un lote.
+
+        Args:
+            delta_df: Lote de filas de studentVle
+
+        Returns:
+            Hash hexadecimal (16 caracteres) del contenido del lote
+        """
+        row_hashes = pd.util.hash_pandas_object(delta_df[list(STUDENT_VLE_DTYPES)], index=False)
+        return hashlib.sha256(row_hashes.to_numpy().tobytes()).hexdigest()[:16]
+
+    def ingest(self,
+               delta_df: pd.DataFrame,
+               vle: pd.DataFrame,
+               student_registration: pd.DataFrame,
+               batch_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Valida un lote y lo añade al almacén.
+
+        Args:
+            delta_df: Lote de filas nuevas de studentVle
+            vle: Tabla vle (para validar los recursos)
+            student_registration: Tabla de matrículas (para validar las claves)
+            batch_id: Identificador del lote (por defecto, hash del contenido)
+
+        Returns:
+            Diccionario con el identificador del lote, filas escritas y particiones modificadas
+        """
+        validation = validate_student_vle_delta(delta_df, vle, student_registration)
+        if validation['overall_status'] != 'PASS':
+            raise ValueError(f"Lote de interacciones inválido: {validation['checks']}")
+
+        delta_df = delta_df[list(STUDENT_VLE_DTYPES)].astype(STUDENT_VLE_DTYPES)
+        batch_id = batch_id or self.batch_id_for(delta_df)
+        if any(batch['batch_id'] == batch_id for batch in self.manifest['batches']):
+            logger.warning(f"⚠️ El lote {batch_id} ya fue ingerido; se omite")
+            return {'batch_id': batch_id, 'rows': 0, 'changed_partitions': []}
+
+        changed = self._write_batch(delta_df, batch_id)
+        logger.info(f"✅ Lote {batch_id} ingerido: {len(delta_df)} registros en {len(changed)} particiones")
+        return {'batch_id': batch_id, 'rows': len(delta_df), 'changed_partitions': changed}
+
+    def _write_batch(self, delta_df: pd.DataFrame, batch_id: str) -> List[str]:
+        """Escribe un lote (ya tipado) en sus particiones y lo registra en el manifiesto."""
+        changed = []
+        for key, part in delta_df.groupby(STORE_PARTITION_KEYS, sort=True):
+            key = (str(key[0]), str(key[1]), int(key[2]))
+            name = _partition_name(key)
+            partition_dir = self.root / name
+            partition_dir.mkdir(parents=True, exist_ok=True)
+            # Escritura atómica: un fallo no deja ficheros a medias con nombre final
+            tmp_path = partition_dir / f".part-{batch_id}.parquet.tmp"
+            part.to_parquet(tmp_path, index=False, compression='zstd')
+            os.replace(tmp_path, partition_dir / f"part-{batch_id}.parquet")
+            changed.append(name)
+
+        # El lote solo es visible cuando el manifiesto lo registra
+        self.manifest['batches'].append({
+            'batch_id': batch_id,
+            'ingested_at': pd.Timestamp.now().isoformat(),
+            'rows': len(delta_df),
+            'partitions': changed
+        })
+        for name in changed:
+            self.manifest['partitions'].setdefault(name, []).append(batch_id)
+        self._save_manifest()
+        return changed
+
+    def reset(self) -> None:
+        """Vacía el almacén (particiones y manifiesto)."""
+        for partition_dir in self.root.glob(f"{STORE_PARTITION_KEYS[0]}=*"):
+            shutil.rmtree(partition_dir)
+        self.manifest = {'batches': [], 'partitions': {}, 'consumers': {}}
+        self._save_manifest()
+
+    def ingest_history(self, chunks: Iterable[pd.DataFrame]) -> Dict[str, Any]:
+        """
+        Siembra el almacén con el histórico completo de studentVle.
+
+        El almacén se vacía primero, de modo que cada adquisición completa lo
+        reconstruye. Cada bloque se registra como un lote ``history-<n>``; el
+        histórico no pasa por la validación de lotes porque la adquisición ya
+        valida la tabla completa.
+
+        Args:
+            chunks: Bloques de filas de studentVle (un único DataFrame o un lector por bloques)
+
+        Returns:
+            Diccionario con filas, lotes y particiones del histórico
+        """
+        self.reset()
+        rows, n_batches = 0, 0
+        for chunk in chunks:
+            chunk = chunk[list(STUDENT_VLE_DTYPES)].astype(STUDENT_VLE_DTYPES)
+            self._write_batch(chunk, f"{HISTORY_BATCH_PREFIX}{n_batches:05d}")
+            rows += len(chunk)
+            n_batches += 1
+
+        self.manifest['history'] = {
+            'seeded_at': pd.Timestamp.now().isoformat(), 'rows': rows, 'batches': n_batches
+        }
+        self._save_manifest()
+        logger.info(f"✅ Histórico sembrado en el almacén: {rows} registros en {len(self.manifest['partitions'])} particiones")
+        return {'rows': rows, 'batches': n_batches, 'partitions': len(self.manifest['partitions'])}
+
+    def has_history(self) -> bool:
+        """Indica si el almacén se sembró con el histórico completo."""
+        return 'history' in self.manifest
+
+    def list_batches(self) -> pd.DataFrame:
+        """
+        Lista los lotes ingeridos.
+
+        Returns:
+            DataFrame con identificador, fecha de ingesta, filas y número de particiones
+        """
+        return pd.DataFrame([
+            {
+                'batch_id': batch['batch_id'],
+                'ingested_at': batch['ingested_at'],
+                'rows': batch['rows'],
+                'n_partitions': len(batch['partitions'])
+            }
+            for batch in self.manifest['batches']
+        ], columns=['batch_id', 'ingested_at', 'rows', 'n_partitions'])
+
+    def partitions(self) -> List[PartitionKey]:
+        """
+        Lista las particiones con datos.
+
+        Returns:
+            Lista de claves (code_module, code_presentation, date)
+        """
+        return sorted(_parse_partition_name(name) for name in self.manifest['partitions'])
+
+    def changed_partitions(self, consumer: str) -> List[PartitionKey]:
+        """
+        Particiones modificadas desde la última vez que un consumidor marcó su avance.
+
+        Args:
+            consumer: Nombre de la etapa consumidora (p. ej. 'interaction_features')
+
+        Returns:
+            Lista de claves de partición a recalcular
+        """
+        consumed = self.manifest['consumers'].get(consumer, 0)
+        names = {name for batch in self.manifest['batches'][consumed:] for name in batch['partitions']}
+        return sorted(_parse_partition_name(name) for name in names)
+
+    def mark_consumed(self, consumer: str, n_batches: Optional[int] = None) -> None:
+        """
+        Registra que un consumidor ha procesado los lotes hasta n_batches.
+
+        Args:
+            consumer: Nombre de la etapa consumidora
+            n_batches: Número de lotes procesados (por defecto, todos los actuales)
+        """
+        self.manifest['consumers'][consumer] = len(self.manifest['batches']) if n_batches is None else n_batches
+        self._save_manifest()
+
+    def read(self,
+             partitions: Optional[Sequence[PartitionKey]] = None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Lee las interacciones de un conjunto de particiones.
+
+        Solo se leen los ficheros de lotes registrados en el manifiesto.
+
+        Args:
+            partitions: Claves de partición a leer (None lee todo el almacén)
+            columns: Columnas a leer (None lee todas)
+
+        Returns:
+            DataFrame con las interacciones, en orden de partición y de ingesta
+        """
+        if partitions is None:
+            partitions = self.partitions()
+        names = [_partition_name((str(m), str(p), int(d))) for m, p, d in partitions]
+        frames = [
+            pd.read_parquet(self.root / name / f"part-{batch_id}.parquet", columns=columns)
+            for name in names
+            for batch_id in self.manifest['partitions'].get(name, [])
+        ]
+        if not frames:
+            empty = pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in STUDENT_VLE_DTYPES.items()})
+            return empty[columns] if columns else empty
+        return pd.concat(frames, ignore_index=True)
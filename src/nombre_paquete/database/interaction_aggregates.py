@@ -0,0 +1,373 @@
+"""
+Módulo de agregados de interacciones mantenidos incrementalmente.
+
+Este módulo guarda en SQLite un estado agregado mergeable de las
+interacciones: por (matrícula, día) y por matrícula se mantienen sumas,
+conteos, suma de cuadrados, primera y última fecha y un bitset de tipos de
+actividad. Cada lote nuevo se pliega en el estado con un UPSERT por clave
+(coste O(lote)), y la tabla interaction_features se reconstruye desde el
+estado sin releer el histórico. La adquisición completa siembra el estado
+con el histórico (``seed``), y solo un estado sembrado admite lotes
+incrementales. Un modo de verificación compara el resultado con un
+recálculo completo sobre histórico + lotes.
+"""
+
+import pandas as pd
+import numpy as np
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+import logging
+
+from .data_processor import INTERACTION_KEYS, _with_activity_type, create_interaction_features
+
+logger = logging.getLogger(__name__)
+
+# Ruta por defecto del estado agregado
+INTERACTION_STATE_PATH = Path("data/processed/interaction_state.sqlite")
+
+# Clave de matrícula
+ENROLLMENT_KEYS = ['id_student', 'code_module', 'code_presentation']
+
+# Bits disponibles en un INTEGER de SQLite (el bit de signo no se usa)
+MAX_ACTIVITY_TYPES = 63
+
+# Lotes plegados entre verificaciones completas
+DEFAULT_VERIFY_EVERY = 7
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS activity_types (
+    activity_type TEXT PRIMARY KEY,
+    bit INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS daily_state (
+    id_student INTEGER NOT NULL,
+    code_module TEXT NOT NULL,
+    code_presentation TEXT NOT NULL,
+    date INTEGER NOT NULL,
+    click_sum INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    activity_bits INTEGER NOT NULL,
+    PRIMARY KEY (id_student, code_module, code_presentation, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS enrollment_state (
+    id_student INTEGER NOT NULL,
+    code_module TEXT NOT NULL,
+    code_presentation TEXT NOT NULL,
+    click_sum INTEGER NOT NULL,
+    click_sq_sum INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    first_date INTEGER NOT NULL,
+    last_date INTEGER NOT NULL,
+    activity_bits INTEGER NOT NULL,
+    PRIMARY KEY (id_student, code_module, code_presentation)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS folded_batches (
+    batch_id TEXT PRIMARY KEY,
+    folded_at TEXT NOT NULL,
+    rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seeds (
+    seeded_at TEXT NOT NULL,
+    rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS verifications (
+    verified_at TEXT NOT NULL,
+    n_batches INTEGER NOT NULL,
+    status TEXT NOT NULL
+);
+"""
+
+_UPSERT_DAILY = """
+INSERT INTO daily_state VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id_student, code_module, code_presentation, date) DO UPDATE SET
+    click_sum = click_sum + excluded.click_sum,
+    row_count = row_count + excluded.row_count,
+    activity_bits = activity_bits | excluded.activity_bits
+"""
+
+_UPSERT_ENROLLMENT = """
+INSERT INTO enrollment_state VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id_student, code_module, code_presentation) DO UPDATE SET
+    click_sum = click_sum + excluded.click_sum,
+    click_sq_sum = click_sq_sum + excluded.click_sq_sum,
+    row_count = row_count + excluded.row_count,
+    first_date = MIN(first_date, excluded.first_date),
+    last_date = MAX(last_date, excluded.last_date),
+    activity_bits = activity_bits | excluded.activity_bits
+"""
+
+
+# Bits activos de cada byte (NumPy < 2.0 no tiene np.bitwise_count)
+_BYTE_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.int64)
+
+
+def _popcount(bits: np.ndarray) -> np.ndarray:
+    """Número de bits activos de cada entero (tipos de actividad distintos)."""
+    bits = np.ascontiguousarray(bits, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bits).astype(np.int64)
+    return _BYTE_POPCOUNT[bits.view(np.uint8).reshape(-1, 8)].sum(axis=1).reshape(bits.shape)
+
+
+def _or_reduce_bits(df: pd.DataFrame, keys: List[str]) -> pd.Series:
+    """OR de los bits por grupo: suma de los bits distintos de cada grupo."""
+    distinct = df.loc[df['bit'] != 0, keys + ['bit']].drop_duplicates()
+    return distinct.groupby(keys)['bit'].sum()
+
+
+class InteractionAggregateState:
+    """
+    Estado agregado de interacciones respaldado por SQLite.
+
+    Las agregaciones guardadas son todas mergeables (sumas, conteos, mínimos,
+    máximos y OR de bits) y enteras, por lo que el orden en que se pliegan
+    los lotes no altera el resultado: la tabla producida es idéntica bit a
+    bit a la de un recálculo completo.
+    """
+
+    def __init__(self, db_path: Union[str, Path] = INTERACTION_STATE_PATH):
+        """
+        Abre (o crea) el estado agregado.
+
+        Args:
+            db_path: Ruta del fichero SQLite (':memory:' para un estado temporal)
+        """
+        self.db_path = db_path if db_path == ':memory:' else Path(db_path)
+        if isinstance(self.db_path, Path):
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.db_path))
+        self.connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Cierra la conexión con la base de datos."""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _activity_bits(self, activity_types: pd.Series) -> pd.Series:
+        """Asigna (y registra si son nuevos) el bit de cada tipo de actividad."""
+        known = dict(self.connection.execute("SELECT activity_type, bit FROM activity_types").fetchall())
+        new_types = [t for t in pd.unique(activity_types.dropna()) if t not in known]
+        if len(known) + len(new_types) > MAX_ACTIVITY_TYPES:
+            raise ValueError(f"El bitset admite como máximo {MAX_ACTIVITY_TYPES} tipos de actividad")
+        for position, activity_type in enumerate(sorted(new_types), start=len(known)):
+            known[activity_type] = 1 << position
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO activity_types VALUES (?, ?)", [(t, known[t]) for t in new_types]
+        )
+        # Las interacciones sin tipo de actividad no activan ningún bit
+        return activity_types.map(known).fillna(0).astype(np.int64)
+
+    def reset(self) -> None:
+        """Vacía el estado (agregados, lotes, siembra y verificaciones)."""
+        with self.connection:
+            for table in ('activity_types', 'daily_state', 'enrollment_state', 'folded_batches', 'seeds', 'verifications'):
+                self.connection.execute(f"DELETE FROM {table}")
+
+    def seed(self, chunks: Iterable[pd.DataFrame], vle: pd.DataFrame) -> int:
+        """
+        Reconstruye el estado a partir del histórico completo de studentVle.
+
+        Args:
+            chunks: Bloques de filas del histórico (un único DataFrame o un lector por bloques)
+            vle: Tabla vle
+
+        Returns:
+            Filas del histórico plegadas
+        """
+        self.reset()
+        rows = 0
+        for chunk in chunks:
+            self.fold(chunk, vle)
+            rows += len(chunk)
+        with self.connection:
+            self.connection.execute("INSERT INTO seeds VALUES (?, ?)", (pd.Timestamp.now().isoformat(), rows))
+        logger.info(f"✅ Estado agregado sembrado con el histórico: {rows} filas")
+        return rows
+
+    def is_seeded(self) -> bool:
+        """Indica si el estado se sembró con el histórico completo."""
+        return self.connection.execute("SELECT COUNT(*) FROM seeds").fetchone()[0] > 0
+
+    def total_rows(self) -> int:
+        """Filas de studentVle plegadas en el estado: histórico sembrado + lotes."""
+        seeded = self.connection.execute("SELECT COALESCE(SUM(rows), 0) FROM seeds").fetchone()[0]
+        folded = self.connection.execute("SELECT COALESCE(SUM(rows), 0) FROM folded_batches").fetchone()[0]
+        return seeded + folded
+
+    def fold(self, delta_df: pd.DataFrame, vle: pd.DataFrame, batch_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Pliega un lote de interacciones en el estado.
+
+        Args:
+            delta_df: Lote de filas de studentVle
+            vle: Tabla vle (para el tipo de actividad de cada recurso)
+            batch_id: Identificador del lote; un lote ya plegado se omite
+
+        Returns:
+            Diccionario con filas del lote y claves diarias y de matrícula actualizadas
+        """
+        if batch_id is not None:
+            seen = self.connection.execute("SELECT 1 FROM folded_batches WHERE batch_id = ?", (batch_id,)).fetchone()
+            if seen:
+                logger.warning(f"⚠️ El lote {batch_id} ya está plegado en el estado; se omite")
+                return {'rows': 0, 'daily_keys': 0, 'enrollment_keys': 0}
+
+        # Mismo enriquecimiento y mismas filas que create_interaction_features
+        vle_info = vle[['id_site', 'activity_type']].drop_duplicates()
+        rows = _with_activity_type(delta_df, vle_info).dropna(subset=INTERACTION_KEYS)
+        rows = rows.assign(bit=self._activity_bits(rows['activity_type']), click_sq=rows['sum_click'] ** 2)
+
+        daily = rows.groupby(INTERACTION_KEYS).agg(
+            click_sum=('sum_click', 'sum'), row_count=('sum_click', 'count')
+        )
+        daily['activity_bits'] = _or_reduce_bits(rows, INTERACTION_KEYS).reindex(daily.index, fill_value=0)
+
+        enrollment = rows.groupby(ENROLLMENT_KEYS).agg(
+            click_sum=('sum_click', 'sum'), click_sq_sum=('click_sq', 'sum'), row_count=('sum_click', 'count'),
+            first_date=('date', 'min'), last_date=('date', 'max')
+        )
+        enrollment['activity_bits'] = _or_reduce_bits(rows, ENROLLMENT_KEYS).reindex(enrollment.index, fill_value=0)
+
+        def _records(frame):
+            frame = frame.reset_index()
+            return [
+                tuple(int(v) if isinstance(v, (np.integer, np.floating)) else str(v) for v in record)
+                for record in frame.itertuples(index=False, name=None)
+            ]
+
+        with self.connection:
+            self.connection.executemany(_UPSERT_DAILY, _records(daily))
+            self.connection.executemany(_UPSERT_ENROLLMENT, _records(enrollment))
+            if batch_id is not None:
+                self.connection.execute(
+                    "INSERT INTO folded_batches VALUES (?, ?, ?)",
+                    (batch_id, pd.Timestamp.now().isoformat(), len(delta_df))
+                )
+
+        logger.info(f"✅ Lote plegado: {len(delta_df)} filas -> {len(daily)} claves diarias, {len(enrollment)} matrículas")
+        return {'rows': len(delta_df), 'daily_keys': len(daily), 'enrollment_keys': len(enrollment)}
+
+    def interaction_features(self) -> pd.DataFrame:
+        """
+        Construye la tabla interaction_features desde el estado.
+
+        Returns:
+            pd.DataFrame con el mismo esquema y orden que create_interaction_features
+        """
+        state = pd.read_sql_query(
+            "SELECT * FROM daily_state ORDER BY id_student, code_module, code_presentation, date",
+            self.connection
+        )
+        return pd.DataFrame({
+            'id_student': state['id_student'].astype(np.int64),
+            'code_module': state['code_module'].astype(str),
+            'code_presentation': state['code_presentation'].astype(str),
+            'date': state['date'].astype(np.int64),
+            'total_clicks': state['click_sum'].astype(np.int64),
+            'interaction_count': state['row_count'].astype(np.int64),
+            'avg_clicks_per_interaction': state['click_sum'] / state['row_count'],
+            'unique_activity_types': _popcount(state['activity_bits'].to_numpy())
+        })
+
+    def enrollment_summary(self) -> pd.DataFrame:
+        """
+        Resume la actividad acumulada de cada matrícula.
+
+        Returns:
+            pd.DataFrame con clics totales, media y desviación por interacción,
+            primera y última fecha activa y tipos de actividad distintos
+        """
+        state = pd.read_sql_query(
+            "SELECT * FROM enrollment_state ORDER BY id_student, code_module, code_presentation",
+            self.connection
+        )
+        n = state['row_count'].astype(np.float64)
+        total = state['click_sum'].astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variance = (state['click_sq_sum'].astype(np.float64) - total ** 2 / n) / (n - 1).where(n > 1)
+        return pd.DataFrame({
+            'id_student': state['id_student'].astype(np.int64),
+            'code_module': state['code_module'].astype(str),
+            'code_presentation': state['code_presentation'].astype(str),
+            'total_clicks': state['click_sum'].astype(np.int64),
+            'interaction_count': state['row_count'].astype(np.int64),
+            'avg_clicks': total / n,
+            'std_clicks': np.sqrt(variance.clip(lower=0)),
+            'first_active_date': state['first_date'].astype(np.int64),
+            'last_active_date': state['last_date'].astype(np.int64),
+            'unique_activity_types': _popcount(state['activity_bits'].to_numpy())
+        })
+
+    def n_batches(self) -> int:
+        """Número de lotes plegados."""
+        return self.connection.execute("SELECT COUNT(*) FROM folded_batches").fetchone()[0]
+
+    def needs_verification(self, every: int = DEFAULT_VERIFY_EVERY) -> bool:
+        """
+        Indica si toca una verificación periódica.
+
+        Args:
+            every: Lotes plegados entre verificaciones
+
+        Returns:
+            True si se han plegado al menos `every` lotes desde la última verificación
+        """
+        row = self.connection.execute("SELECT MAX(n_batches) FROM verifications").fetchone()
+        return self.n_batches() - (row[0] or 0) >= every
+
+    def verify(self, student_vle: pd.DataFrame, vle: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Compara el estado con un recálculo completo sobre el histórico.
+
+        Además de las tablas, comprueba que student_vle tenga tantas filas
+        como el histórico sembrado más los lotes plegados: un histórico
+        incompleto (p. ej. solo los lotes) no puede dar una verificación PASS.
+
+        Args:
+            student_vle: Histórico completo de studentVle (histórico sembrado + lotes)
+            vle: Tabla vle
+
+        Returns:
+            Dict con el estado de la verificación y las filas discrepantes
+        """
+        logger.info("🔍 Verificando el estado agregado contra un recálculo completo...")
+
+        expected = create_interaction_features({'student_vle': student_vle, 'vle': vle})
+        actual = self.interaction_features()
+
+        # Resumen por matrícula recalculado desde cero en un estado temporal
+        with InteractionAggregateState(':memory:') as fresh:
+            fresh.fold(student_vle, vle)
+            expected_summary = fresh.enrollment_summary()
+        actual_summary = self.enrollment_summary()
+
+        results = {
+            'history': {
+                'status': 'PASS' if len(student_vle) == self.total_rows() else 'FAIL',
+                'rows': len(student_vle),
+                'expected_rows': self.total_rows()
+            }
+        }
+        for name, left, right in [('interaction_features', actual, expected),
+                                  ('enrollment_summary', actual_summary, expected_summary)]:
+            equal = left.shape == right.shape and left.equals(right)
+            mismatched = len(left.merge(right, how='outer', indicator=True).query("_merge != 'both'")) if not equal else 0
+            results[name] = {'status': 'PASS' if equal else 'FAIL', 'rows': len(left), 'mismatched_rows': mismatched}
+
+        status = 'PASS' if all(result['status'] == 'PASS' for result in results.values()) else 'FAIL'
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO verifications VALUES (?, ?, ?)", (pd.Timestamp.now().isoformat(), self.n_batches(), status)
+            )
+
+        if status == 'PASS':
+            logger.info("✅ Estado agregado idéntico al recálculo completo")
+        else:
+            logger.warning(f"⚠️ El estado agregado difiere del recálculo completo: {results}")
+        return {'overall_status': status, 'tables': results}
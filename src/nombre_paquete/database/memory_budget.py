@@ -0,0 +1,162 @@
+"""
+Módulo de gestión de tablas bajo un presupuesto de memoria.
+
+Este módulo mantiene en memoria las tablas que aún tienen consumidores
+pendientes y las libera en cuanto termina el último. Si cargar una tabla
+nueva haría superar el presupuesto, las tablas residentes menos usadas
+recientemente se vuelcan a parquet (o se descartan si ya existe una copia
+columnar en disco) y se recargan bajo demanda.
+"""
+
+import pandas as pd
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _table_mb(df: pd.DataFrame) -> float:
+    """Memoria ocupada por un DataFrame en MB."""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+class BudgetedTableCache:
+    """
+    Caché de tablas con consumidores declarados y presupuesto de memoria.
+
+    Cada tabla declara las etapas que la leen; ``finish_stage`` la libera
+    cuando ya no le quedan consumidores. El presupuesto se aplica sobre el
+    tamaño de las tablas residentes (memory_usage profundo), no sobre el RSS
+    del proceso, para que la decisión de volcado sea determinista.
+    """
+
+    def __init__(self,
+                 max_memory_mb: float,
+                 consumers: Dict[str, Iterable[str]],
+                 spill_dir: Optional[Union[str, Path]] = None):
+        """
+        Inicializa la caché.
+
+        Args:
+            max_memory_mb: Memoria máxima para las tablas residentes (MB)
+            consumers: Tabla -> etapas que la consumen
+            spill_dir: Carpeta de volcado (por defecto, una carpeta temporal)
+        """
+        self.max_memory_mb = max_memory_mb
+        self.consumers = {name: set(stages) for name, stages in consumers.items()}
+        self._tmp_dir = None
+        if spill_dir is None:
+            self._tmp_dir = tempfile.TemporaryDirectory(prefix="tdsp-tables-")
+            spill_dir = self._tmp_dir.name
+        self.spill_dir = Path(spill_dir)
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+        # Tablas residentes en orden de último uso (la primera es la menos reciente)
+        self._resident: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._sizes_mb: Dict[str, float] = {}
+        self._on_disk: Dict[str, Path] = {}
+        self.n_spills = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self) -> None:
+        """Libera las tablas y elimina los volcados temporales."""
+        self._resident.clear()
+        self._sizes_mb.clear()
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+            self._tmp_dir = None
+
+    @property
+    def resident_mb(self) -> float:
+        """Memoria ocupada por las tablas residentes (MB)."""
+        return sum(self._sizes_mb.values())
+
+    def _make_room(self, incoming_mb: float) -> None:
+        """Vuelca tablas residentes (LRU) hasta que quepan incoming_mb más."""
+        for name in list(self._resident):
+            if self.resident_mb + incoming_mb <= self.max_memory_mb:
+                return
+            self.spill(name)
+        if self.resident_mb + incoming_mb > self.max_memory_mb:
+            logger.warning(
+                f"⚠️ Presupuesto de memoria superado: {self.resident_mb + incoming_mb:.0f} MB "
+                f"> {self.max_memory_mb:.0f} MB"
+            )
+
+    def put(self, name: str, df: pd.DataFrame, disk_copy: Optional[Union[str, Path]] = None) -> None:
+        """
+        Añade una tabla a la caché.
+
+        Args:
+            name: Nombre de la tabla
+            df: Tabla
+            disk_copy: Copia columnar ya escrita en disco (evita volcarla de nuevo)
+        """
+        if disk_copy is not None:
+            self._on_disk[name] = Path(disk_copy)
+        if not self.consumers.get(name):
+            # Sin consumidores pendientes: no hace falta retenerla
+            return
+        size_mb = _table_mb(df)
+        self._make_room(size_mb)
+        self._resident[name] = df
+        self._sizes_mb[name] = size_mb
+
+    def get(self, name: str) -> pd.DataFrame:
+        """
+        Devuelve una tabla, recargándola desde disco si se volcó.
+
+        Args:
+            name: Nombre de la tabla
+
+        Returns:
+            DataFrame de la tabla
+        """
+        if name in self._resident:
+            self._resident.move_to_end(name)
+            return self._resident[name]
+        if name not in self._on_disk:
+            raise KeyError(f"La tabla {name} no está en la caché ni en disco")
+
+        logger.info(f"📂 Recargando {name} desde {self._on_disk[name]}")
+        df = pd.read_parquet(self._on_disk[name])
+        self.put(name, df)
+        return df
+
+    def spill(self, name: str) -> None:
+        """
+        Saca una tabla de memoria, escribiéndola en parquet si no tiene copia en disco.
+
+        Args:
+            name: Nombre de la tabla
+        """
+        df = self._resident.pop(name)
+        size_mb = self._sizes_mb.pop(name)
+        if name not in self._on_disk:
+            path = self.spill_dir / f"{name}.parquet"
+            df.to_parquet(path, index=False)
+            self._on_disk[name] = path
+        self.n_spills += 1
+        logger.info(f"💽 {name} volcada a disco ({size_mb:.1f} MB liberados)")
+
+    def finish_stage(self, stage: str) -> None:
+        """
+        Marca una etapa como terminada y libera las tablas sin consumidores.
+
+        Args:
+            stage: Nombre de la etapa terminada
+        """
+        for name, stages in self.consumers.items():
+            stages.discard(stage)
+            if not stages and name in self._resident:
+                del self._resident[name]
+                freed_mb = self._sizes_mb.pop(name)
+                logger.info(f"🧹 {name} liberada tras su último consumidor ({freed_mb:.1f} MB)")
@@ -0,0 +1,324 @@
+"""
+Módulo de agregaciones fuera de memoria (out-of-core).
+
+Este módulo agrega tablas de hechos que no caben en RAM: durante una lectura
+por bloques reparte las filas por hash de la clave de agrupación en ficheros
+de volcado (spill) en disco y después agrega cada partición por separado.
+Como todas las filas de un grupo caen en la misma partición y conservan su
+orden de lectura, el resultado es idéntico al de ``groupby().agg()`` en memoria
+(incluido ``nunique`` exacto).
+"""
+
+import pandas as pd
+import numpy as np
+import io
+import os
+import pickle
+import tempfile
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Funciones de agregación admitidas por el motor
+SUPPORTED_AGGREGATIONS = ('sum', 'count', 'mean', 'std', 'min', 'max', 'nunique')
+
+# Presupuesto de memoria por defecto (MB)
+DEFAULT_MEMORY_BUDGET_MB = 512
+
+# Filas leídas de un CSV para estimar su tamaño en memoria
+CSV_SAMPLE_ROWS = 10_000
+
+# Tamaño de fila supuesto cuando la fuente es un iterable de bloques
+DEFAULT_ROW_BYTES = 64
+
+# Profundidad máxima de re-particionado de particiones que exceden el presupuesto
+MAX_REPARTITION_DEPTH = 3
+
+# Tipo de las fuentes aceptadas: DataFrame, ruta CSV o iterable de bloques
+Source = Union[pd.DataFrame, str, Path, Iterable[pd.DataFrame]]
+
+
+def _validate_agg_spec(agg_spec: Dict[str, Union[str, List[str]]]) -> None:
+    """Comprueba que la especificación solo usa agregaciones admitidas."""
+    for column, funcs in agg_spec.items():
+        for func in [funcs] if isinstance(funcs, str) else funcs:
+            if func not in SUPPORTED_AGGREGATIONS:
+                raise ValueError(f"Agregación '{func}' no admitida para '{column}'; use una de {SUPPORTED_AGGREGATIONS}")
+
+
+def _csv_row_bytes(path: Union[str, Path], usecols: Optional[Sequence[str]] = None) -> Optional[Tuple[float, float]]:
+    """Bytes por fila en disco y en memoria, medidos sobre las primeras filas del CSV."""
+    with open(path, 'rb') as f:
+        header = f.readline()
+        lines = list(islice(f, CSV_SAMPLE_ROWS))
+    if not lines:
+        return None
+    sample = pd.read_csv(io.BytesIO(header + b''.join(lines)), usecols=usecols)
+    if sample.empty:
+        return None
+    return sum(map(len, lines)) / len(sample), sample.memory_usage(deep=True).sum() / len(sample)
+
+
+def estimate_row_bytes(source: Source, usecols: Optional[Sequence[str]] = None) -> Optional[float]:
+    """
+    Estima los bytes en memoria de una fila de la fuente.
+
+    Para un CSV se lee una muestra de las primeras filas (las columnas de
+    texto ocupan en memoria bastante más que en disco).
+
+    Args:
+        source: DataFrame, ruta CSV o iterable de bloques
+        usecols: Columnas a leer (solo para CSV)
+
+    Returns:
+        Bytes por fila (None si la fuente está vacía o es un iterable)
+    """
+    if isinstance(source, pd.DataFrame):
+        return source.memory_usage(deep=True).sum() / len(source) if len(source) else None
+    if isinstance(source, (str, Path)):
+        row_bytes = _csv_row_bytes(source, usecols)
+        return row_bytes[1] if row_bytes is not None else None
+    return None
+
+
+def estimate_source_bytes(source: Source, usecols: Optional[Sequence[str]] = None) -> Optional[int]:
+    """
+    Estima el tamaño en memoria de una fuente antes de leerla.
+
+    Args:
+        source: DataFrame, ruta CSV o iterable de bloques
+        usecols: Columnas a leer (solo para CSV)
+
+    Returns:
+        Bytes estimados (None si la fuente es un iterable de tamaño desconocido)
+    """
+    if isinstance(source, pd.DataFrame):
+        return int(source.memory_usage(deep=True).sum())
+    if isinstance(source, (str, Path)):
+        # Filas estimadas con el tamaño en disco de la muestra, por su tamaño en memoria
+        row_bytes = _csv_row_bytes(source, usecols)
+        if row_bytes is None:
+            return os.path.getsize(source)
+        disk_row_bytes, memory_row_bytes = row_bytes
+        return int(os.path.getsize(source) / disk_row_bytes * memory_row_bytes)
+    return None
+
+
+def iter_source_chunks(source: Source, chunk_rows: int, usecols: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Recorre una fuente por bloques de filas.
+
+    Args:
+        source: DataFrame, ruta CSV o iterable de bloques
+        chunk_rows: Filas por bloque
+        usecols: Columnas a leer (solo para CSV)
+
+    Returns:
+        Iterador de DataFrames
+    """
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_rows):
+            yield source.iloc[start:start + chunk_rows]
+    elif isinstance(source, (str, Path)):
+        yield from pd.read_csv(source, chunksize=chunk_rows, usecols=usecols)
+    else:
+        yield from source
+
+
+def plan_partitions(estimated_bytes: Optional[int], memory_budget_bytes: int) -> int:
+    """
+    Elige el número de particiones para que cada una quepa en el presupuesto.
+
+    Se reserva la mitad del presupuesto para el resultado y las copias
+    intermedias de la agregación.
+
+    Args:
+        estimated_bytes: Tamaño estimado de la fuente (None si es desconocido)
+        memory_budget_bytes: Presupuesto de memoria en bytes
+
+    Returns:
+        Número de particiones (>= 1)
+    """
+    if estimated_bytes is None:
+        return 64
+    return max(int(np.ceil(2 * estimated_bytes / memory_budget_bytes)), 1)
+
+
+def _partition_ids(df: pd.DataFrame, keys: Sequence[str], n_partitions: int, salt: int) -> np.ndarray:
+    """Asigna cada fila a una partición por hash estable de su clave."""
+    hashes = pd.util.hash_pandas_object(df[list(keys)], index=False, hash_key=f"tdsp-spill-{salt:05d}")
+    return (hashes.to_numpy() % np.uint64(n_partitions)).astype(np.int64)
+
+
+def _append_frame(path: Path, frame: pd.DataFrame) -> None:
+    """Añade un bloque al fichero de volcado de una partición."""
+    with open(path, 'ab') as f:
+        pickle.dump(frame, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _read_spill(path: Path) -> pd.DataFrame:
+    """Lee todos los bloques de un fichero de volcado en su orden de escritura."""
+    frames = []
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                frames.append(pickle.load(f))
+            except EOFError:
+                break
+    return pd.concat(frames, ignore_index=True)
+
+
+def _iter_spill(path: Path) -> Iterator[pd.DataFrame]:
+    """Recorre los bloques de un fichero de volcado sin cargarlo entero."""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def spill_partitions(chunks: Iterable[pd.DataFrame],
+                     keys: Sequence[str],
+                     n_partitions: int,
+                     spill_dir: Union[str, Path],
+                     transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                     salt: int = 0,
+                     buffer_bytes: int = 64 * 1024 ** 2) -> Dict[Path, int]:
+    """
+    Reparte por hash de la clave las filas de un flujo de bloques en ficheros de disco.
+
+    Las porciones se acumulan en memoria hasta buffer_bytes y se vuelcan
+    concatenadas por partición, para no escribir miles de bloques pequeños.
+
+    Args:
+        chunks: Iterable de bloques
+        keys: Columnas de agrupación
+        n_partitions: Número de particiones
+        spill_dir: Carpeta de los ficheros de volcado
+        transform: Función opcional aplicada a cada bloque antes de repartirlo
+            (p. ej. un merge con una tabla de dimensiones pequeña)
+        salt: Semilla del hash (distinta en cada nivel de re-particionado)
+        buffer_bytes: Memoria máxima de las porciones pendientes de volcar
+
+    Returns:
+        Diccionario ruta de cada partición no vacía -> bytes en memoria, en orden de partición
+    """
+    spill_dir = Path(spill_dir)
+    spill_dir.mkdir(parents=True, exist_ok=True)
+    paths = [spill_dir / f"part-{salt:02d}-{i:05d}.pkl" for i in range(n_partitions)]
+    partition_bytes = np.zeros(n_partitions, dtype=np.int64)
+    buffers: Dict[int, List[pd.DataFrame]] = {}
+    buffered = 0
+
+    def flush():
+        for partition, frames in buffers.items():
+            _append_frame(paths[partition], pd.concat(frames, ignore_index=True))
+        buffers.clear()
+
+    for chunk in chunks:
+        if transform is not None:
+            chunk = transform(chunk)
+        if chunk.empty:
+            continue
+        partition_ids = _partition_ids(chunk, keys, n_partitions, salt)
+        row_bytes = chunk.memory_usage(deep=True).sum() / len(chunk)
+        # Ordenación estable: cada porción conserva el orden original de las filas
+        order = np.argsort(partition_ids, kind='stable')
+        boundaries = np.flatnonzero(np.diff(partition_ids[order])) + 1
+        for rows in np.split(order, boundaries):
+            partition = int(partition_ids[rows[0]])
+            part = chunk.iloc[rows]
+            size = int(np.ceil(row_bytes * len(rows)))
+            buffers.setdefault(partition, []).append(part)
+            partition_bytes[partition] += size
+            buffered += size
+        if buffered > buffer_bytes:
+            flush()
+            buffered = 0
+    flush()
+
+    return {path: int(size) for path, size in zip(paths, partition_bytes) if size > 0}
+
+
+def _aggregate_spill(path: Path,
+                     size: int,
+                     keys: Sequence[str],
+                     agg_spec: Dict[str, Union[str, List[str]]],
+                     memory_budget_bytes: int,
+                     depth: int) -> List[pd.DataFrame]:
+    """Agrega una partición, re-particionándola si excede el presupuesto."""
+    if size > memory_budget_bytes // 2 and depth < MAX_REPARTITION_DEPTH:
+        n_sub = plan_partitions(size, memory_budget_bytes)
+        logger.info(f"🔁 Re-particionando {path.name} en {n_sub} subparticiones")
+        sub_parts = spill_partitions(
+            _iter_spill(path), keys, n_sub, path.with_suffix(''), salt=depth + 1,
+            buffer_bytes=memory_budget_bytes // 4
+        )
+        path.unlink()
+        results = []
+        for sub_path, sub_size in sub_parts.items():
+            results.extend(_aggregate_spill(sub_path, sub_size, keys, agg_spec, memory_budget_bytes, depth + 1))
+        return results
+
+    if size > memory_budget_bytes // 2:
+        logger.warning(f"⚠️ La partición {path.name} excede el presupuesto (grupos muy grandes)")
+    partition = _read_spill(path)
+    path.unlink()
+    return [partition.groupby(list(keys)).agg(agg_spec)]
+
+
+def out_of_core_groupby(source: Source,
+                        keys: Sequence[str],
+                        agg_spec: Dict[str, Union[str, List[str]]],
+                        memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+                        transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                        usecols: Optional[Sequence[str]] = None,
+                        spill_dir: Optional[Union[str, Path]] = None) -> pd.DataFrame:
+    """
+    Equivalente fuera de memoria de ``df.groupby(keys).agg(agg_spec)``.
+
+    Args:
+        source: DataFrame, ruta CSV o iterable de bloques
+        keys: Columnas de agrupación
+        agg_spec: Especificación de agregación (columna -> función o lista de funciones)
+        memory_budget_mb: Presupuesto de memoria para bloques y particiones (MB)
+        transform: Función opcional aplicada a cada bloque antes de repartirlo
+        usecols: Columnas a leer si la fuente es un CSV
+        spill_dir: Carpeta de volcado (por defecto una carpeta temporal que se elimina al terminar)
+
+    Returns:
+        pd.DataFrame con el mismo índice, columnas y orden que el cálculo en memoria
+    """
+    _validate_agg_spec(agg_spec)
+    memory_budget_bytes = int(memory_budget_mb * 1024 ** 2)
+    n_partitions = plan_partitions(estimate_source_bytes(source, usecols), memory_budget_bytes)
+
+    # Bloques de ~1/4 del presupuesto, con el tamaño de fila medido en la fuente (muestra si es CSV)
+    row_bytes = estimate_row_bytes(source, usecols) or DEFAULT_ROW_BYTES
+    chunk_rows = max(int(memory_budget_bytes // (4 * row_bytes)), 1)
+
+    logger.info(f"💽 Agregación out-of-core: {n_partitions} particiones, presupuesto {memory_budget_mb:.0f} MB")
+    with tempfile.TemporaryDirectory(dir=spill_dir, prefix="tdsp-spill-") as tmp_dir:
+        chunks = iter_source_chunks(source, chunk_rows, usecols=usecols)
+        parts = spill_partitions(
+            chunks, keys, n_partitions, tmp_dir, transform=transform, buffer_bytes=memory_budget_bytes // 4
+        )
+
+        results = []
+        for path, size in parts.items():
+            results.extend(_aggregate_spill(path, size, keys, agg_spec, memory_budget_bytes, depth=0))
+
+    if not results:
+        # Sin filas: mismo esquema que la agregación de un DataFrame vacío
+        columns = list(keys) + list(agg_spec)
+        empty = next(iter_source_chunks(source, chunk_rows, usecols=usecols), pd.DataFrame(columns=columns))
+        if transform is not None:
+            empty = transform(empty.iloc[0:0])
+        return empty.iloc[0:0].groupby(list(keys)).agg(agg_spec)
+
+    # Los grupos son disjuntos entre particiones: basta con reordenar por la clave
+    return pd.concat(results).sort_index(kind='mergesort')
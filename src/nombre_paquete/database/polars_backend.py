@@ -0,0 +1,200 @@
+"""
+Módulo del backend Polars para el procesamiento de datos.
+
+Este módulo expresa las etapas de ``process_all_data`` (consolidación del
+estudiante, características de interacciones y de evaluaciones) como planes
+perezosos de Polars. Los tres planes se optimizan juntos (proyección de solo
+las columnas necesarias, subplanes compartidos) y se ejecutan en paralelo con
+el motor multihilo de Polars; los resultados se devuelven como DataFrames de
+pandas con el mismo esquema y orden que el backend pandas. Las tablas dadas
+como ruta (CSV o Parquet) se escanean directamente desde el fichero y las
+que ya están en memoria se convierten solo con las columnas que usan los planes.
+"""
+
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+STUDENT_KEYS = ['id_student', 'code_module', 'code_presentation']
+COURSE_KEYS = ['code_module', 'code_presentation']
+INTERACTION_KEYS = ['id_student', 'code_module', 'code_presentation', 'date']
+
+# Columnas que leen los planes de cada tabla (None = todas: se devuelven en student_consolidated)
+TABLE_COLUMNS = {
+    'student_info': None,
+    'student_registration': STUDENT_KEYS + ['date_registration', 'date_unregistration'],
+    'courses': COURSE_KEYS + ['module_presentation_length'],
+    'vle': ['id_site', 'activity_type'],
+    'student_vle': INTERACTION_KEYS + ['id_site', 'sum_click'],
+    'assessments': ['id_assessment', 'assessment_type', 'weight'],
+    'student_assessments': ['id_assessment', 'id_student', 'date_submitted', 'score']
+}
+
+
+def _import_polars():
+    """Importa Polars con un mensaje claro si no está instalado."""
+    try:
+        import polars as pl
+    except ImportError as e:
+        raise ImportError("El backend 'polars' requiere el paquete polars (pip install polars)") from e
+    return pl
+
+
+def _nunique(pl, column: str):
+    """Número de valores distintos sin contar nulos (igual que pandas nunique)."""
+    return pl.col(column).drop_nulls().n_unique().cast(pl.Int64)
+
+
+def scan_table(pl, source: Any, columns=None) -> 'pl.LazyFrame':
+    """
+    LazyFrame de una tabla sin copiar más columnas de las necesarias.
+
+    Args:
+        pl: Módulo polars
+        source: DataFrame de pandas o ruta a un fichero CSV o Parquet
+        columns: Columnas que se leen (None = todas)
+
+    Returns:
+        LazyFrame con las columnas pedidas
+    """
+    if isinstance(source, pd.DataFrame):
+        return pl.from_pandas(source if columns is None else source[columns]).lazy()
+    path = Path(source)
+    if path.suffix == '.parquet':
+        table = pl.scan_parquet(path)
+    elif path.suffix == '.csv':
+        table = pl.scan_csv(path)
+    else:
+        raise ValueError(f"Formato no soportado por el backend polars: {path}")
+    return table if columns is None else table.select(columns)
+
+
+def build_student_plan(pl, tables: Dict[str, 'pl.LazyFrame']) -> 'pl.LazyFrame':
+    """
+    Plan perezoso equivalente a merge_student_data.
+
+    Args:
+        pl: Módulo polars
+        tables: Tablas originales como LazyFrames
+
+    Returns:
+        LazyFrame con la información consolidada del estudiante
+    """
+    registration_info = tables['student_registration'].select(
+        STUDENT_KEYS + ['date_registration', 'date_unregistration']
+    )
+    course_info = tables['courses'].select(COURSE_KEYS + ['module_presentation_length'])
+    return (
+        tables['student_info']
+        .join(registration_info, on=STUDENT_KEYS, how='left', maintain_order='left_right', nulls_equal=True)
+        .join(course_info, on=COURSE_KEYS, how='left', maintain_order='left_right', nulls_equal=True)
+    )
+
+
+def build_interaction_plan(pl, tables: Dict[str, 'pl.LazyFrame']) -> 'pl.LazyFrame':
+    """
+    Plan perezoso equivalente a create_interaction_features.
+
+    Args:
+        pl: Módulo polars
+        tables: Tablas originales como LazyFrames
+
+    Returns:
+        LazyFrame con las características de interacciones
+    """
+    vle_info = tables['vle'].select(['id_site', 'activity_type']).unique(maintain_order=True)
+    return (
+        tables['student_vle']
+        .select(INTERACTION_KEYS + ['id_site', 'sum_click'])
+        .join(vle_info, on='id_site', how='left')
+        # pandas descarta los grupos con clave nula
+        .drop_nulls(INTERACTION_KEYS)
+        .group_by(INTERACTION_KEYS)
+        .agg(
+            pl.col('sum_click').sum().alias('total_clicks'),
+            pl.col('sum_click').count().cast(pl.Int64).alias('interaction_count'),
+            pl.col('sum_click').mean().alias('avg_clicks_per_interaction'),
+            _nunique(pl, 'activity_type').alias('unique_activity_types')
+        )
+        .sort(INTERACTION_KEYS)
+    )
+
+
+def build_assessment_plan(pl, tables: Dict[str, 'pl.LazyFrame'], weight_as_float: bool) -> 'pl.LazyFrame':
+    """
+    Plan perezoso equivalente a create_assessment_features.
+
+    Args:
+        pl: Módulo polars
+        tables: Tablas originales como LazyFrames
+        weight_as_float: Si el peso debe sumarse como float (como hace pandas
+            cuando el merge deja evaluaciones sin emparejar)
+
+    Returns:
+        LazyFrame con las características de evaluaciones
+    """
+    assessment_info = tables['assessments'].select(['id_assessment', 'assessment_type', 'weight'])
+    if weight_as_float:
+        assessment_info = assessment_info.with_columns(pl.col('weight').cast(pl.Float64))
+    return (
+        tables['student_assessments']
+        .select(['id_assessment', 'id_student', 'date_submitted', 'score'])
+        .join(assessment_info, on='id_assessment', how='left')
+        .drop_nulls('id_student')
+        .group_by('id_student')
+        .agg(
+            pl.col('score').mean().alias('avg_score'),
+            pl.col('score').std().alias('std_score'),
+            pl.col('score').min().alias('min_score'),
+            pl.col('score').max().alias('max_score'),
+            pl.col('score').count().cast(pl.Int64).alias('assessment_count'),
+            pl.col('date_submitted').mean().alias('avg_submission_date'),
+            pl.col('date_submitted').std().alias('std_submission_date'),
+            _nunique(pl, 'assessment_type').alias('unique_assessment_types'),
+            pl.col('weight').sum().alias('total_weight')
+        )
+        .sort('id_student')
+    )
+
+
+def process_with_polars(data_dict: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
+    """
+    Calcula student_consolidated, interaction_features y assessment_features con Polars.
+
+    Args:
+        data_dict: Diccionario con las tablas originales (DataFrames o rutas CSV/Parquet)
+
+    Returns:
+        Dict[str, pd.DataFrame]: Mismas tablas y esquema que el backend pandas
+    """
+    pl = _import_polars()
+
+    tables = {name: scan_table(pl, data_dict[name], columns) for name, columns in TABLE_COLUMNS.items()}
+
+    # pandas convierte el peso a float si alguna entrega no encuentra su evaluación
+    unmatched = (
+        tables['student_assessments'].select('id_assessment')
+        .join(tables['assessments'].select('id_assessment'), on='id_assessment', how='anti')
+        .select(pl.len())
+    )
+    weight_as_float = (
+        not tables['assessments'].collect_schema()['weight'].is_integer()
+        or unmatched.collect().item() > 0
+    )
+
+    plans = [
+        build_student_plan(pl, tables),
+        build_interaction_plan(pl, tables),
+        build_assessment_plan(pl, tables, weight_as_float)
+    ]
+    logger.info("⚡ Ejecutando planes perezosos de Polars...")
+    student_consolidated, interaction_features, assessment_features = pl.collect_all(plans)
+
+    return {
+        'student_consolidated': student_consolidated.to_pandas(),
+        'interaction_features': interaction_features.to_pandas(),
+        'assessment_features': assessment_features.to_pandas()
+    }
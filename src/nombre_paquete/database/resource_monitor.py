@@ -0,0 +1,172 @@
+"""
+Módulo de seguimiento del consumo de memoria del pipeline.
+
+Este módulo mide el pico de memoria residente (peak RSS) del proceso y lo
+registra como métrica de regresión: cada ejecución se compara con la línea
+base guardada y se avisa si el pico crece más de la tolerancia.
+"""
+
+import json
+import re
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Fichero por defecto de métricas de recursos
+RESOURCE_METRICS_PATH = Path("docs/data/resource_metrics.json")
+
+# Crecimiento relativo del pico de memoria tolerado frente a la línea base
+DEFAULT_RSS_TOLERANCE = 0.10
+
+
+def get_peak_rss_mb() -> float:
+    """
+    Obtiene el pico de memoria residente del proceso actual.
+
+    Returns:
+        Pico de RSS en MB (NaN si la plataforma no permite medirlo)
+    """
+    try:
+        import resource
+    except ImportError:
+        # Windows: psutil expone el pico del working set
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 1024 ** 2
+        except (ImportError, AttributeError):
+            return float('nan')
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB y macOS bytes
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def _read_proc_status_mb(field: str) -> Optional[float]:
+    """Lee un campo de /proc/self/status en MB (None fuera de Linux)."""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            match = re.search(rf'^{field}:\s+(\d+) kB', f.read(), re.MULTILINE)
+    except OSError:
+        return None
+    return int(match.group(1)) / 1024 if match else None
+
+
+def get_current_rss_mb() -> float:
+    """
+    Obtiene la memoria residente actual del proceso.
+
+    Returns:
+        RSS actual en MB (NaN si la plataforma no permite medirlo)
+    """
+    current = _read_proc_status_mb('VmRSS')
+    if current is not None:
+        return current
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    except ImportError:
+        return float('nan')
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reinicia el pico de RSS del proceso (solo Linux, vía /proc/self/clear_refs).
+
+    Returns:
+        True si el pico se reinició; si no, get_peak_rss_mb sigue siendo el
+        pico desde el inicio del proceso
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+@contextmanager
+def track_stage_peak(stage: str, stage_peaks: Dict[str, float]) -> Iterator[None]:
+    """
+    Mide el pico de RSS de una etapa y lo guarda en stage_peaks[stage].
+
+    Si el pico no puede reiniciarse, se registra el pico acumulado del
+    proceso, que es una cota superior del pico de la etapa.
+
+    Args:
+        stage: Nombre de la etapa
+        stage_peaks: Diccionario donde se acumulan los picos por etapa (MB)
+    """
+    reset_peak_rss()
+    try:
+        yield
+    finally:
+        peak = _read_proc_status_mb('VmHWM')
+        stage_peaks[stage] = round(peak if peak is not None else get_peak_rss_mb(), 1)
+        logger.info(f"📈 Pico de memoria de la etapa {stage}: {stage_peaks[stage]:.0f} MB")
+
+
+def record_peak_rss(run_name: str,
+                    metrics_path: Union[str, Path] = RESOURCE_METRICS_PATH,
+                    tolerance: float = DEFAULT_RSS_TOLERANCE,
+                    update_baseline: bool = False,
+                    extra: Optional[Dict[str, Any]] = None,
+                    peak_rss_mb: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Registra el pico de RSS de una ejecución y lo compara con su línea base.
+
+    La primera ejecución de un run_name fija la línea base; las siguientes
+    solo la reemplazan con update_baseline=True.
+
+    Args:
+        run_name: Nombre de la ejecución (p. ej. 'data_acquisition')
+        metrics_path: Fichero JSON de métricas
+        tolerance: Crecimiento relativo tolerado antes de marcar regresión
+        update_baseline: Si True, la medición actual pasa a ser la línea base
+        extra: Datos adicionales a guardar con la medición
+        peak_rss_mb: Pico ya medido por el llamador (p. ej. el máximo de los
+            picos por etapa, si se reinició el contador); None lo mide aquí
+
+    Returns:
+        Diccionario con el pico actual, la línea base y si hay regresión
+    """
+    metrics_path = Path(metrics_path)
+    metrics = {}
+    if metrics_path.exists():
+        with open(metrics_path, 'r', encoding='utf-8') as f:
+            metrics = json.load(f)
+
+    if peak_rss_mb is None:
+        peak_rss_mb = get_peak_rss_mb()
+    entry = metrics.get(run_name, {})
+    baseline_mb = entry.get('baseline_peak_rss_mb')
+    if baseline_mb is None or update_baseline:
+        baseline_mb = peak_rss_mb
+
+    regression = bool(peak_rss_mb > baseline_mb * (1 + tolerance))
+    entry.update({
+        'baseline_peak_rss_mb': baseline_mb,
+        'last_peak_rss_mb': peak_rss_mb,
+        'last_run': pd.Timestamp.now().isoformat(),
+        'regression': regression,
+        **(extra or {})
+    })
+    metrics[run_name] = entry
+
+    metrics_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(metrics_path, 'w', encoding='utf-8') as f:
+        json.dump(metrics, f, indent=2)
+
+    if regression:
+        logger.warning(
+            f"⚠️ Regresión de memoria en {run_name}: pico {peak_rss_mb:.0f} MB "
+            f"> línea base {baseline_mb:.0f} MB (+{tolerance:.0%})"
+        )
+    else:
+        logger.info(f"📈 Pico de memoria de {run_name}: {peak_rss_mb:.0f} MB (línea base {baseline_mb:.0f} MB)")
+    return entry
@@ -0,0 +1,195 @@
+"""
+Módulo de importancia por permutación independiente del modelo.
+
+La importancia de una característica (o de un grupo de columnas, como todas
+las dummies de ``region``) es la caída de la métrica al permutar sus valores
+entre filas. Todas las repeticiones de un grupo se apilan en una sola matriz
+y se predicen con una única llamada a ``predict_proba``, lo que amortiza el
+coste fijo por llamada (validación del pipeline, lanzamiento de hilos del
+bosque, grafo de Keras); los grupos se reparten entre procesos. Sirve para
+cualquier objeto con ``predict_proba(DataFrame)``: BaselineModel de
+cualquier tipo y NeuralNetworkModel.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.metrics import average_precision_score, log_loss, roc_auc_score
+
+from ..preprocessing.feature_engineering import DEMOGRAPHIC_CATEGORICAL_COLUMNS
+from ..resource_planner import get_resource_plan, limit_worker_threads
+
+logger = logging.getLogger(__name__)
+
+# Métricas admitidas (mayor es mejor) sobre la probabilidad de la clase positiva
+SCORERS = {
+    'roc_auc': roc_auc_score,
+    'average_precision': average_precision_score,
+    'neg_log_loss': lambda y, proba: -log_loss(y, proba, labels=[0, 1])
+}
+
+# Filas evaluadas por defecto (submuestra aleatoria del conjunto de evaluación)
+DEFAULT_MAX_ROWS = 50_000
+
+# Tamaño máximo de la matriz apilada que se predice de una vez
+MAX_STACKED_BYTES = 256 * 1024 ** 2
+
+
+def group_one_hot_columns(columns: Sequence[str],
+                          prefixes: Sequence[str] = DEMOGRAPHIC_CATEGORICAL_COLUMNS) -> Dict[str, List[str]]:
+    """
+    Agrupa las dummies de cada variable categórica; el resto de columnas forma grupos de una.
+
+    Args:
+        columns: Columnas de la matriz de características
+        prefixes: Variables categóricas codificadas como '<variable>_<nivel>'
+
+    Returns:
+        Diccionario nombre del grupo -> columnas, en el orden de aparición
+    """
+    groups: Dict[str, List[str]] = {}
+    for column in columns:
+        group = next((prefix for prefix in prefixes if str(column).startswith(f"{prefix}_")), column)
+        groups.setdefault(group, []).append(column)
+    return groups
+
+
+def _positive_proba(model: Any, X: pd.DataFrame) -> np.ndarray:
+    """Probabilidad de la clase positiva, tanto para salidas (n, 2) como (n, 1)."""
+    proba = np.asarray(model.predict_proba(X))
+    if proba.ndim == 2 and proba.shape[1] == 2:
+        return proba[:, 1]
+    return proba.ravel()
+
+
+def _as_frame(values: np.ndarray, columns: List[str], bool_columns: List[str]) -> pd.DataFrame:
+    """DataFrame con los tipos de entrada: las dummies booleanas vuelven a ser bool."""
+    frame = pd.DataFrame(values, columns=columns, copy=False)
+    return frame.astype({column: bool for column in bool_columns}) if bool_columns else frame
+
+
+def _limit_model_n_jobs(model: Any, n_threads: int) -> None:
+    """Fija n_jobs=n_threads en los estimadores que ya paralelizan (p. ej. RandomForest)."""
+    estimator = getattr(model, 'pipeline', model)
+    if not hasattr(estimator, 'get_params'):
+        return
+    params = {
+        name: n_threads for name, value in estimator.get_params().items()
+        if name.split('__')[-1] == 'n_jobs' and value is not None
+    }
+    if params:
+        estimator.set_params(**params)
+
+
+def _score_group(model: Any,
+                 X: np.ndarray,
+                 y: np.ndarray,
+                 columns: List[str],
+                 bool_columns: List[str],
+                 group_index: int,
+                 column_indices: np.ndarray,
+                 n_repeats: int,
+                 scoring: str,
+                 random_state: int,
+                 n_threads: Optional[int]) -> np.ndarray:
+    """Puntuación del modelo con un grupo permutado en cada repetición (predicciones apiladas)."""
+    if n_threads is not None:
+        # El modelo llega copiado a cada proceso: se ajusta sin tocar el original
+        limit_worker_threads(n_threads)
+        _limit_model_n_jobs(model, n_threads)
+    n_rows = len(X)
+    # Semilla por grupo: el resultado no depende del reparto entre procesos
+    rng = np.random.default_rng([random_state, group_index])
+    repeats_per_batch = max(min(n_repeats, MAX_STACKED_BYTES // max(X.nbytes, 1)), 1)
+
+    scores = []
+    for first in range(0, n_repeats, repeats_per_batch):
+        batch = min(repeats_per_batch, n_repeats - first)
+        stacked = np.tile(X, (batch, 1))
+        for repeat in range(batch):
+            rows = slice(repeat * n_rows, (repeat + 1) * n_rows)
+            # La misma permutación para todas las columnas del grupo: las dummies siguen siendo coherentes
+            stacked[rows, column_indices] = X[rng.permutation(n_rows)][:, column_indices]
+        proba = _positive_proba(model, _as_frame(stacked, columns, bool_columns))
+        scores.extend(
+            SCORERS[scoring](y, proba[repeat * n_rows:(repeat + 1) * n_rows]) for repeat in range(batch)
+        )
+    return np.asarray(scores)
+
+
+def permutation_importance(model: Any,
+                           X: pd.DataFrame,
+                           y: pd.Series,
+                           groups: Optional[Dict[str, List[str]]] = None,
+                           scoring: str = 'roc_auc',
+                           n_repeats: int = 5,
+                           max_rows: Optional[int] = DEFAULT_MAX_ROWS,
+                           n_jobs: int = -1,
+                           random_state: int = 42) -> pd.DataFrame:
+    """
+    Calcula la importancia por permutación de cada característica o grupo.
+
+    Args:
+        model: Modelo entrenado con predict_proba(DataFrame) (BaselineModel, NeuralNetworkModel...)
+        X: Características de evaluación (idealmente no vistas en el entrenamiento)
+        y: Variable objetivo binaria
+        groups: Grupo -> columnas permutadas juntas (por defecto, dummies agrupadas por variable)
+        scoring: Métrica de SCORERS
+        n_repeats: Permutaciones por grupo
+        max_rows: Filas evaluadas como máximo (None usa todas)
+        n_jobs: Procesos (-1 usa los workers del plan de recursos; 1 evalúa en el proceso actual)
+        random_state: Semilla de la submuestra y de las permutaciones
+
+    Returns:
+        DataFrame con 'feature', 'importance' (caída media), 'importance_std' y 'n_columns',
+        ordenado de mayor a menor importancia
+    """
+    if scoring not in SCORERS:
+        raise ValueError(f"scoring debe ser uno de {tuple(SCORERS)}")
+    # Las dummies de pd.get_dummies son bool: se permutan como 0/1 y el modelo las recibe como bool
+    X = X.select_dtypes(include=[np.number, 'bool'])
+    columns = X.columns.tolist()
+    bool_columns = X.select_dtypes(include='bool').columns.tolist()
+    groups = groups if groups is not None else group_one_hot_columns(columns)
+    missing = [column for group in groups.values() for column in group if column not in columns]
+    if missing:
+        raise ValueError(f"Columnas de los grupos que no están en X: {missing}")
+
+    y = np.asarray(y)
+    if max_rows is not None and len(X) > max_rows:
+        rows = np.sort(np.random.default_rng(random_state).choice(len(X), max_rows, replace=False))
+        X, y = X.iloc[rows], y[rows]
+    X_array = X.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    baseline_score = SCORERS[scoring](y, _positive_proba(model, X))
+
+    plan = get_resource_plan()
+    n_workers = min(plan.resolve_n_jobs(n_jobs), len(groups))
+    n_threads = plan.threads_per_process(n_workers) if n_workers > 1 else None
+    logger.info(
+        f"🔀 Importancia por permutación: {len(groups)} grupos x {n_repeats} repeticiones "
+        f"sobre {len(X_array)} filas en {n_workers} procesos"
+    )
+    # X se comparte con los procesos por memory-mapping (joblib lo hace con los arrays grandes)
+    group_scores = Parallel(n_jobs=n_workers)(
+        delayed(_score_group)(
+            model, X_array, y, columns, bool_columns, index,
+            np.array([columns.index(column) for column in group_columns]),
+            n_repeats, scoring, random_state, n_threads
+        )
+        for index, group_columns in enumerate(groups.values())
+    )
+
+    drops = [baseline_score - scores for scores in group_scores]
+    importance_df = pd.DataFrame({
+        'feature': list(groups),
+        'importance': [float(drop.mean()) for drop in drops],
+        'importance_std': [float(drop.std()) for drop in drops],
+        'n_columns': [len(group_columns) for group_columns in groups.values()]
+    }).sort_values('importance', ascending=False, ignore_index=True)
+
+    logger.info(f"✅ Importancia por permutación calculada ({scoring} base: {baseline_score:.3f})")
+    return importance_df
@@ -0,0 +1,274 @@
+"""
+Módulo de artefactos de modelo con secciones mapeables en memoria.
+
+Un artefacto es un único fichero con una cabecera fija, una serie de
+secciones alineadas y un manifiesto JSON al final. Cada objeto guardado se
+serializa con pickle (protocolo 5) y sus arrays numéricos grandes (nodos de
+árboles, matrices de pesos) se escriben fuera de banda como secciones sin
+comprimir, de modo que ``load_artifact(mmap=True)`` los reconstruye como
+vistas de solo lectura sobre el fichero mapeado: N procesos que sirven el
+mismo modelo comparten una única copia en la caché de páginas en lugar de
+deserializar cada uno la suya. El manifiesto recoge el hash SHA-256 de las
+secciones, el esquema de características y metadatos libres.
+
+Para distribuir el modelo, ``compress_artifact`` genera una copia .gz; al
+cargarla se descomprime una sola vez junto al original y se mapea.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import struct
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Cabecera: firma, offset del manifiesto y longitud del manifiesto
+ARTIFACT_MAGIC = b"TDSPART1"
+HEADER_FORMAT = "<8sQQ"
+HEADER_SIZE = 64
+
+# Alineación de las secciones (línea de caché; suficiente para cualquier dtype)
+SECTION_ALIGNMENT = 64
+
+ARTIFACT_SUFFIX = ".tdsp"
+COMPRESSED_SUFFIX = ".gz"
+FORMAT_VERSION = 1
+
+
+def is_artifact(path: Union[str, Path]) -> bool:
+    """
+    Indica si un fichero es un artefacto (o su versión comprimida).
+
+    Args:
+        path: Ruta del fichero
+
+    Returns:
+        True si el fichero empieza por la firma de artefacto
+    """
+    path = Path(path)
+    if not path.is_file():
+        return False
+    opener = gzip.open if path.suffix == COMPRESSED_SUFFIX else open
+    try:
+        with opener(path, 'rb') as f:
+            return f.read(len(ARTIFACT_MAGIC)) == ARTIFACT_MAGIC
+    except OSError:
+        return False
+
+
+def build_feature_schema(X: Any) -> Dict[str, Any]:
+    """
+    Esquema de las características numéricas que consume un modelo.
+
+    Args:
+        X: DataFrame con características
+
+    Returns:
+        Diccionario con 'columns' (en orden) y 'dtypes'
+    """
+    numeric = X.select_dtypes(include=np.number)
+    return {
+        'columns': numeric.columns.tolist(),
+        'dtypes': {col: str(dtype) for col, dtype in numeric.dtypes.items()}
+    }
+
+
+def _pad(f, alignment: int = SECTION_ALIGNMENT) -> None:
+    """Rellena con ceros hasta el siguiente múltiplo de la alineación."""
+    remainder = f.tell() % alignment
+    if remainder:
+        f.write(b"\0" * (alignment - remainder))
+
+
+def save_artifact(path: Union[str, Path],
+                  objects: Dict[str, Any],
+                  feature_schema: Optional[Dict[str, Any]] = None,
+                  metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Guarda uno o varios objetos en un artefacto.
+
+    Args:
+        path: Ruta del artefacto
+        objects: Nombre -> objeto serializable con pickle
+        feature_schema: Columnas y tipos de entrada del modelo
+        metadata: Información adicional (tipo de modelo, métricas...)
+
+    Returns:
+        Manifiesto del artefacto
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+    sections: List[Dict[str, int]] = []
+    manifest_objects = {}
+    digest = hashlib.sha256()
+
+    with open(tmp_path, 'wb') as f:
+        f.write(b"\0" * HEADER_SIZE)
+
+        def write_section(data) -> int:
+            _pad(f)
+            view = memoryview(data).cast('B')
+            sections.append({'offset': f.tell(), 'nbytes': view.nbytes})
+            f.write(view)
+            digest.update(view)
+            return len(sections) - 1
+
+        for name, obj in objects.items():
+            buffers: List[pickle.PickleBuffer] = []
+            payload = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+            manifest_objects[name] = {
+                'pickle': write_section(payload),
+                'buffers': [write_section(buffer.raw()) for buffer in buffers]
+            }
+
+        manifest = {
+            'format_version': FORMAT_VERSION,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'sha256': digest.hexdigest(),
+            'feature_schema': feature_schema,
+            'metadata': metadata or {},
+            'objects': manifest_objects,
+            'sections': sections
+        }
+        manifest_bytes = json.dumps(manifest, indent=2, ensure_ascii=False, default=str).encode('utf-8')
+        _pad(f)
+        manifest_offset = f.tell()
+        f.write(manifest_bytes)
+        f.seek(0)
+        f.write(struct.pack(HEADER_FORMAT, ARTIFACT_MAGIC, manifest_offset, len(manifest_bytes)))
+
+    os.replace(tmp_path, path)
+    size_mb = path.stat().st_size / 1024 ** 2
+    logger.info(f"✅ Artefacto guardado en {path} ({size_mb:.2f} MB, {len(sections)} secciones)")
+    return manifest
+
+
+def read_manifest(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Lee el manifiesto de un artefacto sin cargar sus secciones.
+
+    Args:
+        path: Ruta del artefacto (sin comprimir)
+
+    Returns:
+        Manifiesto del artefacto
+    """
+    with open(path, 'rb') as f:
+        magic, manifest_offset, manifest_length = struct.unpack(
+            HEADER_FORMAT, f.read(struct.calcsize(HEADER_FORMAT))
+        )
+        if magic != ARTIFACT_MAGIC:
+            raise ValueError(f"{path} no es un artefacto de modelo")
+        f.seek(manifest_offset)
+        return json.loads(f.read(manifest_length).decode('utf-8'))
+
+
+def _section_hash(data, manifest: Dict[str, Any]) -> str:
+    """SHA-256 de todas las secciones, en el orden en que se escribieron."""
+    digest = hashlib.sha256()
+    for section in manifest['sections']:
+        digest.update(data[section['offset']:section['offset'] + section['nbytes']])
+    return digest.hexdigest()
+
+
+def compress_artifact(path: Union[str, Path]) -> Path:
+    """
+    Genera una copia comprimida del artefacto para distribuirlo.
+
+    Args:
+        path: Ruta del artefacto
+
+    Returns:
+        Ruta de la copia comprimida (<artefacto>.gz)
+    """
+    path = Path(path)
+    compressed_path = path.with_name(path.name + COMPRESSED_SUFFIX)
+    with open(path, 'rb') as src, gzip.open(compressed_path, 'wb', compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, length=1024 * 1024)
+    logger.info(
+        f"🗜️ Artefacto comprimido: {path.stat().st_size / 1024 ** 2:.2f} MB -> "
+        f"{compressed_path.stat().st_size / 1024 ** 2:.2f} MB"
+    )
+    return compressed_path
+
+
+def _decompress(path: Path) -> Path:
+    """Descomprime un artefacto .gz junto al original (una sola vez) y devuelve la ruta sin comprimir."""
+    target = path.with_name(path.name[:-len(COMPRESSED_SUFFIX)])
+    if target.exists() and target.stat().st_mtime >= path.stat().st_mtime:
+        return target
+    tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    with gzip.open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst, length=1024 * 1024)
+    # Un artefacto distribuido se verifica siempre al descomprimirlo
+    manifest = read_manifest(tmp_path)
+    data = np.memmap(tmp_path, dtype=np.uint8, mode='r')
+    if _section_hash(data, manifest) != manifest['sha256']:
+        del data
+        tmp_path.unlink()
+        raise ValueError(f"El hash de {path} no coincide con su manifiesto")
+    del data
+    os.replace(tmp_path, target)
+    # Misma fecha que la copia comprimida: las siguientes cargas reutilizan lo descomprimido
+    compressed_stat = path.stat()
+    os.utime(target, (compressed_stat.st_atime, compressed_stat.st_mtime))
+    logger.info(f"📦 Artefacto descomprimido en {target}")
+    return target
+
+
+def load_artifact(path: Union[str, Path],
+                  mmap: bool = True,
+                  names: Optional[List[str]] = None,
+                  verify: bool = False) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Carga los objetos de un artefacto.
+
+    Con mmap=True los arrays fuera de banda son vistas de solo lectura sobre
+    el fichero mapeado (compartidas entre procesos a través de la caché de
+    páginas); con mmap=False se leen a memoria propia y son modificables.
+
+    Args:
+        path: Ruta del artefacto (o de su copia .gz)
+        mmap: Si True, mapea el fichero en lugar de leerlo
+        names: Objetos a cargar (por defecto, todos)
+        verify: Si True, comprueba el hash de las secciones
+
+    Returns:
+        Tuple con el diccionario nombre -> objeto y el manifiesto
+    """
+    path = Path(path)
+    if path.suffix == COMPRESSED_SUFFIX:
+        path = _decompress(path)
+    manifest = read_manifest(path)
+
+    if mmap:
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+    else:
+        data = np.fromfile(path, dtype=np.uint8)
+    if verify and _section_hash(data, manifest) != manifest['sha256']:
+        raise ValueError(f"El hash de {path} no coincide con su manifiesto")
+
+    def section(index: int):
+        spec = manifest['sections'][index]
+        return data[spec['offset']:spec['offset'] + spec['nbytes']]
+
+    objects = {}
+    for name, spec in manifest['objects'].items():
+        if names is not None and name not in names:
+            continue
+        objects[name] = pickle.loads(
+            section(spec['pickle']).tobytes(),
+            buffers=[pickle.PickleBuffer(section(index)) for index in spec['buffers']]
+        )
+    return objects, manifest
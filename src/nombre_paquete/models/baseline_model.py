@@ -7,47 +7,108 @@ una línea base de rendimiento antes de implementar modelos más complejos.
 
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, f1_score
 from sklearn.preprocessing import StandardScaler
 from sklearn.impute import SimpleImputer
 from sklearn.pipeline import Pipeline
 import joblib
 import logging
-from typing import Dict, Tuple, Any, Optional
+from typing import Dict, Tuple, Any, Optional, Sequence
 from pathlib import Path
 
+from ..resource_planner import get_resource_plan
+from .cross_validation import DEFAULT_SCORING, parallel_cross_validate
+from .artifacts import ARTIFACT_SUFFIX, build_feature_schema, compress_artifact, is_artifact, load_artifact, save_artifact
+from .binning import codes_to_float, get_binned_matrix
+from .compiled_forest import CompiledForest
+from .forest_growth import DEFAULT_GROWTH_STEP, DEFAULT_OOB_PATIENCE, DEFAULT_OOB_TOLERANCE, grow_forest
+from .incremental import train_incremental_logistic
+from .tuning import RESOURCE_N_SAMPLES, SuccessiveHalvingSearch
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Espacios de búsqueda por defecto de BaselineModel.tune
+DEFAULT_SEARCH_SPACES = {
+    'logistic': {
+        'C': [0.001, 0.003, 0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0, 30.0, 100.0],
+        'class_weight': [None, 'balanced']
+    },
+    'random_forest': {
+        'max_depth': [None, 8, 12, 16, 24],
+        'min_samples_leaf': [1, 2, 5, 10, 20],
+        'max_features': ['sqrt', 'log2', 0.3, 0.5],
+        'class_weight': [None, 'balanced']
+    },
+    'sgd_logistic': {
+        'alpha': [1e-6, 1e-5, 1e-4, 1e-3, 1e-2],
+        'class_weight': [None, 'balanced']
+    }
+}
+
+# Recurso que reparte el successive halving: filas para la regresión, árboles para el bosque
+TUNING_RESOURCE = {'logistic': RESOURCE_N_SAMPLES, 'random_forest': 'n_estimators', 'sgd_logistic': RESOURCE_N_SAMPLES}
+
+# Parámetros del entrenamiento por bloques de 'sgd_logistic' (no son del estimador)
+STREAMING_PARAMS = ('epochs', 'chunk_rows', 'checkpoint_path')
+
+# Parámetros del crecimiento adaptativo de 'random_forest' (no son del estimador)
+GROWTH_PARAMS = ('adaptive', 'growth_step', 'oob_tolerance', 'oob_patience')
+
 class BaselineModel:
     """
     Clase para implementar modelos baseline de predicción de retención estudiantil.
     """
     
-    def __init__(self, model_type: str = 'logistic'):
+    def __init__(self, model_type: str = 'logistic', params: Optional[Dict[str, Any]] = None):
         """
         Inicializa el modelo baseline.
         
         Args:
-            model_type: Tipo de modelo ('logistic' o 'random_forest')
+            model_type: Tipo de modelo ('logistic', 'random_forest', 'sgd_logistic' o 'hist_gb')
+            params: Hiperparámetros del estimador (sobrescriben los valores por defecto);
+                para 'sgd_logistic' admite además 'epochs', 'chunk_rows' y 'checkpoint_path';
+                para 'random_forest', 'adaptive' (n_estimators pasa a ser el máximo),
+                'growth_step', 'oob_tolerance' y 'oob_patience'
         """
         self.model_type = model_type
+        self.params = dict(params or {})
+        self.streaming_params = {
+            name: self.params.pop(name) for name in STREAMING_PARAMS if name in self.params
+        }
+        self.growth_params = {
+            name: self.params.pop(name) for name in GROWTH_PARAMS if name in self.params
+        }
         self.model = None
         self.scaler = StandardScaler()
         self.imputer = SimpleImputer(strategy='median')
         self.pipeline = None
+        self.tuning_results = None
+        self.feature_schema = None
         self.is_fitted = False
         
         if model_type == 'logistic':
-            self.model = LogisticRegression(random_state=42, max_iter=1000)
+            self.model = LogisticRegression(**{'random_state': 42, 'max_iter': 1000, **self.params})
         elif model_type == 'random_forest':
-            self.model = RandomForestClassifier(n_estimators=100, random_state=42)
+            # Árboles en paralelo con los núcleos del plan de recursos
+            self.model = RandomForestClassifier(**{
+                'n_estimators': 100, 'random_state': 42, 'n_jobs': get_resource_plan().n_cpus, **self.params
+            })
+        elif model_type == 'sgd_logistic':
+            # Regresión logística por SGD, entrenada por bloques con partial_fit
+            self.model = SGDClassifier(**{'alpha': 1e-4, 'random_state': 42, **self.params, 'loss': 'log_loss'})
+        elif model_type == 'hist_gb':
+            # Gradient boosting por histogramas: trata los NaN de forma nativa, sin imputador
+            self.model = HistGradientBoostingClassifier(**{
+                'max_iter': 200, 'early_stopping': True, 'validation_fraction': 0.1,
+                'n_iter_no_change': 10, 'random_state': 42, **self.params
+            })
         else:
-            raise ValueError("model_type debe ser 'logistic' o 'random_forest'")
+            raise ValueError("model_type debe ser 'logistic', 'random_forest', 'sgd_logistic' o 'hist_gb'")
     
     def prepare_data(self, X: pd.DataFrame, y: pd.Series, test_size: float = 0.2) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """
@@ -83,6 +144,12 @@ class BaselineModel:
             Diccionario con métricas de entrenamiento
         """
         logger.info(f"🚀 Entrenando modelo baseline ({self.model_type})...")
+        self.feature_schema = build_feature_schema(X)
+        
+        if self.model_type == 'sgd_logistic':
+            return self._train_incremental(X, y)
+        if self.model_type == 'hist_gb':
+            return self._train_binned(X, y)
         
         # Seleccionar solo columnas numéricas
         numeric_cols = X.select_dtypes(include=np.number).columns
@@ -99,7 +166,11 @@ class BaselineModel:
         ])
         
         # Entrenar pipeline
-        self.pipeline.fit(X_train, y_train)
+        growth_curve = None
+        if self.model_type == 'random_forest' and self.growth_params.get('adaptive'):
+            growth_curve = self._grow_forest(X_train, y_train)
+        else:
+            self.pipeline.fit(X_train, y_train)
         self.is_fitted = True
         
         # Evaluar modelo
@@ -114,46 +185,207 @@ class BaselineModel:
             'classification_report': classification_report(y_test, y_pred, zero_division=0),
             'confusion_matrix': confusion_matrix(y_test, y_pred)
         }
+        if growth_curve is not None:
+            metrics['n_estimators'] = self.model.n_estimators
+            metrics['growth_curve'] = growth_curve
         
         logger.info(f"✅ Modelo entrenado - F1: {metrics['f1_score']:.3f}, ROC-AUC: {metrics['roc_auc']:.3f}")
         return metrics
     
-    def cross_validate(self, X: pd.DataFrame, y: pd.Series, cv: int = 5) -> Dict[str, float]:
+    def _grow_forest(self, X_train: pd.DataFrame, y_train: pd.Series) -> list:
         """
-        Realiza validación cruzada del modelo.
+        Ajusta el preprocesamiento una vez y hace crecer el random forest hasta que el error OOB se estabiliza.
+        
+        Args:
+            X_train: Características de entrenamiento
+            y_train: Variable objetivo de entrenamiento
+            
+        Returns:
+            Curva de crecimiento (árboles y métricas OOB por incremento)
+        """
+        X_transformed = self.scaler.fit_transform(self.imputer.fit_transform(X_train))
+        logger.info(f"🌲 Creciendo el random forest hasta {self.model.n_estimators} árboles con parada por OOB...")
+        self.model, curve = grow_forest(
+            self.model, X_transformed, y_train,
+            step=self.growth_params.get('growth_step', DEFAULT_GROWTH_STEP),
+            tolerance=self.growth_params.get('oob_tolerance', DEFAULT_OOB_TOLERANCE),
+            patience=self.growth_params.get('oob_patience', DEFAULT_OOB_PATIENCE)
+        )
+        self.params['n_estimators'] = self.model.n_estimators
+        return curve
+    
+    def _train_incremental(self, X: pd.DataFrame, y: pd.Series) -> Dict[str, Any]:
+        """
+        Entrena 'sgd_logistic' recorriendo X por bloques, sin copiarla en memoria.
+        
+        Args:
+            X: DataFrame con características (puede estar respaldado por memory-mapping)
+            y: Series con variable objetivo
+            
+        Returns:
+            Diccionario con métricas de entrenamiento
+        """
+        self.pipeline, metrics = train_incremental_logistic(X, y, params=self.params, **self.streaming_params)
+        self.imputer = self.pipeline.named_steps['imputer']
+        self.scaler = self.pipeline.named_steps['scaler']
+        self.model = self.pipeline.named_steps['model']
+        self.is_fitted = True
+        
+        logger.info(f"✅ Modelo entrenado - F1: {metrics['f1_score']:.3f}, ROC-AUC: {metrics['roc_auc']:.3f}")
+        return metrics
+    
+    def _train_binned(self, X: pd.DataFrame, y: pd.Series) -> Dict[str, Any]:
+        """
+        Entrena 'hist_gb' sobre la matriz discretizada cacheada en disco.
+        
+        La partición entrenamiento/prueba es la misma que la de los demás
+        modelos; el pipeline resultante discretiza las filas nuevas con los
+        mismos umbrales antes de predecir.
         
         Args:
             X: DataFrame con características
             y: Series con variable objetivo
-            cv: Número de folds para validación cruzada
             
         Returns:
-            Diccionario con métricas de validación cruzada
+            Diccionario con métricas de entrenamiento
         """
-        logger.info(f"🔄 Realizando validación cruzada ({cv} folds)...")
+        numeric_cols = X.select_dtypes(include=np.number).columns
+        binner, codes = get_binned_matrix(X[numeric_cols])
         
-        # Crear pipeline para CV
-        cv_pipeline = Pipeline([
-            ('imputer', SimpleImputer(strategy='median')),
-            ('scaler', StandardScaler()),
+        train_idx, test_idx = train_test_split(
+            np.arange(len(y)), test_size=0.2, random_state=42, stratify=y
+        )
+        y_array = np.asarray(y)
+        self.model.fit(codes_to_float(codes[np.sort(train_idx)]), y_array[np.sort(train_idx)])
+        self.pipeline = Pipeline([
+            ('binner', binner),
             ('model', self.model)
         ])
+        self.is_fitted = True
+        
+        # Evaluar modelo
+        X_test = codes_to_float(codes[test_idx])
+        y_test = y_array[test_idx]
+        y_pred = self.model.predict(X_test)
+        y_pred_proba = self.model.predict_proba(X_test)[:, 1]
+        
+        metrics = {
+            'accuracy': float(np.mean(y_pred == y_test)),
+            'f1_score': f1_score(y_test, y_pred),
+            'roc_auc': roc_auc_score(y_test, y_pred_proba),
+            'classification_report': classification_report(y_test, y_pred, zero_division=0),
+            'confusion_matrix': confusion_matrix(y_test, y_pred),
+            'n_iter': int(self.model.n_iter_)
+        }
+        
+        logger.info(
+            f"✅ Modelo entrenado - F1: {metrics['f1_score']:.3f}, ROC-AUC: {metrics['roc_auc']:.3f} "
+            f"({metrics['n_iter']} iteraciones)"
+        )
+        return metrics
+    
+    def cross_validate(self,
+                       X: pd.DataFrame,
+                       y: pd.Series,
+                       cv: int = 5,
+                       scoring: Sequence[str] = DEFAULT_SCORING) -> Dict[str, Any]:
+        """
+        Realiza validación cruzada del modelo.
+        
+        Los folds se ejecutan en procesos paralelos sobre matrices ya imputadas
+        y escaladas (cacheadas y mapeadas en memoria), de modo que los demás
+        modelos evaluados sobre los mismos datos reutilizan el preprocesamiento.
+        
+        Args:
+            X: DataFrame con características
+            y: Series con variable objetivo
+            cv: Número de folds para validación cruzada
+            scoring: Métricas de sklearn calculadas en cada fold
+            
+        Returns:
+            Diccionario con media, desviación y valores por fold de cada métrica
+        """
+        logger.info(f"🔄 Realizando validación cruzada ({cv} folds)...")
         
         # Escalar datos
         numeric_cols = X.select_dtypes(include=np.number).columns
         X_numeric = X[numeric_cols]
         
         # Validación cruzada
-        cv_scores = cross_val_score(cv_pipeline, X_numeric, y, cv=cv, scoring='f1')
+        if self.model_type == 'hist_gb':
+            # Folds sobre la matriz discretizada cacheada, sin imputar (NaN nativos)
+            _, codes = get_binned_matrix(X_numeric)
+            metrics = parallel_cross_validate(self.model, codes_to_float(codes), y, cv=cv, scoring=scoring, preprocess=False)
+        else:
+            metrics = parallel_cross_validate(self.model, X_numeric, y, cv=cv, scoring=scoring)
         
-        metrics = {
-            'cv_f1_mean': cv_scores.mean(),
-            'cv_f1_std': cv_scores.std(),
-            'cv_f1_scores': cv_scores.tolist()
+        summary = ", ".join(
+            f"{name}: {metrics[f'cv_{name}_mean']:.3f} ± {metrics[f'cv_{name}_std']:.3f}" for name in scoring
+        )
+        logger.info(f"✅ Validación cruzada completada - {summary}")
+        return metrics
+    
+    def tune(self,
+             X: pd.DataFrame,
+             y: pd.Series,
+             space: Optional[Dict[str, Any]] = None,
+             budget: float = 10,
+             scoring: str = 'roc_auc',
+             log_path: Optional[str] = None,
+             n_jobs: int = -1) -> Pipeline:
+        """
+        Busca hiperparámetros por successive halving y deja entrenada la mejor configuración.
+        
+        Las configuraciones se prueban primero con pocos árboles (random forest)
+        o con un subconjunto de filas (regresión logística) y solo las mejores
+        reciben más recurso. Con log_path, una búsqueda interrumpida se reanuda
+        sin repetir las pruebas registradas.
+        
+        Args:
+            X: DataFrame con características
+            y: Series con variable objetivo
+            space: Parámetro -> lista de valores o distribución (por defecto, DEFAULT_SEARCH_SPACES)
+            budget: Presupuesto en entrenamientos completos equivalentes
+            scoring: Métrica de sklearn usada para elegir la configuración
+            log_path: Registro JSONL de pruebas
+            n_jobs: Procesos para las pruebas de cada ronda
+            
+        Returns:
+            Pipeline (imputador, escalador, modelo) entrenado con la mejor configuración
+        """
+        if self.model_type not in TUNING_RESOURCE:
+            raise ValueError(f"La búsqueda de hiperparámetros no está disponible para {self.model_type}")
+        
+        logger.info(f"🔎 Buscando hiperparámetros para {self.model_type} (presupuesto: {budget})...")
+        
+        numeric_cols = X.select_dtypes(include=np.number).columns
+        X_numeric = X[numeric_cols]
+        self.feature_schema = build_feature_schema(X)
+        
+        search = SuccessiveHalvingSearch(
+            self.model,
+            space if space is not None else DEFAULT_SEARCH_SPACES[self.model_type],
+            budget=budget,
+            resource=TUNING_RESOURCE[self.model_type],
+            scoring=scoring,
+            log_path=log_path,
+            n_jobs=n_jobs
+        )
+        self.pipeline = search.fit(X_numeric, y)
+        self.model = self.pipeline.named_steps['model']
+        self.imputer = self.pipeline.named_steps['imputer']
+        self.scaler = self.pipeline.named_steps['scaler']
+        self.params = {**self.params, **search.best_params_}
+        self.tuning_results = {
+            'best_params': search.best_params_,
+            'best_score': search.best_score_,
+            'scoring': scoring,
+            'n_trials': len(search.trials)
         }
+        self.is_fitted = True
         
-        logger.info(f"✅ Validación cruzada completada - F1: {metrics['cv_f1_mean']:.3f} ± {metrics['cv_f1_std']:.3f}")
-        return metrics
+        logger.info(f"✅ Búsqueda completada - {scoring}: {search.best_score_:.3f} con {search.best_params_}")
+        return self.pipeline
     
     def get_feature_importance(self, feature_names: list) -> pd.DataFrame:
         """
@@ -170,7 +402,7 @@ class BaselineModel:
         
         if self.model_type == 'random_forest':
             importance = self.pipeline.named_steps['model'].feature_importances_
-        elif self.model_type == 'logistic':
+        elif self.model_type in ('logistic', 'sgd_logistic'):
             importance = np.abs(self.pipeline.named_steps['model'].coef_[0])
         else:
             return pd.DataFrame()
@@ -215,12 +447,18 @@ class BaselineModel:
         numeric_cols = X.select_dtypes(include=np.number).columns
         return self.pipeline.predict_proba(X[numeric_cols])
     
-    def save_model(self, filepath: str):
+    def save_model(self, filepath: str, compress: bool = False):
         """
         Guarda el modelo entrenado.
         
+        Con la extensión .tdsp se guarda como artefacto con secciones mapeables
+        en memoria, manifiesto (hash y esquema de características) y, para el
+        random forest, también su versión compilada; con otra extensión, como
+        pickle de joblib.
+        
         Args:
             filepath: Ruta donde guardar el modelo
+            compress: Si True (solo artefactos), genera además una copia .gz para distribuir
         """
         if not self.is_fitted:
             raise ValueError("El modelo debe estar entrenado antes de guardarlo")
@@ -228,24 +466,55 @@ class BaselineModel:
         # Crear directorio si no existe
         Path(filepath).parent.mkdir(parents=True, exist_ok=True)
         
+        if Path(filepath).suffix == ARTIFACT_SUFFIX:
+            objects = {'pipeline': self.pipeline}
+            if self.model_type == 'random_forest':
+                objects['compiled_forest'] = CompiledForest.from_pipeline(self.pipeline)
+            save_artifact(
+                filepath, objects,
+                feature_schema=self.feature_schema,
+                metadata={'model_type': self.model_type, 'params': self.params}
+            )
+            if compress:
+                compress_artifact(filepath)
+            return
+        
         # Guardar pipeline completo
         joblib.dump(self.pipeline, filepath)
         logger.info(f"✅ Modelo (pipeline) guardado en {filepath}")
     
-    def load_model(self, filepath: str):
+    def load_model(self, filepath: str, mmap: bool = False):
         """
         Carga un modelo guardado.
         
+        Con mmap=True los arrays del modelo se mapean desde el fichero y los
+        procesos que cargan el mismo artefacto comparten una sola copia. El
+        random forest mapeado se sirve con su versión compilada, que solo
+        admite predict y predict_proba.
+        
         Args:
-            filepath: Ruta del modelo a cargar
+            filepath: Ruta del modelo a cargar (.tdsp, .tdsp.gz o pickle de joblib)
+            mmap: Si True, mapea los arrays en lugar de copiarlos a memoria
         """
-        self.pipeline = joblib.load(filepath)
-        self.model = self.pipeline.named_steps['model']
-        self.scaler = self.pipeline.named_steps['scaler']
-        self.imputer = self.pipeline.named_steps['imputer']
+        if not is_artifact(filepath):
+            self.pipeline = joblib.load(filepath, mmap_mode='r' if mmap else None)
+        else:
+            manifest_objects = ['compiled_forest'] if mmap and self.model_type == 'random_forest' else ['pipeline']
+            objects, manifest = load_artifact(filepath, mmap=mmap, names=manifest_objects)
+            self.model_type = manifest['metadata'].get('model_type', self.model_type)
+            self.params = manifest['metadata'].get('params', self.params)
+            self.feature_schema = manifest['feature_schema']
+            self.pipeline = objects.get('pipeline') or objects.get('compiled_forest')
+        
+        if isinstance(self.pipeline, CompiledForest):
+            self.model, self.scaler, self.imputer = self.pipeline, None, None
+        else:
+            self.model = self.pipeline.named_steps['model']
+            self.scaler = self.pipeline.named_steps.get('scaler')
+            self.imputer = self.pipeline.named_steps.get('imputer')
         self.is_fitted = True
         
-        logger.info(f"✅ Modelo (pipeline) cargado desde {filepath}")
+        logger.info(f"✅ Modelo (pipeline) cargado desde {filepath} (mmap={mmap})")
     
     def get_model_summary(self) -> Dict[str, Any]:
         """
@@ -257,7 +526,7 @@ class BaselineModel:
         summary = {
             'model_type': self.model_type,
             'is_fitted': self.is_fitted,
-            'model_params': self.pipeline.named_steps['model'].get_params() if self.is_fitted else None
+            'model_params': self.model.get_params() if self.is_fitted and hasattr(self.model, 'get_params') else None
         }
         
         return summary 
\ No newline at end of file
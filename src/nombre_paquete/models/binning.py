@@ -0,0 +1,179 @@
+"""
+Módulo de discretización de características para gradient boosting por histogramas.
+
+Este módulo convierte la matriz de características en códigos de bin uint8
+(hasta 255 bins por columna más un código para los valores faltantes), la
+guarda en disco y la reutiliza en entrenamientos y folds posteriores sobre
+los mismos datos. Los umbrales de los bins se calculan con cuantiles sobre
+una submuestra, sin usar la variable objetivo, por lo que se comparten entre
+la partición de entrenamiento y los folds de validación cruzada.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional, Tuple, Union
+import logging
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+from ..resource_planner import get_resource_plan
+
+logger = logging.getLogger(__name__)
+
+# Código reservado para los valores faltantes
+MISSING_CODE = 255
+
+# Carpeta de la caché de matrices discretizadas (persistente entre ejecuciones)
+BIN_CACHE_DIR = Path(os.environ.get('TDSP_BIN_CACHE_DIR', Path.home() / '.cache' / 'tdsp' / 'binned'))
+
+
+class QuantileBinner(BaseEstimator, TransformerMixin):
+    """
+    Discretizador por cuantiles con soporte de valores faltantes.
+
+    ``transform_codes`` devuelve los códigos uint8 (MISSING_CODE para NaN) y
+    ``transform`` los mismos códigos como float32 con NaN, que es la entrada
+    que recibe HistGradientBoostingClassifier para conservar su tratamiento
+    nativo de los faltantes.
+    """
+
+    def __init__(self, max_bins: int = 255, subsample: int = 200_000, random_state: int = 42):
+        """
+        Configura el discretizador.
+
+        Args:
+            max_bins: Bins máximos por columna (<= 255)
+            subsample: Filas usadas para calcular los cuantiles
+            random_state: Semilla de la submuestra
+        """
+        self.max_bins = max_bins
+        self.subsample = subsample
+        self.random_state = random_state
+
+    def fit(self, X: Union[pd.DataFrame, np.ndarray], y=None) -> 'QuantileBinner':
+        """
+        Calcula los umbrales de cada columna.
+
+        Args:
+            X: Características numéricas
+            y: Ignorado
+
+        Returns:
+            El propio discretizador
+        """
+        if not 2 <= self.max_bins <= MISSING_CODE:
+            raise ValueError(f"max_bins debe estar entre 2 y {MISSING_CODE}")
+        X = np.asarray(X)
+        if len(X) > self.subsample:
+            rows = np.sort(np.random.default_rng(self.random_state).choice(len(X), self.subsample, replace=False))
+            X = X[rows]
+        X = X.astype(np.float64)
+
+        self.bin_edges_ = []
+        for j in range(X.shape[1]):
+            values = X[:, j][~np.isnan(X[:, j])]
+            distinct = np.unique(values)
+            if len(distinct) <= self.max_bins:
+                # Pocos valores distintos: un bin por valor, con el umbral en el punto medio
+                edges = (distinct[:-1] + distinct[1:]) / 2
+            else:
+                quantiles = np.linspace(0, 100, self.max_bins + 1)[1:-1]
+                edges = np.unique(np.percentile(values, quantiles, method='midpoint'))
+            self.bin_edges_.append(edges)
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def transform_codes(self, X: Union[pd.DataFrame, np.ndarray], chunk_rows: Optional[int] = None) -> np.ndarray:
+        """
+        Convierte las características en códigos de bin uint8.
+
+        Args:
+            X: Características numéricas (puede estar respaldada por memory-mapping)
+            chunk_rows: Filas por bloque al recorrer X
+
+        Returns:
+            Array uint8 con los códigos (MISSING_CODE para NaN)
+        """
+        X = np.asarray(X)
+        chunk_rows = chunk_rows or get_resource_plan().chunk_rows
+        codes = np.empty(X.shape, dtype=np.uint8)
+        for start in range(0, len(X), chunk_rows):
+            chunk = X[start:start + chunk_rows]
+            for j, edges in enumerate(self.bin_edges_):
+                column = chunk[:, j]
+                column_codes = np.searchsorted(edges, column, side='left').astype(np.uint8)
+                column_codes[np.isnan(column)] = MISSING_CODE
+                codes[start:start + len(chunk), j] = column_codes
+        return codes
+
+    def transform(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        """
+        Convierte las características en códigos float32 con NaN para los faltantes.
+
+        Args:
+            X: Características numéricas
+
+        Returns:
+            Array float32 con los códigos de bin
+        """
+        return codes_to_float(self.transform_codes(X))
+
+
+def codes_to_float(codes: np.ndarray) -> np.ndarray:
+    """
+    Convierte códigos uint8 a float32, con NaN en los faltantes.
+
+    Args:
+        codes: Códigos de bin uint8
+
+    Returns:
+        Array float32
+    """
+    values = codes.astype(np.float32)
+    values[codes == MISSING_CODE] = np.nan
+    return values
+
+
+def get_binned_matrix(X: Union[pd.DataFrame, np.ndarray],
+                      max_bins: int = 255,
+                      cache_dir: Optional[Union[str, Path]] = None) -> Tuple[QuantileBinner, np.ndarray]:
+    """
+    Devuelve la matriz discretizada de X, desde la caché en disco si ya existe.
+
+    Args:
+        X: Características numéricas
+        max_bins: Bins máximos por columna
+        cache_dir: Carpeta de la caché (por defecto, BIN_CACHE_DIR)
+
+    Returns:
+        Tuple con el discretizador ajustado y los códigos uint8 (con memory-mapping)
+    """
+    X = np.asarray(X)
+    cache_dir = Path(cache_dir) if cache_dir is not None else BIN_CACHE_DIR
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{X.shape}|{X.dtype}|{max_bins}".encode())
+    digest.update(memoryview(np.ascontiguousarray(X)).cast('B'))
+    key = digest.hexdigest()
+    codes_path = cache_dir / f"{key}.npy"
+    binner_path = cache_dir / f"{key}_binner.pkl"
+
+    if codes_path.exists() and binner_path.exists():
+        logger.info(f"♻️ Matriz discretizada recuperada de la caché ({codes_path})")
+        return joblib.load(binner_path), np.load(codes_path, mmap_mode='r')
+
+    logger.info(f"🧮 Discretizando {X.shape[1]} columnas en {max_bins} bins...")
+    binner = QuantileBinner(max_bins=max_bins).fit(X)
+    codes = binner.transform_codes(X)
+
+    # Escritura atómica: otro proceso nunca ve un fichero a medias
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_dir / f"{key}.{os.getpid()}.tmp.npy"
+    np.save(tmp_path, codes)
+    joblib.dump(binner, binner_path)
+    os.replace(tmp_path, codes_path)
+    logger.info(f"✅ Matriz discretizada guardada: {codes.nbytes / 1024 ** 2:.1f} MB")
+    return binner, np.load(codes_path, mmap_mode='r')
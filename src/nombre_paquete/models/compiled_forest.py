@@ -0,0 +1,284 @@
+"""
+Módulo de compilación de random forests a arrays planos.
+
+Este módulo convierte un pipeline entrenado (imputador + escalador + random
+forest de sklearn) en un conjunto de arrays contiguos con todos los nodos de
+todos los árboles: característica, umbral, hijos y valor de las hojas. La
+mediana del imputador y el escalado se pliegan en los umbrales de cada nodo
+(el umbral pasa a estar en unidades originales y cada nodo guarda hacia qué
+lado van los faltantes), de modo que el predictor recibe las características
+sin transformar. La predicción recorre todos los árboles de un lote a la vez
+con NumPy y el artefacto (ficheros .npy más un JSON de metadatos) se abre
+con memory-mapping.
+
+El módulo solo depende de NumPy para poder copiarse tal cual a la imagen de
+despliegue.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Arrays que forman el artefacto compilado, uno por fichero .npy
+ARRAY_NAMES = ('feature', 'threshold', 'children_left', 'children_right', 'missing_left', 'values', 'roots')
+METADATA_FILE = "metadata.json"
+
+# Tipos admitidos para los valores de las hojas; uint8 guarda la probabilidad cuantizada en 1/255
+VALUE_DTYPES = ('float32', 'float16', 'uint8')
+
+# Pares (fila, árbol) recorridos a la vez al predecir
+BATCH_PAIRS = 1_000_000
+
+# Marca de hoja en el array de características
+LEAF = -1
+
+
+def _pipeline_steps(pipeline: Any) -> Dict[str, Any]:
+    """Separa imputador, escalador y bosque de un pipeline (o de un bosque suelto)."""
+    steps = dict(getattr(pipeline, 'named_steps', {}))
+    if not steps:
+        steps = {'model': pipeline}
+    forest = steps.get('model', list(steps.values())[-1])
+    if not hasattr(forest, 'estimators_'):
+        raise ValueError("El pipeline debe terminar en un random forest entrenado")
+    return {'imputer': steps.get('imputer'), 'scaler': steps.get('scaler'), 'model': forest}
+
+
+class CompiledForest:
+    """
+    Random forest compilado a arrays planos con predicción vectorizada.
+
+    Los nodos de todos los árboles se concatenan; ``roots`` indica el nodo
+    raíz de cada árbol y ``values`` la probabilidad de la clase positiva (o
+    de cada clase, si hay más de dos) en cada nodo.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], metadata: Dict[str, Any]):
+        """
+        Inicializa el predictor a partir de sus arrays.
+
+        Args:
+            arrays: Diccionario nombre -> array (ver ARRAY_NAMES)
+            metadata: Clases, nombres de características, tipo y escala de los valores
+        """
+        self.arrays = arrays
+        self.metadata = metadata
+        self.classes_ = np.asarray(metadata['classes'])
+        self.feature_names: Optional[List[str]] = metadata.get('feature_names')
+
+    @classmethod
+    def from_pipeline(cls,
+                      pipeline: Any,
+                      value_dtype: str = 'float32',
+                      threshold_dtype: str = 'float64') -> 'CompiledForest':
+        """
+        Compila un pipeline (imputador, escalador, random forest) entrenado.
+
+        Args:
+            pipeline: Pipeline de sklearn o RandomForestClassifier entrenado
+            value_dtype: Tipo de los valores de las hojas ('float32', 'float16' o 'uint8')
+            threshold_dtype: Tipo de los umbrales ('float64' o 'float32')
+
+        Returns:
+            CompiledForest equivalente al pipeline
+        """
+        if value_dtype not in VALUE_DTYPES:
+            raise ValueError(f"value_dtype debe ser uno de {VALUE_DTYPES}")
+        steps = _pipeline_steps(pipeline)
+        forest = steps['model']
+        n_features = forest.n_features_in_
+
+        medians = np.full(n_features, np.nan)
+        if steps['imputer'] is not None:
+            medians = np.asarray(steps['imputer'].statistics_, dtype=np.float64)
+            if len(medians) != n_features:
+                raise ValueError("El imputador descartó columnas vacías; no se puede compilar")
+        mean, scale = np.zeros(n_features), np.ones(n_features)
+        if steps['scaler'] is not None:
+            if steps['scaler'].mean_ is not None:
+                mean = steps['scaler'].mean_
+            if steps['scaler'].scale_ is not None:
+                scale = steps['scaler'].scale_
+
+        feature, threshold, left, right, missing_left, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        for tree in forest.estimators_:
+            t = tree.tree_
+            is_leaf = t.children_left == -1
+            node_feature = np.where(is_leaf, LEAF, t.feature)
+            safe_feature = np.where(is_leaf, 0, t.feature)
+
+            # Umbral en unidades originales: (x - media) / escala <= t  <=>  x <= t * escala + media
+            raw_threshold = np.where(is_leaf, 0.0, t.threshold * scale[safe_feature] + mean[safe_feature])
+            # Los faltantes siguen a la mediana imputada, comparada como lo hace sklearn (float32)
+            scaled_median = ((medians[safe_feature] - mean[safe_feature]) / scale[safe_feature]).astype(np.float32)
+            node_missing_left = ~is_leaf & (scaled_median <= t.threshold)
+
+            proba = t.value[:, 0, :] / t.value[:, 0, :].sum(axis=1, keepdims=True)
+            node_values = proba[:, 1:] if proba.shape[1] == 2 else proba
+
+            roots.append(offset)
+            feature.append(node_feature)
+            threshold.append(raw_threshold)
+            left.append(np.where(is_leaf, -1, t.children_left + offset))
+            right.append(np.where(is_leaf, -1, t.children_right + offset))
+            missing_left.append(node_missing_left)
+            values.append(node_values)
+            offset += t.node_count
+
+        values = np.concatenate(values)
+        value_scale = 1.0
+        if value_dtype == 'uint8':
+            value_scale = 1 / 255
+            values = np.rint(values * 255)
+
+        # Índices de característica en int16 cuando caben (la mayoría de matrices de modelado)
+        feature_dtype = np.int16 if n_features < np.iinfo(np.int16).max else np.int32
+        arrays = {
+            'feature': np.concatenate(feature).astype(feature_dtype),
+            'threshold': np.concatenate(threshold).astype(threshold_dtype),
+            'children_left': np.concatenate(left).astype(np.int32),
+            'children_right': np.concatenate(right).astype(np.int32),
+            'missing_left': np.concatenate(missing_left),
+            'values': np.ascontiguousarray(values.astype(value_dtype)),
+            'roots': np.asarray(roots, dtype=np.int32)
+        }
+        feature_names = getattr(forest, 'feature_names_in_', None)
+        if feature_names is None and steps['imputer'] is not None:
+            feature_names = getattr(steps['imputer'], 'feature_names_in_', None)
+        metadata = {
+            'classes': forest.classes_.tolist(),
+            'n_features': int(n_features),
+            'feature_names': list(feature_names) if feature_names is not None else None,
+            'value_dtype': value_dtype,
+            'value_scale': value_scale,
+            'n_trees': len(roots),
+            'n_nodes': int(offset)
+        }
+        return cls(arrays, metadata)
+
+    def _as_matrix(self, X: Any) -> np.ndarray:
+        """Convierte X a float64, reordenando columnas por nombre si es un DataFrame."""
+        if hasattr(X, 'columns') and self.feature_names is not None:
+            X = X[self.feature_names]
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.metadata['n_features']:
+            raise ValueError(f"Se esperaban {self.metadata['n_features']} características")
+        return X
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """
+        Probabilidades de cada clase (media de las hojas alcanzadas en todos los árboles).
+
+        Args:
+            X: Características sin transformar (array o DataFrame)
+
+        Returns:
+            Array (n_filas, n_clases)
+        """
+        X = self._as_matrix(X)
+        a = self.arrays
+        feature, threshold = a['feature'], a['threshold']
+        children_left, children_right, missing_left = a['children_left'], a['children_right'], a['missing_left']
+        roots = np.asarray(a['roots'])
+        n_trees, n_features = len(roots), X.shape[1]
+        rows_per_batch = max(BATCH_PAIRS // n_trees, 1)
+        n_outputs = a['values'].shape[1]
+        mean_values = np.empty((len(X), n_outputs))
+
+        for start in range(0, len(X), rows_per_batch):
+            X_batch = np.ascontiguousarray(X[start:start + rows_per_batch])
+            X_flat = X_batch.ravel()
+            has_missing = np.isnan(X_flat).any()
+            n_rows = len(X_batch)
+
+            # Un par (fila, árbol) por posición; solo avanzan los que aún no están en una hoja
+            leaves = np.tile(roots, n_rows)
+            position = np.arange(n_rows * n_trees)
+            row_offset = np.repeat(np.arange(n_rows) * n_features, n_trees)
+            nodes = leaves.copy()
+            node_feature = feature[nodes].astype(np.intp)
+            while True:
+                internal = node_feature != LEAF
+                if not internal.all():
+                    leaves[position[~internal]] = nodes[~internal]
+                    nodes, position, row_offset, node_feature = (
+                        nodes[internal], position[internal], row_offset[internal], node_feature[internal]
+                    )
+                if not nodes.size:
+                    break
+                x = X_flat[row_offset + node_feature]
+                go_left = x <= threshold[nodes]
+                if has_missing:
+                    go_left |= np.isnan(x) & missing_left[nodes]
+                nodes = np.where(go_left, children_left[nodes], children_right[nodes])
+                node_feature = feature[nodes].astype(np.intp)
+
+            leaf_values = np.asarray(a['values'][leaves], dtype=np.float64).reshape(n_rows, n_trees, n_outputs)
+            mean_values[start:start + n_rows] = leaf_values.mean(axis=1) * self.metadata['value_scale']
+
+        if len(self.classes_) == 2:
+            return np.column_stack([1 - mean_values[:, 0], mean_values[:, 0]])
+        return mean_values
+
+    def predict(self, X: Any) -> np.ndarray:
+        """
+        Clase predicha para cada fila.
+
+        Args:
+            X: Características sin transformar (array o DataFrame)
+
+        Returns:
+            Array con las clases predichas
+        """
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def save(self, output_dir: Union[str, Path]) -> int:
+        """
+        Guarda el artefacto compilado.
+
+        Args:
+            output_dir: Carpeta de salida
+
+        Returns:
+            Tamaño total del artefacto en bytes
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(output_dir / f"{name}.npy", self.arrays[name])
+        with open(output_dir / METADATA_FILE, 'w', encoding='utf-8') as f:
+            json.dump(self.metadata, f, indent=2, ensure_ascii=False)
+
+        size = sum((output_dir / f"{name}.npy").stat().st_size for name in ARRAY_NAMES)
+        logger.info(
+            f"✅ Random forest compilado guardado en {output_dir}: {self.metadata['n_trees']} árboles, "
+            f"{self.metadata['n_nodes']} nodos ({size / 1024 ** 2:.2f} MB)"
+        )
+        return size
+
+    @classmethod
+    def load(cls, input_dir: Union[str, Path], mmap: bool = True) -> 'CompiledForest':
+        """
+        Carga un artefacto compilado.
+
+        Args:
+            input_dir: Carpeta del artefacto
+            mmap: Si True, abre los arrays con memory-mapping (carga en frío casi inmediata)
+
+        Returns:
+            CompiledForest listo para predecir
+        """
+        input_dir = Path(input_dir)
+        with open(input_dir / METADATA_FILE, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        arrays = {
+            name: np.load(input_dir / f"{name}.npy", mmap_mode='r' if mmap else None)
+            for name in ARRAY_NAMES
+        }
+        return cls(arrays, metadata)
@@ -0,0 +1,209 @@
+"""
+Módulo de validación cruzada paralela con preprocesamiento cacheado.
+
+Este módulo ejecuta los folds de la validación cruzada en procesos
+paralelos. El imputador y el escalador de cada fold se ajustan una sola vez
+y sus matrices transformadas se guardan como .npy en una caché en disco;
+los workers las abren con memory-mapping, de modo que la matriz no se
+serializa por fold y varios modelos evaluados sobre los mismos folds
+reutilizan el preprocesamiento. Cada fold calcula todos los scorers en una
+sola pasada.
+"""
+
+import atexit
+import hashlib
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Union
+import logging
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.impute import SimpleImputer
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+
+from ..resource_planner import get_resource_plan, limit_worker_threads
+
+logger = logging.getLogger(__name__)
+
+# Scorers calculados por defecto en cada fold
+DEFAULT_SCORING = ('f1', 'roc_auc', 'accuracy')
+
+# Máximo de conjuntos de folds cacheados a la vez en el proceso
+MAX_CACHED_FOLD_SETS = 2
+
+
+class FoldCache:
+    """
+    Folds estratificados con el imputador y el escalador ya aplicados.
+
+    Las matrices de cada fold se escriben en disco como .npy (float64) y se
+    abren con memory-mapping, tanto en el proceso principal como en los workers.
+    """
+
+    def __init__(self,
+                 X: np.ndarray,
+                 y: np.ndarray,
+                 cv: int,
+                 cache_dir: Union[str, Path],
+                 preprocess: bool = True):
+        """
+        Ajusta el preprocesamiento de cada fold y lo guarda en disco.
+
+        Args:
+            X: Matriz de características numéricas
+            y: Variable objetivo
+            cv: Número de folds
+            cache_dir: Carpeta donde guardar las matrices de los folds
+            preprocess: Si False, los folds guardan X sin imputar ni escalar
+        """
+        self.cv = cv
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.folds: List[Dict[str, Path]] = []
+
+        splitter = StratifiedKFold(n_splits=cv)
+        for fold, (train_idx, test_idx) in enumerate(splitter.split(X, y)):
+            preprocessor = [SimpleImputer(strategy='median'), StandardScaler()] if preprocess else []
+            X_train = X[train_idx]
+            X_test = X[test_idx]
+            for step in preprocessor:
+                X_train = step.fit_transform(X_train)
+                X_test = step.transform(X_test)
+
+            paths = {
+                name: self.cache_dir / f"fold{fold}_{name}.npy"
+                for name in ('X_train', 'X_test', 'y_train', 'y_test')
+            }
+            dtype = np.float64 if preprocess else X.dtype
+            np.save(paths['X_train'], np.ascontiguousarray(X_train, dtype=dtype))
+            np.save(paths['X_test'], np.ascontiguousarray(X_test, dtype=dtype))
+            np.save(paths['y_train'], y[train_idx])
+            np.save(paths['y_test'], y[test_idx])
+            self.folds.append(paths)
+
+    def close(self) -> None:
+        """Elimina las matrices de los folds."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+# Cachés de folds del proceso, por huella de (X, y, cv), en orden de creación
+_FOLD_CACHES: Dict[str, FoldCache] = {}
+
+
+def _close_fold_caches() -> None:
+    """Elimina todas las cachés de folds al terminar el proceso."""
+    for cache in _FOLD_CACHES.values():
+        cache.close()
+    _FOLD_CACHES.clear()
+
+
+atexit.register(_close_fold_caches)
+
+
+def _fingerprint(X: np.ndarray, y: np.ndarray, cv: int, preprocess: bool = True) -> str:
+    """Huella del contenido de los datos, del número de folds y del preprocesamiento."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{X.shape}|{X.dtype}|{cv}|{preprocess}".encode())
+    digest.update(memoryview(np.ascontiguousarray(X)).cast('B'))
+    digest.update(memoryview(np.ascontiguousarray(y)).cast('B'))
+    return digest.hexdigest()
+
+
+def get_fold_cache(X: np.ndarray, y: np.ndarray, cv: int = 5, preprocess: bool = True) -> FoldCache:
+    """
+    Devuelve la caché de folds de unos datos, creándola si no existe.
+
+    Args:
+        X: Matriz de características numéricas
+        y: Variable objetivo
+        cv: Número de folds
+        preprocess: Si False, los folds no se imputan ni se escalan
+
+    Returns:
+        FoldCache compartida por todos los modelos evaluados sobre los mismos datos
+    """
+    key = _fingerprint(X, y, cv, preprocess)
+    if key in _FOLD_CACHES:
+        logger.info("♻️ Reutilizando el preprocesamiento cacheado de los folds")
+        return _FOLD_CACHES[key]
+
+    while len(_FOLD_CACHES) >= MAX_CACHED_FOLD_SETS:
+        _FOLD_CACHES.pop(next(iter(_FOLD_CACHES))).close()
+
+    logger.info(f"🧮 Preparando {cv} folds{' (imputación y escalado)' if preprocess else ''}...")
+    cache = FoldCache(X, y, cv, tempfile.mkdtemp(prefix="tdsp-folds-"), preprocess=preprocess)
+    _FOLD_CACHES[key] = cache
+    return cache
+
+
+def _fit_and_score_fold(estimator: Any,
+                        paths: Dict[str, Path],
+                        scoring: Sequence[str],
+                        n_threads: int) -> Dict[str, float]:
+    """Ajusta un estimador en un fold (matrices mapeadas en memoria) y calcula los scorers."""
+    limit_worker_threads(n_threads)
+    X_train = np.load(paths['X_train'], mmap_mode='r')
+    y_train = np.load(paths['y_train'], mmap_mode='r')
+    X_test = np.load(paths['X_test'], mmap_mode='r')
+    y_test = np.load(paths['y_test'], mmap_mode='r')
+
+    estimator.fit(X_train, y_train)
+    return {name: float(get_scorer(name)(estimator, X_test, y_test)) for name in scoring}
+
+
+def parallel_cross_validate(estimator: Any,
+                            X: Union[pd.DataFrame, np.ndarray],
+                            y: Union[pd.Series, np.ndarray],
+                            cv: int = 5,
+                            scoring: Sequence[str] = DEFAULT_SCORING,
+                            n_jobs: int = -1,
+                            preprocess: bool = True) -> Dict[str, Any]:
+    """
+    Validación cruzada con folds en paralelo y preprocesamiento cacheado.
+
+    Equivale a ``cross_validate`` de sklearn sobre el pipeline imputador
+    (mediana) + escalador + estimador, con folds estratificados sin barajar.
+
+    Args:
+        estimator: Estimador de sklearn (sin preprocesamiento)
+        X: Características numéricas
+        y: Variable objetivo
+        cv: Número de folds
+        scoring: Nombres de scorers de sklearn a calcular en cada fold
+        n_jobs: Procesos (-1 usa los workers del plan de recursos)
+        preprocess: Si False, el estimador recibe X sin imputar ni escalar
+            (p. ej. modelos con tratamiento nativo de faltantes)
+
+    Returns:
+        Diccionario con 'cv_<scorer>_mean', 'cv_<scorer>_std' y 'cv_<scorer>_scores'
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    fold_cache = get_fold_cache(X, y, cv, preprocess)
+
+    plan = get_resource_plan()
+    n_workers = min(plan.resolve_n_jobs(n_jobs), cv)
+    n_threads = plan.threads_per_process(n_workers)
+    if estimator.get_params().get('n_jobs') is not None:
+        # Solo se ajustan los estimadores que ya paralelizan (p. ej. RandomForest)
+        estimator = clone(estimator).set_params(n_jobs=n_threads)
+
+    logger.info(f"🔄 Validación cruzada: {cv} folds en {n_workers} procesos ({n_threads} hilos por proceso)")
+    fold_scores = Parallel(n_jobs=n_workers)(
+        delayed(_fit_and_score_fold)(clone(estimator), paths, scoring, n_threads)
+        for paths in fold_cache.folds
+    )
+
+    metrics = {}
+    for name in scoring:
+        scores = np.array([fold[name] for fold in fold_scores])
+        metrics[f'cv_{name}_mean'] = float(scores.mean())
+        metrics[f'cv_{name}_std'] = float(scores.std())
+        metrics[f'cv_{name}_scores'] = scores.tolist()
+    return metrics
@@ -0,0 +1,115 @@
+"""
+Módulo de crecimiento adaptativo de random forests.
+
+En lugar de entrenar siempre un número fijo de árboles, el bosque crece por
+incrementos con ``warm_start`` y se detiene cuando la métrica out-of-bag
+(OOB) deja de mejorar. Las predicciones OOB se acumulan árbol a árbol: cada
+incremento solo evalúa los árboles nuevos sobre sus filas no muestreadas, de
+modo que medir la curva no cuesta más que una única evaluación OOB final.
+Con ``max_samples`` cada árbol ve una fracción de las filas, lo que acelera
+el entrenamiento y deja más filas OOB por árbol.
+"""
+
+import time
+from typing import Any, Dict, List, Tuple
+import logging
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+
+logger = logging.getLogger(__name__)
+
+# Árboles añadidos en cada incremento
+DEFAULT_GROWTH_STEP = 25
+
+# Mejora mínima del ROC-AUC OOB para considerar que el bosque sigue mejorando
+DEFAULT_OOB_TOLERANCE = 1e-3
+
+# Incrementos consecutivos sin mejora antes de detenerse
+DEFAULT_OOB_PATIENCE = 2
+
+
+def _oob_tree_proba(tree: Any, X: np.ndarray, sampled: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Probabilidades de un árbol sobre las filas que no usó para entrenar."""
+    unsampled = np.ones(len(X), dtype=bool)
+    unsampled[sampled] = False
+    rows = np.flatnonzero(unsampled)
+    return rows, tree.predict_proba(X[rows], check_input=False)
+
+
+def grow_forest(forest: RandomForestClassifier,
+                X: np.ndarray,
+                y: np.ndarray,
+                step: int = DEFAULT_GROWTH_STEP,
+                tolerance: float = DEFAULT_OOB_TOLERANCE,
+                patience: int = DEFAULT_OOB_PATIENCE) -> Tuple[RandomForestClassifier, List[Dict[str, Any]]]:
+    """
+    Hace crecer un random forest hasta que el ROC-AUC OOB se estabiliza.
+
+    El ``n_estimators`` del bosque es el máximo de árboles; el resto de sus
+    parámetros (``max_samples``, profundidad, ``n_jobs``...) se respetan.
+
+    Args:
+        forest: RandomForestClassifier sin entrenar (con bootstrap)
+        X: Características ya imputadas y escaladas
+        y: Variable objetivo binaria
+        step: Árboles añadidos en cada incremento
+        tolerance: Mejora mínima del ROC-AUC OOB
+        patience: Incrementos sin mejora antes de detenerse
+
+    Returns:
+        Tuple con el bosque entrenado y la curva (árboles, ROC-AUC y accuracy OOB, segundos)
+    """
+    if not forest.bootstrap:
+        raise ValueError("El crecimiento adaptativo necesita bootstrap=True para medir el error OOB")
+    max_estimators = forest.n_estimators
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.asarray(y)
+
+    proba_sum, votes = None, np.zeros(len(X))
+    curve: List[Dict[str, Any]] = []
+    best_score, stalled = -np.inf, 0
+    start = time.perf_counter()
+
+    n_trees = 0
+    while n_trees < max_estimators:
+        previous = n_trees
+        n_trees = min(n_trees + step, max_estimators)
+        forest.set_params(n_estimators=n_trees, warm_start=True)
+        forest.fit(X, y)
+
+        # Solo los árboles nuevos; estimators_samples_ regenera los índices muestreados con la semilla de cada árbol
+        new_trees = zip(forest.estimators_[previous:], forest.estimators_samples_[previous:])
+        results = Parallel(n_jobs=forest.n_jobs, prefer='threads')(
+            delayed(_oob_tree_proba)(tree, X, sampled) for tree, sampled in new_trees
+        )
+        if proba_sum is None:
+            proba_sum = np.zeros((len(X), len(forest.classes_)))
+        for rows, proba in results:
+            proba_sum[rows] += proba
+            votes[rows] += 1
+
+        scored = votes > 0
+        oob_proba = proba_sum[scored] / votes[scored, None]
+        score = roc_auc_score(y[scored], oob_proba[:, 1])
+        curve.append({
+            'n_estimators': n_trees,
+            'oob_roc_auc': float(score),
+            'oob_accuracy': float(np.mean(forest.classes_[oob_proba.argmax(axis=1)] == y[scored])),
+            'oob_coverage': float(scored.mean()),
+            'seconds': time.perf_counter() - start
+        })
+        logger.info(f"   {n_trees} árboles - ROC-AUC OOB: {score:.4f}")
+
+        if score > best_score + tolerance:
+            best_score, stalled = score, 0
+        else:
+            stalled += 1
+            if stalled >= patience:
+                logger.info(f"🛑 ROC-AUC OOB estable durante {patience} incrementos; se detiene en {n_trees} árboles")
+                break
+
+    forest.set_params(warm_start=False)
+    return forest, curve
@@ -0,0 +1,236 @@
+"""
+Módulo de entrenamiento incremental (fuera de memoria) de modelos lineales.
+
+Este módulo entrena el pipeline imputador + escalador + SGDClassifier
+recorriendo la matriz de modelado por bloques de filas, de modo que la
+memoria queda acotada por el tamaño de bloque y no por el de la matriz
+(que puede estar abierta con memory-mapping). Las medianas del imputador se
+estiman con una muestra de reservorio de tamaño fijo, el escalador se ajusta
+con partial_fit y el modelo recorre varias épocas con los bloques en orden
+aleatorio, guardando un checkpoint al final de cada época. El checkpoint
+solo se reutiliza con los mismos datos e hiperparámetros y se borra al
+terminar el entrenamiento.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+import hashlib
+import logging
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import classification_report, confusion_matrix, f1_score, roc_auc_score
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from ..resource_planner import get_resource_plan
+
+logger = logging.getLogger(__name__)
+
+# Filas de la muestra de reservorio con la que se estiman las medianas
+RESERVOIR_ROWS = 100_000
+
+# Épocas por defecto sobre la matriz completa
+DEFAULT_EPOCHS = 5
+
+
+class ReservoirSample:
+    """
+    Muestra aleatoria uniforme de tamaño fijo de un flujo de bloques de filas.
+
+    Cada fila recibe una clave aleatoria y se conservan las max_rows filas con
+    menor clave; mientras el flujo no supera max_rows la muestra es exacta.
+    """
+
+    def __init__(self, max_rows: int = RESERVOIR_ROWS, random_state: int = 42):
+        """
+        Inicializa la muestra vacía.
+
+        Args:
+            max_rows: Filas máximas conservadas
+            random_state: Semilla de las claves aleatorias
+        """
+        self.max_rows = max_rows
+        self.rng = np.random.default_rng(random_state)
+        self.rows: Optional[np.ndarray] = None
+        self.keys = np.empty(0)
+
+    def update(self, chunk: np.ndarray) -> None:
+        """
+        Incorpora un bloque de filas a la muestra.
+
+        Args:
+            chunk: Bloque de filas (n_filas, n_columnas)
+        """
+        keys = np.concatenate([self.keys, self.rng.random(len(chunk))])
+        rows = chunk if self.rows is None else np.concatenate([self.rows, chunk])
+        if len(keys) > self.max_rows:
+            keep = np.argpartition(keys, self.max_rows)[:self.max_rows]
+            keys, rows = keys[keep], rows[keep]
+        self.keys, self.rows = keys, np.array(rows)
+
+
+def iter_row_chunks(X: pd.DataFrame, chunk_rows: int, order: Optional[np.ndarray] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Recorre un DataFrame por bloques contiguos de filas.
+
+    Args:
+        X: DataFrame (puede estar respaldado por un array con memory-mapping)
+        chunk_rows: Filas por bloque
+        order: Orden de los bloques (por defecto, secuencial)
+
+    Yields:
+        Tuple con la fila inicial del bloque y sus columnas numéricas como array float64
+    """
+    n_chunks = max(int(np.ceil(len(X) / chunk_rows)), 1)
+    for chunk_id in (order if order is not None else range(n_chunks)):
+        start = int(chunk_id) * chunk_rows
+        chunk = X.iloc[start:start + chunk_rows]
+        yield start, chunk.select_dtypes(include=np.number).to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def data_fingerprint(X: pd.DataFrame, y: pd.Series, chunk_rows: int) -> str:
+    """
+    Huella del contenido de X e y, calculada por bloques.
+
+    Args:
+        X: DataFrame de características (puede estar respaldado por memory-mapping)
+        y: Series con variable objetivo
+        chunk_rows: Filas por bloque
+
+    Returns:
+        Hash hexadecimal de las columnas numéricas de X y de y
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(X.select_dtypes(include=np.number).columns.tolist()).encode())
+    for _, chunk in iter_row_chunks(X, chunk_rows):
+        digest.update(np.ascontiguousarray(chunk).tobytes())
+    digest.update(np.ascontiguousarray(np.asarray(y)).tobytes())
+    return digest.hexdigest()
+
+
+def train_incremental_logistic(X: pd.DataFrame,
+                               y: pd.Series,
+                               params: Optional[Dict[str, Any]] = None,
+                               epochs: int = DEFAULT_EPOCHS,
+                               chunk_rows: Optional[int] = None,
+                               test_size: float = 0.2,
+                               checkpoint_path: Optional[Union[str, Path]] = None,
+                               random_state: int = 42) -> Tuple[Pipeline, Dict[str, Any]]:
+    """
+    Entrena una regresión logística por SGD sin cargar la matriz entera.
+
+    Las filas de prueba se eligen con una máscara aleatoria (test_size) y se
+    excluyen de todos los ajustes. Si checkpoint_path existe y corresponde a
+    los mismos datos, hiperparámetros, épocas y partición, el entrenamiento
+    continúa desde la última época guardada; el checkpoint se borra al
+    completar todas las épocas.
+
+    Args:
+        X: DataFrame de características (puede estar respaldado por memory-mapping)
+        y: Series con variable objetivo
+        params: Hiperparámetros de SGDClassifier (la pérdida es siempre logística)
+        epochs: Épocas sobre los bloques de entrenamiento
+        chunk_rows: Filas por bloque (por defecto, las del plan de recursos)
+        test_size: Proporción de filas reservadas para evaluación
+        checkpoint_path: Fichero de checkpoint entre épocas
+        random_state: Semilla de la partición, del orden de los bloques y del modelo
+
+    Returns:
+        Tuple con el pipeline (imputador, escalador, modelo) y las métricas sobre las filas de prueba
+    """
+    chunk_rows = chunk_rows or get_resource_plan().chunk_rows
+    n_chunks = max(int(np.ceil(len(X) / chunk_rows)), 1)
+    rng = np.random.default_rng(random_state)
+    y_array = np.asarray(y)
+    is_test = rng.random(len(X)) < test_size
+    classes = np.unique(y_array)
+    feature_names = X.select_dtypes(include=np.number).columns
+
+    def as_frame(rows: np.ndarray) -> pd.DataFrame:
+        # El pipeline conserva los nombres de columna, como el de los demás modelos
+        return pd.DataFrame(rows, columns=feature_names, copy=False)
+
+    model_params = {'alpha': 1e-4, 'random_state': random_state, **(params or {}), 'loss': 'log_loss'}
+
+    checkpoint = None
+    if checkpoint_path is not None:
+        signature = {
+            'shape': list(X.shape), 'chunk_rows': chunk_rows, 'random_state': random_state,
+            'params': model_params, 'epochs': epochs, 'test_size': test_size,
+            'data': data_fingerprint(X, y, chunk_rows)
+        }
+        if Path(checkpoint_path).exists():
+            checkpoint = joblib.load(checkpoint_path)
+            if checkpoint.get('signature') != signature:
+                logger.warning(f"⚠️ Checkpoint {checkpoint_path} de otros datos o hiperparámetros; se entrena desde cero")
+                checkpoint = None
+
+    if checkpoint is not None:
+        imputer, scaler, model = checkpoint['imputer'], checkpoint['scaler'], checkpoint['model']
+        start_epoch = checkpoint['epoch']
+        logger.info(f"♻️ Reanudando desde el checkpoint de la época {start_epoch}/{epochs}")
+    else:
+        logger.info(f"📊 Estimando medianas y escala por bloques ({n_chunks} bloques de {chunk_rows} filas)...")
+        sample = ReservoirSample(random_state=random_state)
+        for start, chunk in iter_row_chunks(X, chunk_rows):
+            sample.update(chunk[~is_test[start:start + len(chunk)]])
+        imputer = SimpleImputer(strategy='median', keep_empty_features=True).fit(as_frame(sample.rows))
+
+        scaler = StandardScaler()
+        for start, chunk in iter_row_chunks(X, chunk_rows):
+            train_rows = ~is_test[start:start + len(chunk)]
+            if train_rows.any():
+                scaler.partial_fit(imputer.transform(as_frame(chunk[train_rows])))
+
+        model = SGDClassifier(**model_params)
+        start_epoch = 0
+
+    for epoch in range(start_epoch, epochs):
+        # Orden de bloques y de filas distinto en cada época, reproducible por semilla
+        epoch_rng = np.random.default_rng([random_state, epoch])
+        for start, chunk in iter_row_chunks(X, chunk_rows, order=epoch_rng.permutation(n_chunks)):
+            rows = np.flatnonzero(~is_test[start:start + len(chunk)])
+            if len(rows) == 0:
+                continue
+            rows = epoch_rng.permutation(rows)
+            model.partial_fit(
+                scaler.transform(imputer.transform(as_frame(chunk[rows]))), y_array[start + rows], classes=classes
+            )
+
+        if checkpoint_path is not None:
+            Path(checkpoint_path).parent.mkdir(parents=True, exist_ok=True)
+            joblib.dump(
+                {'signature': signature, 'epoch': epoch + 1, 'imputer': imputer, 'scaler': scaler, 'model': model},
+                checkpoint_path
+            )
+        logger.info(f"   Época {epoch + 1}/{epochs} completada")
+
+    if checkpoint_path is not None:
+        # El checkpoint solo sirve para reanudar un entrenamiento interrumpido
+        Path(checkpoint_path).unlink(missing_ok=True)
+
+    pipeline = Pipeline([('imputer', imputer), ('scaler', scaler), ('model', model)])
+
+    # Evaluar sobre las filas de prueba, también por bloques
+    y_test, y_pred, y_pred_proba = [], [], []
+    for start, chunk in iter_row_chunks(X, chunk_rows):
+        rows = np.flatnonzero(is_test[start:start + len(chunk)])
+        if len(rows) == 0:
+            continue
+        y_test.append(y_array[start + rows])
+        y_pred_proba.append(pipeline.predict_proba(as_frame(chunk[rows]))[:, 1])
+        y_pred.append(pipeline.predict(as_frame(chunk[rows])))
+    y_test, y_pred, y_pred_proba = np.concatenate(y_test), np.concatenate(y_pred), np.concatenate(y_pred_proba)
+
+    metrics = {
+        'accuracy': float(np.mean(y_pred == y_test)),
+        'f1_score': f1_score(y_test, y_pred),
+        'roc_auc': roc_auc_score(y_test, y_pred_proba),
+        'classification_report': classification_report(y_test, y_pred, zero_division=0),
+        'confusion_matrix': confusion_matrix(y_test, y_pred)
+    }
+    return pipeline, metrics
@@ -22,6 +22,9 @@ from pathlib import Path
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from ..resource_planner import get_resource_plan
+from .artifacts import ARTIFACT_SUFFIX, compress_artifact, is_artifact, load_artifact, save_artifact
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -53,6 +56,13 @@ class NeuralNetworkModel:
             tf.get_logger().setLevel('ERROR')
         except:
             pass
+        
+        # Hilos de TensorFlow según el plan de recursos (solo antes de inicializar el runtime)
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(get_resource_plan().n_cpus)
+            tf.config.threading.set_inter_op_parallelism_threads(min(get_resource_plan().n_cpus, 2))
+        except RuntimeError:
+            pass
     
     def build_model(self) -> keras.Model:
         """
@@ -292,12 +302,18 @@ class NeuralNetworkModel:
         X_processed = self.pipeline.transform(X[numeric_cols])
         return self.model.predict(X_processed)
     
-    def save_model(self, filepath: str):
+    def save_model(self, filepath: str, compress: bool = False):
         """
         Guarda el modelo entrenado.
         
+        Con la extensión .tdsp se guarda un único artefacto: las matrices de
+        pesos como secciones mapeables en memoria, la arquitectura en el
+        manifiesto y el preprocesador; con otra extensión, .keras más el
+        preprocesador en pickle.
+        
         Args:
             filepath: Ruta donde guardar el modelo
+            compress: Si True (solo artefactos), genera además una copia .gz para distribuir
         """
         if not self.is_fitted:
             raise ValueError("El modelo debe estar entrenado antes de guardarlo")
@@ -305,6 +321,23 @@ class NeuralNetworkModel:
         # Crear directorio si no existe
         Path(filepath).parent.mkdir(parents=True, exist_ok=True)
         
+        if Path(filepath).suffix == ARTIFACT_SUFFIX:
+            numeric_cols = list(getattr(self.imputer, 'feature_names_in_', []))
+            save_artifact(
+                filepath,
+                {'preprocessor': self.pipeline, 'weights': self.model.get_weights()},
+                feature_schema={'columns': numeric_cols} if numeric_cols else None,
+                metadata={
+                    'model_type': 'MLP',
+                    'input_dim': self.input_dim,
+                    'architecture': self.architecture,
+                    'keras_config': self.model.to_json()
+                }
+            )
+            if compress:
+                compress_artifact(filepath)
+            return
+        
         # Guardar modelo Keras y pipeline preprocesador por separado
         self.model.save(filepath.replace('.pkl', '.keras'))
         joblib.dump(self.pipeline, filepath.replace('.pkl', '_preprocessor.pkl'))
@@ -312,15 +345,26 @@ class NeuralNetworkModel:
         logger.info(f"✅ Modelo Keras guardado en {filepath.replace('.pkl', '.keras')}")
         logger.info(f"✅ Preprocesador guardado en {filepath.replace('.pkl', '_preprocessor.pkl')}")
     
-    def load_model(self, filepath: str):
+    def load_model(self, filepath: str, mmap: bool = False):
         """
         Carga un modelo guardado.
         
         Args:
-            filepath: Ruta del modelo a cargar
+            filepath: Ruta del modelo a cargar (.tdsp, .tdsp.gz o la ruta .pkl de referencia)
+            mmap: Si True y es un artefacto, lee los pesos desde el fichero mapeado
         """
-        self.model = keras.models.load_model(filepath.replace('.pkl', '.keras'))
-        self.pipeline = joblib.load(filepath.replace('.pkl', '_preprocessor.pkl'))
+        if is_artifact(filepath):
+            objects, manifest = load_artifact(filepath, mmap=mmap)
+            metadata = manifest['metadata']
+            self.input_dim = metadata['input_dim']
+            self.architecture = metadata['architecture']
+            # Keras copia los pesos a sus variables; el mapeo evita la lectura y copia intermedias
+            self.model = keras.models.model_from_json(metadata['keras_config'])
+            self.model.set_weights(objects['weights'])
+            self.pipeline = objects['preprocessor']
+        else:
+            self.model = keras.models.load_model(filepath.replace('.pkl', '.keras'))
+            self.pipeline = joblib.load(filepath.replace('.pkl', '_preprocessor.pkl'))
         self.scaler = self.pipeline.named_steps['scaler']
         self.imputer = self.pipeline.named_steps['imputer']
         self.is_fitted = True
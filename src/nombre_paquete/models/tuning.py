@@ -0,0 +1,256 @@
+"""
+Módulo de búsqueda de hiperparámetros por successive halving.
+
+Este módulo evalúa muchas configuraciones con poco recurso (pocos árboles o
+un subconjunto de filas) y solo promociona a la siguiente ronda la mejor
+fracción 1/eta, que recibe eta veces más recurso, hasta llegar al recurso
+completo. Las pruebas de cada ronda se ejecutan en procesos paralelos sobre
+una partición entrenamiento/validación ya imputada y escalada (cacheada y
+mapeada en memoria) y cada prueba terminada se añade a un registro JSONL,
+de modo que una búsqueda interrumpida se reanuda sin repetir pruebas.
+"""
+
+import hashlib
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import logging
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.impute import SimpleImputer
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from ..resource_planner import get_resource_plan, limit_worker_threads
+from .cross_validation import get_fold_cache
+
+logger = logging.getLogger(__name__)
+
+# Recurso que se reparte en cada ronda: número de árboles o filas de entrenamiento
+RESOURCE_N_SAMPLES = 'n_samples'
+
+# Recurso mínimo de la primera ronda
+MIN_RESOURCE = {'n_estimators': 10, RESOURCE_N_SAMPLES: 500}
+
+# Folds de la caché cuyo primer fold sirve de partición de validación (80/20)
+VALIDATION_FOLDS = 5
+
+
+def _params_key(params: Dict[str, Any]) -> str:
+    """Representación canónica de una configuración (clave del registro)."""
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def _to_builtin(value: Any) -> Any:
+    """Convierte escalares de numpy a tipos de Python serializables en JSON."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _run_trial(estimator: Any,
+               params: Dict[str, Any],
+               resource: str,
+               amount: int,
+               paths: Dict[str, Path],
+               scoring: str,
+               n_threads: int,
+               random_state: int) -> float:
+    """Entrena una configuración con el recurso indicado y la puntúa en validación."""
+    limit_worker_threads(n_threads)
+    X_train = np.load(paths['X_train'], mmap_mode='r')
+    y_train = np.load(paths['y_train'], mmap_mode='r')
+    X_valid = np.load(paths['X_test'], mmap_mode='r')
+    y_valid = np.load(paths['y_test'], mmap_mode='r')
+
+    estimator = clone(estimator).set_params(**params)
+    if resource == RESOURCE_N_SAMPLES:
+        # Subconjuntos anidados: las filas de una ronda incluyen las de la anterior
+        rows = np.sort(np.random.default_rng(random_state).permutation(len(y_train))[:amount])
+        X_train, y_train = X_train[rows], y_train[rows]
+    else:
+        estimator.set_params(**{resource: amount})
+
+    estimator.fit(X_train, y_train)
+    return float(get_scorer(scoring)(estimator, X_valid, y_valid))
+
+
+class SuccessiveHalvingSearch:
+    """
+    Búsqueda de hiperparámetros por successive halving.
+
+    El presupuesto se expresa en entrenamientos completos equivalentes: cada
+    ronda gasta aproximadamente budget / n_rondas, de modo que la primera
+    ronda prueba muchas configuraciones baratas y la última unas pocas con el
+    recurso completo.
+    """
+
+    def __init__(self,
+                 estimator: Any,
+                 space: Dict[str, Any],
+                 budget: float = 10,
+                 resource: str = RESOURCE_N_SAMPLES,
+                 max_resource: Optional[int] = None,
+                 eta: int = 3,
+                 scoring: str = 'roc_auc',
+                 log_path: Optional[Union[str, Path]] = None,
+                 n_jobs: int = -1,
+                 random_state: int = 42):
+        """
+        Configura la búsqueda.
+
+        Args:
+            estimator: Estimador de sklearn (sin preprocesamiento)
+            space: Parámetro -> lista de valores o distribución de scipy.stats
+            budget: Presupuesto en entrenamientos completos equivalentes
+            resource: 'n_samples' (filas de entrenamiento) o un parámetro entero del estimador
+            max_resource: Recurso completo (por defecto, todas las filas o el valor del estimador)
+            eta: Factor de reducción entre rondas
+            scoring: Scorer de sklearn usado para ordenar las configuraciones
+            log_path: Registro JSONL de pruebas (permite reanudar la búsqueda)
+            n_jobs: Procesos (-1 usa los workers del plan de recursos)
+            random_state: Semilla del muestreo de configuraciones y subconjuntos
+        """
+        if resource in space:
+            raise ValueError(f"El recurso {resource} no puede formar parte del espacio de búsqueda")
+        self.estimator = estimator
+        self.space = space
+        self.budget = budget
+        self.resource = resource
+        self.max_resource = max_resource
+        self.eta = eta
+        self.scoring = scoring
+        self.log_path = Path(log_path) if log_path is not None else None
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.trials: List[Dict[str, Any]] = []
+        self.best_params_: Optional[Dict[str, Any]] = None
+        self.best_score_: Optional[float] = None
+
+    def _schedule(self, max_resource: int) -> List[int]:
+        """Recurso de cada ronda, de la más barata a la completa."""
+        min_resource = min(MIN_RESOURCE.get(self.resource, 1), max_resource)
+        n_rounds = int(math.floor(math.log(max_resource / min_resource, self.eta) + 1e-9)) + 1
+        return [
+            max(int(max_resource / self.eta ** (n_rounds - 1 - i)), 1)
+            for i in range(n_rounds)
+        ]
+
+    def _load_log(self, data_key: str) -> Dict[tuple, float]:
+        """Lee las pruebas ya registradas para estos datos."""
+        done = {}
+        if self.log_path is None or not self.log_path.exists():
+            return done
+        with open(self.log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get('data') == data_key and record.get('resource') == self.resource:
+                    done[(_params_key(record['params']), record['amount'])] = record['score']
+        return done
+
+    def _log_trial(self, record: Dict[str, Any]) -> None:
+        """Añade una prueba terminada al registro."""
+        self.trials.append(record)
+        if self.log_path is None:
+            return
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, default=str) + '\n')
+
+    def fit(self, X: Union[pd.DataFrame, np.ndarray], y: Union[pd.Series, np.ndarray]) -> Pipeline:
+        """
+        Ejecuta la búsqueda y reentrena la mejor configuración con todos los datos.
+
+        Args:
+            X: Características numéricas
+            y: Variable objetivo
+
+        Returns:
+            Pipeline (imputador, escalador, modelo) entrenado con la mejor configuración
+        """
+        X_array = np.asarray(X)
+        y_array = np.asarray(y)
+        paths = get_fold_cache(X_array, y_array, VALIDATION_FOLDS).folds[0]
+        n_train = len(np.load(paths['y_train'], mmap_mode='r'))
+
+        max_resource = self.max_resource
+        if max_resource is None:
+            max_resource = n_train if self.resource == RESOURCE_N_SAMPLES else self.estimator.get_params()[self.resource]
+        schedule = self._schedule(int(max_resource))
+
+        # Las configuraciones dependen solo de la semilla: al reanudar se repiten las mismas
+        per_round = self.budget / len(schedule)
+        n_candidates = max(int(math.ceil(per_round * max_resource / schedule[0])), 1)
+        if all(isinstance(values, list) for values in self.space.values()):
+            n_candidates = min(n_candidates, len(ParameterGrid(self.space)))
+        candidates = [
+            {name: _to_builtin(value) for name, value in params.items()}
+            for params in ParameterSampler(self.space, n_iter=n_candidates, random_state=self.random_state)
+        ]
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(memoryview(np.ascontiguousarray(X_array)).cast('B'))
+        digest.update(memoryview(np.ascontiguousarray(y_array)).cast('B'))
+        digest.update(f"{type(self.estimator).__name__}|{self.scoring}|{self.random_state}".encode())
+        data_key = digest.hexdigest()
+        done = self._load_log(data_key)
+        if done:
+            logger.info(f"♻️ Reanudando búsqueda: {len(done)} pruebas ya registradas en {self.log_path}")
+
+        plan = get_resource_plan()
+        logger.info(
+            f"🔎 Successive halving: {len(candidates)} configuraciones, "
+            f"{self.resource} por ronda {schedule}, eta={self.eta}"
+        )
+
+        for rung, amount in enumerate(schedule):
+            pending = [params for params in candidates if (_params_key(params), amount) not in done]
+            n_workers = max(min(plan.resolve_n_jobs(self.n_jobs), len(pending)), 1)
+            n_threads = plan.threads_per_process(n_workers)
+            estimator = self.estimator
+            if estimator.get_params().get('n_jobs') is not None:
+                estimator = clone(estimator).set_params(n_jobs=n_threads)
+
+            scores = Parallel(n_jobs=n_workers, return_as='generator')(
+                delayed(_run_trial)(
+                    estimator, params, self.resource, amount, paths, self.scoring, n_threads, self.random_state
+                )
+                for params in pending
+            )
+            for params, score in zip(pending, scores):
+                done[(_params_key(params), amount)] = score
+                self._log_trial({
+                    'data': data_key, 'resource': self.resource, 'rung': rung,
+                    'amount': amount, 'params': params, 'score': score
+                })
+
+            ranked = sorted(candidates, key=lambda params: done[(_params_key(params), amount)], reverse=True)
+            best_score = done[(_params_key(ranked[0]), amount)]
+            logger.info(
+                f"   Ronda {rung + 1}/{len(schedule)}: {len(candidates)} configuraciones con "
+                f"{self.resource}={amount} - mejor {self.scoring}: {best_score:.4f}"
+            )
+            if rung < len(schedule) - 1:
+                candidates = ranked[:max(len(candidates) // self.eta, 1)]
+
+        self.best_params_ = ranked[0]
+        self.best_score_ = best_score
+        logger.info(f"🏆 Mejor configuración: {self.best_params_} ({self.scoring}={self.best_score_:.4f})")
+
+        # Reentrenar la mejor configuración con el recurso completo y todos los datos
+        final_estimator = clone(self.estimator).set_params(**self.best_params_)
+        if self.resource != RESOURCE_N_SAMPLES:
+            final_estimator.set_params(**{self.resource: schedule[-1]})
+        pipeline = Pipeline([
+            ('imputer', SimpleImputer(strategy='median')),
+            ('scaler', StandardScaler()),
+            ('model', final_estimator)
+        ])
+        pipeline.fit(X, y)
+        return pipeline
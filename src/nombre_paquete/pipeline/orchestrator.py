@@ -0,0 +1,501 @@
+"""
+Módulo del orquestador del pipeline de extremo a extremo.
+
+Este módulo modela las etapas del proyecto (adquisición, preprocesamiento,
+entrenamiento y evaluación) como un grafo dirigido acíclico con entradas y
+salidas declaradas. Cada etapa se identifica por el hash de sus entradas, de
+su código y de sus parámetros; si ese hash ya se ejecutó, sus artefactos se
+recuperan de una caché direccionada por contenido en lugar de recalcularse.
+Las etapas independientes (p. ej. los modelos baseline y la red neuronal) se
+ejecutan en paralelo.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+import logging
+
+from ..resource_planner import get_resource_plan
+
+logger = logging.getLogger(__name__)
+
+# Carpeta por defecto de la caché de artefactos (relativa a la raíz del proyecto)
+PIPELINE_CACHE_DIR = Path(".pipeline_cache")
+
+# Estados posibles de una etapa tras ejecutar el pipeline
+STAGE_STATUSES = ('ran', 'cached', 'restored', 'failed', 'skipped')
+
+# Tamaño de bloque al calcular el hash de ficheros grandes
+HASH_BLOCK_SIZE = 1 << 20
+
+# Ficheros ignorados al calcular el hash de una carpeta de código o datos
+IGNORED_NAMES = {'__pycache__', '.DS_Store'}
+IGNORED_SUFFIXES = ('.pyc', '.tmp')
+
+
+def python_dependencies(script: Union[str, Path],
+                        package_dir: Union[str, Path],
+                        root: Union[str, Path] = '.',
+                        exclude: Iterable[Union[str, Path]] = ()) -> List[Path]:
+    """
+    Código del que depende un script: él mismo y los módulos del paquete que importa.
+
+    Sigue de forma transitiva los imports (absolutos y relativos, también los
+    que están dentro de funciones) hacia el paquete, incluidos los __init__.py
+    que Python ejecuta al importar un submódulo. Así la clave de una etapa
+    cambia con cualquier módulo que use, sin mantener la lista a mano.
+
+    Args:
+        script: Script de la etapa (relativo a root)
+        package_dir: Carpeta del paquete (relativa a root), p. ej. src/nombre_paquete
+        root: Raíz del proyecto
+        exclude: Módulos que el script importa pero la etapa no usa (no se siguen)
+
+    Returns:
+        Lista ordenada de ficheros .py relativos a root
+    """
+    root, package_dir = Path(root), Path(package_dir)
+    excluded = {Path(path) for path in exclude}
+    source_dir = package_dir.parent
+
+    def module_files(module: str) -> List[Path]:
+        parts = module.split('.')
+        if parts[0] != package_dir.name:
+            return []
+        files = [source_dir.joinpath(*parts[:depth], '__init__.py') for depth in range(1, len(parts) + 1)]
+        files.append(source_dir.joinpath(*parts).with_suffix('.py'))
+        return [path for path in files if (root / path).is_file()]
+
+    found = set()
+    pending = [Path(script)]
+    while pending:
+        path = pending.pop()
+        if path in found or path in excluded:
+            continue
+        found.add(path)
+        for node in ast.walk(ast.parse((root / path).read_text(encoding='utf-8'), filename=str(path))):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ''
+                if node.level:
+                    package_parts = path.parent.relative_to(source_dir).parts
+                    package_parts = package_parts[:len(package_parts) - node.level + 1]
+                    base = '.'.join(package_parts + ((node.module,) if node.module else ()))
+                # 'from paquete import modulo' puede importar un submódulo
+                modules = [base] + [f"{base}.{alias.name}" for alias in node.names]
+            else:
+                continue
+            for module in modules:
+                pending.extend(module_files(module))
+    return sorted(found)
+
+
+class Stage:
+    """
+    Etapa del pipeline con entradas, salidas, código y parámetros declarados.
+    """
+
+    def __init__(self,
+                 name: str,
+                 command: Sequence[str],
+                 inputs: Iterable[Union[str, Path]] = (),
+                 outputs: Iterable[Union[str, Path]] = (),
+                 code: Iterable[Union[str, Path]] = (),
+                 params: Optional[Dict[str, Any]] = None,
+                 depends_on: Iterable[str] = ()):
+        """
+        Define una etapa.
+
+        Args:
+            name: Nombre único de la etapa
+            command: Comando a ejecutar (lista de argumentos, desde la raíz del proyecto)
+            inputs: Ficheros o carpetas de datos que lee la etapa
+            outputs: Ficheros que produce la etapa (se guardan en la caché)
+            code: Ficheros o carpetas de código de los que depende el resultado
+            params: Parámetros de la etapa (deben ser serializables en JSON)
+            depends_on: Nombres de las etapas que deben terminar antes
+        """
+        self.name = name
+        self.command = [str(arg) for arg in command]
+        self.inputs = [Path(path) for path in inputs]
+        self.outputs = [Path(path) for path in outputs]
+        self.code = [Path(path) for path in code]
+        self.params = params or {}
+        self.depends_on = list(depends_on)
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, depends_on={self.depends_on})"
+
+
+class PipelineOrchestrator:
+    """
+    Ejecuta un grafo de etapas con caché de artefactos direccionada por contenido.
+
+    La clave de una etapa es el hash de (comando, parámetros, contenido de sus
+    entradas, contenido de su código). Como las entradas de una etapa son las
+    salidas de sus predecesoras, una etapa que vuelve a ejecutarse pero produce
+    exactamente los mismos artefactos no invalida a las siguientes.
+
+    Estructura de la caché:
+        objects/<hh>/<hash>          contenido de cada artefacto
+        stages/<etapa>/<clave>.json  artefactos producidos por cada clave
+        logs/<etapa>.log             salida de la última ejecución
+        file_hashes.json             hashes memorizados por (tamaño, mtime)
+    """
+
+    def __init__(self,
+                 stages: Sequence[Stage],
+                 root: Union[str, Path] = ".",
+                 cache_dir: Union[str, Path] = PIPELINE_CACHE_DIR,
+                 max_workers: Optional[int] = None):
+        """
+        Inicializa el orquestador y valida el grafo.
+
+        Args:
+            stages: Etapas del pipeline
+            root: Raíz del proyecto (directorio de trabajo de los comandos)
+            cache_dir: Carpeta de la caché (relativa a root si no es absoluta)
+            max_workers: Etapas simultáneas como máximo (None usa los workers del plan de recursos)
+        """
+        self.root = Path(root).resolve()
+        self.cache_dir = self.root / cache_dir
+        self.max_workers = max_workers or get_resource_plan().n_workers
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Los nombres de las etapas deben ser únicos")
+        for stage in stages:
+            unknown = [dep for dep in stage.depends_on if dep not in self.stages]
+            if unknown:
+                raise ValueError(f"La etapa {stage.name} depende de etapas desconocidas: {unknown}")
+        self.order = self._topological_order()
+
+        self._hash_lock = threading.Lock()
+        self._file_hashes = self._load_file_hashes()
+
+    def _topological_order(self) -> List[str]:
+        """Orden topológico estable (en el orden de declaración); falla si hay ciclos."""
+        order, state = [], {}
+
+        def visit(name: str, path: List[str]):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Ciclo en el pipeline: {' -> '.join(path + [name])}")
+            state[name] = 'visiting'
+            for dep in self.stages[name].depends_on:
+                visit(dep, path + [name])
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return order
+
+    def _with_ancestors(self, targets: Optional[Iterable[str]]) -> List[str]:
+        """Etapas necesarias para producir los objetivos, en orden topológico."""
+        if targets is None:
+            return list(self.order)
+        selected, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise ValueError(f"Etapa desconocida: {name}")
+            if name not in selected:
+                selected.add(name)
+                stack.extend(self.stages[name].depends_on)
+        return [name for name in self.order if name in selected]
+
+    # ------------------------------------------------------------------
+    # Hashes de contenido
+    # ------------------------------------------------------------------
+
+    def _load_file_hashes(self) -> Dict[str, Any]:
+        """Lee los hashes de ficheros memorizados en ejecuciones anteriores."""
+        path = self.cache_dir / "file_hashes.json"
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _save_file_hashes(self) -> None:
+        """Guarda los hashes de ficheros memorizados."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with self._hash_lock:
+            snapshot = dict(self._file_hashes)
+        tmp_path = self.cache_dir / "file_hashes.json.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.cache_dir / "file_hashes.json")
+
+    def file_hash(self, path: Path) -> str:
+        """
+        Hash SHA-256 del contenido de un fichero.
+
+        El resultado se memoriza por (tamaño, mtime) para no releer artefactos
+        grandes que no han cambiado.
+
+        Args:
+            path: Ruta del fichero
+
+        Returns:
+            Hash hexadecimal del contenido
+        """
+        path = self._absolute(path)
+        stat = path.stat()
+        signature = [stat.st_size, stat.st_mtime_ns]
+        key = str(path)
+        with self._hash_lock:
+            cached = self._file_hashes.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        content_hash = digest.hexdigest()
+        with self._hash_lock:
+            self._file_hashes[key] = [signature, content_hash]
+        return content_hash
+
+    def path_hash(self, path: Path) -> str:
+        """
+        Hash del contenido de un fichero o, recursivamente, de una carpeta.
+
+        Args:
+            path: Ruta relativa a la raíz del proyecto o absoluta
+
+        Returns:
+            Hash hexadecimal ('missing' si la ruta no existe)
+        """
+        path = self._absolute(path)
+        if path.is_file():
+            return self.file_hash(path)
+        if not path.is_dir():
+            return 'missing'
+
+        digest = hashlib.sha256()
+        for file_path in sorted(path.rglob('*')):
+            relative = file_path.relative_to(path)
+            if not file_path.is_file() or IGNORED_NAMES & set(relative.parts) or file_path.suffix in IGNORED_SUFFIXES:
+                continue
+            digest.update(f"{relative.as_posix()}:{self.file_hash(file_path)}\n".encode())
+        return digest.hexdigest()
+
+    def stage_key(self, name: str) -> str:
+        """
+        Clave de caché de una etapa con el estado actual de sus entradas.
+
+        Args:
+            name: Nombre de la etapa
+
+        Returns:
+            Hash hexadecimal de comando, parámetros, entradas y código
+        """
+        stage = self.stages[name]
+        fingerprint = {
+            'command': stage.command,
+            'params': stage.params,
+            'inputs': {path.as_posix(): self.path_hash(path) for path in stage.inputs},
+            'code': {path.as_posix(): self.path_hash(path) for path in stage.code},
+            'outputs': [path.as_posix() for path in stage.outputs]
+        }
+        payload = json.dumps(fingerprint, sort_keys=True, default=str).encode()
+        return hashlib.sha256(payload).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Caché de artefactos
+    # ------------------------------------------------------------------
+
+    def _absolute(self, path: Path) -> Path:
+        """Ruta absoluta respecto a la raíz del proyecto."""
+        path = Path(path)
+        return path if path.is_absolute() else self.root / path
+
+    def _object_path(self, content_hash: str) -> Path:
+        """Ruta del objeto de caché con un contenido dado."""
+        return self.cache_dir / "objects" / content_hash[:2] / content_hash
+
+    def _record_path(self, name: str, key: str) -> Path:
+        """Ruta del registro de artefactos de una etapa para una clave."""
+        return self.cache_dir / "stages" / name / f"{key}.json"
+
+    def _restore(self, name: str, key: str) -> Optional[str]:
+        """
+        Intenta satisfacer una etapa desde la caché.
+
+        Returns:
+            'cached' si los artefactos ya estaban en su sitio, 'restored' si se
+            copiaron desde la caché o None si hay que ejecutar la etapa
+        """
+        record_path = self._record_path(name, key)
+        if not record_path.exists():
+            return None
+        with open(record_path, 'r', encoding='utf-8') as f:
+            record = json.load(f)
+
+        to_restore = []
+        for relative, content_hash in record['outputs'].items():
+            path = self._absolute(Path(relative))
+            if path.is_file() and self.file_hash(path) == content_hash:
+                continue
+            if not self._object_path(content_hash).exists():
+                return None
+            to_restore.append((path, content_hash))
+
+        for path, content_hash in to_restore:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            shutil.copyfile(self._object_path(content_hash), tmp_path)
+            os.replace(tmp_path, path)
+        return 'restored' if to_restore else 'cached'
+
+    def _store(self, name: str, key: str, duration: float) -> None:
+        """Copia los artefactos de una etapa a la caché y registra su clave."""
+        stage = self.stages[name]
+        outputs = {}
+        for relative in stage.outputs:
+            path = self._absolute(relative)
+            if not path.is_file():
+                raise FileNotFoundError(f"La etapa {name} no produjo el artefacto declarado {relative}")
+            content_hash = self.file_hash(path)
+            object_path = self._object_path(content_hash)
+            if not object_path.exists():
+                object_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = object_path.with_name(f"{content_hash}.tmp")
+                shutil.copyfile(path, tmp_path)
+                os.replace(tmp_path, object_path)
+            outputs[relative.as_posix()] = content_hash
+
+        record_path = self._record_path(name, key)
+        record_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(record_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'stage': name,
+                'key': key,
+                'outputs': outputs,
+                'duration_seconds': round(duration, 3),
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+            }, f, indent=2)
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+
+    def _execute(self, name: str, n_threads: int) -> float:
+        """Ejecuta el comando de una etapa (con n_threads núcleos) guardando su salida en logs/<etapa>.log."""
+        stage = self.stages[name]
+        log_path = self.cache_dir / "logs" / f"{name}.log"
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+        env = {**os.environ, **get_resource_plan().thread_env(n_threads)}
+        with open(log_path, 'w', encoding='utf-8') as log_file:
+            completed = subprocess.run(
+                stage.command, cwd=self.root, env=env, stdout=log_file, stderr=subprocess.STDOUT
+            )
+        if completed.returncode != 0:
+            raise RuntimeError(f"La etapa {name} terminó con código {completed.returncode} (ver {log_path})")
+        return time.perf_counter() - start
+
+    def plan(self, targets: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Indica qué etapas se ejecutarían sin ejecutar nada.
+
+        Una etapa cuya predecesora debe ejecutarse se marca como 'run', ya que
+        sus entradas aún no se conocen.
+
+        Args:
+            targets: Etapas objetivo (None para todo el pipeline)
+
+        Returns:
+            Diccionario etapa -> 'run' o 'cached'
+        """
+        plan = {}
+        for name in self._with_ancestors(targets):
+            if any(plan[dep] == 'run' for dep in self.stages[name].depends_on):
+                plan[name] = 'run'
+            else:
+                plan[name] = 'cached' if self._record_path(name, self.stage_key(name)).exists() else 'run'
+        return plan
+
+    def run(self, targets: Optional[Iterable[str]] = None, force: bool = False) -> Dict[str, str]:
+        """
+        Ejecuta el pipeline, reutilizando la caché y paralelizando etapas independientes.
+
+        Args:
+            targets: Etapas objetivo (se ejecutan también sus predecesoras; None para todo)
+            force: Si True, ignora la caché y ejecuta todas las etapas seleccionadas
+
+        Returns:
+            Diccionario etapa -> estado ('ran', 'cached', 'restored', 'failed' o 'skipped')
+        """
+        selected = self._with_ancestors(targets)
+        pending = list(selected)
+        statuses: Dict[str, str] = {}
+        running = {}
+
+        logger.info(f"🚀 Ejecutando pipeline: {len(selected)} etapas, hasta {self.max_workers} en paralelo")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                progressed = False
+                ready = []
+                for name in list(pending):
+                    deps = [statuses.get(dep) for dep in self.stages[name].depends_on if dep in selected]
+                    if any(status in ('failed', 'skipped') for status in deps):
+                        pending.remove(name)
+                        statuses[name] = 'skipped'
+                        logger.warning(f"⚠️ {name}: omitida porque falló una etapa previa")
+                        progressed = True
+                        continue
+                    if any(status is None for status in deps):
+                        continue
+
+                    pending.remove(name)
+                    progressed = True
+                    key = self.stage_key(name)
+                    cached = None if force else self._restore(name, key)
+                    if cached is not None:
+                        statuses[name] = cached
+                        logger.info(f"⏭️ {name}: sin cambios ({cached}, clave {key[:12]})")
+                        continue
+                    ready.append((name, key))
+
+                if ready:
+                    # Los núcleos se reparten entre las etapas que corren a la vez, no entre max_workers:
+                    # una etapa sola recibe todos
+                    n_concurrent = min(self.max_workers, len(running) + len(ready))
+                    n_threads = get_resource_plan().threads_per_process(n_concurrent)
+                    for name, key in ready:
+                        logger.info(f"▶️ {name}: ejecutando con {n_threads} hilos (clave {key[:12]})")
+                        running[executor.submit(self._execute, name, n_threads)] = (name, key)
+
+                if progressed:
+                    continue
+                if not running:
+                    raise RuntimeError(f"Etapas sin poder planificar: {pending}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, key = running.pop(future)
+                    try:
+                        duration = future.result()
+                        self._store(name, key, duration)
+                        statuses[name] = 'ran'
+                        logger.info(f"✅ {name}: completada en {duration:.1f}s")
+                    except Exception as e:
+                        statuses[name] = 'failed'
+                        logger.error(f"❌ {name}: {e}")
+
+        self._save_file_hashes()
+        summary = {status: sum(1 for s in statuses.values() if s == status) for status in STAGE_STATUSES}
+        logger.info(f"📋 Pipeline terminado: {summary}")
+        return {name: statuses[name] for name in selected}
@@ -9,23 +9,84 @@ académicos y comportamentales.
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional
+import copy
 import logging
 from pathlib import Path
 
+from ..database.data_processor import create_partition_executor, resolve_n_jobs, split_by_presentation
+from .feature_ranking import rank_features
+from .quantile_sketch import KLLSketch
+from .feature_hashing import (
+    DEFAULT_HASH_CROSSES,
+    collision_statistics,
+    hash_categorical_crosses,
+    hash_grouped_tokens
+)
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Tipos enteros candidatos, de menor a mayor tamaño
+_INTEGER_DTYPES = [np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32, np.int64]
+
+# Mayor entero representable exactamente en float32
+_FLOAT32_EXACT_INT = 2 ** 24
+
+# Variables categóricas demográficas codificadas con one-hot
+DEMOGRAPHIC_CATEGORICAL_COLUMNS = ['gender', 'age_band', 'highest_education', 'region', 'disability']
+
+# Columnas cuyos umbrales (medianas) forman parte del estado ajustado
+ACTIVITY_THRESHOLD_COLUMNS = ['total_clicks', 'weeks_active']
+
+def _smallest_integer_dtype(min_value: float, max_value: float) -> np.dtype:
+    """Devuelve el tipo entero más pequeño que contiene el rango [min_value, max_value]."""
+    for dtype in _INTEGER_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= min_value and max_value <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
 class FeatureEngineer:
     """
     Clase para la ingeniería de características del modelo de retención estudiantil.
     """
     
-    def __init__(self):
-        """Inicializa el ingeniero de características."""
+    def __init__(self,
+                 use_feature_hashing: bool = False,
+                 n_hash_buckets: int = 1024,
+                 hash_crosses: Optional[List[Tuple[str, ...]]] = None,
+                 downcast_dtypes: bool = True,
+                 float_rtol: float = 1e-6,
+                 sketch_k: int = 1024):
+        """
+        Inicializa el ingeniero de características.
+        
+        Args:
+            use_feature_hashing: Si True, genera además un bloque disperso de
+                cruces categóricos e indicadores de id_site codificados por hashing
+            n_hash_buckets: Número fijo de columnas del bloque hasheado
+            hash_crosses: Cruces a codificar (por defecto DEFAULT_HASH_CROSSES)
+            downcast_dtypes: Si True, reduce los tipos numéricos al finalizar prepare_features
+            float_rtol: Error relativo máximo admitido al pasar columnas continuas a
+                float32 (con 1e-6 solo se rechazan valores fuera del rango de float32)
+            sketch_k: Precisión de los sketches KLL usados para los umbrales de actividad
+        """
         self.feature_columns = []
         self.categorical_columns = []
         self.numerical_columns = []
+        self.use_feature_hashing = use_feature_hashing
+        self.n_hash_buckets = n_hash_buckets
+        self.hash_crosses = hash_crosses if hash_crosses is not None else DEFAULT_HASH_CROSSES
+        self.hashed_features = None
+        self.hash_collision_stats = {}
+        self.downcast_dtypes = downcast_dtypes
+        self.float_rtol = float_rtol
+        self.feature_dtypes = {}
+        self.sketch_k = sketch_k
+        self.quantile_sketches = {}
+        self.activity_thresholds = {}
+        self.category_levels = {}
         
     def create_demographic_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -43,12 +104,17 @@ class FeatureEngineer:
         features_df = df.copy()
         
         # Codificar variables categóricas
-        categorical_cols = ['gender', 'age_band', 'highest_education', 'region', 'disability']
-        
-        for col in categorical_cols:
+        for col in DEMOGRAPHIC_CATEGORICAL_COLUMNS:
             if col in features_df.columns:
+                # Con niveles ajustados, todas las particiones generan las mismas dummies
+                values = features_df[col]
+                if col in self.category_levels:
+                    values = pd.Series(
+                        pd.Categorical(values, categories=self.category_levels[col]), index=features_df.index
+                    )
+                
                 # One-hot encoding para variables categóricas
-                dummies = pd.get_dummies(features_df[col], prefix=col, dummy_na=True)
+                dummies = pd.get_dummies(values, prefix=col, dummy_na=True)
                 features_df = pd.concat([features_df, dummies], axis=1)
                 features_df.drop(columns=[col], inplace=True)
         
@@ -119,10 +185,35 @@ class FeatureEngineer:
         """
         logger.info("🔧 Creando características comportamentales...")
         
+        features_df = self.merge_interaction_features(df, interaction_features)
+        
+        # Los umbrales se ajustan una sola vez y quedan congelados en el estado
+        missing_thresholds = self._missing_activity_thresholds(features_df)
+        if missing_thresholds:
+            self.update_activity_sketches(features_df[missing_thresholds])
+            self.freeze_activity_thresholds()
+        
+        features_df = self.apply_activity_thresholds(features_df)
+        
+        logger.info(f"✅ Características comportamentales creadas: {features_df.shape[1]} columnas")
+        return features_df
+    
+    def merge_interaction_features(self, df: pd.DataFrame, interaction_features: pd.DataFrame) -> pd.DataFrame:
+        """
+        Une las características de interacciones y rellena con 0 las matrículas sin actividad.
+        
+        Args:
+            df: DataFrame con información de estudiantes
+            interaction_features: DataFrame con características de interacciones
+            
+        Returns:
+            DataFrame unido
+        """
         features_df = df.copy()
         
-        # Unir con características de interacciones
-        if not interaction_features.empty:
+        # Unir con características de interacciones (también si la porción está
+        # vacía, para que todas las particiones tengan las mismas columnas)
+        if len(interaction_features.columns) > 0:
             features_df = features_df.merge(
                 interaction_features, 
                 on=['code_module', 'code_presentation', 'id_student'], 
@@ -138,20 +229,239 @@ class FeatureEngineer:
                 if col in features_df.columns:
                     features_df[col] = features_df[col].fillna(0)
         
-        # Crear características derivadas de interacciones
+        return features_df
+    
+    def create_hashed_features(self,
+                               df: pd.DataFrame,
+                               site_interactions: Optional[pd.DataFrame] = None):
+        """
+        Crea el bloque disperso de características hasheadas.
+        
+        El ancho del bloque es siempre n_hash_buckets, independientemente del
+        número de categorías, por lo que sirve igual en entrenamiento y en servicio.
+        
+        Args:
+            df: DataFrame con las columnas categóricas originales (una fila por matrícula)
+            site_interactions: DataFrame opcional de interacciones con 'id_site'
+                (studentVle) para los indicadores por sitio
+            
+        Returns:
+            Matriz dispersa CSR (len(df), n_hash_buckets)
+        """
+        logger.info(f"🔧 Creando características hasheadas ({self.n_hash_buckets} buckets)...")
+        
+        hashed_block, cross_tokens = hash_categorical_crosses(df, self.hash_crosses, self.n_hash_buckets)
+        token_groups = {'x'.join(cross): tokens for cross, tokens in zip(self.hash_crosses, cross_tokens)}
+        
+        key_cols = ['id_student', 'code_module', 'code_presentation']
+        if site_interactions is not None and 'id_site' in site_interactions.columns:
+            site_block, site_tokens = hash_grouped_tokens(
+                df, site_interactions, key_cols, 'id_site', self.n_hash_buckets
+            )
+            hashed_block = (hashed_block + site_block).tocsr()
+            token_groups['id_site'] = site_tokens
+        
+        # Estadísticas de colisiones por grupo y para el espacio compartido
+        self.hash_collision_stats = {
+            name: collision_statistics(tokens, self.n_hash_buckets) for name, tokens in token_groups.items()
+        }
+        if token_groups:
+            self.hash_collision_stats['all'] = collision_statistics(
+                np.concatenate(list(token_groups.values())), self.n_hash_buckets
+            )
+            overall = self.hash_collision_stats['all']
+            logger.info(
+                f"   - {overall['n_tokens']} tokens distintos, tasa de colisión "
+                f"{overall['collision_rate']:.2%} (esperada {overall['expected_collision_rate']:.2%})"
+            )
+        
+        logger.info(f"✅ Características hasheadas creadas: {hashed_block.nnz} valores no nulos")
+        return hashed_block
+    
+    def optimize_dtypes(self, features_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Reduce los tipos numéricos de la matriz de características sin pérdida.
+        
+        - Flags 0/1 sin faltantes -> uint8
+        - Enteros sin faltantes -> el entero más pequeño que contiene su rango
+        - Enteros con faltantes -> float32 si caben exactamente en float32
+        - Continuas -> float32 si el error relativo no supera float_rtol
+        
+        Cada conversión se verifica comparando con los valores originales; si
+        falla, la columna conserva su tipo. El redondeo a float32 tiene un error
+        relativo de como mucho 2**-24 (~6e-8), por debajo del float_rtol por
+        defecto: las continuas se reducen siempre salvo que tengan valores fuera
+        del rango de float32 (se vuelven inf) o tan pequeños que quedan
+        subnormales; un float_rtol menor que 6e-8 las mantiene en float64. Las
+        dummies booleanas ya ocupan un byte y se mantienen como bool. Los tipos
+        finales quedan en self.feature_dtypes.
+        
+        Args:
+            features_df: DataFrame con características
+            
+        Returns:
+            DataFrame con tipos reducidos
+        """
+        logger.info("🔧 Reduciendo tipos de datos de las características...")
+        
+        memory_before = features_df.memory_usage(deep=True).sum()
+        features_df = features_df.copy()
+        
+        for col in features_df.select_dtypes(include=np.number).columns:
+            values = features_df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            observed = values[~np.isnan(values)]
+            if observed.size == 0:
+                continue
+            
+            has_missing = observed.size < values.size
+            is_integral = np.array_equal(observed, np.floor(observed))
+            min_value, max_value = observed.min(), observed.max()
+            
+            if is_integral and not has_missing:
+                if min_value >= 0 and max_value <= 1:
+                    target_dtype = np.dtype(np.uint8)
+                else:
+                    target_dtype = _smallest_integer_dtype(min_value, max_value)
+            elif is_integral and max(abs(min_value), abs(max_value)) <= _FLOAT32_EXACT_INT:
+                target_dtype = np.dtype(np.float32)
+            elif not is_integral:
+                target_dtype = np.dtype(np.float32)
+            else:
+                continue
+            
+            if target_dtype == features_df[col].dtype:
+                continue
+            
+            # El desbordamiento a inf se detecta en la verificación siguiente
+            with np.errstate(over='ignore'):
+                converted = features_df[col].astype(target_dtype)
+            restored = converted.to_numpy(dtype=np.float64, na_value=np.nan)
+            rtol = self.float_rtol if target_dtype.kind == 'f' and not is_integral else 0.0
+            if np.allclose(restored, values, rtol=rtol, atol=0.0, equal_nan=True):
+                features_df[col] = converted
+            else:
+                logger.warning(f"⚠️ La conversión de {col} a {target_dtype} no es exacta; se mantiene {features_df[col].dtype}")
+        
+        self.feature_dtypes = {col: str(dtype) for col, dtype in features_df.dtypes.items()}
+        
+        memory_after = features_df.memory_usage(deep=True).sum()
+        logger.info(f"✅ Tipos reducidos: {memory_before / 1024**2:.1f} MB -> {memory_after / 1024**2:.1f} MB")
+        return features_df
+    
+    def _missing_activity_thresholds(self, features_df: pd.DataFrame) -> List[str]:
+        """Columnas de actividad presentes cuyo umbral aún no está ajustado."""
+        return [
+            col for col in ACTIVITY_THRESHOLD_COLUMNS
+            if col in features_df.columns and col not in self.activity_thresholds
+        ]
+    
+    def fit_category_levels(self, df: pd.DataFrame) -> Dict[str, List]:
+        """
+        Fija los niveles de las variables categóricas demográficas.
+        
+        Args:
+            df: DataFrame con información de estudiantes
+            
+        Returns:
+            Diccionario columna -> niveles ordenados
+        """
+        self.category_levels = {
+            col: sorted(df[col].dropna().unique().tolist())
+            for col in DEMOGRAPHIC_CATEGORICAL_COLUMNS if col in df.columns
+        }
+        return self.category_levels
+    
+    def update_activity_sketches(self, chunk: pd.DataFrame) -> None:
+        """
+        Añade un bloque de filas a los sketches de cuantiles de actividad.
+        
+        Permite ajustar los umbrales en ejecuciones por bloques (out-of-core):
+        basta con llamar a este método con cada bloque ya unido a las
+        interacciones y después a freeze_activity_thresholds().
+        
+        Args:
+            chunk: Bloque con las columnas de ACTIVITY_THRESHOLD_COLUMNS disponibles
+        """
+        for col in ACTIVITY_THRESHOLD_COLUMNS:
+            if col in chunk.columns:
+                if col not in self.quantile_sketches:
+                    self.quantile_sketches[col] = KLLSketch(k=self.sketch_k)
+                self.quantile_sketches[col].update(chunk[col].to_numpy(dtype=np.float64, na_value=np.nan))
+    
+    def merge_activity_sketches(self, sketches: Dict[str, KLLSketch]) -> None:
+        """
+        Combina sketches calculados en otra partición o proceso.
+        
+        Args:
+            sketches: Diccionario columna -> sketch parcial
+        """
+        for col, sketch in sketches.items():
+            if col in self.quantile_sketches:
+                self.quantile_sketches[col].merge(sketch)
+            else:
+                self.quantile_sketches[col] = sketch
+    
+    def freeze_activity_thresholds(self) -> Dict[str, float]:
+        """
+        Fija los umbrales de actividad (medianas) a partir de los sketches.
+        
+        Returns:
+            Diccionario columna -> umbral
+        """
+        self.activity_thresholds.update({col: sketch.median() for col, sketch in self.quantile_sketches.items()})
+        logger.info(f"   - Umbrales de actividad: {self.activity_thresholds}")
+        return self.activity_thresholds
+    
+    def apply_activity_thresholds(self, features_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Crea los indicadores de actividad con los umbrales congelados.
+        
+        Args:
+            features_df: DataFrame con las características de interacciones
+            
+        Returns:
+            DataFrame con los indicadores añadidos
+        """
         if 'total_clicks' in features_df.columns:
-            features_df['high_activity'] = (features_df['total_clicks'] > features_df['total_clicks'].median()).astype(int)
-            features_df['low_activity'] = (features_df['total_clicks'] <= features_df['total_clicks'].median()).astype(int)
+            threshold = self.activity_thresholds['total_clicks']
+            features_df['high_activity'] = (features_df['total_clicks'] > threshold).astype(int)
+            features_df['low_activity'] = (features_df['total_clicks'] <= threshold).astype(int)
         
         if 'avg_clicks_per_week' in features_df.columns:
             features_df['consistent_activity'] = (features_df['avg_clicks_per_week'] > 0).astype(int)
         
         if 'weeks_active' in features_df.columns:
-            features_df['long_term_engagement'] = (features_df['weeks_active'] > features_df['weeks_active'].median()).astype(int)
+            threshold = self.activity_thresholds['weeks_active']
+            features_df['long_term_engagement'] = (features_df['weeks_active'] > threshold).astype(int)
         
-        logger.info(f"✅ Características comportamentales creadas: {features_df.shape[1]} columnas")
         return features_df
     
+    def get_fitted_state(self) -> Dict:
+        """
+        Obtiene el estado ajustado necesario para reproducir las características en servicio.
+        
+        Returns:
+            Diccionario serializable con umbrales, sketches y tipos
+        """
+        return {
+            'activity_thresholds': self.activity_thresholds,
+            'quantile_sketches': {col: sketch.to_dict() for col, sketch in self.quantile_sketches.items()},
+            'feature_dtypes': self.feature_dtypes
+        }
+    
+    def load_fitted_state(self, state: Dict) -> None:
+        """
+        Restaura un estado obtenido con get_fitted_state().
+        
+        Args:
+            state: Diccionario con el estado ajustado
+        """
+        self.activity_thresholds = dict(state.get('activity_thresholds', {}))
+        self.quantile_sketches = {
+            col: KLLSketch.from_dict(sketch) for col, sketch in state.get('quantile_sketches', {}).items()
+        }
+        self.feature_dtypes = dict(state.get('feature_dtypes', {}))
+    
     def create_target_variable(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
         """
         Crea la variable objetivo para el modelo.
@@ -178,32 +488,64 @@ class FeatureEngineer:
     
     def prepare_features(self, 
                         student_df: pd.DataFrame, 
-                        interaction_features: Optional[pd.DataFrame] = None) -> Tuple[pd.DataFrame, pd.Series]:
+                        interaction_features: Optional[pd.DataFrame] = None,
+                        site_interactions: Optional[pd.DataFrame] = None,
+                        n_jobs: int = 1) -> Tuple[pd.DataFrame, pd.Series]:
         """
         Prepara todas las características para el modelo.
         
+        Con use_feature_hashing=True el bloque hasheado, alineado fila a fila con
+        el DataFrame devuelto, queda en self.hashed_features.
+        
         Args:
             student_df: DataFrame con información de estudiantes
             interaction_features: DataFrame opcional con características de interacciones
+            site_interactions: DataFrame opcional con interacciones por id_site (modo hashing)
+            n_jobs: 1 procesa todo en el proceso actual; otro valor (-1 = todos los
+                núcleos) procesa cada (code_module, code_presentation) en un worker
             
         Returns:
             Tuple con DataFrame de características y Series de variable objetivo
         """
         logger.info("🚀 Iniciando preparación de características...")
         
-        # Crear características demográficas
-        features_df = self.create_demographic_features(student_df)
-        
-        # Crear características académicas
-        features_df = self.create_academic_features(features_df)
-        
-        # Crear características comportamentales
-        if interaction_features is not None:
-            features_df = self.create_behavioral_features(features_df, interaction_features)
+        # Bloque hasheado sobre las categorías originales; '_row_id' permite
+        # realinearlo tras los merges que replican filas
+        partitioned = resolve_n_jobs(n_jobs) > 1
+        hashed_block = None
+        if self.use_feature_hashing or partitioned:
+            student_df = student_df.assign(_row_id=np.arange(len(student_df)))
+        if self.use_feature_hashing:
+            hashed_block = self.create_hashed_features(student_df, site_interactions)
+        
+        if partitioned:
+            # Características demográficas, académicas y comportamentales por partición
+            features_df = self._prepare_partitioned(student_df, interaction_features, n_jobs)
+        else:
+            # Crear características demográficas
+            features_df = self.create_demographic_features(student_df)
+            
+            # Crear características académicas
+            features_df = self.create_academic_features(features_df)
+            
+            # Crear características comportamentales
+            if interaction_features is not None:
+                features_df = self.create_behavioral_features(features_df, interaction_features)
         
         # Crear variable objetivo
         features_df, target = self.create_target_variable(features_df)
         
+        if '_row_id' in features_df.columns:
+            row_ids = features_df.pop('_row_id').to_numpy()
+            if hashed_block is not None:
+                self.hashed_features = hashed_block[row_ids]
+        
+        # Reducir tipos como paso final (el esquema resultante se reutiliza en servicio)
+        if self.downcast_dtypes:
+            features_df = self.optimize_dtypes(features_df)
+        else:
+            self.feature_dtypes = {col: str(dtype) for col, dtype in features_df.dtypes.items()}
+        
         # Identificar tipos de columnas
         self.categorical_columns = features_df.select_dtypes(include=['object']).columns.tolist()
         self.numerical_columns = features_df.select_dtypes(include=['number']).columns.tolist()
@@ -215,36 +557,115 @@ class FeatureEngineer:
         
         return features_df, target
     
-    def get_feature_importance_ranking(self, features_df: pd.DataFrame) -> pd.DataFrame:
+    def _prepare_partitioned(self,
+                             student_df: pd.DataFrame,
+                             interaction_features: Optional[pd.DataFrame],
+                             n_jobs: int) -> pd.DataFrame:
         """
-        Calcula un ranking de importancia de características basado en correlación con la variable objetivo.
+        Crea las características por presentación en procesos worker.
+        
+        Los estadísticos globales se fijan fuera de los workers: los niveles
+        categóricos antes de repartir y los umbrales de actividad combinando
+        los sketches parciales de cada partición.
         
         Args:
-            features_df: DataFrame con características
+            student_df: DataFrame con información de estudiantes (con '_row_id')
+            interaction_features: DataFrame opcional con características de interacciones
+            n_jobs: Número de procesos
+            
+        Returns:
+            DataFrame con las mismas filas y orden que el modo secuencial
+        """
+        if not self.category_levels:
+            self.fit_category_levels(student_df)
+        
+        worker_engineer = copy.copy(self)
+        worker_engineer.quantile_sketches = {}
+        worker_engineer.hashed_features = None
+        
+        student_parts = split_by_presentation(student_df)
+        interaction_parts = split_by_presentation(interaction_features) if interaction_features is not None else {}
+        keys = list(student_parts)
+        interaction_args = [
+            interaction_parts.get(key, interaction_features.iloc[0:0]) if interaction_features is not None else None
+            for key in keys
+        ]
+        
+        n_workers = max(min(resolve_n_jobs(n_jobs), len(keys)), 1)
+        logger.info(f"🧩 Preparando características en {len(keys)} particiones con {n_workers} procesos...")
+        with create_partition_executor(n_workers) as executor:
+            results = list(executor.map(
+                _prepare_partition, [worker_engineer] * len(keys), [student_parts[key] for key in keys], interaction_args
+            ))
+        
+        features_df = (
+            pd.concat([frame for frame, _ in results], ignore_index=True)
+            .sort_values('_row_id', kind='mergesort')
+            .reset_index(drop=True)
+        )
+        
+        if interaction_features is not None:
+            for _, sketches in results:
+                self.merge_activity_sketches(sketches)
+            if self._missing_activity_thresholds(features_df):
+                self.freeze_activity_thresholds()
+            features_df = self.apply_activity_thresholds(features_df)
+        
+        return features_df
+    
+    def get_feature_importance_ranking(self,
+                                       features_df: pd.DataFrame,
+                                       method: str = 'correlation',
+                                       n_jobs: int = 1) -> pd.DataFrame:
+        """
+        Calcula un ranking de importancia de características frente a la variable objetivo.
+        
+        Args:
+            features_df: DataFrame con características y la columna 'target'
+            method: 'correlation' (|r| de Pearson), 'f_score' (F de ANOVA punto-biserial)
+                o 'mutual_info' (información mutua, calculada en paralelo por bloques de columnas)
+            n_jobs: Número de procesos para los métodos paralelizables
             
         Returns:
             DataFrame con ranking de importancia
         """
-        logger.info("📊 Calculando ranking de importancia de características...")
+        logger.info(f"📊 Calculando ranking de importancia de características ({method})...")
         
-        # Calcular correlaciones solo con columnas numéricas
         if 'target' in features_df.columns:
-            numeric_cols = features_df.select_dtypes(include=np.number).columns.tolist()
-            if 'target' not in numeric_cols:
-                numeric_cols.append('target')
-                
-            correlations = features_df[numeric_cols].corr()['target'].abs().sort_values(ascending=False)
-            
-            # Crear DataFrame con ranking
-            ranking_df = pd.DataFrame({
-                'feature': correlations.index,
-                'correlation': correlations.values
-            })
-            
-            # Filtrar solo características (excluir target)
-            ranking_df = ranking_df[ranking_df['feature'] != 'target']
+            ranking_df = rank_features(
+                features_df.drop(columns=['target']),
+                features_df['target'],
+                method=method,
+                n_jobs=n_jobs
+            )
             
             logger.info(f"✅ Ranking calculado para {len(ranking_df)} características")
             return ranking_df
         
-        return pd.DataFrame() 
\ No newline at end of file
+        return pd.DataFrame()
+
+
+def _prepare_partition(engineer: FeatureEngineer,
+                       student_part: pd.DataFrame,
+                       interaction_part: Optional[pd.DataFrame]):
+    """
+    Crea las características de una partición dentro de un worker.
+    
+    Args:
+        engineer: Copia del ingeniero con los niveles categóricos y umbrales ya fijados
+        student_part: Estudiantes de la partición
+        interaction_part: Interacciones de la partición (o None)
+        
+    Returns:
+        Tuple con el DataFrame de la partición y sus sketches de actividad parciales
+    """
+    features_df = engineer.create_demographic_features(student_part)
+    features_df = engineer.create_academic_features(features_df)
+    
+    if interaction_part is not None:
+        features_df = engineer.merge_interaction_features(features_df, interaction_part)
+        missing_thresholds = engineer._missing_activity_thresholds(features_df)
+        if missing_thresholds:
+            engineer.update_activity_sketches(features_df[missing_thresholds])
+    
+    return features_df, engineer.quantile_sketches
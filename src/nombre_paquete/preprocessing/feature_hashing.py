@@ -0,0 +1,156 @@
+"""
+Módulo de hashing de características categóricas.
+
+Este módulo proyecta categorías de alta cardinalidad y cruces de categorías
+(p. ej. region × code_module) sobre un número fijo de buckets, produciendo
+un bloque disperso de scipy cuyo ancho no depende de cuántas categorías
+aparezcan, junto con estadísticas de colisiones para dimensionar los buckets.
+"""
+
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from typing import Any, Dict, List, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cruces por defecto del modo hashing
+DEFAULT_HASH_CROSSES = [
+    ('region', 'code_module'),
+    ('age_band', 'highest_education'),
+]
+
+
+def hash_tokens(tokens: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Asigna cada token a un bucket con un hash estable entre procesos.
+
+    Args:
+        tokens: Array de tokens (cadenas)
+        n_buckets: Número de buckets
+
+    Returns:
+        Array de índices de bucket (int64)
+    """
+    hashes = pd.util.hash_array(np.asarray(tokens, dtype=object), categorize=True)
+    return (hashes % np.uint64(n_buckets)).astype(np.int64)
+
+
+def _as_token_strings(values: pd.Series) -> np.ndarray:
+    """Convierte una columna en cadenas, representando los faltantes como 'nan'."""
+    strings = values.to_numpy(dtype=object).astype(str)
+    strings[values.isna().to_numpy()] = 'nan'
+    return strings
+
+
+def build_cross_tokens(df: pd.DataFrame, columns: Sequence[str]) -> np.ndarray:
+    """
+    Construye los tokens 'col1=v1|col2=v2' de un cruce de columnas.
+
+    Args:
+        df: DataFrame con las columnas del cruce
+        columns: Columnas a cruzar
+
+    Returns:
+        Array de tokens, uno por fila
+    """
+    tokens = None
+    for col in columns:
+        part = np.char.add(col + '=', _as_token_strings(df[col]))
+        tokens = part if tokens is None else np.char.add(np.char.add(tokens, '|'), part)
+    return tokens
+
+
+def collision_statistics(tokens: np.ndarray, n_buckets: int) -> Dict[str, Any]:
+    """
+    Calcula estadísticas de colisiones para un conjunto de tokens.
+
+    Args:
+        tokens: Array de tokens (puede contener repetidos)
+        n_buckets: Número de buckets
+
+    Returns:
+        Diccionario con tokens distintos, buckets ocupados, tasa de colisión
+        observada y tasa esperada bajo un hash uniforme
+    """
+    unique_tokens = pd.unique(np.asarray(tokens, dtype=object))
+    n_tokens = len(unique_tokens)
+    bucket_counts = np.bincount(hash_tokens(unique_tokens, n_buckets), minlength=n_buckets)
+    colliding_tokens = int(bucket_counts[bucket_counts > 1].sum())
+
+    return {
+        'n_buckets': n_buckets,
+        'n_tokens': n_tokens,
+        'occupied_buckets': int((bucket_counts > 0).sum()),
+        'load_factor': n_tokens / n_buckets,
+        'colliding_tokens': colliding_tokens,
+        'collision_rate': colliding_tokens / n_tokens if n_tokens else 0.0,
+        'expected_collision_rate': 1.0 - (1.0 - 1.0 / n_buckets) ** max(n_tokens - 1, 0),
+        'max_bucket_load': int(bucket_counts.max()) if n_tokens else 0
+    }
+
+
+def hash_categorical_crosses(df: pd.DataFrame,
+                             crosses: Sequence[Sequence[str]],
+                             n_buckets: int) -> Tuple[sparse.csr_matrix, List[np.ndarray]]:
+    """
+    Codifica cruces categóricos por hashing (un token por fila y cruce).
+
+    Los cruces con columnas ausentes en df se omiten.
+
+    Args:
+        df: DataFrame con las columnas categóricas
+        crosses: Lista de cruces; un cruce de una sola columna es la propia columna
+        n_buckets: Número de buckets
+
+    Returns:
+        Tuple con la matriz dispersa (n_filas, n_buckets) y los tokens de cada cruce
+    """
+    n_rows = len(df)
+    matrix = sparse.csr_matrix((n_rows, n_buckets), dtype=np.float32)
+    all_tokens = []
+
+    for columns in crosses:
+        if not all(col in df.columns for col in columns):
+            logger.warning(f"⚠️ Cruce {columns} omitido: faltan columnas")
+            continue
+        tokens = build_cross_tokens(df, columns)
+        buckets = hash_tokens(tokens, n_buckets)
+        matrix = matrix + sparse.csr_matrix(
+            (np.ones(n_rows, dtype=np.float32), (np.arange(n_rows), buckets)),
+            shape=(n_rows, n_buckets)
+        )
+        all_tokens.append(tokens)
+
+    return matrix.tocsr(), all_tokens
+
+
+def hash_grouped_tokens(keys_df: pd.DataFrame,
+                        tokens_df: pd.DataFrame,
+                        key_columns: Sequence[str],
+                        token_column: str,
+                        n_buckets: int) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    Codifica por hashing indicadores multivaluados (p. ej. los id_site visitados por matrícula).
+
+    Args:
+        keys_df: DataFrame cuyas filas definen las filas de la salida
+        tokens_df: DataFrame largo con las columnas clave y la columna de tokens
+        key_columns: Columnas que relacionan tokens_df con keys_df
+        token_column: Columna con los valores a indicar
+        n_buckets: Número de buckets
+
+    Returns:
+        Tuple con la matriz dispersa (len(keys_df), n_buckets) y los tokens de cada par
+    """
+    pairs = tokens_df[list(key_columns) + [token_column]].drop_duplicates()
+    positions = keys_df[list(key_columns)].reset_index(drop=True).reset_index()
+    pairs = pairs.merge(positions, on=list(key_columns), how='inner')
+
+    tokens = np.char.add(token_column + '=', _as_token_strings(pairs[token_column]))
+    matrix = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.float32), (pairs['index'].to_numpy(), hash_tokens(tokens, n_buckets))),
+        shape=(len(keys_df), n_buckets)
+    )
+    return matrix, tokens
@@ -0,0 +1,178 @@
+"""
+Módulo de ranking de características frente a la variable objetivo.
+
+Este módulo calcula puntuaciones de relevancia (correlación, F de ANOVA /
+punto-biserial e información mutua) columna a columna sin construir la
+matriz de correlación completa, de modo que escale a miles de características.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import List, Optional
+import logging
+import warnings
+
+logger = logging.getLogger(__name__)
+
+RANKING_METHODS = ('correlation', 'f_score', 'mutual_info')
+
+
+def _column_chunks(n_columns: int, chunk_size: int) -> List[slice]:
+    """Divide el rango de columnas en bloques contiguos."""
+    return [slice(start, min(start + chunk_size, n_columns)) for start in range(0, n_columns, chunk_size)]
+
+
+def _nan_column_stat(func, X_block: np.ndarray) -> np.ndarray:
+    """Aplica un estadístico nan-aware por columna; las columnas vacías devuelven 0."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nan_to_num(func(X_block, axis=0))
+
+
+def compute_target_correlation(X: np.ndarray, y: np.ndarray, chunk_size: int = 256) -> np.ndarray:
+    """
+    Calcula la correlación de Pearson de cada columna con el objetivo.
+
+    Usa observaciones completas por pares (igual que ``DataFrame.corr``) y
+    obtiene todas las sumas necesarias como productos matriz-vector, por lo
+    que el coste es O(n·p) en lugar de O(n·p²).
+
+    Args:
+        X: Matriz (n, p) de características, puede contener NaN
+        y: Vector (n,) con la variable objetivo, sin NaN
+
+    Returns:
+        Array (p,) con las correlaciones (NaN si la columna es constante)
+    """
+    y = np.asarray(y, dtype=np.float64)
+    y_centered = y - y.mean()
+    y_squared = y_centered ** 2
+    correlations = np.empty(X.shape[1], dtype=np.float64)
+
+    for block in _column_chunks(X.shape[1], chunk_size):
+        X_block = np.asarray(X[:, block], dtype=np.float64)
+        observed = ~np.isnan(X_block)
+        # Centrar mejora la estabilidad numérica de las sumas
+        X_centered = np.where(observed, X_block - _nan_column_stat(np.nanmean, X_block), 0.0)
+        mask = observed.astype(np.float64)
+
+        n = mask.sum(axis=0)
+        sum_x = X_centered.sum(axis=0)
+        sum_xx = (X_centered ** 2).sum(axis=0)
+        sum_y = mask.T @ y_centered
+        sum_yy = mask.T @ y_squared
+        sum_xy = X_centered.T @ y_centered
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = sum_xy - sum_x * sum_y / n
+            var_x = sum_xx - sum_x ** 2 / n
+            var_y = sum_yy - sum_y ** 2 / n
+            r = cov / np.sqrt(var_x * var_y)
+        r[(n < 2) | (var_x <= 0) | (var_y <= 0)] = np.nan
+        correlations[block] = np.clip(r, -1.0, 1.0)
+
+    return correlations
+
+
+def compute_f_scores(X: np.ndarray, y: np.ndarray, chunk_size: int = 256) -> np.ndarray:
+    """
+    Calcula el estadístico F de ANOVA para un objetivo binario.
+
+    Con dos clases el F de ANOVA es una transformación monótona de la
+    correlación punto-biserial: F = r² (n - 2) / (1 - r²).
+
+    Args:
+        X: Matriz (n, p) de características, puede contener NaN
+        y: Vector (n,) binario con la variable objetivo
+
+    Returns:
+        Array (p,) con los estadísticos F
+    """
+    if np.unique(y).size > 2:
+        raise ValueError("El estadístico F punto-biserial requiere un objetivo binario")
+
+    r = compute_target_correlation(X, y, chunk_size=chunk_size)
+    n = (~np.isnan(X)).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f_scores = r ** 2 * (n - 2) / (1.0 - r ** 2)
+    return f_scores
+
+
+def _mutual_info_block(X_block: np.ndarray, y: np.ndarray, random_state: int) -> np.ndarray:
+    """Calcula la información mutua de un bloque de columnas (ejecutado en un worker)."""
+    from sklearn.feature_selection import mutual_info_classif
+
+    X_block = np.asarray(X_block, dtype=np.float64)
+    # Imputar con la mediana: mutual_info_classif no admite NaN
+    X_block = np.where(np.isnan(X_block), _nan_column_stat(np.nanmedian, X_block), X_block)
+
+    # Las columnas binarias (flags, dummies) se tratan como discretas
+    discrete = np.array([np.unique(X_block[:, j]).size <= 2 for j in range(X_block.shape[1])])
+    return mutual_info_classif(X_block, y, discrete_features=discrete, random_state=random_state)
+
+
+def compute_mutual_information(X: np.ndarray,
+                               y: np.ndarray,
+                               n_jobs: int = 1,
+                               chunk_size: int = 64,
+                               random_state: int = 42) -> np.ndarray:
+    """
+    Calcula la información mutua de cada columna con el objetivo.
+
+    Las columnas se reparten en bloques que se procesan en paralelo.
+
+    Args:
+        X: Matriz (n, p) de características, puede contener NaN
+        y: Vector (n,) con la variable objetivo
+        n_jobs: Número de procesos (-1 usa todos los núcleos)
+        chunk_size: Número de columnas por bloque
+        random_state: Semilla del estimador k-NN
+
+    Returns:
+        Array (p,) con la información mutua
+    """
+    from joblib import Parallel, delayed
+
+    blocks = _column_chunks(X.shape[1], chunk_size)
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_mutual_info_block)(X[:, block], y, random_state) for block in blocks
+    )
+    return np.concatenate(results) if results else np.empty(0)
+
+
+def rank_features(features_df: pd.DataFrame,
+                  target: pd.Series,
+                  method: str = 'correlation',
+                  n_jobs: int = 1,
+                  chunk_size: Optional[int] = None) -> pd.DataFrame:
+    """
+    Ordena las características numéricas según su relación con el objetivo.
+
+    Args:
+        features_df: DataFrame con características
+        target: Series con la variable objetivo
+        method: 'correlation' (|r| de Pearson), 'f_score' (F de ANOVA) o 'mutual_info'
+        n_jobs: Procesos para los métodos paralelizables
+        chunk_size: Columnas por bloque (None usa el valor por defecto del método)
+
+    Returns:
+        DataFrame con columnas 'feature' y la puntuación del método, ordenado de mayor a menor
+    """
+    if method not in RANKING_METHODS:
+        raise ValueError(f"method debe ser uno de {RANKING_METHODS}")
+
+    numeric_cols = features_df.select_dtypes(include=np.number).columns.tolist()
+    valid_rows = target.notna().to_numpy()
+    X = features_df[numeric_cols].to_numpy(dtype=np.float64)[valid_rows]
+    y = target.to_numpy(dtype=np.float64)[valid_rows]
+
+    if method == 'correlation':
+        scores = np.abs(compute_target_correlation(X, y, chunk_size=chunk_size or 256))
+    elif method == 'f_score':
+        scores = compute_f_scores(X, y, chunk_size=chunk_size or 256)
+    else:
+        scores = compute_mutual_information(X, y, n_jobs=n_jobs, chunk_size=chunk_size or 64)
+
+    ranking_df = pd.DataFrame({'feature': numeric_cols, method: scores})
+    ranking_df = ranking_df.sort_values(method, ascending=False, na_position='last', kind='mergesort')
+    return ranking_df.reset_index(drop=True)
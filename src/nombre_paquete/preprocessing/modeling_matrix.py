@@ -0,0 +1,172 @@
+"""
+Módulo de intercambio binario de la matriz de modelado.
+
+Este módulo guarda las columnas numéricas de la matriz de características
+como un array float32 contiguo (.npy) más un esquema JSON, de modo que los
+scripts de entrenamiento y evaluación puedan abrirla con memory-mapping en
+lugar de volver a parsear el CSV. Antes de usarla se comprueba que no sea
+más antigua que el CSV y que su esquema coincida con feature_info.json.
+"""
+
+import pandas as pd
+import numpy as np
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+FEATURES_MATRIX_FILE = "modeling_features.npy"
+TARGET_MATRIX_FILE = "modeling_target.npy"
+SCHEMA_FILE = "modeling_schema.json"
+
+# Ficheros de texto de los que se deriva la matriz y esquema del preprocesamiento
+FEATURES_CSV_FILE = "modeling_features.csv"
+TARGET_CSV_FILE = "modeling_target.csv"
+FEATURE_INFO_FILE = "feature_info.json"
+
+
+def save_modeling_matrix(features_df: pd.DataFrame,
+                         target: pd.Series,
+                         output_dir: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Guarda la matriz de modelado en formato binario.
+
+    Solo se incluyen las columnas numéricas, que son las que consumen los
+    modelos; las dummies booleanas y las columnas de texto quedan en el CSV.
+
+    Args:
+        features_df: DataFrame con características
+        target: Series con variable objetivo
+        output_dir: Carpeta de salida
+
+    Returns:
+        Diccionario con el esquema guardado
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    numeric_cols = features_df.select_dtypes(include=np.number).columns.tolist()
+    matrix = np.ascontiguousarray(features_df[numeric_cols].to_numpy(dtype=np.float32, na_value=np.nan))
+    np.save(output_dir / FEATURES_MATRIX_FILE, matrix)
+    np.save(output_dir / TARGET_MATRIX_FILE, target.to_numpy(dtype=np.int8))
+
+    schema = {
+        'columns': numeric_cols,
+        'source_dtypes': {col: str(features_df[col].dtype) for col in numeric_cols},
+        'shape': list(matrix.shape),
+        'dtype': 'float32',
+        'target_name': target.name
+    }
+    with open(output_dir / SCHEMA_FILE, 'w', encoding='utf-8') as f:
+        json.dump(schema, f, indent=2, ensure_ascii=False)
+
+    logger.info(f"✅ Matriz de modelado binaria guardada: {matrix.shape} ({matrix.nbytes / 1024**2:.1f} MB)")
+    return schema
+
+
+def modeling_matrix_exists(input_dir: Union[str, Path]) -> bool:
+    """
+    Indica si existe una matriz de modelado binaria completa.
+
+    Args:
+        input_dir: Carpeta de datos procesados
+
+    Returns:
+        True si están la matriz, el objetivo y el esquema
+    """
+    input_dir = Path(input_dir)
+    return all((input_dir / name).exists() for name in (FEATURES_MATRIX_FILE, TARGET_MATRIX_FILE, SCHEMA_FILE))
+
+
+def modeling_matrix_problems(input_dir: Union[str, Path]) -> List[str]:
+    """
+    Comprueba si la matriz binaria está al día con el resto del preprocesamiento.
+
+    La matriz queda obsoleta si el CSV de características o de objetivo es
+    más reciente que ella, o si sus columnas y tipos de origen no coinciden
+    con los de feature_info.json (por ejemplo, tras un preprocesamiento
+    interrumpido o un cambio de características).
+
+    Args:
+        input_dir: Carpeta de datos procesados
+
+    Returns:
+        Lista de motivos por los que no debe usarse (vacía si está al día)
+    """
+    input_dir = Path(input_dir)
+    if not modeling_matrix_exists(input_dir):
+        return ["no existe la matriz binaria completa"]
+
+    problems = []
+    matrix_mtime = min((input_dir / name).stat().st_mtime for name in (FEATURES_MATRIX_FILE, TARGET_MATRIX_FILE))
+    for name in (FEATURES_CSV_FILE, TARGET_CSV_FILE):
+        csv_path = input_dir / name
+        if csv_path.exists() and csv_path.stat().st_mtime > matrix_mtime:
+            problems.append(f"{name} es más reciente que la matriz binaria")
+
+    with open(input_dir / SCHEMA_FILE, 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+    feature_info_path = input_dir / FEATURE_INFO_FILE
+    if feature_info_path.exists():
+        with open(feature_info_path, 'r', encoding='utf-8') as f:
+            feature_info = json.load(f)
+        if feature_info.get('numerical_columns', schema['columns']) != schema['columns']:
+            problems.append(f"las columnas no coinciden con {FEATURE_INFO_FILE}")
+        feature_dtypes = feature_info.get('feature_dtypes') or {}
+        changed = [
+            col for col, dtype in schema['source_dtypes'].items()
+            if col in feature_dtypes and feature_dtypes[col] != dtype
+        ]
+        if changed:
+            problems.append(f"tipos distintos a {FEATURE_INFO_FILE} en {changed}")
+    return problems
+
+
+def modeling_matrix_is_current(input_dir: Union[str, Path]) -> bool:
+    """
+    Indica si existe una matriz binaria utilizable (completa y al día).
+
+    Args:
+        input_dir: Carpeta de datos procesados
+
+    Returns:
+        True si puede cargarse en lugar del CSV
+    """
+    problems = modeling_matrix_problems(input_dir)
+    if problems and modeling_matrix_exists(input_dir):
+        logger.warning(f"⚠️ Matriz de modelado binaria obsoleta: {'; '.join(problems)}")
+    return not problems
+
+
+def load_modeling_matrix(input_dir: Union[str, Path], mmap: bool = True) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Carga la matriz de modelado binaria.
+
+    Con mmap=True el array se abre en solo lectura sobre la caché de páginas
+    del sistema, de modo que varios procesos comparten una única copia y el
+    DataFrame devuelto es una vista sin copia.
+
+    Args:
+        input_dir: Carpeta de datos procesados
+        mmap: Si True, abre el array con memory-mapping
+
+    Returns:
+        Tuple con DataFrame de características y Series de variable objetivo
+    """
+    input_dir = Path(input_dir)
+    with open(input_dir / SCHEMA_FILE, 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+
+    matrix = np.load(input_dir / FEATURES_MATRIX_FILE, mmap_mode='r' if mmap else None)
+    if list(matrix.shape) != schema['shape']:
+        raise ValueError(f"La matriz {matrix.shape} no coincide con el esquema {schema['shape']}")
+
+    features_df = pd.DataFrame(matrix, columns=schema['columns'], copy=False)
+    target = pd.Series(np.load(input_dir / TARGET_MATRIX_FILE), name=schema.get('target_name'))
+    if len(target) != len(features_df):
+        raise ValueError(f"El objetivo ({len(target)} filas) no coincide con la matriz ({len(features_df)} filas)")
+
+    logger.info(f"✅ Matriz de modelado binaria cargada: {matrix.shape} (mmap={mmap})")
+    return features_df, target
@@ -0,0 +1,158 @@
+"""
+Módulo de sketches de cuantiles mergeables (KLL).
+
+Este módulo permite estimar cuantiles (p. ej. la mediana de total_clicks)
+procesando los datos por bloques o en particiones paralelas: cada partición
+construye su propio sketch y los sketches se combinan con merge(). El
+sketch es serializable para congelarlo junto al estado ajustado de las
+características.
+"""
+
+import numpy as np
+from typing import Any, Dict, Iterable, Optional
+
+
+class KLLSketch:
+    """
+    Sketch de cuantiles KLL (Karnin, Lang y Liberty) sobre arrays de NumPy.
+
+    Mantiene una jerarquía de compactadores; los elementos del nivel h pesan
+    2**h. Mientras no se haya compactado nada el sketch es exacto y los
+    cuantiles coinciden con np.quantile (interpolación lineal).
+    """
+
+    def __init__(self, k: int = 1024, c: float = 2.0 / 3.0, seed: int = 42):
+        """
+        Inicializa el sketch.
+
+        Args:
+            k: Capacidad del compactador superior (controla la precisión, error ~1/k)
+            c: Factor de decrecimiento de la capacidad en los niveles inferiores
+            seed: Semilla del generador usado al compactar
+        """
+        self.k = k
+        self.c = c
+        self.count = 0
+        self.compactors = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        """Capacidad del compactador de un nivel."""
+        depth = len(self.compactors) - level - 1
+        return max(int(np.ceil(self.k * self.c ** depth)), 2)
+
+    def _compress(self) -> None:
+        """Compacta los niveles que exceden su capacidad."""
+        level = 0
+        while level < len(self.compactors):
+            items = self.compactors[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                # Con longitud impar, el último elemento se queda en este nivel
+                keep = items[len(items) - len(items) % 2:]
+                promoted = items[self._rng.integers(2):len(items) - len(items) % 2:2]
+                self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], promoted])
+                self.compactors[level] = keep
+            level += 1
+
+    @property
+    def is_exact(self) -> bool:
+        """Indica si todavía no se ha compactado ningún elemento."""
+        return len(self.compactors) == 1
+
+    def update(self, values: Iterable[float]) -> 'KLLSketch':
+        """
+        Añade un bloque de valores al sketch (los NaN se ignoran).
+
+        Args:
+            values: Valores a añadir
+
+        Returns:
+            El propio sketch
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size:
+            self.compactors[0] = np.concatenate([self.compactors[0], values])
+            self.count += values.size
+            self._compress()
+        return self
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        """
+        Combina otro sketch en este (p. ej. el de otra partición).
+
+        Args:
+            other: Sketch a combinar
+
+        Returns:
+            El propio sketch
+        """
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> float:
+        """
+        Estima un cuantil.
+
+        Args:
+            q: Cuantil en [0, 1]
+
+        Returns:
+            Valor estimado (NaN si el sketch está vacío)
+        """
+        if self.count == 0:
+            return float('nan')
+        if self.is_exact:
+            return float(np.quantile(self.compactors[0], q))
+
+        items = np.concatenate(self.compactors)
+        weights = np.concatenate([
+            np.full(len(level_items), 2.0 ** level) for level, level_items in enumerate(self.compactors)
+        ])
+        order = np.argsort(items, kind='mergesort')
+        cumulative = np.cumsum(weights[order])
+        position = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return float(items[order][min(position, len(items) - 1)])
+
+    def median(self) -> float:
+        """Estima la mediana."""
+        return self.quantile(0.5)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serializa el sketch a un diccionario compatible con JSON.
+
+        Returns:
+            Diccionario con parámetros, conteo y compactadores
+        """
+        return {
+            'k': self.k,
+            'c': self.c,
+            'count': self.count,
+            'compactors': [items.tolist() for items in self.compactors]
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any], seed: Optional[int] = 42) -> 'KLLSketch':
+        """
+        Reconstruye un sketch serializado con to_dict().
+
+        Args:
+            state: Diccionario serializado
+            seed: Semilla para futuras compactaciones
+
+        Returns:
+            Sketch reconstruido
+        """
+        sketch = cls(k=state['k'], c=state['c'], seed=seed)
+        sketch.count = state['count']
+        sketch.compactors = [np.asarray(items, dtype=np.float64) for items in state['compactors']]
+        return sketch
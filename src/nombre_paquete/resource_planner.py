@@ -0,0 +1,296 @@
+"""
+Módulo de planificación de recursos (CPU y memoria) del pipeline.
+
+Este módulo inspecciona al arrancar la memoria disponible, los límites del
+cgroup (contenedores) y los núcleos asignados al proceso, y deriva de ellos
+un único objeto de configuración: tamaño de bloque para leer CSV, número de
+workers de los pools de procesos, presupuesto de memoria de las agregaciones
+fuera de memoria e hilos de BLAS/OpenMP por proceso. Los cargadores, los
+procesadores y los modelos consumen este plan en lugar de números fijos, de
+modo que el mismo código se adapta a un portátil de 4 GB o a un servidor de
+64 núcleos sin sobresuscribir la CPU cuando un pool de procesos envuelve
+sklearn o TensorFlow.
+
+Las variables de entorno TDSP_CPU_LIMIT, TDSP_MAX_WORKERS y
+TDSP_MEMORY_LIMIT_MB permiten fijar los límites a mano; el orquestador del
+pipeline fija TDSP_CPU_LIMIT en cada etapa según las que corren en paralelo.
+"""
+
+import os
+from functools import lru_cache
+from typing import Any, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Fracción de la memoria disponible que el pipeline se permite usar
+DEFAULT_MEMORY_FRACTION = 0.5
+
+# Memoria estimada por worker de un pool de procesos (MB)
+DEFAULT_WORKER_MEMORY_MB = 512
+
+# Bytes estimados por fila al leer un CSV (incluye el sobrecoste del parser)
+CSV_ROW_BYTES = 1024
+
+# Límites del tamaño de bloque al leer CSV por bloques
+MIN_CHUNK_ROWS = 10_000
+MAX_CHUNK_ROWS = 2_000_000
+
+# Variables de entorno que controlan los hilos de las librerías numéricas
+THREAD_ENV_VARS = (
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS',
+    'NUMEXPR_NUM_THREADS'
+)
+
+# Valor de cgroup que indica "sin límite" en cgroup v1 (en torno a 2^63)
+_CGROUP_V1_UNLIMITED = 1 << 60
+
+
+def _read_first_line(path: str) -> Optional[str]:
+    """Lee la primera línea de un fichero (None si no existe)."""
+    try:
+        with open(path, 'r') as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def detect_cpu_count() -> int:
+    """
+    Núcleos utilizables por el proceso.
+
+    Tiene en cuenta la afinidad de CPU, la cuota de CPU del cgroup (v2
+    ``cpu.max`` o v1 ``cpu.cfs_quota_us``), que os.cpu_count ignora, y el
+    límite TDSP_CPU_LIMIT.
+
+    Returns:
+        Número de núcleos (>= 1)
+    """
+    try:
+        n_cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        n_cpus = os.cpu_count() or 1
+
+    quota = None
+    cpu_max = _read_first_line('/sys/fs/cgroup/cpu.max')
+    if cpu_max is not None:
+        limit, period = (cpu_max.split() + ['100000'])[:2]
+        if limit != 'max':
+            quota = int(limit) / int(period)
+    else:
+        limit = _read_first_line('/sys/fs/cgroup/cpu/cpu.cfs_quota_us')
+        period = _read_first_line('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+        if limit is not None and period is not None and int(limit) > 0:
+            quota = int(limit) / int(period)
+
+    if quota is not None:
+        n_cpus = min(n_cpus, max(int(quota), 1))
+    if os.environ.get('TDSP_CPU_LIMIT'):
+        n_cpus = min(n_cpus, int(os.environ['TDSP_CPU_LIMIT']))
+    return max(n_cpus, 1)
+
+
+def detect_memory_mb() -> Dict[str, Optional[float]]:
+    """
+    Memoria disponible y límite del cgroup.
+
+    Returns:
+        Diccionario con 'available_mb' (memoria libre utilizable del sistema),
+        'cgroup_limit_mb' (None si no hay límite) y 'cgroup_usage_mb'
+    """
+    available_mb = None
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    available_mb = int(line.split()[1]) / 1024
+                    break
+    except OSError:
+        pass
+    if available_mb is None:
+        try:
+            import psutil
+            available_mb = psutil.virtual_memory().available / 1024 ** 2
+        except ImportError:
+            pass
+
+    limit_mb, usage_mb = None, None
+    limit = _read_first_line('/sys/fs/cgroup/memory.max')
+    usage = _read_first_line('/sys/fs/cgroup/memory.current')
+    if limit is None:
+        limit = _read_first_line('/sys/fs/cgroup/memory/memory.limit_in_bytes')
+        usage = _read_first_line('/sys/fs/cgroup/memory/memory.usage_in_bytes')
+    if limit is not None and limit != 'max' and int(limit) < _CGROUP_V1_UNLIMITED:
+        limit_mb = int(limit) / 1024 ** 2
+    if usage is not None:
+        usage_mb = int(usage) / 1024 ** 2
+
+    return {'available_mb': available_mb, 'cgroup_limit_mb': limit_mb, 'cgroup_usage_mb': usage_mb}
+
+
+class ResourcePlan:
+    """
+    Parámetros de ejecución derivados de la CPU y la memoria disponibles.
+
+    Atributos:
+        n_cpus: Núcleos utilizables por el proceso
+        memory_mb: Memoria utilizable (mínimo entre la disponible y el margen del cgroup)
+        memory_budget_mb: Presupuesto para datos en memoria (fracción de memory_mb)
+        n_workers: Procesos de los pools (limitados por núcleos y por memoria)
+        blas_threads: Hilos BLAS/OpenMP por proceso cuando hay n_workers procesos
+        chunk_rows: Filas por bloque al leer CSV grandes
+    """
+
+    def __init__(self,
+                 n_cpus: int,
+                 memory_mb: float,
+                 memory_fraction: float = DEFAULT_MEMORY_FRACTION,
+                 worker_memory_mb: float = DEFAULT_WORKER_MEMORY_MB,
+                 max_workers: Optional[int] = None):
+        """
+        Deriva el plan a partir de los recursos detectados.
+
+        Args:
+            n_cpus: Núcleos utilizables
+            memory_mb: Memoria utilizable en MB
+            memory_fraction: Fracción de la memoria reservada a los datos
+            worker_memory_mb: Memoria estimada por worker (limita n_workers)
+            max_workers: Máximo de workers impuesto por el usuario
+        """
+        self.n_cpus = max(int(n_cpus), 1)
+        self.memory_mb = float(memory_mb)
+        self.memory_budget_mb = self.memory_mb * memory_fraction
+
+        workers_by_memory = max(int(self.memory_budget_mb // worker_memory_mb), 1)
+        self.n_workers = min(self.n_cpus, workers_by_memory)
+        if max_workers is not None:
+            self.n_workers = max(min(self.n_workers, max_workers), 1)
+
+        # Cada proceso del pool usa su parte de los núcleos, sin sobresuscribir
+        self.blas_threads = max(self.n_cpus // self.n_workers, 1)
+
+        chunk_rows = int(self.memory_budget_mb * 1024 ** 2 / (self.n_workers * CSV_ROW_BYTES))
+        self.chunk_rows = min(max(chunk_rows, MIN_CHUNK_ROWS), MAX_CHUNK_ROWS)
+
+    def resolve_n_jobs(self, n_jobs: Optional[int]) -> int:
+        """
+        Traduce un n_jobs de estilo sklearn al número de procesos del plan.
+
+        Args:
+            n_jobs: Número de procesos solicitado (-1 o None usan n_workers)
+
+        Returns:
+            Número de procesos (>= 1)
+        """
+        if n_jobs is None or n_jobs < 0:
+            return self.n_workers
+        return max(n_jobs, 1)
+
+    def threads_per_process(self, n_processes: int) -> int:
+        """
+        Hilos BLAS/OpenMP por proceso si se lanzan n_processes en paralelo.
+
+        Args:
+            n_processes: Procesos simultáneos
+
+        Returns:
+            Número de hilos (>= 1)
+        """
+        return max(self.n_cpus // max(n_processes, 1), 1)
+
+    def thread_env(self, n_threads: Optional[int] = None) -> Dict[str, str]:
+        """
+        Variables de entorno que limitan los núcleos de un subproceso.
+
+        Incluye TDSP_CPU_LIMIT para que el plan del subproceso también se ajuste.
+
+        Args:
+            n_threads: Hilos permitidos (por defecto, blas_threads)
+
+        Returns:
+            Diccionario variable -> valor
+        """
+        value = str(n_threads or self.blas_threads)
+        return {**{name: value for name in THREAD_ENV_VARS}, 'TDSP_CPU_LIMIT': value}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Representación serializable del plan.
+
+        Returns:
+            Diccionario con los parámetros del plan
+        """
+        return {
+            'n_cpus': self.n_cpus,
+            'memory_mb': round(self.memory_mb, 1),
+            'memory_budget_mb': round(self.memory_budget_mb, 1),
+            'n_workers': self.n_workers,
+            'blas_threads': self.blas_threads,
+            'chunk_rows': self.chunk_rows
+        }
+
+    def __repr__(self) -> str:
+        return f"ResourcePlan({self.to_dict()})"
+
+
+def plan_resources(memory_fraction: float = DEFAULT_MEMORY_FRACTION,
+                   worker_memory_mb: float = DEFAULT_WORKER_MEMORY_MB) -> ResourcePlan:
+    """
+    Inspecciona la máquina y construye un plan de recursos.
+
+    Args:
+        memory_fraction: Fracción de la memoria utilizable reservada a los datos
+        worker_memory_mb: Memoria estimada por worker de un pool de procesos
+
+    Returns:
+        ResourcePlan con los parámetros derivados
+    """
+    n_cpus = detect_cpu_count()
+    memory = detect_memory_mb()
+
+    candidates = []
+    if memory['available_mb'] is not None:
+        candidates.append(memory['available_mb'])
+    if memory['cgroup_limit_mb'] is not None:
+        candidates.append(memory['cgroup_limit_mb'] - (memory['cgroup_usage_mb'] or 0))
+    if os.environ.get('TDSP_MEMORY_LIMIT_MB'):
+        candidates.append(float(os.environ['TDSP_MEMORY_LIMIT_MB']))
+    memory_mb = max(min(candidates), 256.0) if candidates else 4096.0
+
+    max_workers = int(os.environ['TDSP_MAX_WORKERS']) if os.environ.get('TDSP_MAX_WORKERS') else None
+    plan = ResourcePlan(n_cpus, memory_mb, memory_fraction, worker_memory_mb, max_workers)
+    logger.info(f"🧮 Plan de recursos: {plan.to_dict()}")
+    return plan
+
+
+@lru_cache(maxsize=1)
+def get_resource_plan() -> ResourcePlan:
+    """
+    Plan de recursos del proceso (se calcula una sola vez).
+
+    Returns:
+        ResourcePlan compartido por cargadores, procesadores y modelos
+    """
+    return plan_resources()
+
+
+def limit_worker_threads(n_threads: int) -> None:
+    """
+    Limita los hilos BLAS/OpenMP del proceso actual.
+
+    Pensada como initializer de los pools de procesos: las variables de
+    entorno cubren las librerías que aún no se han cargado y threadpoolctl
+    (si está instalado) las que ya lo están.
+
+    Args:
+        n_threads: Hilos permitidos
+    """
+    os.environ.update({name: str(n_threads) for name in THREAD_ENV_VARS})
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(n_threads)
+    except ImportError:
+        pass
@@ -0,0 +1,528 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from nombre_paquete.database import data_processor
+from nombre_paquete.database.data_processor import (
+    INTERACTION_AGGREGATIONS,
+    INTERACTION_KEYS,
+    process_all_data,
+    read_processed_table,
+    save_processed_data,
+)
+from nombre_paquete.database.out_of_core import out_of_core_groupby
+
+
+def _synthetic_student_vle(n_rows=20000, seed=0):
+    """Genera interacciones sintéticas con el esquema de studentVle y su activity_type."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id_student': rng.integers(0, 300, n_rows),
+        'code_module': rng.choice(['AAA', 'BBB', 'CCC'], n_rows),
+        'code_presentation': rng.choice(['2013J', '2014B'], n_rows),
+        'date': rng.integers(-10, 60, n_rows),
+        'sum_click': rng.integers(1, 20, n_rows),
+        'activity_type': rng.choice(['resource', 'quiz', 'forumng', None], n_rows),
+    })
+
+
+def test_out_of_core_groupby_matches_in_memory(tmp_path):
+    """La agregación por particiones en disco debe ser idéntica al groupby en memoria."""
+    student_vle = _synthetic_student_vle()
+    expected = student_vle.groupby(INTERACTION_KEYS).agg(INTERACTION_AGGREGATIONS)
+
+    # Presupuesto diminuto: fuerza varias particiones y bloques
+    result = out_of_core_groupby(
+        student_vle, INTERACTION_KEYS, INTERACTION_AGGREGATIONS, memory_budget_mb=0.5, spill_dir=tmp_path
+    )
+    pd.testing.assert_frame_equal(result, expected)
+
+    # También leyendo por bloques desde CSV, con std y nunique exactos
+    csv_path = tmp_path / 'student_vle.csv'
+    student_vle.to_csv(csv_path, index=False)
+    spec = {'sum_click': ['std', 'min', 'max'], 'date': 'nunique'}
+    result = out_of_core_groupby(csv_path, ['id_student'], spec, memory_budget_mb=0.2, spill_dir=tmp_path)
+    pd.testing.assert_frame_equal(result, pd.read_csv(csv_path).groupby(['id_student']).agg(spec))
+    assert not list(tmp_path.glob('tdsp-spill-*'))
+
+
+def test_out_of_core_csv_chunks_fit_memory_budget(tmp_path):
+    """Con un CSV el tamaño de bloque se estima con una muestra: cada bloque cabe en su parte del presupuesto."""
+    rng = np.random.default_rng(3)
+    n_rows = 40000
+    wide = pd.DataFrame({
+        'id_student': rng.integers(0, 500, n_rows),
+        'comment': [f"comentario-largo-{i:06d}-" + 'x' * 60 for i in range(n_rows)],
+        'sum_click': rng.integers(1, 20, n_rows),
+    })
+    csv_path = tmp_path / 'wide.csv'
+    wide.to_csv(csv_path, index=False)
+
+    chunk_bytes = []
+    def record(chunk):
+        chunk_bytes.append(chunk.memory_usage(deep=True).sum())
+        return chunk
+
+    memory_budget_mb = 2
+    result = out_of_core_groupby(
+        csv_path, ['id_student'], {'sum_click': 'sum'}, memory_budget_mb=memory_budget_mb,
+        transform=record, spill_dir=tmp_path
+    )
+    pd.testing.assert_frame_equal(result, wide.groupby(['id_student']).agg({'sum_click': 'sum'}))
+
+    chunk_budget = memory_budget_mb * 1024 ** 2 / 4
+    assert len(chunk_bytes) > 1
+    assert max(chunk_bytes) <= 1.05 * chunk_budget
+    assert max(chunk_bytes) >= 0.5 * chunk_budget
+
+
+def _synthetic_data_dict(seed=1):
+    """Genera un conjunto OULAD sintético pequeño con dos presentaciones."""
+    rng = np.random.default_rng(seed)
+    modules = [('AAA', '2013J'), ('BBB', '2014B')]
+    student_info = pd.DataFrame({
+        'code_module': [modules[i % 2][0] for i in range(60)],
+        'code_presentation': [modules[i % 2][1] for i in range(60)],
+        'id_student': np.arange(60),
+        'gender': rng.choice(['M', 'F'], 60),
+        'region': rng.choice(['East', 'Wales', None], 60),
+        'num_of_prev_attempts': rng.integers(0, 3, 60),
+        'studied_credits': rng.choice([60, 120, 240], 60),
+        'final_result': rng.choice(['Pass', 'Fail', 'Withdrawn'], 60),
+    })
+    return {
+        'student_info': student_info,
+        'student_registration': student_info[['code_module', 'code_presentation', 'id_student']].iloc[5:].assign(
+            date_registration=rng.integers(-50, 0, 55).astype(float), date_unregistration=np.nan
+        ),
+        'courses': pd.DataFrame({'code_module': ['AAA'], 'code_presentation': ['2013J'], 'module_presentation_length': [268]}),
+        'vle': pd.DataFrame({'id_site': np.arange(10), 'activity_type': rng.choice(['quiz', 'resource'], 10)}),
+        'student_vle': _synthetic_student_vle(3000, seed=seed).drop(columns=['activity_type']).assign(
+            id_site=lambda df: df['id_student'] % 12
+        ),
+        'assessments': pd.DataFrame({
+            'code_module': ['AAA', 'BBB', 'AAA'], 'code_presentation': ['2013J', '2014B', '2013J'],
+            'id_assessment': [1, 2, 3], 'assessment_type': ['TMA', 'CMA', 'Exam'], 'weight': [20, 0, 100]
+        }),
+        'student_assessments': pd.DataFrame({
+            'id_assessment': rng.integers(1, 5, 200),
+            'id_student': rng.integers(0, 60, 200),
+            'date_submitted': rng.integers(0, 250, 200),
+            'score': np.where(rng.random(200) < 0.1, np.nan, rng.integers(0, 100, 200).astype(float)),
+        }),
+    }
+
+
+def test_polars_engine_matches_pandas(tmp_path):
+    """El backend Polars debe producir las mismas tablas derivadas que el backend pandas, también desde ficheros."""
+    pytest.importorskip('polars')
+    data_dict = _synthetic_data_dict()
+
+    expected = process_all_data(data_dict)
+    result = process_all_data(data_dict, engine='polars')
+    for name in ['student_consolidated', 'interaction_features', 'assessment_features']:
+        pd.testing.assert_frame_equal(result[name], expected[name], check_exact=False, rtol=1e-12)
+
+    # Las tablas de hechos pasadas como ruta se escanean desde el fichero sin cargarlas en pandas
+    pytest.importorskip('pyarrow')
+    file_dict = dict(data_dict)
+    data_dict['student_vle'].to_csv(tmp_path / 'student_vle.csv', index=False)
+    data_dict['student_assessments'].to_parquet(tmp_path / 'student_assessments.parquet', index=False)
+    file_dict['student_vle'] = str(tmp_path / 'student_vle.csv')
+    file_dict['student_assessments'] = tmp_path / 'student_assessments.parquet'
+    result = process_all_data(file_dict, engine='polars')
+    for name in ['student_consolidated', 'interaction_features', 'assessment_features']:
+        pd.testing.assert_frame_equal(result[name], expected[name], check_exact=False, rtol=1e-12)
+
+
+def test_partitioned_processing_matches_serial(caplog):
+    """process_all_data y prepare_features con n_jobs=2 deben dar lo mismo que en serie."""
+    from nombre_paquete.preprocessing.feature_engineering import FeatureEngineer
+
+    data_dict = _synthetic_data_dict()
+    serial = process_all_data(data_dict)
+    parallel = process_all_data(data_dict, n_jobs=2)
+    for name in ['student_consolidated', 'interaction_features', 'assessment_features']:
+        pd.testing.assert_frame_equal(parallel[name], serial[name], check_exact=False, rtol=1e-12)
+
+    student_df = serial['student_consolidated']
+    interaction_features = serial['interaction_features']
+    serial_engineer = FeatureEngineer()
+    expected_features, expected_target = serial_engineer.prepare_features(student_df, interaction_features)
+    parallel_engineer = FeatureEngineer()
+    features, target = parallel_engineer.prepare_features(student_df, interaction_features, n_jobs=2)
+    pd.testing.assert_frame_equal(features, expected_features)
+    pd.testing.assert_series_equal(target, expected_target)
+    assert parallel_engineer.activity_thresholds == serial_engineer.activity_thresholds
+    assert parallel_engineer.feature_dtypes == serial_engineer.feature_dtypes
+
+    # Los modos que no reparten por procesos lo avisan en lugar de ignorar n_jobs en silencio
+    with caplog.at_level('WARNING', logger=data_processor.logger.name):
+        process_all_data(data_dict, n_jobs=2, memory_budget_mb=64)
+    assert 'n_jobs' in caplog.text
+
+
+def test_feature_store_writes_one_vector_per_enrollment(tmp_path):
+    """Las filas por fecha se agregan por matrícula y get/get_many devuelven esos vectores."""
+    from nombre_paquete.database.feature_store import FeatureStore, aggregate_enrollments
+
+    features_df = pd.DataFrame({
+        'id_student': [1, 1, 1, 2],
+        'code_module': ['AAA', 'AAA', 'AAA', 'BBB'],
+        'code_presentation': ['2013J'] * 3 + ['2014B'],
+        'gender_M': [True, True, True, False],
+        'studied_credits': [60, 60, 60, 120],
+        'date': [-3, 5, 10, 2],
+        'total_clicks': [4.0, 6.0, 10.0, 7.0],
+        'interaction_count': [2, 2, 1, 7],
+        'avg_clicks_per_interaction': [2.0, 3.0, 10.0, 1.0],
+        'high_activity': [0, 1, 1, 1],
+    })
+    enrollments_df = aggregate_enrollments(features_df)
+    assert len(enrollments_df) == 2 and enrollments_df.columns.tolist() == features_df.columns.tolist()
+    first = enrollments_df.iloc[0]
+    assert first['date'] == 10 and first['total_clicks'] == 20 and first['interaction_count'] == 5
+    assert first['avg_clicks_per_interaction'] == 4 and np.isclose(first['high_activity'], 2 / 3)
+    assert first['gender_M'] and first['studied_credits'] == 60
+
+    with FeatureStore(tmp_path / 'store.sqlite') as store:
+        with pytest.raises(ValueError):
+            store.write(features_df)
+        version = store.write(enrollments_df)
+        columns = store.get_columns(version)
+        assert columns == [col for col in features_df.columns if col not in ['id_student', 'code_module', 'code_presentation']]
+
+        vector = store.get(1, 'AAA', '2013J')
+        np.testing.assert_array_equal(vector.to_numpy(), enrollments_df.iloc[0][columns].to_numpy(dtype=float))
+        assert store.get(3, 'AAA', '2013J') is None
+
+        batch = store.get_many([(2, 'BBB', '2014B'), (9, 'CCC', '2014J'), (1, 'AAA', '2013J')])
+        assert batch['id_student'].tolist() == [2, 9, 1]
+        np.testing.assert_array_equal(batch.loc[0, columns].to_numpy(dtype=float), enrollments_df.iloc[1][columns].to_numpy(dtype=float))
+        assert batch.loc[1, columns].isna().all()
+
+
+def test_feature_store_versions_and_retention(tmp_path):
+    """Cada escritura crea una versión; solo se conservan las últimas y los nombres no se reutilizan."""
+    from nombre_paquete.database.feature_store import FeatureStore
+
+    def features(value):
+        return pd.DataFrame({'id_student': [1], 'code_module': ['AAA'], 'code_presentation': ['2013J'], 'x': [value]})
+
+    with FeatureStore(tmp_path / 'store.sqlite') as store:
+        for value in range(4):
+            store.write(features(float(value)), max_versions=None)
+        assert store.list_versions()['version'].tolist() == ['v1', 'v2', 'v3', 'v4']
+        assert store.get(1, 'AAA', '2013J', version='v2')['x'] == 1
+        assert store.get(1, 'AAA', '2013J')['x'] == 3
+
+        assert store.write(features(4.0), max_versions=2) == 'v5'
+        assert store.list_versions()['version'].tolist() == ['v4', 'v5']
+        assert store.get(1, 'AAA', '2013J', version='v2') is None
+        assert store.connection.execute("SELECT COUNT(*) FROM features").fetchone()[0] == 2
+        assert store.write(features(5.0), max_versions=2) == 'v6'
+        assert store.latest_version() == 'v6'
+
+
+def test_clean_outputs_share_memory_with_sources():
+    """Las tablas *_clean deben ser referencias a los DataFrames de origen, sin copias."""
+    student_vle = _synthetic_student_vle(500)
+    data_dict = {
+        'student_info': pd.DataFrame({'code_module': ['AAA'], 'code_presentation': ['2013J'], 'id_student': [0]}),
+        'student_registration': pd.DataFrame({
+            'code_module': ['AAA'], 'code_presentation': ['2013J'], 'id_student': [0],
+            'date_registration': [-10.0], 'date_unregistration': [np.nan]
+        }),
+        'courses': pd.DataFrame({'code_module': ['AAA'], 'code_presentation': ['2013J'], 'module_presentation_length': [268]}),
+        'vle': pd.DataFrame({'id_site': np.arange(5), 'activity_type': ['quiz'] * 5}),
+        'student_vle': student_vle.drop(columns=['activity_type']).assign(id_site=0),
+        'assessments': pd.DataFrame({'id_assessment': [1], 'assessment_type': ['TMA'], 'weight': [100]}),
+        'student_assessments': pd.DataFrame({'id_assessment': [1], 'id_student': [0], 'date_submitted': [5], 'score': [70.0]}),
+    }
+
+    processed = process_all_data(data_dict)
+    for name, df in data_dict.items():
+        clean = processed[f"{name}_clean"]
+        for col in df.select_dtypes(include=np.number).columns:
+            assert np.shares_memory(clean[col].to_numpy(), df[col].to_numpy())
+
+
+@pytest.mark.parametrize('format', ['parquet', 'feather'])
+def test_processed_tables_round_trip(tmp_path, format, monkeypatch):
+    """Las tablas guardadas en formato columnar deben leerse idénticas y con un row group por presentación."""
+    pytest.importorskip('pyarrow')
+    monkeypatch.setattr(data_processor, 'ROW_GROUP_PARTITION_MIN_ROWS', 100)
+    # Orden de los CSV de OULAD: por módulo y después por presentación, de modo
+    # que cada code_presentation aparece en varios tramos no contiguos
+    student_vle = _synthetic_student_vle(2000).sort_values(
+        ['code_module', 'code_presentation'], kind='mergesort', ignore_index=True
+    )
+    tables = {'student_vle_clean': student_vle, 'small': student_vle.head(10)}
+
+    save_processed_data(tables, tmp_path, format=format, n_jobs=2)
+
+    for name, df in tables.items():
+        pd.testing.assert_frame_equal(read_processed_table(tmp_path, name), df)
+    if format == 'parquet':
+        import pyarrow.parquet as pq
+        row_groups = pq.ParquetFile(tmp_path / 'student_vle_clean.parquet').metadata.num_row_groups
+        assert row_groups == student_vle.groupby(['code_module', 'code_presentation']).ngroups == 6
+
+    # Sin agrupar por presentación se mantienen el orden y row groups de tamaño fijo
+    assert data_processor._row_group_runs(_synthetic_student_vle(2000), ['code_module', 'code_presentation']) == [(0, 2000)]
+
+
+def test_incremental_ingest_tracks_changed_partitions(tmp_path):
+    """Cada lote se añade sin reescribir el histórico y marca solo las particiones que toca."""
+    pytest.importorskip('pyarrow')
+    from nombre_paquete.database.incremental_ingest import InteractionStore
+
+    vle = pd.DataFrame({'id_site': [1, 2], 'code_module': ['AAA', 'BBB'], 'code_presentation': ['2013J', '2014B']})
+    registration = pd.DataFrame({'id_student': [10, 11], 'code_module': ['AAA', 'BBB'], 'code_presentation': ['2013J', '2014B']})
+    day_1 = pd.DataFrame({
+        'code_module': ['AAA', 'BBB'], 'code_presentation': ['2013J', '2014B'],
+        'id_student': [10, 11], 'id_site': [1, 2], 'date': [1, 1], 'sum_click': [3, 4]
+    })
+    day_2 = day_1.head(1).assign(date=2, sum_click=7)
+
+    store = InteractionStore(tmp_path / 'store')
+    store.ingest(day_1, vle, registration)
+    store.mark_consumed('interaction_features')
+    result = store.ingest(day_2, vle, registration)
+
+    assert store.changed_partitions('interaction_features') == [('AAA', '2013J', 2)]
+    assert store.ingest(day_2, vle, registration)['rows'] == 0
+    assert result['changed_partitions'] == ['code_module=AAA/code_presentation=2013J/date=2']
+    expected = pd.concat([day_1, day_2]).sort_values(['code_module', 'code_presentation', 'date'], ignore_index=True)
+    pd.testing.assert_frame_equal(InteractionStore(tmp_path / 'store').read(), expected)
+
+    with pytest.raises(ValueError):
+        store.ingest(day_2.assign(id_site=2), vle, registration)
+
+
+def test_incremental_store_seeded_with_history_reads_history_plus_delta(tmp_path):
+    """La adquisición completa siembra el histórico; tras un lote, read() devuelve histórico + lote."""
+    pytest.importorskip('pyarrow')
+    from nombre_paquete.database.incremental_ingest import InteractionStore
+
+    vle = pd.DataFrame({'id_site': [1, 2], 'code_module': ['AAA', 'BBB'], 'code_presentation': ['2013J', '2014B']})
+    registration = pd.DataFrame({'id_student': [10, 11], 'code_module': ['AAA', 'BBB'], 'code_presentation': ['2013J', '2014B']})
+    history = pd.DataFrame({
+        'code_module': ['AAA', 'BBB', 'AAA'], 'code_presentation': ['2013J', '2014B', '2013J'],
+        'id_student': [10, 11, 10], 'id_site': [1, 2, 1], 'date': [1, 1, 2], 'sum_click': [3, 4, 5]
+    })
+    delta = history.head(1).assign(date=2, sum_click=7)
+
+    store = InteractionStore(tmp_path / 'store')
+    assert not store.has_history()
+    # Histórico por bloques, como en la adquisición con presupuesto de memoria
+    store.ingest_history([history.iloc[:2], history.iloc[2:]])
+    store.mark_consumed('interaction_features')
+    store.ingest(delta, vle, registration)
+
+    reopened = InteractionStore(tmp_path / 'store')
+    assert reopened.has_history() and reopened.manifest['history']['rows'] == 3
+    assert reopened.changed_partitions('interaction_features') == [('AAA', '2013J', 2)]
+    expected = pd.concat([history, delta]).sort_values(['code_module', 'code_presentation', 'date'], kind='stable', ignore_index=True)
+    pd.testing.assert_frame_equal(reopened.read(), expected)
+
+    # Una nueva adquisición completa reconstruye el almacén desde cero
+    reopened.ingest_history([history])
+    pd.testing.assert_frame_equal(
+        InteractionStore(tmp_path / 'store').read(),
+        history.sort_values(['code_module', 'code_presentation', 'date'], kind='stable', ignore_index=True)
+    )
+
+
+def test_incremental_aggregates_match_full_recompute():
+    """Plegar lotes en el estado agregado debe dar la misma tabla que un recálculo completo."""
+    from nombre_paquete.database.data_processor import create_interaction_features
+    from nombre_paquete.database.interaction_aggregates import InteractionAggregateState
+
+    vle = pd.DataFrame({'id_site': np.arange(12), 'activity_type': ['quiz', 'resource', 'forumng', None] * 3})
+    student_vle = _synthetic_student_vle(5000, seed=2).drop(columns=['activity_type']).assign(
+        id_site=lambda df: df['id_student'] % 14
+    )
+
+    with InteractionAggregateState(':memory:') as state:
+        for batch_id, batch in enumerate(np.array_split(np.arange(len(student_vle)), 4)):
+            state.fold(student_vle.iloc[batch], vle, batch_id=str(batch_id))
+        state.fold(student_vle.iloc[:10], vle, batch_id='0')
+
+        expected = create_interaction_features({'student_vle': student_vle, 'vle': vle})
+        assert state.interaction_features().equals(expected)
+        assert state.verify(student_vle, vle)['overall_status'] == 'PASS'
+
+
+def test_activity_popcount_without_numpy_bitwise_count(monkeypatch):
+    """El recuento de tipos de actividad no depende de np.bitwise_count (NumPy >= 2.0)."""
+    from nombre_paquete.database.interaction_aggregates import _popcount
+
+    bits = np.array([0, 1, 6, 2 ** 40 + 7, 2 ** 63], dtype=np.uint64)
+    expected = np.array([bin(int(value)).count('1') for value in bits])
+    np.testing.assert_array_equal(_popcount(bits), expected)
+    monkeypatch.delattr(np, 'bitwise_count', raising=False)
+    np.testing.assert_array_equal(_popcount(bits), expected)
+
+
+def test_delta_ingest_after_full_acquisition_matches_full_recompute(tmp_path, monkeypatch):
+    """Tras una adquisición completa, un lote --delta produce interaction_features de histórico + lote."""
+    pytest.importorskip('pyarrow')
+    import importlib.util
+    from nombre_paquete.database.data_processor import create_interaction_features
+
+    spec = importlib.util.spec_from_file_location(
+        'data_acquisition_main', os.path.join(os.path.dirname(__file__), '../scripts/data_acquisition/main.py')
+    )
+    acquisition = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(acquisition)
+
+    rng = np.random.default_rng(8)
+    presentations = [('AAA', '2013J'), ('BBB', '2014B')]
+    vle = pd.DataFrame({
+        'id_site': np.arange(12),
+        'code_module': [presentations[i // 6][0] for i in range(12)],
+        'code_presentation': [presentations[i // 6][1] for i in range(12)],
+        'activity_type': ['quiz', 'resource', 'forumng'] * 4
+    })
+    registration = pd.DataFrame(
+        [(student, module, presentation) for student in range(20) for module, presentation in presentations],
+        columns=['id_student', 'code_module', 'code_presentation']
+    )
+
+    def interactions(n_rows, dates):
+        which = rng.integers(0, 2, n_rows)
+        return pd.DataFrame({
+            'code_module': np.array(['AAA', 'BBB'])[which],
+            'code_presentation': np.array(['2013J', '2014B'])[which],
+            'id_student': rng.integers(0, 20, n_rows),
+            'id_site': which * 6 + rng.integers(0, 6, n_rows),
+            'date': rng.integers(*dates, n_rows),
+            'sum_click': rng.integers(1, 10, n_rows)
+        })
+
+    history, delta = interactions(3000, (0, 30)), interactions(200, (28, 31))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(acquisition, 'load_vle', lambda: vle)
+    monkeypatch.setattr(acquisition, 'load_student_registration', lambda: registration)
+    delta.to_csv(tmp_path / 'delta.csv', index=False)
+
+    # Sin adquisición completa previa, el lote se rechaza
+    with pytest.raises(RuntimeError):
+        acquisition.ingest_delta_file(tmp_path / 'delta.csv')
+
+    # La adquisición completa solo deja la copia limpia e invalida el almacén; la
+    # primera ingesta siembra el histórico (por bloques) y después añade el lote
+    processed_path = tmp_path / 'data' / 'processed'
+    processed_path.mkdir(parents=True, exist_ok=True)
+    save_processed_data({'student_vle_clean': history}, processed_path, format='parquet')
+    acquisition.reset_interaction_store()
+    monkeypatch.setattr(acquisition.get_resource_plan(), 'chunk_rows', 1000)
+    acquisition.ingest_delta_file(tmp_path / 'delta.csv', verify=True)
+
+    expected = create_interaction_features({'student_vle': pd.concat([history, delta], ignore_index=True), 'vle': vle})
+    result = read_processed_table(processed_path, 'interaction_features')
+    pd.testing.assert_frame_equal(result, expected)
+    assert acquisition.InteractionStore().list_batches()['batch_id'].str.startswith('history-').sum() == 3
+
+    # Un segundo lote no vuelve a sembrar; una nueva adquisición completa sí invalida el almacén
+    delta.assign(date=31).to_csv(tmp_path / 'delta2.csv', index=False)
+    acquisition.ingest_delta_file(tmp_path / 'delta2.csv', verify=True)
+    assert len(acquisition.InteractionStore().read()) == len(history) + 2 * len(delta)
+    acquisition.reset_interaction_store()
+    assert not acquisition.InteractionStore().has_history()
+
+
+def test_enrollment_assessment_features_match_merge():
+    """El motor vectorizado debe coincidir con un merge + groupby de pandas."""
+    from nombre_paquete.database.assessment_engine import create_enrollment_assessment_features
+
+    rng = np.random.default_rng(3)
+    keys = ['id_student', 'code_module', 'code_presentation']
+    assessments = pd.DataFrame({
+        'code_module': ['AAA'] * 4 + ['BBB'] * 4,
+        'code_presentation': ['2013J'] * 4 + ['2014B'] * 4,
+        'id_assessment': np.arange(100, 108),
+        'assessment_type': ['TMA', 'TMA', 'CMA', 'Exam'] * 2,
+        'date': [20.0, 60.0, 90.0, np.nan] * 2,
+        'weight': [10.0, 20.0, 0.0, 100.0] * 2,
+    })
+    student_registration = pd.DataFrame({
+        'id_student': np.arange(40),
+        'code_module': ['AAA', 'BBB'] * 20,
+        'code_presentation': ['2013J', '2014B'] * 20,
+    })
+    student_assessments = student_registration.merge(assessments, on=['code_module', 'code_presentation'])
+    student_assessments = student_assessments.sample(frac=0.7, random_state=0)[['id_assessment', 'id_student', 'date']]
+    student_assessments['date_submitted'] = student_assessments['date'].fillna(200) + rng.integers(-5, 6, len(student_assessments))
+    student_assessments['is_banked'] = 0
+    student_assessments['score'] = rng.uniform(0, 100, len(student_assessments))
+    data_dict = {
+        'assessments': assessments,
+        'student_registration': student_registration,
+        'student_assessments': student_assessments.drop(columns='date'),
+    }
+
+    result = create_enrollment_assessment_features(data_dict, as_of=100).set_index(keys)
+
+    merged = student_assessments.drop(columns='date').merge(assessments, on='id_assessment')
+    merged = merged[merged['date_submitted'] <= 100]
+    merged['lateness'] = merged['date_submitted'] - merged['date']
+    grouped = merged.groupby(keys)
+    expected_weighted = (merged['score'] * merged['weight']).groupby([merged[k] for k in keys]).sum() / grouped['weight'].sum()
+
+    aligned = result.loc[grouped.size().index]
+    np.testing.assert_array_equal(aligned['n_assessments_submitted'], grouped.size())
+    np.testing.assert_allclose(aligned['weighted_score'], expected_weighted)
+    np.testing.assert_allclose(aligned['max_lateness_days'], grouped['lateness'].max())
+    np.testing.assert_array_equal(aligned['n_late_submissions'], grouped['lateness'].apply(lambda x: (x > 0).sum()))
+    expected_tma = merged[merged['assessment_type'] == 'TMA'].groupby(keys)['score'].mean()
+    np.testing.assert_allclose(result.loc[expected_tma.index, 'avg_score_tma'], expected_tma)
+    # Tres fechas límite vencidas (TMA, TMA, CMA) por matrícula
+    assert (result['n_missed_deadlines'] == 3 - result['n_assessments_submitted'] + result['n_exam']).all()
+
+
+def test_budgeted_table_cache_spills_and_frees(tmp_path):
+    """Las tablas que no caben se vuelcan y recargan; se liberan tras su último consumidor."""
+    from nombre_paquete.database.memory_budget import BudgetedTableCache
+
+    tables = {name: _synthetic_student_vle(20000, seed=i) for i, name in enumerate(['a', 'b', 'c'])}
+    table_mb = tables['a'].memory_usage(deep=True).sum() / 1024 ** 2
+    consumers = {'a': ['join'], 'b': ['join', 'report'], 'c': ['report']}
+
+    with BudgetedTableCache(2.5 * table_mb, consumers, spill_dir=tmp_path) as cache:
+        for name, df in tables.items():
+            cache.put(name, df)
+        assert cache.n_spills == 1 and cache.resident_mb <= 2.5 * table_mb
+        pd.testing.assert_frame_equal(cache.get('a'), tables['a'])
+
+        cache.finish_stage('join')
+        pd.testing.assert_frame_equal(cache.get('b'), tables['b'])
+        cache.finish_stage('report')
+        assert cache.resident_mb == 0
+
+
+def test_summarize_table_in_chunks_counts_duplicates_on_disk(tmp_path):
+    """El resumen por bloques con hashes volcados a disco coincide con el resumen en memoria."""
+    from nombre_paquete.database.data_validator import generate_data_summary, summarize_table_in_chunks
+
+    student_vle = _synthetic_student_vle(5000)
+    student_vle = pd.concat([student_vle, student_vle.iloc[::7]], ignore_index=True)
+    chunks = (student_vle.iloc[start:start + 700] for start in range(0, len(student_vle), 700))
+
+    result = summarize_table_in_chunks(
+        'student_vle', chunks, memory_budget_mb=0.01, expected_rows=len(student_vle), spill_dir=tmp_path
+    )
+    expected = generate_data_summary({'student_vle': student_vle})
+
+    assert result['file_summary']['duplicate_rows'] == expected['file_summary']['student_vle']['duplicate_rows']
+    assert result['file_summary']['duplicate_rows'] >= 5000 // 7
+    interactions = result['key_statistics']['interactions']
+    assert interactions['unique_students'] == expected['key_statistics']['interactions']['unique_students']
+    assert interactions['total_clicks'] == expected['key_statistics']['interactions']['total_clicks']
+    assert list(tmp_path.iterdir()) == []
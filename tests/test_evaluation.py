@@ -0,0 +1,75 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from nombre_paquete.evaluation.permutation_importance import (
+    _score_group,
+    group_one_hot_columns,
+    permutation_importance,
+)
+from nombre_paquete.models.baseline_model import BaselineModel
+
+
+class ColumnModel:
+    """Modelo de prueba con salida (n, 1), como la red neuronal."""
+
+    def predict_proba(self, X):
+        return (1 / (1 + np.exp(-X[['f0']].to_numpy()))).reshape(-1, 1)
+
+
+def test_permutation_importance_groups_one_hot_columns_for_any_model():
+    """Las dummies de region (bool, como las genera pd.get_dummies) se permutan juntas con cualquier modelo."""
+    rng = np.random.default_rng(7)
+    X = pd.DataFrame(rng.normal(size=(1500, 3)), columns=['f0', 'f1', 'noise'])
+    region = pd.Series(rng.choice(['East', 'North', 'Wales'], 1500))
+    X = pd.concat([X, pd.get_dummies(region, prefix='region')], axis=1)
+    y = pd.Series((X['f0'] + 2 * X['region_North'] + rng.normal(scale=0.5, size=1500) > 1).astype(int))
+    region_columns = ['region_East', 'region_North', 'region_Wales']
+
+    assert X[region_columns].dtypes.eq(bool).all()
+    assert group_one_hot_columns(X.columns)['region'] == region_columns
+
+    # Un estimador que consume las dummies bool: la región es importante y se puntúa como un solo grupo
+    classifier = LogisticRegression().fit(X, y)
+    importance = permutation_importance(classifier, X, y, n_repeats=3, n_jobs=1).set_index('feature')
+    assert set(importance.index) == {'f0', 'f1', 'noise', 'region'}
+    assert importance.loc['region', 'n_columns'] == 3
+    assert importance.loc['region', 'importance'] > 0.05 and abs(importance.loc['noise', 'importance']) < 0.01
+
+    explicit = permutation_importance(classifier, X, y, groups={'region': region_columns}, n_repeats=3, n_jobs=1)
+    assert explicit['feature'].tolist() == ['region']
+    assert abs(explicit['importance'].iloc[0] - importance.loc['region', 'importance']) < 0.03
+
+    # BaselineModel (solo columnas numéricas) recibe las dummies con su tipo y el resultado no depende de los procesos
+    model = BaselineModel('logistic')
+    model.train(X, y)
+    serial = permutation_importance(model, X, y, n_repeats=3, n_jobs=1).set_index('feature')
+    parallel = permutation_importance(model, X, y, n_repeats=3, n_jobs=2).set_index('feature')
+    assert np.allclose(parallel['importance'], serial['importance'])
+    assert serial.loc['region', 'importance'] == 0
+
+    # Cualquier objeto con predict_proba sirve, también con salida de una sola columna
+    single_output = permutation_importance(ColumnModel(), X, y, n_repeats=2, n_jobs=1)
+    assert single_output.iloc[0]['feature'] == 'f0'
+    assert (single_output.set_index('feature').drop('f0')['importance'] == 0).all()
+
+
+def test_permutation_workers_limit_forest_n_jobs():
+    """En cada proceso el bosque usa los hilos del reparto, no todos los núcleos."""
+    rng = np.random.default_rng(3)
+    X = pd.DataFrame(rng.normal(size=(300, 3)), columns=['f0', 'f1', 'f2'])
+    y = pd.Series((X['f0'] > 0).astype(int))
+    model = BaselineModel('random_forest', params={'n_estimators': 10, 'n_jobs': 8})
+    model.train(X, y)
+
+    scores = _score_group(
+        model, X.to_numpy(), y.to_numpy(), X.columns.tolist(), [], 0, np.array([0]),
+        n_repeats=2, scoring='roc_auc', random_state=0, n_threads=1
+    )
+    assert len(scores) == 2
+    assert model.pipeline.get_params()['model__n_jobs'] == 1
@@ -0,0 +1,162 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from nombre_paquete.preprocessing.feature_engineering import FeatureEngineer
+from nombre_paquete.preprocessing.feature_ranking import rank_features
+
+
+def _synthetic_features(n_rows=500, seed=0):
+    """Genera un DataFrame numérico sintético con valores faltantes y su objetivo."""
+    rng = np.random.default_rng(seed)
+    target = pd.Series(rng.integers(0, 2, n_rows), name='target')
+    features_df = pd.DataFrame({
+        'signal': target * 2.0 + rng.normal(size=n_rows),
+        'noise': rng.normal(size=n_rows),
+        'flag': rng.integers(0, 2, n_rows),
+        'constant': np.ones(n_rows),
+    })
+    features_df.loc[rng.choice(n_rows, 50, replace=False), 'noise'] = np.nan
+    return features_df, target
+
+
+def test_correlation_ranking_matches_pandas_corr():
+    """El ranking vectorizado debe coincidir con la columna 'target' de DataFrame.corr()."""
+    features_df, target = _synthetic_features()
+    features_with_target = features_df.assign(target=target)
+
+    ranking = FeatureEngineer().get_feature_importance_ranking(features_with_target)
+    expected = features_with_target.corr()['target'].abs().drop('target')
+
+    result = ranking.set_index('feature')['correlation']
+    pd.testing.assert_series_equal(
+        result.sort_index(), expected.sort_index(), check_names=False, atol=1e-10
+    )
+    assert ranking.iloc[0]['feature'] == 'signal'
+    assert np.isnan(result['constant'])
+
+
+@pytest.mark.parametrize('method', ['f_score', 'mutual_info'])
+def test_alternative_ranking_methods(method):
+    """F de ANOVA e información mutua deben situar la señal en primer lugar."""
+    pytest.importorskip('sklearn')
+    features_df, target = _synthetic_features()
+
+    ranking = rank_features(features_df, target, method=method, n_jobs=2, chunk_size=2)
+
+    assert list(ranking.columns) == ['feature', method]
+    assert ranking.iloc[0]['feature'] == 'signal'
+
+
+def test_hashed_crosses_have_fixed_width():
+    """El bloque hasheado debe tener siempre n_buckets columnas y un token por cruce y fila."""
+    pytest.importorskip('scipy')
+    from nombre_paquete.preprocessing.feature_hashing import hash_categorical_crosses
+
+    df = pd.DataFrame({
+        'region': ['Wales', 'Scotland', None, 'Wales'],
+        'code_module': ['AAA', 'BBB', 'AAA', 'AAA'],
+    })
+
+    block, tokens = hash_categorical_crosses(df, [('region', 'code_module'), ('code_module',)], n_buckets=32)
+
+    assert block.shape == (4, 32)
+    np.testing.assert_array_equal(np.asarray(block.sum(axis=1)).ravel(), [2, 2, 2, 2])
+    assert tokens[0][2] == 'region=nan|code_module=AAA'
+    # Filas con las mismas categorías producen el mismo vector
+    assert (block[0] != block[3]).nnz == 0
+
+
+def test_quantile_sketch_merge_approximates_median():
+    """Los sketches por partición combinados deben aproximar la mediana global."""
+    from nombre_paquete.preprocessing.quantile_sketch import KLLSketch
+
+    values = np.random.default_rng(0).lognormal(3, 1, 200_000)
+    partitions = [KLLSketch(k=512, seed=i).update(part) for i, part in enumerate(np.array_split(values, 8))]
+    merged = partitions[0]
+    for sketch in partitions[1:]:
+        merged.merge(sketch)
+
+    assert merged.count == values.size
+    assert abs((values < merged.median()).mean() - 0.5) < 0.01
+    # Con pocos datos el sketch es exacto
+    assert KLLSketch().update([1, 2, 3, 4]).median() == np.median([1, 2, 3, 4])
+
+
+def test_modeling_matrix_round_trip(tmp_path):
+    """La matriz binaria guarda las columnas numéricas en float32 y se lee con memory-mapping."""
+    from nombre_paquete.preprocessing.modeling_matrix import load_modeling_matrix, save_modeling_matrix
+
+    features_df, target = _synthetic_features()
+    features_df['region_East'] = features_df['flag'] == 1
+    schema = save_modeling_matrix(features_df, target, tmp_path)
+    assert schema['columns'] == ['signal', 'noise', 'flag', 'constant']
+
+    loaded_df, loaded_target = load_modeling_matrix(tmp_path, mmap=True)
+    assert loaded_df.dtypes.eq(np.float32).all()
+    pd.testing.assert_frame_equal(loaded_df, features_df[schema['columns']].astype(np.float32))
+    pd.testing.assert_series_equal(loaded_target, target.astype(np.int8))
+
+
+def test_modeling_matrix_is_stale_after_csv_or_schema_change(tmp_path):
+    """La matriz no se usa si el CSV es más reciente o su esquema no coincide con feature_info.json."""
+    import json
+    from nombre_paquete.preprocessing.modeling_matrix import (
+        FEATURES_MATRIX_FILE,
+        TARGET_MATRIX_FILE,
+        modeling_matrix_is_current,
+        modeling_matrix_problems,
+        save_modeling_matrix,
+    )
+
+    features_df, target = _synthetic_features()
+    assert not modeling_matrix_is_current(tmp_path)
+    features_df.to_csv(tmp_path / 'modeling_features.csv', index=False)
+    target.to_csv(tmp_path / 'modeling_target.csv', index=False)
+    save_modeling_matrix(features_df, target, tmp_path)
+    feature_info = {
+        'numerical_columns': features_df.columns.tolist(),
+        'feature_dtypes': {col: str(dtype) for col, dtype in features_df.dtypes.items()}
+    }
+    (tmp_path / 'feature_info.json').write_text(json.dumps(feature_info))
+    assert modeling_matrix_is_current(tmp_path)
+
+    # Un preprocesamiento posterior con otras columnas deja la matriz obsoleta
+    feature_info['numerical_columns'].append('new_feature')
+    feature_info['feature_dtypes']['flag'] = 'int8'
+    (tmp_path / 'feature_info.json').write_text(json.dumps(feature_info))
+    problems = modeling_matrix_problems(tmp_path)
+    assert any('columnas' in problem for problem in problems) and any('flag' in problem for problem in problems)
+
+    # CSV reescrito después de la matriz
+    (tmp_path / 'feature_info.json').unlink()
+    assert modeling_matrix_is_current(tmp_path)
+    matrix_mtime = (tmp_path / FEATURES_MATRIX_FILE).stat().st_mtime
+    for name in (FEATURES_MATRIX_FILE, TARGET_MATRIX_FILE):
+        os.utime(tmp_path / name, (matrix_mtime - 10, matrix_mtime - 10))
+    assert not modeling_matrix_is_current(tmp_path)
+    assert all('más reciente' in problem for problem in modeling_matrix_problems(tmp_path))
+
+
+def test_optimize_dtypes_keeps_columns_that_do_not_survive_float32():
+    """Las continuas pasan a float32 salvo si algún valor se sale de su rango o se vuelve subnormal."""
+    features_df = pd.DataFrame({
+        'ratio': [0.1, 0.25, 1 / 3, np.nan],
+        'huge': [0.5, 1e40, 2.0, 3.0],
+        'tiny': [0.5, 1e-42, 2.0, 3.0],
+        'flag': [0, 1, 1, 0],
+        'count': [3.0, np.nan, 7.0, 70000.0],
+    })
+    optimized = FeatureEngineer().optimize_dtypes(features_df)
+    assert optimized['ratio'].dtype == np.float32
+    assert optimized['huge'].dtype == np.float64 and optimized['tiny'].dtype == np.float64
+    assert optimized['flag'].dtype == np.uint8 and optimized['count'].dtype == np.float32
+
+    # Con una tolerancia por debajo del redondeo de float32 las continuas se mantienen en float64
+    strict = FeatureEngineer(float_rtol=1e-9).optimize_dtypes(features_df)
+    assert strict['ratio'].dtype == np.float64 and strict['count'].dtype == np.float32
@@ -0,0 +1,247 @@
+import json
+import os
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.impute import SimpleImputer
+from sklearn.model_selection import cross_validate
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from nombre_paquete.models import binning, cross_validation, incremental
+from nombre_paquete.models.baseline_model import BaselineModel
+from nombre_paquete.models.compiled_forest import CompiledForest
+
+
+def test_cross_validate_matches_sklearn_and_reuses_folds():
+    """La validación cruzada paralela reproduce a sklearn y reutiliza el preprocesamiento de los folds."""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(600, 5)), columns=[f'f{i}' for i in range(5)])
+    X.loc[::7, 'f1'] = np.nan
+    y = pd.Series((X['f0'] + rng.normal(scale=0.5, size=600) > 0).astype(int))
+
+    model = BaselineModel('logistic')
+    metrics = model.cross_validate(X, y, cv=3)
+
+    reference = Pipeline([
+        ('imputer', SimpleImputer(strategy='median')),
+        ('scaler', StandardScaler()),
+        ('model', model.model)
+    ])
+    expected = cross_validate(reference, X, y, cv=3, scoring=['f1', 'roc_auc', 'accuracy'])
+    for name in ('f1', 'roc_auc', 'accuracy'):
+        assert np.allclose(metrics[f'cv_{name}_scores'], expected[f'test_{name}'])
+
+    # Un segundo modelo sobre los mismos datos no vuelve a preprocesar los folds
+    cache = cross_validation.get_fold_cache(X.to_numpy(), y.to_numpy(), cv=3)
+    BaselineModel('random_forest', params={'n_estimators': 5}).cross_validate(X, y, cv=3, scoring=['f1'])
+    assert cross_validation.get_fold_cache(X.to_numpy(), y.to_numpy(), cv=3) is cache
+
+
+def test_tune_prunes_configurations_and_resumes_from_log(tmp_path):
+    """El successive halving promociona menos configuraciones por ronda y reanuda desde el registro."""
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame(rng.normal(size=(3000, 4)), columns=[f'f{i}' for i in range(4)])
+    y = pd.Series((X['f0'] + rng.normal(scale=0.5, size=3000) > 0).astype(int))
+    log_path = tmp_path / 'trials.jsonl'
+    space = {'C': [0.001, 0.01, 0.1, 1.0, 10.0]}
+
+    model = BaselineModel('logistic')
+    pipeline = model.tune(X, y, space=space, budget=3, log_path=str(log_path))
+    assert model.is_fitted and model.tuning_results['best_params']['C'] in space['C']
+    assert pipeline.predict_proba(X).shape == (3000, 2)
+
+    trials = [json.loads(line) for line in log_path.read_text().splitlines()]
+    per_rung = [sum(trial['rung'] == rung for trial in trials) for rung in range(max(t['rung'] for t in trials) + 1)]
+    assert per_rung[0] == len(space['C']) and per_rung[-1] == 1
+    assert all(later < earlier for earlier, later in zip(per_rung, per_rung[1:]))
+
+    # Reanudar no repite pruebas y llega a la misma configuración
+    resumed = BaselineModel('logistic')
+    resumed.tune(X, y, space=space, budget=3, log_path=str(log_path))
+    assert resumed.tuning_results['n_trials'] == 0
+    assert resumed.tuning_results['best_params'] == model.tuning_results['best_params']
+    assert len(log_path.read_text().splitlines()) == len(trials)
+
+
+def test_sgd_logistic_trains_by_chunks_and_resumes_from_checkpoint(tmp_path, monkeypatch):
+    """El modelo 'sgd_logistic' se entrena por bloques y reanudar desde un checkpoint equivale a no interrumpir."""
+    from sklearn.linear_model import SGDClassifier
+
+    rng = np.random.default_rng(2)
+    X = pd.DataFrame(rng.normal(size=(4000, 6)), columns=[f'f{i}' for i in range(6)])
+    X.loc[::9, 'f2'] = np.nan
+    y = pd.Series((X['f0'] - X['f1'] + rng.normal(scale=0.5, size=4000) > 0).astype(int))
+    checkpoint_path = tmp_path / 'sgd_checkpoint.pkl'
+    params = {'epochs': 3, 'chunk_rows': 500, 'checkpoint_path': checkpoint_path}
+
+    # Interrupción durante la tercera época (8 bloques por época)
+    original_partial_fit, calls = SGDClassifier.partial_fit, []
+
+    def interrupted_partial_fit(self, *args, **kwargs):
+        calls.append(1)
+        if len(calls) > 20:
+            raise KeyboardInterrupt
+        return original_partial_fit(self, *args, **kwargs)
+
+    monkeypatch.setattr(SGDClassifier, 'partial_fit', interrupted_partial_fit)
+    try:
+        BaselineModel('sgd_logistic', params=params).train(X, y)
+    except KeyboardInterrupt:
+        pass
+    monkeypatch.setattr(SGDClassifier, 'partial_fit', original_partial_fit)
+    assert joblib.load(checkpoint_path)['epoch'] == 2
+
+    resumed = BaselineModel('sgd_logistic', params=params)
+    metrics = resumed.train(X, y)
+    uninterrupted = BaselineModel('sgd_logistic', params={'epochs': 3, 'chunk_rows': 500})
+    uninterrupted.train(X, y)
+
+    assert metrics['roc_auc'] > 0.9
+    assert np.allclose(resumed.model.coef_, uninterrupted.model.coef_)
+    # Al terminar, el checkpoint se borra: no puede devolver un modelo terminado en otra ejecución
+    assert not checkpoint_path.exists()
+    # Las medianas de la muestra de reservorio son exactas cuando caben todas las filas de entrenamiento
+    assert np.isfinite(resumed.imputer.statistics_).all()
+    assert resumed.predict_proba(X).shape == (4000, 2)
+
+
+def test_sgd_logistic_ignores_checkpoint_of_other_params_or_data(tmp_path):
+    """Un checkpoint de otros hiperparámetros o de otros datos con la misma forma no se reutiliza."""
+    rng = np.random.default_rng(9)
+    X = pd.DataFrame(rng.normal(size=(3000, 4)), columns=[f'f{i}' for i in range(4)])
+    y = pd.Series((X['f0'] > 0).astype(int))
+    checkpoint_path = tmp_path / 'sgd_checkpoint.pkl'
+    streaming = {'epochs': 2, 'chunk_rows': 500, 'checkpoint_path': checkpoint_path}
+
+    def checkpoint_for(X, y, alpha):
+        # Checkpoint de un entrenamiento completo con esos datos y alpha (como uno que no se llegó a borrar)
+        pipeline, _ = incremental.train_incremental_logistic(X, y, params={'alpha': alpha}, epochs=2, chunk_rows=500)
+        signature = {
+            'shape': list(X.shape), 'chunk_rows': 500, 'random_state': 42,
+            'params': {'alpha': alpha, 'random_state': 42, 'loss': 'log_loss'}, 'epochs': 2, 'test_size': 0.2,
+            'data': incremental.data_fingerprint(X, y, 500)
+        }
+        steps = pipeline.named_steps
+        joblib.dump({'signature': signature, 'epoch': 2, 'imputer': steps['imputer'], 'scaler': steps['scaler'],
+                     'model': steps['model']}, checkpoint_path)
+        return steps['model']
+
+    # Otros hiperparámetros: se entrena de nuevo con alpha=10
+    stale = checkpoint_for(X, y, alpha=1e-4)
+    model = BaselineModel('sgd_logistic', params={**streaming, 'alpha': 10.0})
+    model.train(X, y)
+    assert model.model.alpha == 10.0 and not np.allclose(model.model.coef_, stale.coef_)
+
+    # Otros datos con la misma forma (objetivo invertido): el modelo viejo no se devuelve
+    checkpoint_for(X, y, alpha=1e-4)
+    metrics = BaselineModel('sgd_logistic', params=streaming).train(X, 1 - y)
+    assert metrics['roc_auc'] > 0.9
+
+
+def test_hist_gb_reuses_binned_matrix_and_keeps_missing_values(tmp_path, monkeypatch):
+    """'hist_gb' discretiza una sola vez (caché en disco), conserva los NaN y se guarda y carga como los demás."""
+    monkeypatch.setattr(binning, 'BIN_CACHE_DIR', tmp_path / 'bins')
+    rng = np.random.default_rng(3)
+    X = pd.DataFrame(rng.normal(size=(2000, 4)), columns=[f'f{i}' for i in range(4)])
+    X.loc[::5, 'f3'] = np.nan
+    y = pd.Series(((X['f0'] > 0) ^ X['f3'].isna()).astype(int))
+
+    model = BaselineModel('hist_gb', params={'max_iter': 30})
+    metrics = model.train(X, y)
+    cv_metrics = model.cross_validate(X, y, cv=3, scoring=['roc_auc'])
+    assert len(list((tmp_path / 'bins').glob('*.npy'))) == 1
+    # Los faltantes llegan al modelo como NaN: sin imputar, la señal del NaN se aprende
+    assert metrics['roc_auc'] > 0.95 and cv_metrics['cv_roc_auc_mean'] > 0.95
+    assert 'imputer' not in model.pipeline.named_steps
+
+    codes = model.pipeline.named_steps['binner'].transform_codes(X)
+    assert codes.dtype == np.uint8 and (codes[::5, 3] == binning.MISSING_CODE).all()
+
+    model_path = tmp_path / 'hist_gb.pkl'
+    model.save_model(str(model_path))
+    loaded = BaselineModel('hist_gb')
+    loaded.load_model(str(model_path))
+    assert np.allclose(loaded.predict_proba(X), model.predict_proba(X))
+
+
+def test_compiled_forest_matches_sklearn_pipeline(tmp_path):
+    """El random forest compilado (imputador y escalador plegados en los umbrales) reproduce al pipeline."""
+    rng = np.random.default_rng(4)
+    X = pd.DataFrame(rng.normal(loc=3, scale=2, size=(1500, 5)), columns=[f'f{i}' for i in range(5)])
+    X.loc[::6, 'f0'] = np.nan
+    y = pd.Series((X['f0'].fillna(3) + X['f1'] > 6).astype(int))
+
+    model = BaselineModel('random_forest', params={'n_estimators': 15})
+    model.train(X, y)
+
+    compiled = CompiledForest.from_pipeline(model.pipeline)
+    compiled.save(tmp_path / 'compiled')
+    loaded = CompiledForest.load(tmp_path / 'compiled')
+    assert isinstance(loaded.arrays['threshold'], np.memmap)
+
+    # Columnas desordenadas: el predictor las reordena por nombre
+    X_shuffled = X[['f3', 'f0', 'f4', 'f1', 'f2']]
+    assert np.allclose(loaded.predict_proba(X_shuffled), model.predict_proba(X), atol=1e-6)
+    assert (loaded.predict(X) == model.predict(X)).all()
+
+    quantized = CompiledForest.from_pipeline(model.pipeline, value_dtype='uint8')
+    assert np.abs(quantized.predict_proba(X) - model.predict_proba(X)).max() <= 0.5 / 255 + 1e-9
+
+
+def test_artifact_round_trip_with_mmap_and_compression(tmp_path):
+    """El artefacto .tdsp se carga mapeado o en memoria (también desde .gz) con las mismas predicciones."""
+    rng = np.random.default_rng(5)
+    X = pd.DataFrame(rng.normal(size=(1000, 4)), columns=[f'f{i}' for i in range(4)])
+    X.loc[::8, 'f2'] = np.nan
+    y = pd.Series((X['f0'] + X['f1'] > 0).astype(int))
+
+    model = BaselineModel('random_forest', params={'n_estimators': 10})
+    model.train(X, y)
+    artifact_path = tmp_path / 'random_forest.tdsp'
+    model.save_model(str(artifact_path), compress=True)
+
+    in_memory = BaselineModel('random_forest')
+    in_memory.load_model(str(artifact_path))
+    assert np.allclose(in_memory.predict_proba(X), model.predict_proba(X))
+    assert in_memory.feature_schema['columns'] == list(X.columns)
+
+    # Mapeado: el random forest se sirve con su versión compilada, con arrays de solo lectura
+    mapped = BaselineModel('random_forest')
+    mapped.load_model(str(artifact_path), mmap=True)
+    assert isinstance(mapped.model, CompiledForest)
+    assert not mapped.model.arrays['threshold'].flags.writeable
+    assert np.allclose(mapped.predict_proba(X), model.predict_proba(X), atol=1e-6)
+
+    artifact_path.unlink()
+    compressed = BaselineModel('random_forest')
+    compressed.load_model(str(artifact_path) + '.gz', mmap=True)
+    assert artifact_path.exists()
+    assert np.allclose(compressed.predict_proba(X), model.predict_proba(X), atol=1e-6)
+
+
+def test_adaptive_random_forest_stops_on_oob_plateau():
+    """El random forest adaptativo se detiene cuando el OOB se estabiliza y su OOB coincide con el de sklearn."""
+    rng = np.random.default_rng(6)
+    X = pd.DataFrame(rng.normal(size=(2000, 5)), columns=[f'f{i}' for i in range(5)])
+    y = pd.Series((X['f0'] > 0).astype(int))
+
+    model = BaselineModel('random_forest', params={
+        'n_estimators': 300, 'adaptive': True, 'growth_step': 10, 'max_samples': 0.5
+    })
+    metrics = model.train(X, y)
+    curve = metrics['growth_curve']
+    assert metrics['n_estimators'] < 300 and len(model.model.estimators_) == metrics['n_estimators']
+    assert [point['n_estimators'] for point in curve] == list(range(10, metrics['n_estimators'] + 1, 10))
+    assert 'adaptive' not in model.model.get_params() and not model.model.warm_start
+
+    # Las predicciones OOB acumuladas por incrementos son las del bosque completo
+    X_train, _, y_train, _ = model.prepare_data(X, y)
+    reference = clone(model.model).set_params(oob_score=True)
+    reference.fit(model.scaler.transform(model.imputer.transform(X_train)), y_train)
+    assert np.isclose(curve[-1]['oob_accuracy'], reference.oob_score_)
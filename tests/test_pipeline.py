@@ -0,0 +1,115 @@
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from nombre_paquete.pipeline.orchestrator import PipelineOrchestrator, Stage, python_dependencies
+
+
+def _copy_stage(name, source, target, depends_on=(), params=None):
+    """Etapa que copia un fichero añadiendo su nombre y parámetros (simula una etapa real)."""
+    suffix = name + ''.join(str(value) for value in (params or {}).values())
+    script = f"import pathlib; pathlib.Path('{target}').write_text(pathlib.Path('{source}').read_text() + '{suffix}')"
+    return Stage(
+        name=name,
+        command=[sys.executable, '-c', script],
+        inputs=[source],
+        outputs=[target],
+        params=params,
+        depends_on=depends_on
+    )
+
+
+def _build(tmp_path, nn_params):
+    stages = [
+        _copy_stage('prepare', 'raw.txt', 'features.txt'),
+        _copy_stage('train_a', 'features.txt', 'model_a.txt', ['prepare'], {'depth': 3}),
+        _copy_stage('train_b', 'features.txt', 'model_b.txt', ['prepare'], nn_params),
+        _copy_stage('evaluate', 'model_b.txt', 'report.txt', ['train_a', 'train_b']),
+    ]
+    return PipelineOrchestrator(stages, root=tmp_path, max_workers=2)
+
+
+def test_orchestrator_skips_unchanged_stages(tmp_path):
+    """Solo deben re-ejecutarse las etapas afectadas por un cambio de parámetros."""
+    (tmp_path / 'raw.txt').write_text('raw')
+
+    first = _build(tmp_path, {'epochs': 1}).run()
+    assert set(first.values()) == {'ran'}
+    assert (tmp_path / 'report.txt').read_text() == 'rawpreparetrain_b1evaluate'
+
+    assert set(_build(tmp_path, {'epochs': 1}).run().values()) == {'cached'}
+
+    changed = _build(tmp_path, {'epochs': 2}).run()
+    assert changed == {'prepare': 'cached', 'train_a': 'cached', 'train_b': 'ran', 'evaluate': 'ran'}
+
+    # Volver a los parámetros anteriores recupera los artefactos de la caché
+    (tmp_path / 'model_b.txt').unlink()
+    restored = _build(tmp_path, {'epochs': 1}).run()
+    assert restored['train_b'] == 'restored' and restored['evaluate'] == 'restored'
+    assert (tmp_path / 'model_b.txt').read_text() == 'rawpreparetrain_b1'
+
+
+def _cpu_limit_stage(name, target, depends_on=()):
+    """Etapa que escribe el límite de núcleos que recibe del orquestador."""
+    script = f"import os, pathlib; pathlib.Path('{target}').write_text(os.environ['TDSP_CPU_LIMIT'])"
+    return Stage(name=name, command=[sys.executable, '-c', script], inputs=['raw.txt'], outputs=[target],
+                 depends_on=depends_on)
+
+
+def test_orchestrator_splits_cores_between_concurrent_stages(tmp_path, monkeypatch):
+    """Una etapa sola recibe todos los núcleos; dos etapas a la vez se los reparten."""
+    from nombre_paquete.pipeline import orchestrator
+    from nombre_paquete.resource_planner import ResourcePlan
+
+    (tmp_path / 'raw.txt').write_text('raw')
+    plan = ResourcePlan(n_cpus=8, memory_mb=64 * 1024)
+    monkeypatch.setattr(orchestrator, 'get_resource_plan', lambda: plan)
+    stages = [
+        _cpu_limit_stage('alone', 'alone.txt'),
+        _cpu_limit_stage('left', 'left.txt', ['alone']),
+        _cpu_limit_stage('right', 'right.txt', ['alone']),
+    ]
+    PipelineOrchestrator(stages, root=tmp_path).run()
+
+    assert (tmp_path / 'alone.txt').read_text() == '8'
+    assert (tmp_path / 'left.txt').read_text() == '4'
+    assert (tmp_path / 'right.txt').read_text() == '4'
+
+
+def test_stage_code_follows_transitive_imports(tmp_path):
+    """El código de una etapa incluye los módulos importados indirectamente, también con imports relativos."""
+    package = tmp_path / 'src' / 'pkg'
+    (package / 'sub').mkdir(parents=True)
+    (package / '__init__.py').write_text('')
+    (package / 'sub' / '__init__.py').write_text('from .a import run\n')
+    (package / 'sub' / 'a.py').write_text('from ..planner import plan\n\ndef run():\n    from . import lazy\n')
+    (package / 'sub' / 'lazy.py').write_text('')
+    (package / 'planner.py').write_text('import json\n')
+    (package / 'unused.py').write_text('')
+    (package / 'other.py').write_text('')
+    (tmp_path / 'main.py').write_text('import pkg.other\nfrom pkg.sub.a import run\n')
+
+    code = {path.as_posix() for path in python_dependencies('main.py', Path('src') / 'pkg', root=tmp_path)}
+    assert code == {
+        'main.py', 'src/pkg/__init__.py', 'src/pkg/sub/__init__.py', 'src/pkg/sub/a.py',
+        'src/pkg/sub/lazy.py', 'src/pkg/planner.py', 'src/pkg/other.py'
+    }
+    excluded = python_dependencies('main.py', Path('src') / 'pkg', root=tmp_path, exclude=[Path('src/pkg/other.py')])
+    assert Path('src/pkg/other.py') not in excluded
+
+    # Las etapas reales dependen de los módulos que sus scripts usan de forma transitiva
+    spec = importlib.util.spec_from_file_location(
+        'pipeline_main', Path(__file__).parent.parent / 'scripts' / 'pipeline' / 'main.py'
+    )
+    pipeline_main = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(pipeline_main)
+    stages = {stage.name: stage for stage in pipeline_main.build_stages({})}
+    database = pipeline_main.PACKAGE / 'database'
+    for module in ['feature_store.py', 'out_of_core.py', 'assessment_engine.py']:
+        assert database / module in stages['preprocessing'].code
+    planner = pipeline_main.PACKAGE / 'resource_planner.py'
+    assert planner in stages['preprocessing'].code and planner in stages['train_baseline'].code
+    assert pipeline_main.PACKAGE / 'models' / 'neural_network.py' not in stages['train_baseline'].code
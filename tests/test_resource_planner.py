@@ -0,0 +1,25 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from nombre_paquete.resource_planner import MAX_CHUNK_ROWS, MIN_CHUNK_ROWS, ResourcePlan, plan_resources
+
+
+def test_resource_plan_avoids_oversubscription(monkeypatch):
+    """Los workers se limitan por memoria y los hilos BLAS reparten los núcleos entre ellos."""
+    laptop = ResourcePlan(n_cpus=8, memory_mb=4096)
+    assert laptop.n_workers == 4 and laptop.blas_threads == 2
+    assert laptop.n_workers * laptop.blas_threads <= laptop.n_cpus
+    assert MIN_CHUNK_ROWS <= laptop.chunk_rows <= MAX_CHUNK_ROWS
+
+    server = ResourcePlan(n_cpus=64, memory_mb=256 * 1024)
+    assert server.n_workers == 64 and server.blas_threads == 1
+    assert server.chunk_rows > laptop.chunk_rows
+    assert server.resolve_n_jobs(-1) == 64 and server.resolve_n_jobs(3) == 3
+
+    # El límite impuesto por el orquestador se respeta al planificar en el subproceso
+    monkeypatch.setenv('TDSP_CPU_LIMIT', '1')
+    monkeypatch.setenv('TDSP_MEMORY_LIMIT_MB', '1024')
+    plan = plan_resources()
+    assert plan.n_cpus == 1 and plan.n_workers == 1 and plan.memory_mb <= 1024